@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# ISM_Server/bench_cold_start.py - SAM 모델 생성 + 체크포인트 로드 시간 (기존: CPU 무작위 초기화 + torch.load + 복사 + .to(device)
+# vs init_empty_weights + mmap 로드를 device에 바로)
+import argparse
+import os
+import tempfile
+import time
+
+import torch
+
+from segment_anything import sam_model_registry
+from utils.checkpoint import init_empty_weights, load_checkpoint, load_weights
+
+
+def legacy_load(model_type, path, device):
+    sam = sam_model_registry[model_type]()
+    with open(path, "rb") as f:
+        sam.load_state_dict(torch.load(f))
+    return sam.to(device)
+
+
+def fast_load(model_type, path, device):
+    with init_empty_weights(device):
+        sam = sam_model_registry[model_type]()
+    load_weights(sam, load_checkpoint(path, device))
+    return sam
+
+
+def timed(fn, device):
+    start = time.perf_counter()
+    result = fn()
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model-type", default="vit_b", choices=["vit_b", "vit_l", "vit_h"])
+    parser.add_argument("--device", default="cuda" if torch.cuda.is_available() else "cpu")
+    args = parser.parse_args()
+    device = torch.device(args.device)
+
+    # 무작위 가중치로 만든 체크포인트 (실제 SAM 체크포인트와 같은 키 / 크기)
+    path = os.path.join(tempfile.mkdtemp(prefix="ism_cold_start_"), f"sam_{args.model_type}.pth")
+    torch.save(sam_model_registry[args.model_type]().state_dict(), path)
+    size_mb = os.path.getsize(path) / 1e6
+    try:
+        legacy, legacy_sec = timed(lambda: legacy_load(args.model_type, path, device), device)
+        fast, fast_sec = timed(lambda: fast_load(args.model_type, path, device), device)
+        x = torch.randn(1, 3, 256, 256, device=device)
+        with torch.no_grad():
+            same = torch.equal(legacy.image_encoder.patch_embed(x), fast.image_encoder.patch_embed(x))
+        assert same and torch.equal(legacy.pixel_mean, fast.pixel_mean)
+        print(f"SAM {args.model_type} ({size_mb:.0f} MB) on {device}: legacy {legacy_sec:.2f}s | "
+              f"init_empty_weights + mmap {fast_sec:.2f}s ({legacy_sec / fast_sec:.1f}x)")
+    finally:
+        os.remove(path)
+        os.rmdir(os.path.dirname(path))
+
+
+if __name__ == "__main__":
+    main()
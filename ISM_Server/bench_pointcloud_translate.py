@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# ISM_Server/bench_pointcloud_translate.py - 제안 마스크 평균 translation 계산 마이크로 벤치마크
+import time
+
+import torch
+
+from utils.trimesh_utils import depth_image_to_pointcloud_translate_torch
+
+
+def legacy_translate(depth, scale, K):
+    """기존 meshgrid 매 호출 생성 구현 (비교 기준)"""
+    u, v = torch.meshgrid(torch.arange(0, depth.shape[2]), torch.arange(0, depth.shape[1]), indexing="xy")
+    u = u.to(depth.device)
+    v = v.to(depth.device)
+    Z = depth * scale / 1000
+    X = (u - K[0, 2]) * Z / K[0, 0]
+    Y = (v - K[1, 2]) * Z / K[1, 1]
+    valid = Z > 0
+    X, Y, Z = X * valid, Y * valid, Z * valid
+    valid_num = torch.count_nonzero(valid, axis=(1, 2)) + 1e-8
+    return torch.vstack((X.sum((1, 2)), Y.sum((1, 2)), Z.sum((1, 2)))).permute(1, 0) / valid_num[:, None]
+
+
+def timeit(fn, device, repeat):
+    fn()
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main(num_query=50, repeat=20):
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    for im_W, im_H in [(640, 480), (1280, 720)]:
+        K = torch.tensor([[615.0, 0.0, im_W / 2], [0.0, 615.0, im_H / 2], [0.0, 0.0, 1.0]], device=device)
+        depth = torch.rand(num_query, im_H, im_W, device=device) * 1500
+        depth[depth < 300] = 0
+
+        expected = legacy_translate(depth, 1.0, K)
+        actual = depth_image_to_pointcloud_translate_torch(depth, 1.0, K)
+        assert torch.allclose(actual.float(), expected.float(), rtol=1e-4, atol=1e-4)
+
+        legacy_ms = timeit(lambda: legacy_translate(depth, 1.0, K), device, repeat)
+        cached_ms = timeit(lambda: depth_image_to_pointcloud_translate_torch(depth, 1.0, K), device, repeat)
+        print(f"{device} {im_W}x{im_H} N={num_query}: legacy {legacy_ms:8.2f} ms | ray grid {cached_ms:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# ISM_Server/bench_precision.py - 백본 정밀도 (fp16 / bf16 autocast, channels-last)의 fp32 대비 정확도 / 속도 / 메모리 확인
+#
+# 저장된 프레임마다 fp32와 대상 정밀도로 각각 실행해서 비교:
+#   - SAM: 같은 프레임의 마스크 IoU (fp32 마스크마다 최대 IoU)
+#   - DINOv2: 같은 (fp32 SAM) 제안에 대한 compute_semantic_score 결과 (선택 제안 / 객체 배정 / 점수 순위)
+# 기준 (utils/precision.PARITY_THRESHOLDS) 미달이면 종료 코드 1.
+#
+#   python bench_precision.py --frames /path/to/frames --template-dir ../static/templates/ycb/obj_000005 \
+#       --segmentor-precision fp16 --descriptor-precision fp16
+import argparse
+import glob
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+from PIL import Image
+
+from utils.precision import compare_masks, compare_semantic, parity_failures, set_precision
+
+
+def find_frames(paths):
+    frames = []
+    for path in paths:
+        if os.path.isdir(path):
+            frames += sorted(p for ext in ("png", "jpg", "jpeg") for p in glob.glob(os.path.join(path, f"*.{ext}")))
+        else:
+            frames.append(path)
+    return frames
+
+
+def timed(fn, device):
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+        torch.cuda.reset_peak_memory_stats(device)
+    start = time.perf_counter()
+    result = fn()
+    if device.type == "cuda":
+        torch.cuda.synchronize()
+        peak_mb = torch.cuda.max_memory_allocated(device) / 2**20
+    else:
+        peak_mb = 0.0
+    return result, time.perf_counter() - start, peak_mb
+
+
+def run_descriptor(model, image, masks, boxes):
+    """DINOv2 디스크립터 + semantic score (Detections를 매번 새로 만듦: process_masks_proposals가 마스크를 제자리 수정)"""
+    from model.utils import Detections
+
+    proposals = Detections({"masks": masks.clone(), "boxes": boxes.clone()})
+    descriptors, _ = model.descriptor_model(image, proposals)
+    return model.compute_semantic_score(descriptors)
+
+
+def mean(values):
+    return sum(values) / len(values) if values else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", nargs="+", required=True, help="RGB 프레임 파일 또는 디렉토리")
+    parser.add_argument("--template-dir", required=True, help="semantic score 기준 템플릿 디렉토리")
+    parser.add_argument("--segmentor-precision", default="fp16", choices=["fp32", "fp16", "bf16"])
+    parser.add_argument("--descriptor-precision", default="fp16", choices=["fp32", "fp16", "bf16"])
+    parser.add_argument("--channels-last", action="store_true")
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    import main as ism
+
+    frames = find_frames(args.frames)
+    if not frames:
+        sys.exit(f"No frames found in {args.frames}")
+    if not ism._load_model():
+        sys.exit("Model loading failed")
+    model, device = ism.model, ism.device
+    encoder = model.segmentor_model.predictor.model.image_encoder
+    backbone = model.descriptor_model.model
+
+    # 템플릿 디스크립터는 fp32로 계산 (서버에서 캐시되는 기준 디스크립터와 같은 조건)
+    set_precision(encoder, "fp32")
+    set_precision(backbone, "fp32")
+    templates, _, _ = ism.load_template_bundle(args.template_dir, device)
+    with torch.no_grad():
+        model.ref_data = {"descriptors": model.descriptor_model.compute_features(
+            templates, token_name="x_norm_clstoken").unsqueeze(0)}
+
+    # 첫 실행의 커널 선택 / 할당 비용이 비교에 섞이지 않게 양쪽 설정으로 한 번씩 워밍업
+    warmup_image = np.array(Image.open(frames[0]).convert("RGB"))
+    for seg, desc in (("fp32", "fp32"), (args.segmentor_precision, args.descriptor_precision)):
+        set_precision(encoder, seg, args.channels_last and seg != "fp32")
+        set_precision(backbone, desc, args.channels_last and desc != "fp32")
+        with torch.no_grad():
+            warm = model.segmentor_model.generate_masks(warmup_image)
+            run_descriptor(model, warmup_image, warm["masks"], warm["boxes"])
+
+    rows, stats = [], {"sam": {"fp32": [], "test": []}, "dino": {"fp32": [], "test": []}}
+    for path in frames:
+        image = np.array(Image.open(path).convert("RGB"))
+        with torch.no_grad():
+            set_precision(encoder, "fp32")
+            set_precision(backbone, "fp32")
+            ref_masks, sam_sec, sam_mb = timed(lambda: model.segmentor_model.generate_masks(image), device)
+            stats["sam"]["fp32"].append((sam_sec, sam_mb))
+            ref_semantic, dino_sec, dino_mb = timed(
+                lambda: run_descriptor(model, image, ref_masks["masks"], ref_masks["boxes"]), device)
+            stats["dino"]["fp32"].append((dino_sec, dino_mb))
+
+            set_precision(encoder, args.segmentor_precision, args.channels_last)
+            set_precision(backbone, args.descriptor_precision, args.channels_last)
+            test_masks, sam_sec, sam_mb = timed(lambda: model.segmentor_model.generate_masks(image), device)
+            stats["sam"]["test"].append((sam_sec, sam_mb))
+            test_semantic, dino_sec, dino_mb = timed(
+                lambda: run_descriptor(model, image, ref_masks["masks"], ref_masks["boxes"]), device)
+            stats["dino"]["test"].append((dino_sec, dino_mb))
+
+        metrics = {**compare_masks(ref_masks["masks"], test_masks["masks"]),
+                   **{k: v for k, v in compare_semantic(ref_semantic, test_semantic, args.top_k).items()
+                      if not k.startswith("num_")}}
+        rows.append(metrics)
+        print(f"{os.path.basename(path)}: masks {metrics['num_ref']}/{metrics['num_test']} "
+              f"IoU mean {metrics['mean_iou']:.4f} min {metrics['min_iou']:.4f} | "
+              f"semantic jaccard {metrics['selected_jaccard']:.3f} objects {metrics['object_agreement']:.3f} "
+              f"top{args.top_k} {metrics['topk_overlap']:.2f} max |Δscore| {metrics['max_score_diff']:.4f}")
+
+    summary = {name: mean([row[name] for row in rows])
+               for name in ("mean_iou", "selected_jaccard", "object_agreement", "topk_overlap")}
+    summary["min_iou"] = min(row["min_iou"] for row in rows)
+    summary["top1_match"] = mean([float(row["top1_match"]) for row in rows])
+    print(f"\nSAM {args.segmentor_precision} / DINOv2 {args.descriptor_precision} "
+          f"(channels_last={args.channels_last}) vs fp32 on {device}, {len(rows)} frames")
+    for backbone_name, runs in stats.items():
+        ref_sec, ref_mb = mean([s for s, _ in runs["fp32"]]), max(m for _, m in runs["fp32"])
+        test_sec, test_mb = mean([s for s, _ in runs["test"]]), max(m for _, m in runs["test"])
+        print(f"  {backbone_name}: {ref_sec * 1000:.1f} ms -> {test_sec * 1000:.1f} ms ({ref_sec / test_sec:.2f}x)"
+              + (f", peak {ref_mb:.0f} MB -> {test_mb:.0f} MB" if device.type == "cuda" else ""))
+    print("  " + ", ".join(f"{k} {v:.4f}" for k, v in summary.items()))
+
+    failures = parity_failures(summary)
+    if failures:
+        print("❌ parity check failed: " + "; ".join(failures))
+        sys.exit(1)
+    print("✅ parity check passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# ISM_Server/bench_rle.py - RLE encode/decode 마이크로 벤치마크 (기존 루프 vs 벡터화)
+import argparse
+import time
+
+import numpy as np
+import torch
+
+from test_rle_utils import legacy_mask_to_rle, legacy_rle_to_mask, sample_masks
+from sam6d_common.rle import mask_to_rle, masks_to_rle_torch, rle_to_mask
+
+
+def timeit(fn, repeat, device="cpu"):
+    fn()  # warmup
+    if device == "cuda":
+        torch.cuda.synchronize()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    if device == "cuda":
+        torch.cuda.synchronize()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", default=["640x480", "1280x720"])
+    parser.add_argument("--num-masks", type=int, default=10)  # ISM 응답 상위 10개
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    devices = ["cpu"] + (["cuda"] if torch.cuda.is_available() else [])
+    print(f"num_masks={args.num_masks} (ms per batch)")
+    for size in args.sizes:
+        w, h = map(int, size.split("x"))
+        masks = sample_masks(args.num_masks, h, w)
+        rles = [mask_to_rle(mask) for mask in masks]
+        assert rles == [legacy_mask_to_rle(mask) for mask in masks]
+        assert all(np.array_equal(rle_to_mask(rle), legacy_rle_to_mask(rle)) for rle in rles)
+
+        enc_legacy = timeit(lambda: [legacy_mask_to_rle(mask) for mask in masks], 1)
+        enc_numpy = timeit(lambda: [mask_to_rle(mask) for mask in masks], args.repeat)
+        dec_legacy = timeit(lambda: [legacy_rle_to_mask(rle) for rle in rles], args.repeat)
+        dec_numpy = timeit(lambda: [rle_to_mask(rle) for rle in rles], args.repeat)
+        print(
+            f"{size:>9} encode: legacy {enc_legacy:>9.2f} | numpy {enc_numpy:>7.2f} | "
+            f"decode: legacy {dec_legacy:>7.2f} | numpy {dec_numpy:>7.2f}"
+        )
+        for device in devices:
+            masks_t = torch.from_numpy(masks).to(device=device, dtype=torch.bool)
+            enc_torch = timeit(lambda: masks_to_rle_torch(masks_t), args.repeat, device)
+            print(f"{size:>9} encode: torch batched ({device}) {enc_torch:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
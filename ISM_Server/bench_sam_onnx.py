@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# ISM_Server/bench_sam_onnx.py - SAM 자동 마스크 생성 CPU 시간 (PyTorch vs ONNX Runtime 백엔드)과 제안 일치 확인
+#
+#   python bench_sam_onnx.py --checkpoint-dir ./checkpoints/segment-anything --model-type vit_h --image frame.png
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import torch
+from PIL import Image
+
+from segment_anything.utils.amg import build_all_layer_point_grids
+from model.sam import CustomSamAutomaticMaskGenerator, load_sam
+from utils.precision import compare_masks
+from utils.startup import synthetic_image
+
+# configs/model/segmentor_model/sam.yaml과 같은 값
+GENERATOR_KWARGS = dict(
+    points_per_batch=64,
+    stability_score_thresh=0.85,
+    box_nms_thresh=0.7,
+    min_mask_region_area=0,
+    pred_iou_thresh=0.88,
+    segmentor_width_size=640,
+)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--checkpoint-dir", required=True)
+    parser.add_argument("--model-type", default="vit_b", choices=["vit_b", "vit_l", "vit_h"])
+    parser.add_argument("--image", help="RGB 프레임 (없으면 합성 640x480)")
+    parser.add_argument("--onnx-dir", help="내보낸 그래프 위치 (없으면 임시 디렉토리에 내보냄)")
+    parser.add_argument("--points-per-side", type=int, default=32)
+    parser.add_argument("--onnx-points-per-batch", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=0, help="torch / ONNX Runtime 스레드 수 (0: 기본값)")
+    parser.add_argument("--pred-iou-thresh", type=float, default=GENERATOR_KWARGS["pred_iou_thresh"])
+    parser.add_argument("--stability-score-thresh", type=float, default=GENERATOR_KWARGS["stability_score_thresh"])
+    args = parser.parse_args()
+    generator_kwargs = {**GENERATOR_KWARGS, "pred_iou_thresh": args.pred_iou_thresh,
+                        "stability_score_thresh": args.stability_score_thresh}
+    if args.threads:
+        torch.set_num_threads(args.threads)
+        os.environ["ISM_ONNX_THREADS"] = str(args.threads)
+
+    image = np.array(Image.open(args.image).convert("RGB")) if args.image else synthetic_image(480, 640)
+    onnx_dir = args.onnx_dir or tempfile.mkdtemp(prefix="ism_sam_onnx_")
+    try:
+        grids = build_all_layer_point_grids(args.points_per_side, 0, 1)
+        reference = CustomSamAutomaticMaskGenerator(load_sam(args.model_type, args.checkpoint_dir, "cpu"), **generator_kwargs)
+        # ONNX 백엔드는 PyTorch 이미지 인코더를 해제하므로 따로 로드 (mmap이라 체크포인트 페이지는 공유)
+        onnx, init_sec = timed(lambda: CustomSamAutomaticMaskGenerator(
+            load_sam(args.model_type, args.checkpoint_dir, "cpu"), backend="onnx", onnx_dir=onnx_dir, onnx_points_per_batch=args.onnx_points_per_batch,
+            **generator_kwargs))
+        reference.point_grids = onnx.point_grids = grids
+
+        with torch.no_grad():
+            expected, torch_sec = timed(lambda: reference.generate_masks(image))
+            actual, onnx_sec = timed(lambda: onnx.generate_masks(image))
+
+        forward, backward = compare_masks(expected["masks"], actual["masks"]), compare_masks(actual["masks"], expected["masks"])
+        print(f"SAM {args.model_type} on CPU ({torch.get_num_threads()} threads), {image.shape[1]}x{image.shape[0]}, "
+              f"{args.points_per_side ** 2} points")
+        print(f"  ONNX init (export if missing + session): {init_sec:.1f}s")
+        print(f"  generate_masks: torch {torch_sec:.1f}s | onnx {onnx_sec:.1f}s ({torch_sec / onnx_sec:.2f}x)")
+        print(f"  proposals: torch {forward['num_ref']} | onnx {forward['num_test']}, "
+              f"IoU torch->onnx mean {forward['mean_iou']:.4f} min {forward['min_iou']:.4f}, "
+              f"onnx->torch min {backward['min_iou']:.4f}")
+    finally:
+        if not args.onnx_dir:
+            shutil.rmtree(onnx_dir)
+
+
+if __name__ == "__main__":
+    main()
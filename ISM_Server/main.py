@@ -1,12 +1,13 @@
 # ISM_Server/main.py - Phase 2: 모델 로딩 기능 구현
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
+import asyncio
 import os
 import sys
 import time
 import torch
-import trimesh
 from PIL import Image
 import numpy as np
 import base64
@@ -14,18 +15,16 @@ import io
 import json
 import logging
 from datetime import datetime
-from hydra import initialize, initialize_config_dir, compose
-from hydra.utils import instantiate
-from omegaconf import OmegaConf
 from contextlib import asynccontextmanager
 
-# SAM-6D 모듈 import
+# SAM-6D 모듈 경로 (hydra / SAM / DINOv2 / SAM-6D 코어 import는 포트를 연 뒤 백그라운드 로드에서)
 import os
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sam6d_path = os.path.join(current_dir, '..', 'SAM-6D', 'SAM-6D', 'Instance_Segmentation_Model')
 sam6d_path = os.path.abspath(sam6d_path)
 sys.path.append(sam6d_path)
-from run_inference_custom_function import load_templates_from_files, run_inference_core, batch_input_data_from_params
+# 공용 모듈 (sam6d_common) 은 저장소 루트에 있음
+sys.path.append(os.path.dirname(current_dir))
 
 # 전역 변수
 model = None
@@ -38,6 +37,14 @@ device = None
 # --- Start of Caching Implementation ---
 from threading import Lock
 from lru_cache import LRUCache
+from sam6d_common.rle import detections_to_bop, mask_to_rle, masks_to_rle_torch, rle_to_mask
+from utils.artifact_writer import ARTIFACT_WRITER
+from utils.metrics import METRICS
+from utils.tracing import TRACER
+from sam6d_common.cache_warmer import CacheWarmer, resolve_targets
+from sam6d_common.metrics import CONTENT_TYPE
+from sam6d_common.tracing import TracingMiddleware
+from utils.startup import StartupState, warmup_model
 
 # 스레드 안전성을 위한 Lock 객체
 CACHE_LOCK = Lock()
@@ -48,8 +55,130 @@ MAX_CACHE_SIZE = int(os.getenv("ISM_MAX_CACHE_SIZE", 20))
 # 템플릿과 CAD 모델을 위한 LRU 캐시
 TEMPLATE_CACHE = LRUCache(capacity=MAX_CACHE_SIZE)
 CAD_CACHE = LRUCache(capacity=MAX_CACHE_SIZE)
+
+# /cache/warm 대기열에 둘 수 있는 최대 객체 수
+WARM_MAX_PENDING = int(os.getenv("ISM_WARM_MAX_PENDING", "64"))
+
+# /metrics 게이지 (스크랩 시점에 계산)
+for _name, _cache in (("template", TEMPLATE_CACHE), ("cad", CAD_CACHE)):
+    METRICS.cache_hit_ratio.set_function(lambda c=_cache: c.hit_ratio, cache=_name)
+    METRICS.cache_entries.set_function(lambda c=_cache: len(c), cache=_name)
+METRICS.queue_depth.set_function(lambda: ARTIFACT_WRITER.get_stats()["pending_items"], queue="artifacts")
 # --- End of Caching Implementation ---
 
+# templates.pack (Render_Server 생성)이 있으면 PNG 디코딩 없이 memmap으로 로드
+USE_TEMPLATE_PACK = os.getenv("ISM_USE_TEMPLATE_PACK", "true").lower() == "true"
+
+
+def load_template_bundle(template_dir, device):
+    """templates.pack이 있으면 pack에서, 없으면 loose 파일에서 템플릿 로드"""
+    from run_inference_custom_function import load_templates_from_files
+    from utils.template_pack import find_template_pack, TemplatePack, load_templates_from_pack
+
+    pack_path = find_template_pack(template_dir) if USE_TEMPLATE_PACK else None
+    if pack_path is not None:
+        try:
+            return load_templates_from_pack(TemplatePack(pack_path), device)
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"Failed to load template pack {pack_path}, falling back to loose files: {e}")
+    return load_templates_from_files(template_dir, device)
+
+
+def load_cad_points(cad_path):
+    import trimesh
+
+    mesh = trimesh.load_mesh(cad_path)
+    return mesh.sample(2048).astype(np.float32) / 1000.0
+
+
+# /cache/warm의 클래스 / 객체 이름 → static 디렉토리의 템플릿 / CAD 경로
+STATIC_ROOT = os.path.abspath(os.path.join(current_dir, '..', 'static'))
+TEMPLATES_ROOT = os.path.join(STATIC_ROOT, 'templates')
+MESHES_ROOT = os.path.join(STATIC_ROOT, 'meshes')
+# ISM_PRELOAD_TEMPLATES=true일 때 시작 시 미리 로드할 클래스 (쉼표 구분, *면 전체)
+PRELOAD_CLASSES = {c.strip().lower() for c in os.getenv("ISM_PRELOAD_CLASSES", "ycb").split(",") if c.strip()}
+
+# 시작 시 합성 입력 워밍업 (auto: CUDA일 때만, true / false), 첫 요청이 커널 선택 / 할당 비용을 내지 않게
+WARMUP_MODE = os.getenv("ISM_WARMUP", "auto").lower()
+WARMUP_RUNS = int(os.getenv("ISM_WARMUP_RUNS", "1"))
+# 워밍업 이미지 크기 (WxH, 실제 카메라 해상도와 맞추면 같은 크기의 버퍼가 미리 할당됨)
+_warmup_w, _warmup_h = os.getenv("ISM_WARMUP_IMAGE_SIZE", "640x480").lower().split("x")
+WARMUP_IMAGE_SIZE = (int(_warmup_h), int(_warmup_w))
+
+# 백본 정밀도 (fp32 / fp16 / bf16 autocast) / channels-last, 비어 있으면 configs/model/ISM_sam.yaml 값 사용
+SEGMENTOR_PRECISION = os.getenv("ISM_SEGMENTOR_PRECISION", "").lower()
+DESCRIPTOR_PRECISION = os.getenv("ISM_DESCRIPTOR_PRECISION", "").lower()
+CHANNELS_LAST = os.getenv("ISM_CHANNELS_LAST", "").lower()
+# SAM 실행 백엔드 (torch / onnx), 비어 있으면 configs/model/ISM_sam.yaml 값 사용
+SEGMENTOR_BACKEND = os.getenv("ISM_SEGMENTOR_BACKEND", "").lower()
+
+# 시작 진행 상태 (/health: 프로세스 동작 여부, /ready: 모델 로드 + 워밍업 + 프리로드 완료 여부)
+STARTUP = StartupState()
+
+
+def warm_assets(item):
+    """캐시 워밍 (워커 스레드): 로드는 CACHE_LOCK 밖에서 해서 추론 요청을 막지 않음"""
+    if model is None:
+        raise RuntimeError("Model not loaded")
+    with CACHE_LOCK:
+        has_templates = item.template_dir in TEMPLATE_CACHE
+        has_cad = item.cad_path is None or item.cad_path in CAD_CACHE
+    if not has_templates:
+        if not os.path.isdir(item.template_dir):
+            raise FileNotFoundError(f"Template directory not found: {item.template_dir}")
+        bundle = load_template_bundle(item.template_dir, device)
+        with CACHE_LOCK:
+            TEMPLATE_CACHE.put(item.template_dir, bundle)
+    if not has_cad:
+        cad_points = load_cad_points(item.cad_path)
+        with CACHE_LOCK:
+            CAD_CACHE.put(item.cad_path, cad_points)
+    return "cached" if has_templates and has_cad else "loaded"
+
+
+CACHE_WARMER = CacheWarmer(warm_assets, max_pending=WARM_MAX_PENDING, observe=METRICS.observe_stage)
+
+
+# true면 SAM-6D 코어가 결과 파일 (detection_ism.json / vis_ism.png)을 요청 중에 직접 저장 (기존 동작)
+# false면 응답에 쓰는 감지 결과로 백그라운드 저장기가 같은 파일을 저장
+CORE_SAVE_OUTPUTS = os.getenv("ISM_CORE_SAVE_OUTPUTS", "false").lower() == "true"
+
+
+def render_ism_vis(rgb_array, detections):
+    """점수가 가장 높은 마스크를 RGB 위에 표시한 이미지 (원본과 나란히)를 PNG 바이트로 반환"""
+    scores = detections.get("scores") or []
+    masks = detections.get("masks") or []
+    if not scores or len(masks) < len(scores) or not isinstance(masks[0], dict):
+        return None
+    mask = rle_to_mask(masks[int(np.argmax(scores))])
+    if mask.shape != rgb_array.shape[:2]:
+        return None
+
+    overlay = rgb_array.copy()
+    overlay[mask] = (overlay[mask] * 0.5 + np.array([255, 0, 0]) * 0.5).astype(np.uint8)
+    # 마스크 경계 (4-이웃 침식으로 내부를 빼고 남은 픽셀)
+    inner = mask.copy()
+    inner[1:] &= mask[:-1]
+    inner[:-1] &= mask[1:]
+    inner[:, 1:] &= mask[:, :-1]
+    inner[:, :-1] &= mask[:, 1:]
+    overlay[mask & ~inner] = 255
+
+    buffer = io.BytesIO()
+    Image.fromarray(np.concatenate([rgb_array, overlay], axis=1)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def queue_ism_outputs(output_dir, rgb_array, detections, inference_time):
+    """detection_ism.json / vis_ism.png 저장 예약 (인코딩 / 파일 쓰기는 저장 스레드에서 수행)"""
+    writer = ARTIFACT_WRITER
+    writer.write_json(os.path.join(output_dir, "detection_ism.json"), detections_to_bop(detections, inference_time))
+    writer.write_with(
+        os.path.join(output_dir, "vis_ism.png"),
+        lambda: render_ism_vis(rgb_array, detections),
+        size_hint=rgb_array.nbytes * 2,
+    )
+
 # 로깅 설정
 def setup_logging():
     """로깅 설정"""
@@ -122,6 +251,19 @@ class InferenceRequest(BaseModel):
     cad_path: str           # CAD 모델 경로 (필수)
     output_dir: Optional[str] = None  # 결과 저장 경로 (선택사항, None이면 파일 저장 안함)
 
+class CacheTarget(BaseModel):
+    class_name: str
+    object_name: Optional[str] = None   # 없으면 클래스 전체
+    template_dir: Optional[str] = None  # 직접 지정 (없으면 static/templates/<class>/<object>)
+    cad_path: Optional[str] = None      # 직접 지정 (없으면 static/meshes/<class>/<object>.ply 등)
+
+class CacheWarmRequest(BaseModel):
+    targets: List[CacheTarget]
+
+class CacheEvictRequest(BaseModel):
+    targets: List[CacheTarget] = []
+    all: bool = False                   # true면 캐시 전체 비움
+
 class InferenceResponse(BaseModel):
     success: bool
     detections: dict  # dict 타입으로 변경
@@ -132,12 +274,24 @@ class InferenceResponse(BaseModel):
     error_message: Optional[str] = None
 
 # 모델 로딩 함수들
-async def load_model():
-    """모델 로딩 함수"""
+def instrument_model(model):
+    """SAM-6D 코어가 호출하는 모델 단계 (SAM 제안 / DINOv2 디스크립터 / 매칭)의 소요 시간을 /metrics에 기록"""
+    METRICS.instrument_method(model.segmentor_model, "generate_masks", "sam_proposals")
+    METRICS.instrument_method(model.descriptor_model, "forward", "dinov2_descriptors")
+    METRICS.instrument_method(model, "compute_semantic_score", "matching_semantic")
+    METRICS.instrument_method(model, "compute_appearance_score", "matching_appearance")
+    METRICS.instrument_method(model, "compute_geometric_score", "matching_geometric")
+
+def _load_model():
+    """모델 로딩 (SAM / DINOv2 체크포인트는 mmap으로 열어서 추론 디바이스에 바로 로드)"""
     global model, device
-    
+    from hydra import initialize_config_dir, compose
+    from hydra.utils import instantiate
+
     try:
         logger.info("Starting model loading...")
+        start = time.perf_counter()
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         
         # ISM_Server 디렉토리에서 직접 실행 (상대 경로 사용)
         ism_server_dir = os.path.join(current_dir)
@@ -174,11 +328,27 @@ async def load_model():
             # 원래 작업 디렉토리로 복원
             os.chdir(original_cwd)
         
+        # 체크포인트를 CPU를 거치지 않고 추론 디바이스에 바로 로드
+        if "sam" in cfg.model.segmentor_model:
+            cfg.model.segmentor_model.sam.device = str(device)
+        if "device" in cfg.model.descriptor_model:
+            cfg.model.descriptor_model.device = str(device)
+        if SEGMENTOR_PRECISION and "segmentor_precision" in cfg.model:
+            cfg.model.segmentor_precision = SEGMENTOR_PRECISION
+        if DESCRIPTOR_PRECISION:
+            cfg.model.descriptor_precision = DESCRIPTOR_PRECISION
+        if CHANNELS_LAST:
+            cfg.model.channels_last = CHANNELS_LAST == "true"
+        if SEGMENTOR_BACKEND and "segmentor_backend" in cfg.model:
+            cfg.model.segmentor_backend = SEGMENTOR_BACKEND
+        logger.info(f"Segmentor backend: {cfg.model.get('segmentor_backend', 'torch')}, "
+                    f"backbone precision: segmentor={cfg.model.get('segmentor_precision', 'fp32')}, "
+                    f"descriptor={cfg.model.descriptor_precision}, channels_last={cfg.model.channels_last}")
+
         # 모델 인스턴스화
         model = instantiate(cfg.model)
         
-        # GPU 설정
-        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        # GPU 설정 (이미 device에 있으면 이동 없음)
         model.descriptor_model.model = model.descriptor_model.model.to(device)
         model.descriptor_model.model.device = device
         
@@ -187,13 +357,24 @@ async def load_model():
         else:
             model.segmentor_model.model.setup_model(device=device, verbose=True)
         
-        logger.info(f"Model loaded successfully on {device}")
+        logger.info(f"Model loaded successfully on {device} ({time.perf_counter() - start:.1f}s)")
         return True
         
     except Exception as e:
         logger.error(f"Model loading failed: {e}")
         return False
 
+def warmup():
+    """합성 입력 워밍업 (실패해도 서버는 ready로 진행, 첫 요청이 워밍업 비용을 냄)"""
+    enabled = WARMUP_MODE == "true" or (WARMUP_MODE == "auto" and device.type == "cuda")
+    if not enabled or WARMUP_RUNS <= 0:
+        logger.info(f"Warmup skipped (ISM_WARMUP={WARMUP_MODE}, device={device})")
+        return
+    try:
+        warmup_model(model, device, image_size=WARMUP_IMAGE_SIZE, runs=WARMUP_RUNS)
+    except Exception as e:
+        logger.warning(f"Warmup failed, first request will pay the warmup cost: {e}")
+
 async def load_templates():
     """템플릿 로딩 함수"""
     global templates_data, templates_masks, templates_boxes
@@ -214,7 +395,7 @@ async def load_templates():
         os.chdir(ism_server_dir)
         
         try:
-            templates_data, templates_masks, templates_boxes = load_templates_from_files(template_dir, device)
+            templates_data, templates_masks, templates_boxes = load_template_bundle(template_dir, device)
         finally:
             os.chdir(original_cwd)
             
@@ -239,8 +420,7 @@ async def load_cad_model():
             logger.error(f"CAD model not found: {cad_path}")
             return False
         
-        mesh = trimesh.load_mesh(cad_path)
-        cad_points = mesh.sample(2048).astype(np.float32) / 1000.0
+        cad_points = load_cad_points(cad_path)
         logger.info(f"CAD model loaded successfully: {cad_points.shape}")
         return True
         
@@ -248,20 +428,8 @@ async def load_cad_model():
         logger.error(f"CAD model loading failed: {e}")
         return False
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """서버 시작/종료 시 실행되는 lifespan 관리자"""
-    logger.info("Starting ISM Server...")
-    write_to_log_file("Starting ISM Server...")
-    
-    # 모델 로딩
-    model_loaded = await load_model()
-    if not model_loaded:
-        logger.error("Model loading failed")
-        yield
-        return
-
-    # --- Start of Pre-loading Logic ---
+def preload_templates():
+    """ISM_PRELOAD_TEMPLATES=true면 static 템플릿 / CAD를 캐시 용량까지 미리 로드"""
     # 환경 변수에서 PRELOAD_ALL_TEMPLATES 값을 읽어옴
     # 이 값을 true로 설정하면 서버 시작 시 모든 템플릿을 미리 로드합니다.
     should_preload = os.getenv("ISM_PRELOAD_TEMPLATES", "false").lower() == "true"
@@ -279,7 +447,7 @@ async def lifespan(app: FastAPI):
         else:
             # 클래스 디렉토리 순회 (e.g., ycb)
             for class_name in os.listdir(templates_base_dir):
-                if class_name.lower() != "ycb":
+                if "*" not in PRELOAD_CLASSES and class_name.lower() not in PRELOAD_CLASSES:
                     continue
                 if len(TEMPLATE_CACHE) >= MAX_CACHE_SIZE:
                     break
@@ -317,14 +485,12 @@ async def lifespan(app: FastAPI):
                     try:
                         with CACHE_LOCK:
                             if template_dir not in TEMPLATE_CACHE:
-                                t_data, t_masks, t_boxes = load_templates_from_files(template_dir, device)
+                                t_data, t_masks, t_boxes = load_template_bundle(template_dir, device)
                                 TEMPLATE_CACHE.put(template_dir, (t_data, t_masks, t_boxes))
                                 logger.info(f"Successfully cached templates for {template_dir}")
 
                             if cad_path not in CAD_CACHE:
-                                mesh = trimesh.load_mesh(cad_path)
-                                c_points = mesh.sample(2048).astype(np.float32) / 1000.0
-                                CAD_CACHE.put(cad_path, c_points)
+                                CAD_CACHE.put(cad_path, load_cad_points(cad_path))
                                 logger.info(f"Successfully cached CAD model for {cad_path}")
                     except Exception as e:
                         logger.error(f"Failed to preload data for {object_name}: {e}")
@@ -334,19 +500,51 @@ async def lifespan(app: FastAPI):
         logger.info(f"Finished pre-loading data. Cache size: {len(TEMPLATE_CACHE)}/{MAX_CACHE_SIZE}")
     else:
         logger.info("PRELOAD_ALL_TEMPLATES is false. Templates will be cached on-demand.")
-    # --- End of Pre-loading Logic ---
 
-    logger.info("Model loaded successfully! Ready to accept inference requests.")
-    write_to_log_file("Model loaded successfully! Ready to accept inference requests.")
+def run_startup():
+    """백그라운드 시작 작업: 모델 로드 → 워밍업 → 템플릿 프리로드 → ready"""
+    try:
+        STARTUP.set_stage("loading_model")
+        if not _load_model():
+            STARTUP.fail("Model loading failed")
+            return
+        STARTUP.set_stage("warming_up")
+        warmup()
+        # 워밍업 호출은 /metrics 단계 지연에 넣지 않도록 워밍업 뒤에 계측
+        instrument_model(model)
+        STARTUP.set_stage("preloading")
+        preload_templates()
+        STARTUP.set_stage("ready")
+        logger.info("Model loaded successfully! Ready to accept inference requests.")
+        write_to_log_file("Model loaded successfully! Ready to accept inference requests.")
+    except Exception as e:
+        logger.error(f"Startup failed: {e}")
+        STARTUP.fail(e)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """서버 시작/종료 시 실행되는 lifespan 관리자
+
+    포트는 바로 열고 (liveness), 모델 로드 / 워밍업 / 프리로드는 백그라운드 스레드에서 진행한다 (readiness: /ready).
+    """
+    logger.info("Starting ISM Server...")
+    write_to_log_file("Starting ISM Server...")
+    startup_task = asyncio.create_task(asyncio.to_thread(run_startup))
     
     # 서버 실행 중
     yield
     
     # 서버 종료 시 정리 작업
     logger.info("Shutting down server...")
+    if not startup_task.done():
+        logger.warning(f"Shutting down during startup (stage: {STARTUP.stage})")
+    if not ARTIFACT_WRITER.close(timeout=30.0):
+        logger.warning("Timed out while flushing pending artifacts")
 
 # FastAPI 앱 생성
 app = FastAPI(title="ISM Server", version="1.0.0", lifespan=lifespan)
+# 요청 추적 (Main 서버의 X-Request-ID / traceparent를 이어받고, 응답에 Server-Timing 추가)
+app.add_middleware(TracingMiddleware, tracer=TRACER)
 
 @app.get("/")
 async def read_root():
@@ -354,12 +552,22 @@ async def read_root():
 
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
+    """liveness: 프로세스가 요청을 받을 수 있으면 200 (모델 로드 중이어도)"""
     return HealthResponse(
         status="healthy",
-        message="Server is running",
+        message=f"Server is running (startup: {STARTUP.stage})",
         timestamp=time.time()
     )
 
+@app.get("/ready")
+async def readiness_check():
+    """readiness: 모델 로드 + 워밍업 + 프리로드가 끝났으면 200, 아니면 503 (진행 단계 / 단계별 소요 시간 포함)"""
+    status = STARTUP.to_dict()
+    if status["ready"]:
+        return status
+    headers = {} if STARTUP.stage == "failed" else {"Retry-After": "5"}
+    return JSONResponse(status_code=503, content=status, headers=headers)
+
 @app.get("/api/v1/status", response_model=ServerStatus)
 async def get_status():
     return ServerStatus(
@@ -400,25 +608,24 @@ async def inference(request: InferenceRequest):
     """추론 API"""
     logger.info("Inference request received")
     start_time = time.time()
+    if not STARTUP.ready:
+        # 모델 로드 / 워밍업 중 (Main 서버는 503을 받으면 다른 replica로 보내거나 실패로 처리)
+        raise HTTPException(
+            status_code=503,
+            detail=f"ISM server is not ready (startup: {STARTUP.stage})",
+            headers={"Retry-After": "5"},
+        )
+    from run_inference_custom_function import run_inference_core, batch_input_data_from_params
+    from model.utils import CroppedMasks
     
     try:
-        if not model:
-            return InferenceResponse(
-                success=False,
-                detections={},
-                inference_time=0,
-                template_dir_used="",
-                cad_path_used="",
-                output_dir_used=None,
-                error_message="Model not loaded"
-            )
-        
         # 이미지 변환
-        rgb_image = base64_to_image(request.rgb_image)
-        depth_image = base64_to_image(request.depth_image)
-        
-        rgb_array = image_to_numpy(rgb_image)
-        depth_array = depth_image_to_numpy(depth_image)
+        with METRICS.time_stage("decode"):
+            rgb_image = base64_to_image(request.rgb_image)
+            depth_image = base64_to_image(request.depth_image)
+            
+            rgb_array = image_to_numpy(rgb_image)
+            depth_array = depth_image_to_numpy(depth_image)
         
         # 카메라 파라미터 처리
         cam_params = request.cam_params
@@ -459,7 +666,9 @@ async def inference(request: InferenceRequest):
         logger.info(f"Loading CAD model from: {cad_path}")
         
         try:
-            with CACHE_LOCK:
+            # 같은 객체를 캐시 워머가 로드 중이면 끝날 때까지 기다렸다가 캐시에서 사용
+            CACHE_WARMER.wait_for(template_dir)
+            with CACHE_LOCK, METRICS.time_stage("template_cache"):
                 # --- Template Caching ---
                 cached_templates = TEMPLATE_CACHE.get(template_dir)
                 if cached_templates:
@@ -467,7 +676,8 @@ async def inference(request: InferenceRequest):
                     client_templates_data, client_templates_masks, client_templates_boxes = cached_templates
                 else:
                     logger.info("Templates not in cache, loading from files...")
-                    client_templates_data, client_templates_masks, client_templates_boxes = load_templates_from_files(template_dir, device)
+                    with METRICS.time_stage("template_load"):
+                        client_templates_data, client_templates_masks, client_templates_boxes = load_template_bundle(template_dir, device)
                     TEMPLATE_CACHE.put(template_dir, (client_templates_data, client_templates_masks, client_templates_boxes))
                     logger.info(f"Cached templates for: {template_dir}")
 
@@ -478,8 +688,8 @@ async def inference(request: InferenceRequest):
                     client_cad_points = cached_cad
                 else:
                     logger.info("CAD model not in cache, loading from file...")
-                    mesh = trimesh.load_mesh(cad_path)
-                    client_cad_points = mesh.sample(2048).astype(np.float32) / 1000.0
+                    with METRICS.time_stage("cad_load"):
+                        client_cad_points = load_cad_points(cad_path)
                     CAD_CACHE.put(cad_path, client_cad_points)
                     logger.info(f"Cached CAD model for: {cad_path}")
 
@@ -500,18 +710,20 @@ async def inference(request: InferenceRequest):
         # 실제 SAM-6D 추론 실행
         logger.info("Starting SAM-6D inference...")
         try:
-            result = run_inference_core(
-                model=model,
-                rgb_array=rgb_array,
-                depth_batch=depth_batch,
-                cad_points=client_cad_points,
-                templates_data=client_templates_data,
-                templates_masks=client_templates_masks,
-                templates_boxes=client_templates_boxes,
-                device=device,
-                output_dir=output_dir,  # 클라이언트가 제공한 출력 경로 사용
-                save_async=False
-            )
+            with METRICS.time_stage("inference"):
+                result = run_inference_core(
+                    model=model,
+                    rgb_array=rgb_array,
+                    depth_batch=depth_batch,
+                    cad_points=client_cad_points,
+                    templates_data=client_templates_data,
+                    templates_masks=client_templates_masks,
+                    templates_boxes=client_templates_boxes,
+                    device=device,
+                    # 결과 파일은 기본적으로 아래에서 백그라운드 저장 (ISM_CORE_SAVE_OUTPUTS=true면 코어가 직접 저장)
+                    output_dir=output_dir if CORE_SAVE_OUTPUTS else None,
+                    save_async=False
+                )
             
             # 결과 처리
             detections = result.get("detections", [])
@@ -533,13 +745,18 @@ async def inference(request: InferenceRequest):
                     if isinstance(detections.masks, list) and len(detections.masks) > 0:
                         # 이미 리스트 형식이거나 COCO RLE 형식인 경우
                         masks_data = detections.masks
+                    elif isinstance(detections.masks, CroppedMasks):
+                        # bbox 크롭 마스크 - 전송할 상위 10개만 전체 크기로 복원
+                        masks_data = masks_to_rle_torch(detections.masks[:10].full())
                     elif hasattr(detections.masks, 'tolist'):
-                        # 큰 배열인 경우 - 상위 10개만 전송하거나 RLE 변환 고려
+                        # 큰 배열인 경우 - 상위 10개만 비압축 COCO RLE로 변환 (전체 배열 tolist 회피)
                         if num_objects > 10:
                             logger.warning(f"Too many detections ({num_objects}). Converting top 10 only.")
-                            masks_data = detections.masks[:10].tolist() if hasattr(detections.masks, '__getitem__') else detections.masks.tolist()[:10]
+                        top_masks = detections.masks[:10]
+                        if isinstance(top_masks, torch.Tensor):
+                            masks_data = masks_to_rle_torch(top_masks)
                         else:
-                            masks_data = detections.masks.tolist()
+                            masks_data = [mask_to_rle(mask) for mask in top_masks]
                     else:
                         masks_data = detections.masks
                 except Exception as mask_err:
@@ -557,10 +774,17 @@ async def inference(request: InferenceRequest):
                 logger.info(f"Sending top {max_objects} detections (out of {num_objects} total)")
             
             conversion_time = time.time() - conversion_start
+            METRICS.observe_stage("encode", conversion_time)
             logger.info(f"SAM-6D inference completed successfully")
             logger.info(f"Detected {len(detections.get('masks', []))} objects")
             if conversion_time > 1.0:
                 logger.warning(f"Data conversion took {conversion_time:.2f}s (consider optimizing mask format)")
+
+            if output_dir and not CORE_SAVE_OUTPUTS:
+                try:
+                    queue_ism_outputs(output_dir, rgb_array, detections, time.time() - start_time)
+                except Exception as save_error:
+                    logger.warning(f"Failed to queue ISM outputs: {save_error}")
             
         except Exception as inference_error:
             logger.error(f"SAM-6D inference failed: {inference_error}")
@@ -603,6 +827,49 @@ async def inference(request: InferenceRequest):
             error_message=str(e)
         )
 
+# 템플릿 / CAD 캐시 관리
+@app.post("/cache/warm")
+async def cache_warm(request: CacheWarmRequest):
+    """클래스 / 객체를 백그라운드에서 캐시에 로드 (바로 반환, 클래스 전체는 캐시 용량까지)"""
+    items = resolve_targets(request.targets, TEMPLATES_ROOT, MESHES_ROOT, limit=MAX_CACHE_SIZE)
+    return {"success": True, **CACHE_WARMER.submit(items)}
+
+@app.post("/cache/evict")
+async def cache_evict(request: CacheEvictRequest):
+    """캐시에서 클래스 / 객체 제거 (대기 중인 워밍도 취소)"""
+    if request.all:
+        cancelled = CACHE_WARMER.cancel()
+        with CACHE_LOCK:
+            evicted = {"templates": TEMPLATE_CACHE.clear(), "cad": CAD_CACHE.clear()}
+    else:
+        items = resolve_targets(request.targets, TEMPLATES_ROOT, MESHES_ROOT)
+        cancelled = CACHE_WARMER.cancel(item.key for item in items)
+        with CACHE_LOCK:
+            evicted = {
+                "templates": sum(TEMPLATE_CACHE.evict(item.template_dir) for item in items),
+                "cad": sum(CAD_CACHE.evict(item.cad_path) for item in items if item.cad_path),
+            }
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+    return {"success": True, "evicted": evicted, "cancelled": cancelled}
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """캐시 항목 / 적중률과 워밍 대기열 상태"""
+    with CACHE_LOCK:
+        caches = {
+            name: {"entries": len(cache), "capacity": cache.capacity, "hits": cache.hits,
+                   "misses": cache.misses, "hit_ratio": cache.hit_ratio, "keys": cache.keys()}
+            for name, cache in (("templates", TEMPLATE_CACHE), ("cad", CAD_CACHE))
+        }
+    return {"caches": caches, "warmer": CACHE_WARMER.get_stats()}
+
+# Prometheus 메트릭
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """단계별 지연 히스토그램, 캐시 적중률, 큐 깊이, GPU / 호스트 메모리 (Prometheus 텍스트 형식)"""
+    return Response(content=METRICS.render(), media_type=CONTENT_TYPE)
+
 # 테스트용 샘플 데이터 엔드포인트
 @app.get("/test/sample")
 async def get_sample_data():
@@ -9,7 +9,7 @@ import os.path as osp
 from torchvision.utils import make_grid, save_image
 import pytorch_lightning as pl
 from utils.inout import save_json, load_json, save_json_bop23
-from model.utils import BatchedData, Detections, convert_npz_to_json
+from model.utils import BatchedData, CroppedMasks, Detections, convert_npz_to_json
 from hydra.utils import instantiate
 import time
 import glob
@@ -17,7 +17,10 @@ from functools import partial
 import multiprocessing
 import trimesh
 from model.loss import MaskedPatch_MatrixSimilarity
-from utils.trimesh_utils import depth_image_to_pointcloud_translate_torch
+from utils.trimesh_utils import (
+    cropped_depth_to_pointcloud_translate_torch,
+    depth_image_to_pointcloud_translate_torch,
+)
 from utils.poses.pose_utils import get_obj_poses_from_template_level
 from utils.bbox_utils import xyxy_to_xywh, compute_iou
 
@@ -235,9 +238,15 @@ class Instance_Segmentation_Model(pl.LightningModule):
         """
         Calculate the translation amount from the origin of the object coordinate system to the camera coordinate system. 
         Cut out the depth using the provided mask and calculate the mean as the translation.
-        proposal: N_query x imageH x imageW
+        proposal: N_query x imageH x imageW (or CroppedMasks, then only the crop windows are used)
         depth: imageH x imageW
         """
+        if isinstance(proposal, CroppedMasks):
+            translate = cropped_depth_to_pointcloud_translate_torch(
+                depth, depth_scale, cam_intrinsic, proposal.crops, proposal.offsets
+            )
+            return translate.to(torch.float32)
+
         (N_query, imageH, imageW) = proposal.squeeze_().shape
         masked_depth = proposal * (depth[None, ...].repeat(N_query, 1, 1))
         translate = depth_image_to_pointcloud_translate_torch(
@@ -347,8 +356,9 @@ class Instance_Segmentation_Model(pl.LightningModule):
         proposal_stage_start_time = time.time()
         proposals = self.segmentor_model.generate_masks(image_np)
 
-        # init detections with masks and boxes
+        # init detections with masks (cropped to their boxes) and boxes
         detections = Detections(proposals)
+        del proposals  # release the full-size masks
         detections.remove_very_small_detections(
             config=self.post_processing_config.mask_post_processing
         )
@@ -7,7 +7,11 @@ import logging
 import numpy as np
 from utils.bbox_utils import CropResizePad, CustomResizeLongestSide
 from torchvision.utils import make_grid, save_image
-from model.utils import BatchedData
+from model.utils import BatchedData, CroppedMasks
+from utils.checkpoint import init_empty_weights, load_checkpoint, load_weights
+from utils.precision import set_precision
+# init_empty_weights 밖에서 import (안에서 처음 import하면 trunc_normal_이 no-op으로 묶임)
+from . import vision_transformer as vits
 from copy import deepcopy
 import os.path as osp
 
@@ -56,8 +60,6 @@ def _make_dinov2_model(
     weights: Union[Weights, str] = Weights.LVD142M,
     **kwargs,
 ):
-    from . import vision_transformer as vits
-
     if isinstance(weights, str):
         try:
             weights = Weights[weights]
@@ -100,11 +102,18 @@ class CustomDINOv2(pl.LightningModule):
         checkpoint_dir,
         patch_size=14,
         validpatch_thresh=0.5,
+        device="cpu",
+        precision="fp32",
+        channels_last=False,
     ):
         super().__init__()
         self.model_name = model_name
-        self.model = _make_dinov2_model(arch_name=descriptor_map[model_name], pretrained=False)
-        self.model.load_state_dict(torch.load(osp.join(checkpoint_dir, f"{model_name}_pretrain.pth")))
+        # 무작위 초기화 없이 device에 바로 만들고, mmap으로 연 체크포인트를 그대로 파라미터로 사용
+        with init_empty_weights(device):
+            self.model = _make_dinov2_model(arch_name=descriptor_map[model_name], pretrained=False)
+        load_weights(self.model, load_checkpoint(osp.join(checkpoint_dir, f"{model_name}_pretrain.pth"), device))
+        # 백본 forward만 autocast, 출력 특징은 fp32 (템플릿 디스크립터 / 유사도 계산과 dtype 일치)
+        set_precision(self.model, precision, channels_last)
         self.validpatch_thresh = validpatch_thresh
         self.token_name = token_name
         self.chunk_size = chunk_size
@@ -136,6 +145,13 @@ class CustomDINOv2(pl.LightningModule):
         """
         num_proposals = len(masks)
         rgb = self.rgb_normalize(image_np).to(masks.device).float()
+        if isinstance(masks, CroppedMasks):
+            # mask only the crop windows instead of N full-size copies of the image
+            masked_rgbs = [
+                rgb_crop * mask.unsqueeze(0)
+                for rgb_crop, mask in zip(masks.crop_images(rgb), masks.crops)
+            ]
+            return self.rgb_proposal_processor(masked_rgbs, masks.crop_boxes(boxes))
         rgbs = rgb.unsqueeze(0).repeat(num_proposals, 1, 1, 1)
         masked_rgbs = rgbs * masks.unsqueeze(1)
         processed_masked_rgbs = self.rgb_proposal_processor(
@@ -182,6 +198,10 @@ class CustomDINOv2(pl.LightningModule):
         3. Resize each proposals to predefined longest image size
         """
         num_proposals = len(masks)
+        if isinstance(masks, CroppedMasks):
+            return self.rgb_proposal_processor(
+                [mask.unsqueeze(0) for mask in masks.crops], masks.crop_boxes(boxes)
+            ).squeeze_()  # [N, target_size, target_size]
         masks.unsqueeze_(1) # [N_proposal, 1, ImgH, ImgW]
         processed_masks = self.rgb_proposal_processor(
             masks, boxes
@@ -4,7 +4,15 @@ from segment_anything import (
     SamAutomaticMaskGenerator,
 )
 from segment_anything.modeling import Sam
-from segment_anything.utils.amg import MaskData, generate_crop_boxes, rle_to_mask
+from segment_anything.utils.amg import (
+    MaskData,
+    batched_mask_to_box,
+    calculate_stability_score,
+    generate_crop_boxes,
+    is_box_near_crop_edge,
+    mask_to_rle_pytorch,
+    uncrop_masks,
+)
 import logging
 import numpy as np
 import torch
@@ -13,6 +21,10 @@ import os.path as osp
 from typing import Any, Dict, List, Optional, Tuple
 import cv2
 import torch.nn.functional as F
+from sam6d_common.rle import rle_to_mask
+from utils.checkpoint import init_empty_weights, load_checkpoint, load_weights
+from utils.precision import set_precision
+from model.sam_onnx import OnnxSamPredictor
 
 pretrained_weight_dict = {
     "vit_l": "sam_vit_l_0b3195.pth",  # 1250MB
@@ -21,11 +33,12 @@ pretrained_weight_dict = {
 }
 
 
-def load_sam(model_type, checkpoint_dir):
+def load_sam(model_type, checkpoint_dir, device="cpu"):
     logging.info(f"Loading SAM model from {checkpoint_dir}")
-    sam = sam_model_registry[model_type](
-        checkpoint=osp.join(checkpoint_dir, pretrained_weight_dict[model_type])
-    )
+    # 무작위 초기화 없이 device에 바로 만들고, mmap으로 연 체크포인트를 그대로 파라미터로 사용
+    with init_empty_weights(device):
+        sam = sam_model_registry[model_type]()
+    load_weights(sam, load_checkpoint(osp.join(checkpoint_dir, pretrained_weight_dict[model_type]), device))
     return sam
 
 
@@ -60,6 +73,11 @@ class CustomSamAutomaticMaskGenerator(SamAutomaticMaskGenerator):
         crop_overlap_ratio: float = 512 / 1500,
         segmentor_width_size=None,
         pred_iou_thresh: float = 0.88,
+        precision: str = "fp32",
+        channels_last: bool = False,
+        backend: str = "torch",
+        onnx_dir: Optional[str] = None,
+        onnx_points_per_batch: int = 64,
     ):
         SamAutomaticMaskGenerator.__init__(
             self,
@@ -72,7 +90,20 @@ class CustomSamAutomaticMaskGenerator(SamAutomaticMaskGenerator):
             pred_iou_thresh=pred_iou_thresh
         )
         self.segmentor_width_size = segmentor_width_size
-        logging.info(f"Init CustomSamAutomaticMaskGenerator done!")
+        self.backend = backend
+        if backend == "onnx":
+            # 이미지 인코더 / 격자 디코더를 ONNX Runtime으로, 격자 점은 onnx_points_per_batch개씩 한 번에 디코딩
+            # (디코더가 점마다 이미지 임베딩을 복제하므로 점 하나에 중간 메모리 약 25MB)
+            if precision != "fp32" or channels_last:
+                logging.warning(f"precision={precision}, channels_last={channels_last} ignored with ONNX backend (fp32)")
+            self.predictor = OnnxSamPredictor(sam, onnx_dir)
+            self.points_per_batch = onnx_points_per_batch
+        elif backend == "torch":
+            # ViT 이미지 인코더만 autocast (마스크 디코더 / 안정성 점수는 fp32)
+            set_precision(self.predictor.model.image_encoder, precision, channels_last)
+        else:
+            raise ValueError(f"Unknown segmentor backend: {backend} (expected torch or onnx)")
+        logging.info(f"Init CustomSamAutomaticMaskGenerator done! (backend={backend})")
 
     def preprocess_resize(self, image: np.ndarray):
         orig_size = image.shape[:2]
@@ -147,6 +178,65 @@ class CustomSamAutomaticMaskGenerator(SamAutomaticMaskGenerator):
         data["masks"] = torch.stack(data["masks"])
         return {"masks": data["masks"].to(data["boxes"].device), "boxes": data["boxes"]}
 
+    # ONNX 경로에서 한 번에 원본 크기로 키우는 마스크 수 (PyTorch 경로의 점 64개 x multimask 3개와 같은 메모리)
+    upscale_chunk_size = 192
+
+    def _process_batch(
+        self,
+        points: np.ndarray,
+        im_size: Tuple[int, ...],
+        crop_box: List[int],
+        orig_size: Tuple[int, ...],
+    ) -> MaskData:
+        if self.backend != "onnx":
+            return super()._process_batch(points, im_size, crop_box, orig_size)
+
+        # 배치의 점 전체를 디코더 그래프 한 번으로 (저해상도 logits)
+        transformed_points = self.predictor.transform.apply_coords(points, im_size)
+        low_res_masks, iou_preds = self.predictor.predict_grid(transformed_points)
+        batch = MaskData(
+            masks=low_res_masks.flatten(0, 1),
+            iou_preds=iou_preds.flatten(0, 1),
+            points=torch.as_tensor(points.repeat(low_res_masks.shape[1], axis=0)),
+        )
+        del low_res_masks
+
+        # 예측 IoU 필터를 먼저 적용해서 통과한 마스크만 원본 크기로 키움 (PyTorch 경로는 전부 키운 뒤 필터)
+        if self.pred_iou_thresh > 0.0:
+            batch.filter(batch["iou_preds"] > self.pred_iou_thresh)
+
+        data = MaskData()
+        # 남은 마스크가 없어도 한 번은 실행 (빈 배치도 PyTorch 경로와 같은 키를 가짐)
+        for start in range(0, max(len(batch["iou_preds"]), 1), self.upscale_chunk_size):
+            chunk = MaskData(**{key: value[start:start + self.upscale_chunk_size] for key, value in batch.items()})
+            chunk["masks"] = self.predictor.model.postprocess_masks(
+                chunk["masks"][:, None], self.predictor.input_size, self.predictor.original_size
+            )[:, 0]
+            data.cat(self._filter_upscaled_masks(chunk, crop_box, orig_size))
+        return data
+
+    def _filter_upscaled_masks(self, data: MaskData, crop_box: List[int], orig_size: Tuple[int, ...]) -> MaskData:
+        """SamAutomaticMaskGenerator._process_batch의 IoU 필터 이후 단계 (안정성 점수, 박스, crop 경계, RLE)"""
+        orig_h, orig_w = orig_size
+        data["stability_score"] = calculate_stability_score(
+            data["masks"], self.predictor.model.mask_threshold, self.stability_score_offset
+        )
+        if self.stability_score_thresh > 0.0:
+            keep_mask = data["stability_score"] >= self.stability_score_thresh
+            data.filter(keep_mask)
+
+        data["masks"] = data["masks"] > self.predictor.model.mask_threshold
+        data["boxes"] = batched_mask_to_box(data["masks"])
+
+        keep_mask = ~is_box_near_crop_edge(data["boxes"], crop_box, [0, 0, orig_w, orig_h])
+        if not torch.all(keep_mask):
+            data.filter(keep_mask)
+
+        data["masks"] = uncrop_masks(data["masks"], crop_box, orig_h, orig_w)
+        data["rles"] = mask_to_rle_pytorch(data["masks"])
+        del data["masks"]
+        return data
+
     def remove_small_detections(self, mask_data: MaskData, img_size: List) -> MaskData:
         # calculate area and number of pixels in each mask
         area = box_area(mask_data["boxes"]) / (img_size[0] * img_size[1])
@@ -0,0 +1,173 @@
+# ISM_Server/model/sam_onnx.py - SAM 이미지 인코더 / 마스크 디코더 ONNX Runtime 백엔드 (CPU 추론 노드)
+#
+# - image_encoder.onnx: 전처리된 1 x 3 x 1024 x 1024 이미지 → 1 x 256 x 64 x 64 임베딩
+# - grid_decoder.onnx: 임베딩 + 점 프롬프트 B개 (B 동적) → 저해상도 마스크 logits B x 3 x 256 x 256, IoU B x 3
+#   (predict_torch(multimask_output=True)와 같은 계산, 배치 크기는 onnx_points_per_batch로 조절)
+# 그래프는 onnx_dir에 없으면 처음 로드할 때 현재 SAM 가중치로 내보낸다 (vit_h는 수 분).
+import inspect
+import logging
+import os
+import os.path as osp
+import time
+
+import numpy as np
+import torch
+
+from segment_anything.modeling import Sam
+from segment_anything.predictor import SamPredictor
+from segment_anything.utils.onnx import SamOnnxModel
+
+ENCODER_FILE = "image_encoder.onnx"
+DECODER_FILE = "grid_decoder.onnx"
+OPSET_VERSION = 17
+
+# ONNX Runtime 연산 스레드 수 (0이면 ONNX Runtime 기본값: 물리 코어 수)
+ONNX_THREADS = int(os.getenv("ISM_ONNX_THREADS", "0"))
+
+
+class SamGridDecoderOnnx(SamOnnxModel):
+    """자동 마스크 생성 격자의 점 프롬프트 B개를 한 번에 디코딩하는 내보내기용 모듈
+
+    SamPredictor.predict_torch처럼 각 점에 (0, 0) / label -1 패딩 점을 붙이고 multimask 3개를 돌려준다.
+    원본 크기로 키우기 전의 저해상도 logits를 반환해서 IoU 필터를 통과한 마스크만 키울 수 있게 한다.
+    """
+
+    def __init__(self, model: Sam):
+        super().__init__(model, return_single_mask=False)
+
+    @torch.no_grad()
+    def forward(self, image_embeddings: torch.Tensor, point_coords: torch.Tensor):
+        ones = torch.ones_like(point_coords[:, :, 0])
+        coords = torch.cat([point_coords, torch.zeros_like(point_coords)], dim=1)
+        labels = torch.cat([ones, -ones], dim=1)
+        sparse_embedding = self._embed_points(coords, labels)
+        dense_embedding = self.model.prompt_encoder.no_mask_embed.weight.reshape(1, -1, 1, 1)
+        masks, iou_preds = self.mask_decoder.predict_masks(
+            image_embeddings=image_embeddings,
+            image_pe=self.model.prompt_encoder.get_dense_pe(),
+            sparse_prompt_embeddings=sparse_embedding,
+            dense_prompt_embeddings=dense_embedding,
+        )
+        return masks[:, 1:], iou_preds[:, 1:]
+
+
+class ImageEncoderStub(torch.nn.Module):
+    """ONNX 세션으로 대체된 PyTorch 이미지 인코더 자리 (ResizeLongestSide / Sam.preprocess가 쓰는 img_size만 유지)"""
+
+    def __init__(self, img_size: int):
+        super().__init__()
+        self.img_size = img_size
+
+    def forward(self, x):
+        raise RuntimeError("PyTorch image encoder was released; embeddings come from the ONNX session")
+
+
+def _export(module, args, path, **kwargs):
+    # torch.export 기반 내보내기가 기본인 torch에서도 TorchScript 내보내기 사용 (동적 배치 축 지정)
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        kwargs["dynamo"] = False
+    torch.onnx.export(module, args, path, opset_version=OPSET_VERSION, do_constant_folding=True, **kwargs)
+
+
+def export_sam_onnx(sam: Sam, onnx_dir: str):
+    """SAM 이미지 인코더와 격자 디코더를 onnx_dir에 내보냄"""
+    os.makedirs(onnx_dir, exist_ok=True)
+    start = time.perf_counter()
+    img_size = sam.image_encoder.img_size
+    # precision (autocast) 래퍼가 있으면 원래 fp32 forward로 내보냄
+    encoder_forward = sam.image_encoder.__dict__.pop("forward", None)
+    try:
+        with torch.no_grad():
+            _export(
+                sam.image_encoder,
+                (torch.randn(1, 3, img_size, img_size, device=sam.device),),
+                osp.join(onnx_dir, ENCODER_FILE),
+                input_names=["image"],
+                output_names=["image_embeddings"],
+            )
+    finally:
+        if encoder_forward is not None:
+            sam.image_encoder.forward = encoder_forward
+
+    embed_dim = sam.prompt_encoder.embed_dim
+    embed_h, embed_w = sam.prompt_encoder.image_embedding_size
+    _export(
+        SamGridDecoderOnnx(sam),
+        (
+            torch.randn(1, embed_dim, embed_h, embed_w, device=sam.device),
+            torch.randint(0, img_size, (4, 1, 2), device=sam.device).float(),
+        ),
+        osp.join(onnx_dir, DECODER_FILE),
+        input_names=["image_embeddings", "point_coords"],
+        output_names=["low_res_masks", "iou_predictions"],
+        dynamic_axes={
+            "point_coords": {0: "num_points"},
+            "low_res_masks": {0: "num_points"},
+            "iou_predictions": {0: "num_points"},
+        },
+    )
+    logging.info(f"Exported SAM ONNX graphs to {onnx_dir} ({time.perf_counter() - start:.1f}s)")
+
+
+class OnnxSamPredictor(SamPredictor):
+    """이미지 임베딩과 격자 점 디코딩을 ONNX Runtime으로 실행하는 SamPredictor
+
+    set_image / predict_torch 등 나머지 API는 그대로 (predict_torch는 ONNX 임베딩으로 PyTorch 디코더 실행).
+    release_encoder면 세션을 만든 뒤 PyTorch 이미지 인코더 가중치를 해제한다 (vit_h 약 2.5GB, sam_model을 바꿈).
+    """
+
+    def __init__(self, sam_model: Sam, onnx_dir: str, threads: int = ONNX_THREADS, release_encoder: bool = True):
+        super().__init__(sam_model)
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("segmentor backend 'onnx' requires onnxruntime (pip install onnxruntime)") from e
+
+        encoder_path, decoder_path = osp.join(onnx_dir, ENCODER_FILE), osp.join(onnx_dir, DECODER_FILE)
+        if not (osp.exists(encoder_path) and osp.exists(decoder_path)):
+            logging.info(f"SAM ONNX graphs not found in {onnx_dir}, exporting...")
+            export_sam_onnx(sam_model, onnx_dir)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # 메모리 arena는 최대 사용량을 계속 잡고 있음 (인코더 전역 attention / 디코더 배치 중간값이 수 GB)
+        options.enable_cpu_mem_arena = False
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        providers = ["CPUExecutionProvider"]
+        self.encoder_session = ort.InferenceSession(encoder_path, options, providers=providers)
+        self.decoder_session = ort.InferenceSession(decoder_path, options, providers=providers)
+        self._features_np = None
+        if release_encoder:
+            sam_model.image_encoder = ImageEncoderStub(sam_model.image_encoder.img_size)
+        logging.info(f"Init OnnxSamPredictor done! ({onnx_dir}, threads={threads or 'default'})")
+
+    @torch.no_grad()
+    def set_torch_image(self, transformed_image: torch.Tensor, original_image_size) -> None:
+        assert (
+            len(transformed_image.shape) == 4
+            and transformed_image.shape[1] == 3
+            and max(*transformed_image.shape[2:]) == self.model.image_encoder.img_size
+        ), f"set_torch_image input must be BCHW with long side {self.model.image_encoder.img_size}."
+        self.reset_image()
+
+        self.original_size = original_image_size
+        self.input_size = tuple(transformed_image.shape[-2:])
+        input_image = self.model.preprocess(transformed_image)
+        self._features_np = self.encoder_session.run(None, {"image": input_image.cpu().numpy()})[0]
+        self.features = torch.from_numpy(self._features_np).to(self.device)
+        self.is_image_set = True
+
+    def reset_image(self) -> None:
+        super().reset_image()
+        self._features_np = None
+
+    def predict_grid(self, point_coords: np.ndarray):
+        """점 N개 (ResizeLongestSide 좌표, N x 2)를 한 번에 디코딩 → 저해상도 logits N x 3 x 256 x 256, IoU N x 3"""
+        if not self.is_image_set:
+            raise RuntimeError("An image must be set with .set_image(...) before mask prediction.")
+        low_res_masks, iou_preds = self.decoder_session.run(None, {
+            "image_embeddings": self._features_np,
+            "point_coords": np.ascontiguousarray(point_coords[:, None, :], dtype=np.float32),
+        })
+        return torch.from_numpy(low_res_masks).to(self.device), torch.from_numpy(iou_preds).to(self.device)
@@ -5,6 +5,7 @@ from torchvision.ops.boxes import batched_nms, box_area
 import logging
 from utils.inout import save_json, load_json, save_npz
 from utils.bbox_utils import xyxy_to_xywh, xywh_to_xyxy, force_binary_mask
+from sam6d_common.rle import mask_to_rle
 import time
 from PIL import Image
 
@@ -22,27 +23,6 @@ lmo_object_ids = np.array(
 )  # object ID of occlusionLINEMOD is different
 
 
-def mask_to_rle(binary_mask):
-    rle = {"counts": [], "size": list(binary_mask.shape)}
-    counts = rle.get("counts")
-
-    last_elem = 0
-    running_length = 0
-
-    for i, elem in enumerate(binary_mask.ravel(order="F")):
-        if elem == last_elem:
-            pass
-        else:
-            counts.append(running_length)
-            running_length = 0
-            last_elem = elem
-        running_length += 1
-
-    counts.append(running_length)
-
-    return rle
-
-
 class BatchedData:
     """
     A structure for storing data in batched format.
@@ -77,12 +57,112 @@ class BatchedData:
         self.data = torch.stack(self.data, dim=dim)
 
 
+class CroppedMasks:
+    """
+    Proposal masks stored as crops around their boxes, with the (x, y) offset of each crop in the image.
+    Per-proposal work (area, translation, cropping for descriptors) only touches the ROI pixels;
+    full image-size masks are materialized on request (full / numpy, e.g. when saving or sending results).
+    """
+
+    def __init__(self, crops, offsets, image_size) -> None:
+        self.crops = list(crops)  # N tensors of shape h_i x w_i
+        self.offsets = offsets  # N x 2 (x, y), long
+        self.image_size = tuple(int(s) for s in image_size)  # (H, W)
+
+    @classmethod
+    def from_full(cls, masks, boxes, margin=2):
+        """
+        Crop N x H x W masks to their xyxy boxes (+ margin pixels, clamped to the image).
+        Crops are copies, so the full masks can be released afterwards.
+        """
+        img_h, img_w = masks.shape[1:]
+        boxes = boxes.long().cpu()
+        x1 = (boxes[:, 0] - margin).clamp(0, img_w - 1)
+        y1 = (boxes[:, 1] - margin).clamp(0, img_h - 1)
+        x2 = (boxes[:, 2] + 1 + margin).clamp(max=img_w)
+        y2 = (boxes[:, 3] + 1 + margin).clamp(max=img_h)
+        x2, y2 = torch.maximum(x2, x1 + 1), torch.maximum(y2, y1 + 1)
+        crops = [
+            masks[i, top:bottom, left:right].clone()
+            for i, (left, top, right, bottom) in enumerate(
+                zip(x1.tolist(), y1.tolist(), x2.tolist(), y2.tolist())
+            )
+        ]
+        offsets = torch.stack([x1, y1], dim=1).to(masks.device)
+        return cls(crops, offsets, (img_h, img_w))
+
+    def __len__(self):
+        return len(self.crops)
+
+    def __getitem__(self, idxs):
+        if isinstance(idxs, slice):
+            return CroppedMasks(self.crops[idxs], self.offsets[idxs], self.image_size)
+        idxs = torch.as_tensor(idxs)
+        if idxs.dtype == torch.bool:
+            idxs = idxs.nonzero().flatten()
+        idxs = idxs.reshape(-1).tolist()
+        return CroppedMasks(
+            [self.crops[i] for i in idxs], self.offsets[idxs], self.image_size
+        )
+
+    @property
+    def shape(self):
+        return (len(self.crops),) + self.image_size
+
+    @property
+    def device(self):
+        return self.offsets.device
+
+    def to(self, device):
+        return CroppedMasks(
+            [crop.to(device) for crop in self.crops], self.offsets.to(device), self.image_size
+        )
+
+    def cpu(self):
+        return self.to("cpu")
+
+    def areas(self):
+        if len(self.crops) == 0:
+            return torch.zeros(0, device=self.device)
+        return torch.stack([crop.sum() for crop in self.crops]).float()
+
+    def crop_boxes(self, boxes):
+        """
+        xyxy image boxes -> xyxy boxes relative to each crop
+        """
+        return boxes - self.offsets.to(boxes.device).repeat(1, 2)
+
+    def crop_images(self, image):
+        """
+        C x H x W image -> list of C x h_i x w_i views on the crop windows
+        """
+        offsets = self.offsets.tolist()
+        return [
+            image[..., y : y + crop.shape[0], x : x + crop.shape[1]]
+            for (x, y), crop in zip(offsets, self.crops)
+        ]
+
+    def full(self):
+        full_masks = torch.zeros(
+            self.shape,
+            dtype=self.crops[0].dtype if len(self.crops) > 0 else torch.bool,
+            device=self.device,
+        )
+        for full_mask, crop, (x, y) in zip(full_masks, self.crops, self.offsets.tolist()):
+            full_mask[y : y + crop.shape[0], x : x + crop.shape[1]] = crop
+        return full_masks
+
+    def numpy(self):
+        return self.full().cpu().numpy()
+
+
 class Detections:
     """
     A structure for storing detections.
+    Masks given with boxes are kept as CroppedMasks unless crop_masks=False.
     """
 
-    def __init__(self, data) -> None:
+    def __init__(self, data, crop_masks=True) -> None:
         if isinstance(data, str):
             data = self.load_from_file(data)
         for key, value in data.items():
@@ -92,11 +172,21 @@ class Detections:
             if isinstance(self.boxes, np.ndarray):
                 self.to_torch()
             self.boxes = self.boxes.long()
+            if (
+                crop_masks
+                and "masks" in self.keys
+                and isinstance(self.masks, torch.Tensor)
+                and self.masks.dim() == 3
+            ):
+                self.masks = CroppedMasks.from_full(self.masks, self.boxes)
 
     def remove_very_small_detections(self, config):
         img_area = self.masks.shape[1] * self.masks.shape[2]
         box_areas = box_area(self.boxes) / img_area
-        mask_areas = self.masks.sum(dim=(1, 2)) / img_area
+        if isinstance(self.masks, CroppedMasks):
+            mask_areas = self.masks.areas() / img_area
+        else:
+            mask_areas = self.masks.sum(dim=(1, 2)) / img_area
         keep_idxs = torch.logical_and(
             box_areas > config.min_box_size**2, mask_areas > config.min_mask_size
         )
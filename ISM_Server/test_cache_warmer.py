@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# ISM_Server/test_cache_warmer.py - 백그라운드 캐시 워밍 대기열 테스트 (로드는 가짜 함수)
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+ISM_ROOT = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(ISM_ROOT)
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from sam6d_common.cache_warmer import CacheWarmer, WarmItem, resolve_targets
+
+
+def item(name):
+    return WarmItem(f"/templates/ycb/{name}", "ycb", name, f"/templates/ycb/{name}", None)
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def test_background_queue():
+    """submit은 바로 반환, 중복 / 상한 / 취소 / 실패 처리, 로드 중인 객체는 wait_for로 대기"""
+    release = threading.Event()
+    cache = {}
+
+    def warm_fn(warm_item):
+        if warm_item.object_name == "broken":
+            raise RuntimeError("no templates")
+        release.wait(2.0)
+        if warm_item.key in cache:
+            return "cached"
+        cache[warm_item.key] = True
+        return "loaded"
+
+    warmer = CacheWarmer(warm_fn, max_pending=2)
+    start = time.perf_counter()
+    result = warmer.submit([item("a"), item("b"), item("a"), item("c")])
+    assert time.perf_counter() - start < 0.05
+    assert wait_until(lambda: warmer.get_stats()["loading"] == "ycb/a")
+    # 대기열 상한 2 → c 거절, a가 로드를 시작하면 d는 들어가고 e는 거절
+    assert result == {"queued": ["ycb/a", "ycb/b"], "duplicate": ["ycb/a"], "rejected": ["ycb/c"]}, result
+    assert warmer.submit([item("d"), item("e")]) == {"queued": ["ycb/d"], "duplicate": [], "rejected": ["ycb/e"]}
+    assert warmer.submit([item("a")])["duplicate"] == ["ycb/a"]
+    assert warmer.cancel([item("d").key, "/unknown"]) == 1
+
+    # 로드 중인 a를 요청이 필요로 하면 끝날 때까지 대기 → 캐시에 있음
+    waiter_result = {}
+
+    def request():
+        waiter_result["waited"] = warmer.wait_for(item("a").key, timeout=2.0)
+        waiter_result["cached"] = item("a").key in cache
+
+    requester = threading.Thread(target=request)
+    requester.start()
+    time.sleep(0.02)
+    assert requester.is_alive()
+    release.set()
+    requester.join(2.0)
+    assert waiter_result == {"waited": True, "cached": True}
+    assert not warmer.wait_for(item("z").key)
+
+    warmer.submit([item("broken"), item("a")])
+    assert wait_until(lambda: warmer.get_stats()["failed"] == 1 and warmer.get_stats()["cached"] == 1)
+    stats = warmer.get_stats()
+    assert stats["loaded"] == 2 and stats["cancelled"] == 1 and stats["rejected"] == 2 and stats["waited"] == 1
+    assert stats["recent"][-2]["error"] and stats["pending"] == [] and stats["loading"] is None
+    print(f"✅ background warm queue (loaded {stats['loaded']}, duplicate {stats['duplicate']}, failed {stats['failed']})")
+    return True
+
+
+def test_resolve_targets():
+    """클래스 이름만 주면 객체 전체 (limit까지), 경로를 직접 주면 그대로 사용"""
+    root = tempfile.mkdtemp(prefix="cache_warmer_test_")
+    try:
+        templates, meshes = os.path.join(root, "templates"), os.path.join(root, "meshes")
+        for name in ("obj_01", "obj_02", "obj_03"):
+            os.makedirs(os.path.join(templates, "lmo", name))
+            os.makedirs(os.path.join(meshes, "lmo"), exist_ok=True)
+            open(os.path.join(meshes, "lmo", f"{name}.ply"), "w").close()
+
+        items = resolve_targets([SimpleNamespace(class_name="lmo", object_name=None)], templates, meshes, limit=2)
+        assert [i.object_name for i in items] == ["obj_01", "obj_02"]
+        assert items[0].cad_path == os.path.join(meshes, "lmo", "obj_01.ply")
+
+        hint = SimpleNamespace(class_name="ycb", object_name="x", template_dir="/data/t/x/", cad_path="/data/m/x.ply")
+        items = resolve_targets([hint, SimpleNamespace(class_name="none", object_name=None)], templates, meshes)
+        assert [(i.key, i.cad_path) for i in items] == [("/data/t/x", "/data/m/x.ply")]
+        print("✅ class / object → template / CAD path resolution")
+        return True
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    print("캐시 워밍 테스트 시작...\n")
+
+    success = True
+    success &= test_background_queue()
+    success &= test_resolve_targets()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# ISM_Server/test_cropped_masks.py - bbox 크롭 마스크 후처리 동등성 테스트
+import os
+import sys
+from types import SimpleNamespace
+
+ISM_ROOT = os.path.dirname(os.path.abspath(__file__))
+if ISM_ROOT not in sys.path:
+    sys.path.insert(0, ISM_ROOT)
+
+import numpy as np
+import torch
+import torchvision.transforms as T
+
+from model.utils import CroppedMasks, Detections
+from utils.bbox_utils import CropResizePad
+from utils.trimesh_utils import depth_image_to_pointcloud_translate_torch
+
+
+def sample_proposals(num_proposals=12, h=120, w=160, seed=0):
+    """SAM 출력 형태의 (masks, boxes) - 박스가 이미지 경계에 닿는 경우 포함"""
+    torch.manual_seed(seed)
+    masks = torch.zeros(num_proposals, h, w)
+    boxes = torch.zeros(num_proposals, 4, dtype=torch.long)
+    for i in range(num_proposals):
+        x1, y1 = torch.randint(0, w - 20, (1,)).item(), torch.randint(0, h - 20, (1,)).item()
+        x2, y2 = x1 + torch.randint(8, 20, (1,)).item(), y1 + torch.randint(8, 20, (1,)).item()
+        if i == 0:
+            x1, y1, x2, y2 = 0, 0, w - 1, h - 1
+        masks[i, y1 : y2 + 1, x1 : x2 + 1] = (torch.rand(y2 - y1 + 1, x2 - x1 + 1) > 0.3).float()
+        ys, xs = torch.nonzero(masks[i], as_tuple=True)
+        boxes[i] = torch.tensor([xs.min(), ys.min(), xs.max(), ys.max()])
+    return {"masks": masks, "boxes": boxes}
+
+
+def test_crop_roundtrip_and_filter():
+    """크롭 후 full() 복원 및 필터링이 전체 마스크와 일치하는지 확인"""
+    proposals = sample_proposals()
+    detections = Detections(dict(proposals))
+    assert isinstance(detections.masks, CroppedMasks)
+    assert detections.masks.shape == tuple(proposals["masks"].shape)
+    assert torch.equal(detections.masks.full(), proposals["masks"])
+    assert torch.allclose(detections.masks.areas(), proposals["masks"].sum(dim=(1, 2)))
+
+    keep = torch.tensor([True, False] * 6)
+    detections.filter(keep)
+    assert torch.equal(detections.masks.full(), proposals["masks"][keep])
+    assert torch.equal(detections.masks[torch.tensor([2, 0])].full(), proposals["masks"][keep][[2, 0]])
+    assert np.array_equal(detections.masks.numpy(), proposals["masks"][keep].numpy())
+    print("✅ crop round trip / filter")
+    return True
+
+
+def test_remove_very_small_detections():
+    """크롭 면적 기반 필터가 기존 전체 마스크 결과와 같은지 확인"""
+    proposals = sample_proposals()
+    config = SimpleNamespace(min_box_size=0.1, min_mask_size=6e-3)
+    cropped = Detections(dict(proposals))
+    full = Detections(dict(proposals), crop_masks=False)
+    cropped.remove_very_small_detections(config)
+    full.remove_very_small_detections(config)
+    assert 0 < len(cropped) < len(proposals["boxes"])
+    assert torch.equal(cropped.boxes, full.boxes)
+    assert torch.equal(cropped.masks.full(), full.masks)
+    print("✅ remove_very_small_detections")
+    return True
+
+
+def test_query_translation():
+    """크롭 윈도우 기반 translation이 전체 마스크 * depth 결과와 같은지 확인"""
+    from model.detector import Instance_Segmentation_Model
+
+    proposals = sample_proposals()
+    depth = torch.rand(120, 160) * 1000 + 300
+    depth[::7] = 0  # invalid depth
+    K = torch.tensor([[200.0, 0, 80], [0, 200.0, 60], [0, 0, 1]])
+    cropped = Detections(dict(proposals)).masks
+
+    translate = Instance_Segmentation_Model.Calculate_the_query_translation(None, cropped, depth, K, 1.0)
+    expected = depth_image_to_pointcloud_translate_torch(proposals["masks"] * depth[None], 1.0, K)
+    assert torch.allclose(translate, expected, atol=1e-5)
+    print("✅ query translation")
+    return True
+
+
+def test_descriptor_proposals():
+    """DINOv2 입력 전처리 (RGB / 마스크 crop-resize-pad)가 기존 결과와 같은지 확인"""
+    from model.dinov2 import CustomDINOv2
+
+    proposals = sample_proposals()
+    image_np = (np.random.default_rng(0).random((120, 160, 3)) * 255).astype(np.uint8)
+    processor = SimpleNamespace(
+        rgb_normalize=T.Compose([T.ToTensor(), T.Normalize(mean=(0.485, 0.456, 0.406), std=(0.229, 0.224, 0.225))]),
+        rgb_proposal_processor=CropResizePad(224),
+    )
+    cropped = Detections(dict(proposals))
+
+    rgbs = CustomDINOv2.process_rgb_proposals(processor, image_np, cropped.masks, cropped.boxes)
+    expected_rgbs = CustomDINOv2.process_rgb_proposals(processor, image_np, proposals["masks"], proposals["boxes"])
+    assert torch.allclose(rgbs, expected_rgbs)
+
+    masks = CustomDINOv2.process_masks_proposals(processor, cropped.masks, cropped.boxes)
+    expected_masks = CustomDINOv2.process_masks_proposals(processor, proposals["masks"].clone(), proposals["boxes"])
+    assert torch.allclose(masks, expected_masks)
+    print("✅ descriptor proposal processing")
+    return True
+
+
+if __name__ == "__main__":
+    print("크롭 마스크 테스트 시작...\n")
+
+    success = True
+    success &= test_crop_roundtrip_and_filter()
+    success &= test_remove_very_small_detections()
+    success &= test_query_translation()
+    success &= test_descriptor_proposals()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
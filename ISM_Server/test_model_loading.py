@@ -13,7 +13,7 @@ sam6d_path = os.path.abspath(sam6d_path)
 sys.path.append(sam6d_path)
 
 # main.py에서 모델 로딩 함수 import
-from main import load_model, load_templates, load_cad_model
+from main import _load_model, load_templates, load_cad_model
 
 async def test_model_loading():
     """모델 로딩 테스트"""
@@ -21,7 +21,7 @@ async def test_model_loading():
     
     # 모델 로딩 테스트
     print("\n1. 모델 로딩 테스트")
-    model_result = await load_model()
+    model_result = await asyncio.to_thread(_load_model)
     print(f"모델 로딩 결과: {model_result}")
     
     # 템플릿 로딩 테스트
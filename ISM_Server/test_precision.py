@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# ISM_Server/test_precision.py - 백본 혼합 정밀도 (autocast / channels-last)와 fp32 대비 비교 지표 테스트
+import os
+import sys
+
+import torch
+import torch.nn.functional as F
+
+ISM_ROOT = os.path.dirname(os.path.abspath(__file__))
+if ISM_ROOT not in sys.path:
+    sys.path.insert(0, ISM_ROOT)
+
+from utils.precision import compare_masks, compare_semantic, parity_failures, set_precision
+
+
+def test_set_precision_dinov2():
+    """DINOv2 백본: bf16 / fp16 autocast 출력은 fp32로 돌아오고 fp32 출력과 거의 같음, fp32로 되돌리면 원래 forward"""
+    from model.dinov2 import _make_dinov2_model
+
+    torch.manual_seed(0)
+    backbone = _make_dinov2_model(arch_name="vit_small", pretrained=False).eval()
+    original_forward = backbone.forward
+    images = torch.randn(2, 3, 224, 224)
+    with torch.no_grad():
+        reference = backbone(images, is_training=True)
+
+        for precision in ("bf16", "fp16"):
+            set_precision(backbone, precision, channels_last=True)
+            assert backbone.precision == precision
+            assert backbone.patch_embed.proj.weight.is_contiguous(memory_format=torch.channels_last)
+            output = backbone(images, is_training=True)
+            for key in ("x_norm_clstoken", "x_norm_patchtokens"):
+                assert output[key].dtype == torch.float32
+                similarity = F.cosine_similarity(output[key], reference[key], dim=-1)
+                assert similarity.min().item() > 0.98, (precision, key, similarity.min().item())
+
+        set_precision(backbone, "fp32")
+        assert backbone.forward == original_forward and "_fp32_forward" not in backbone.__dict__
+        assert backbone.patch_embed.proj.weight.is_contiguous()
+        assert torch.equal(backbone(images, is_training=True)["x_norm_clstoken"], reference["x_norm_clstoken"])
+
+    try:
+        set_precision(backbone, "int8")
+        assert False, "unknown precision must raise"
+    except ValueError:
+        pass
+    print("✅ DINOv2 autocast (bf16 / fp16, channels-last) returns fp32 features close to fp32, fp32 restores forward")
+    return True
+
+
+def test_sam_generator_precision():
+    """CustomSamAutomaticMaskGenerator는 이미지 인코더에만 정밀도를 적용 (마스크 디코더는 fp32)"""
+    from segment_anything import sam_model_registry
+    from model.sam import CustomSamAutomaticMaskGenerator
+
+    sam = sam_model_registry["vit_b"]()
+    generator = CustomSamAutomaticMaskGenerator(sam, segmentor_width_size=640, precision="bf16")
+    encoder = generator.predictor.model.image_encoder
+    assert encoder.precision == "bf16" and "forward" in encoder.__dict__
+    assert "forward" not in generator.predictor.model.mask_decoder.__dict__
+
+    # 인코더 출력은 fp32 (디코더 입력 dtype 그대로)
+    with torch.no_grad():
+        encoder.blocks = encoder.blocks[:1]
+        embedding = encoder(torch.randn(1, 3, 1024, 1024))
+    assert embedding.dtype == torch.float32 and embedding.shape == (1, 256, 64, 64)
+    print("✅ SAM mask generator autocasts the image encoder only, embeddings stay fp32")
+    return True
+
+
+def test_parity_metrics():
+    """마스크 IoU (개수가 달라도 짝 찾기)와 semantic score 순위 비교, 기준 미달 항목 보고"""
+    ref = torch.zeros(3, 20, 20)
+    ref[0, :10, :10] = 1
+    ref[1, 10:, 10:] = 1
+    ref[2, :10, 10:] = 1
+    test = ref[[1, 0]].clone()
+    test[0, 10, 10] = 0  # 한 픽셀 차이
+    masks = compare_masks(ref, test)
+    assert masks["num_ref"] == 3 and masks["num_test"] == 2
+    assert masks["min_iou"] == 0.0 and abs(masks["mean_iou"] - (1 + 99 / 100) / 3) < 1e-6
+
+    ref_semantic = (torch.tensor([0, 2, 3, 5]), torch.tensor([1, 0, 1, 2]), torch.tensor([0.9, 0.5, 0.7, 0.3]))
+    same = compare_semantic(ref_semantic, ref_semantic, top_k=3)
+    assert same["selected_jaccard"] == 1.0 and same["object_agreement"] == 1.0
+    assert same["topk_overlap"] == 1.0 and same["top1_match"] and same["max_score_diff"] == 0.0
+    assert not parity_failures({**compare_masks(ref, ref), **same})
+
+    # 제안 5가 빠지고 3의 객체가 바뀌고 2와 3의 점수 순서가 바뀜
+    test_semantic = (torch.tensor([0, 2, 3]), torch.tensor([1, 0, 2]), torch.tensor([0.88, 0.72, 0.6]))
+    diff = compare_semantic(ref_semantic, test_semantic, top_k=2)
+    assert diff["selected_jaccard"] == 0.75 and abs(diff["object_agreement"] - 2 / 3) < 1e-6
+    assert diff["topk_overlap"] == 0.5 and diff["top1_match"]
+    assert abs(diff["max_score_diff"] - 0.22) < 1e-6
+    failures = parity_failures({**masks, **diff})
+    assert {f.split("=")[0] for f in failures} == {"mean_iou", "selected_jaccard", "object_agreement", "topk_overlap"}
+    print("✅ parity metrics: mask IoU matching, semantic selection / assignment / ranking, threshold failures")
+    return True
+
+
+if __name__ == "__main__":
+    print("혼합 정밀도 테스트 시작...\n")
+
+    success = True
+    success &= test_set_precision_dinov2()
+    success &= test_sam_generator_precision()
+    success &= test_parity_metrics()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# ISM_Server/test_rle_utils.py - 벡터화 RLE encode/decode 검증 테스트
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+import torch
+
+from sam6d_common.rle import mask_to_rle, masks_to_rle_torch, rle_to_mask
+
+
+def legacy_mask_to_rle(binary_mask):
+    """기존 픽셀 단위 루프 구현 (비교 기준)"""
+    rle = {"counts": [], "size": list(binary_mask.shape)}
+    counts = rle.get("counts")
+    last_elem = 0
+    running_length = 0
+    for i, elem in enumerate(binary_mask.ravel(order="F")):
+        if elem != last_elem:
+            counts.append(running_length)
+            running_length = 0
+            last_elem = elem
+        running_length += 1
+    counts.append(running_length)
+    return rle
+
+
+def legacy_rle_to_mask(rle):
+    """기존 run 단위 루프 구현 (PEM data_utils.rle_to_binary_mask, 비교 기준)"""
+    binary_array = np.zeros(np.prod(rle.get("size")), dtype=bool)
+    counts = rle.get("counts")
+    start = 0
+    for i in range(len(counts) - 1):
+        start += counts[i]
+        end = start + counts[i + 1]
+        binary_array[start:end] = (i + 1) % 2
+    return binary_array.reshape(*rle.get("size"), order="F")
+
+
+def sample_masks(num_masks=8, h=48, w=64, seed=0):
+    """블롭 형태 마스크 + 빈 마스크 / 전체 마스크 / 첫 픽셀 foreground 경계 케이스"""
+    rng = np.random.default_rng(seed)
+    masks = np.zeros((num_masks, h, w), dtype=np.uint8)
+    for i in range(num_masks):
+        y1, x1 = rng.integers(0, h // 2), rng.integers(0, w // 2)
+        masks[i, y1:y1 + rng.integers(1, h // 2), x1:x1 + rng.integers(1, w // 2)] = 1
+        masks[i] ^= (rng.random((h, w)) < 0.05).astype(np.uint8)
+    masks[0] = 0
+    masks[1] = 1
+    masks[2, 0, 0] = 1
+    return masks
+
+
+def test_encode_matches_legacy():
+    """NumPy encode가 기존 루프 구현과 동일한 counts를 내는지 확인"""
+    for mask in sample_masks():
+        assert mask_to_rle(mask) == legacy_mask_to_rle(mask)
+    print("✅ mask_to_rle matches legacy loop")
+    return True
+
+
+def test_decode_roundtrip():
+    """decode가 기존 구현과 일치하고 encode의 역함수인지 확인"""
+    for mask in sample_masks():
+        rle = mask_to_rle(mask)
+        decoded = rle_to_mask(rle)
+        assert np.array_equal(decoded, legacy_rle_to_mask(rle))
+        assert np.array_equal(decoded, mask.astype(bool))
+    print("✅ rle_to_mask round trip")
+    return True
+
+
+def test_torch_batch_matches_numpy():
+    """배치 torch encode (CPU, 가능하면 CUDA)가 NumPy encode와 일치하는지 확인"""
+    masks = sample_masks()
+    expected = [mask_to_rle(mask) for mask in masks]
+    devices = ["cpu"] + (["cuda"] if torch.cuda.is_available() else [])
+    for device in devices:
+        for dtype in (torch.bool, torch.uint8):
+            result = masks_to_rle_torch(torch.from_numpy(masks).to(device=device, dtype=dtype))
+            assert result == expected, f"mismatch on {device}/{dtype}"
+    assert masks_to_rle_torch(torch.zeros(0, 4, 4, dtype=torch.bool)) == []
+    print(f"✅ masks_to_rle_torch matches NumPy ({', '.join(devices)})")
+    return True
+
+
+if __name__ == "__main__":
+    print("RLE 유틸리티 테스트 시작...\n")
+
+    success = True
+    success &= test_encode_matches_legacy()
+    success &= test_decode_roundtrip()
+    success &= test_torch_batch_matches_numpy()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
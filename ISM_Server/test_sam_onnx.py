@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# ISM_Server/test_sam_onnx.py - SAM ONNX Runtime 백엔드 (이미지 인코더 + 격자 디코더)와 PyTorch 경로의 CPU 결과 비교
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import torch
+
+ISM_ROOT = os.path.dirname(os.path.abspath(__file__))
+if ISM_ROOT not in sys.path:
+    sys.path.insert(0, ISM_ROOT)
+
+from segment_anything.build_sam import _build_sam
+from segment_anything.utils.amg import build_all_layer_point_grids
+from model.sam import CustomSamAutomaticMaskGenerator
+from model.sam_onnx import DECODER_FILE, ENCODER_FILE, ImageEncoderStub
+from utils.precision import compare_masks
+from utils.startup import synthetic_image
+
+# CPU 테스트용 작은 인코더 (디코더 / 프롬프트 인코더는 실제 SAM과 같은 구조)
+GENERATOR_KWARGS = dict(segmentor_width_size=320, pred_iou_thresh=0.0, stability_score_thresh=0.0)
+
+
+def build_tiny_sam():
+    torch.manual_seed(0)
+    return _build_sam(encoder_embed_dim=128, encoder_depth=2, encoder_num_heads=4, encoder_global_attn_indexes=[1])
+
+
+def make_generators(onnx_dir):
+    # 같은 가중치의 SAM 두 개 (ONNX 백엔드는 PyTorch 이미지 인코더를 해제함)
+    reference = CustomSamAutomaticMaskGenerator(build_tiny_sam(), **GENERATOR_KWARGS)
+    onnx = CustomSamAutomaticMaskGenerator(build_tiny_sam(), backend="onnx", onnx_dir=onnx_dir, **GENERATOR_KWARGS)
+    # 격자 3 x 3 (실제 기본값 32 x 32는 CPU 테스트에 너무 느림)
+    reference.point_grids = onnx.point_grids = build_all_layer_point_grids(3, 0, 1)
+    return reference, onnx
+
+
+def test_onnx_matches_torch():
+    """같은 가중치에서 ONNX 임베딩 / 격자 디코딩 결과와 최종 제안이 PyTorch 경로와 허용 오차 안에서 같음"""
+    onnx_dir = tempfile.mkdtemp(prefix="ism_sam_onnx_")
+    try:
+        reference, onnx = make_generators(onnx_dir)
+        assert os.path.exists(os.path.join(onnx_dir, ENCODER_FILE))
+        assert os.path.exists(os.path.join(onnx_dir, DECODER_FILE))
+        assert onnx.points_per_batch == reference.points_per_batch == 64
+        assert isinstance(onnx.predictor.model.image_encoder, ImageEncoderStub)
+        assert not list(onnx.predictor.model.image_encoder.parameters())
+
+        image = synthetic_image(240, 320)
+        reference.predictor.set_image(image)
+        onnx.predictor.set_image(image)
+        assert torch.allclose(reference.predictor.features, onnx.predictor.features, atol=1e-4)
+
+        # 격자 점 배치 하나의 제안 (IoU / 안정성 점수 필터, 박스, RLE)
+        points = onnx.point_grids[0] * np.array(image.shape[:2])[None, ::-1]
+        crop_box, orig_size = [0, 0, image.shape[1], image.shape[0]], image.shape[:2]
+        expected = reference._process_batch(points, image.shape[:2], crop_box, orig_size)
+        actual = onnx._process_batch(points, image.shape[:2], crop_box, orig_size)
+        assert len(actual["rles"]) == len(expected["rles"]) > 0
+        assert torch.allclose(actual["iou_preds"], expected["iou_preds"], atol=1e-4)
+        assert torch.allclose(actual["stability_score"], expected["stability_score"], atol=1e-3)
+        assert (actual["boxes"] - expected["boxes"]).abs().max() <= 1
+        assert torch.equal(actual["points"], expected["points"])
+        reference.predictor.reset_image()
+        onnx.predictor.reset_image()
+
+        # generate_masks 전체 (NMS, 원본 크기 복원)
+        expected, actual = reference.generate_masks(image), onnx.generate_masks(image)
+        assert actual["masks"].shape == expected["masks"].shape
+        assert compare_masks(expected["masks"], actual["masks"])["min_iou"] > 0.99
+        print(f"✅ ONNX encoder + grid decoder match PyTorch ({len(expected['masks'])} proposals)")
+        return True
+    finally:
+        shutil.rmtree(onnx_dir)
+
+
+def test_empty_batch_and_unknown_backend():
+    """IoU 필터를 통과한 마스크가 없어도 PyTorch 경로와 같은 키, 알 수 없는 backend는 ValueError"""
+    onnx_dir = tempfile.mkdtemp(prefix="ism_sam_onnx_")
+    try:
+        reference, onnx = make_generators(onnx_dir)
+        image = synthetic_image(240, 320)
+        reference.predictor.set_image(image)
+        onnx.predictor.set_image(image)
+        reference.pred_iou_thresh = onnx.pred_iou_thresh = 100.0
+        points = onnx.point_grids[0][:2] * np.array(image.shape[:2])[None, ::-1]
+        crop_box, orig_size = [0, 0, image.shape[1], image.shape[0]], image.shape[:2]
+        expected = reference._process_batch(points, image.shape[:2], crop_box, orig_size)
+        actual = onnx._process_batch(points, image.shape[:2], crop_box, orig_size)
+        assert set(k for k, _ in actual.items()) == set(k for k, _ in expected.items())
+        assert len(actual["rles"]) == 0 and actual["boxes"].shape == (0, 4)
+
+        try:
+            CustomSamAutomaticMaskGenerator(reference.predictor.model, backend="tensorrt")
+            assert False, "unknown backend must raise"
+        except ValueError:
+            pass
+        print("✅ empty ONNX batch keeps the PyTorch keys, unknown backend rejected")
+        return True
+    finally:
+        shutil.rmtree(onnx_dir)
+
+
+if __name__ == "__main__":
+    print("SAM ONNX 백엔드 테스트 시작...\n")
+
+    success = True
+    success &= test_onnx_matches_torch()
+    success &= test_empty_batch_and_unknown_backend()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
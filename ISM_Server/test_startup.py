@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# ISM_Server/test_startup.py - cold start 테스트 (mmap 체크포인트 로드, 초기화 생략, 워밍업, liveness / readiness)
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+import torch
+
+ISM_ROOT = os.path.dirname(os.path.abspath(__file__))
+if ISM_ROOT not in sys.path:
+    sys.path.insert(0, ISM_ROOT)
+
+from utils.checkpoint import init_empty_weights, load_checkpoint, load_weights
+from utils.startup import StartupState, warmup_model
+
+
+class TinyNet(torch.nn.Module):
+    def __init__(self):
+        super().__init__()
+        self.layers = torch.nn.Sequential(torch.nn.Linear(8, 16), torch.nn.LayerNorm(16), torch.nn.Linear(16, 4))
+        # 체크포인트에 없는 버퍼 (SAM pixel_mean처럼 생성자에서 값을 정함)
+        self.register_buffer("offset", torch.tensor([1.0, 2.0, 3.0, 4.0]), persistent=False)
+
+    def forward(self, x):
+        return self.layers(x) + self.offset
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_checkpoint_loading():
+    """mmap 로드 (예전 형식은 torch.load로 대체), 초기화 생략 후 로드한 모델이 원래 모델과 같은 출력"""
+    reference = TinyNet().eval()
+    x = torch.randn(3, 8)
+    root = tempfile.mkdtemp(prefix="ism_ckpt_test_")
+    try:
+        zip_path, legacy_path = os.path.join(root, "net.pth"), os.path.join(root, "net_legacy.pth")
+        torch.save(reference.state_dict(), zip_path)
+        torch.save(reference.state_dict(), legacy_path, _use_new_zipfile_serialization=False)
+
+        original_init = torch.nn.init.kaiming_uniform_
+        for path in (zip_path, legacy_path):
+            with init_empty_weights("cpu"):
+                assert torch.nn.init.kaiming_uniform_ is not original_init
+                net = TinyNet().eval()
+            assert torch.nn.init.kaiming_uniform_ is original_init
+            load_weights(net, load_checkpoint(path, "cpu"))
+            with torch.no_grad():
+                assert torch.equal(net(x), reference(x))
+            assert torch.equal(net.offset, reference.offset)
+        print("✅ mmap checkpoint load (legacy format fallback), skipped init + assign gives identical outputs")
+        return True
+    finally:
+        shutil.rmtree(root)
+
+
+def test_warmup_model():
+    """워밍업은 실제 요청과 같은 SAM 마스크 생성 / DINOv2 디스크립터 경로를 합성 입력으로 실행"""
+    calls = []
+
+    class FakeDescriptor:
+        chunk_size = 4
+
+        def __call__(self, image, proposals):
+            calls.append(("dino", proposals.masks.shape, proposals.boxes))
+
+    model = SimpleNamespace(
+        segmentor_model=SimpleNamespace(generate_masks=lambda image: calls.append(("sam", image.shape, image.dtype))),
+        descriptor_model=FakeDescriptor(),
+    )
+    timings = warmup_model(model, "cpu", image_size=(48, 64), runs=2)
+
+    assert len(timings) == 2 and [c[0] for c in calls] == ["sam", "dino", "sam", "dino"]
+    assert calls[0][1:] == ((48, 64, 3), "uint8")
+    _, mask_shape, boxes = calls[1]
+    assert tuple(mask_shape) == (4, 48, 64)
+    assert bool((boxes[:, 2] <= 64).all() and (boxes[:, 3] <= 48).all() and (boxes[:, :2] >= 0).all())
+    print("✅ warmup runs SAM mask generation + DINOv2 descriptors on a synthetic frame")
+    return True
+
+
+def test_liveness_and_readiness():
+    """포트는 바로 열리고 (/health 200), 모델 로드 / 워밍업이 끝나야 /ready 200 + 추론 요청 수락"""
+    from fastapi.testclient import TestClient
+    import main
+
+    release = threading.Event()
+    warmed = []
+    fake_model = SimpleNamespace(segmentor_model=SimpleNamespace(generate_masks=lambda image: None),
+                                 descriptor_model=SimpleNamespace(forward=lambda *args: None),
+                                 compute_semantic_score=lambda *args: None,
+                                 compute_appearance_score=lambda *args: None,
+                                 compute_geometric_score=lambda *args: None)
+
+    def fake_load():
+        release.wait(5)
+        main.model, main.device = fake_model, torch.device("cpu")
+        return True
+
+    saved = (main._load_model, main.warmup_model, main.WARMUP_MODE, main.STARTUP)
+    main._load_model = fake_load
+    main.warmup_model = lambda model, device, **kwargs: warmed.append((model, kwargs))
+    main.WARMUP_MODE = "true"
+    main.STARTUP = StartupState()
+    try:
+        with TestClient(main.app) as client:
+            assert client.get("/health").status_code == 200
+            ready = client.get("/ready")
+            assert ready.status_code == 503 and ready.json()["stage"] == "loading_model"
+            assert ready.headers["Retry-After"] == "5"
+            body = {"rgb_image": "", "depth_image": "", "cam_params": {}, "template_dir": "t", "cad_path": "c"}
+            assert client.post("/api/v1/inference", json=body).status_code == 503
+
+            release.set()
+            assert wait_until(lambda: client.get("/ready").status_code == 200)
+            status = client.get("/ready").json()
+            assert status["ready"] and {"loading_model", "warming_up", "preloading"} <= set(status["stage_durations_sec"])
+            assert len(warmed) == 1 and warmed[0][0] is fake_model
+
+        # 모델 로드 실패: 계속 503 (Retry-After 없음), 단계는 failed
+        main._load_model = lambda: False
+        main.STARTUP = StartupState()
+        with TestClient(main.app) as client:
+            assert wait_until(lambda: main.STARTUP.stage == "failed")
+            ready = client.get("/ready")
+            assert ready.status_code == 503 and ready.json()["error"] and "Retry-After" not in ready.headers
+            assert client.get("/health").status_code == 200
+        print("✅ /health answers during model load, /ready + inference gated on load / warmup, failure reported")
+        return True
+    finally:
+        main._load_model, main.warmup_model, main.WARMUP_MODE, main.STARTUP = saved
+        main.model = main.device = None
+
+
+if __name__ == "__main__":
+    print("cold start 테스트 시작...\n")
+
+    success = True
+    success &= test_checkpoint_loading()
+    success &= test_warmup_model()
+    success &= test_liveness_and_readiness()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
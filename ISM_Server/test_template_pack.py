@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# ISM_Server/test_template_pack.py - templates.pack 로더와 loose 파일 로더 (load_templates_from_files)의 동등성 테스트
+import glob
+import os
+import shutil
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+import torch
+from PIL import Image
+
+ISM_ROOT = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(ISM_ROOT)
+if ISM_ROOT not in sys.path:
+    sys.path.insert(0, ISM_ROOT)
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+# main.py와 같은 SAM-6D 경로 (있으면 실제 load_templates_from_files와 비교)
+SAM6D_PATH = os.path.join(REPO_ROOT, 'SAM-6D', 'SAM-6D', 'Instance_Segmentation_Model')
+if SAM6D_PATH not in sys.path:
+    sys.path.append(SAM6D_PATH)
+
+from utils.bbox_utils import CropResizePad
+from utils.template_pack import find_template_pack, TemplatePack, load_templates_from_pack
+from Render_Server import template_pack as render_template_pack
+
+
+
+def make_template_dir(num_views=6, h=96, w=128, seed=0):
+    """렌더링 결과 형태의 (rgb_i.png, mask_i.png, xyz_i.npy) 디렉토리 생성 - 경계에 닿는 뷰 / 반투명 경계 포함"""
+    rng = np.random.default_rng(seed)
+    template_dir = tempfile.mkdtemp(prefix='ism_tpl_')
+    for i in range(num_views):
+        mask = np.zeros((h, w), dtype=np.uint8)
+        y1, x1 = rng.integers(0, h // 2), rng.integers(0, w // 2)
+        y2, x2 = y1 + rng.integers(10, h // 2), x1 + rng.integers(10, w // 2)
+        if i == 0:
+            y1, x1, y2, x2 = 0, w // 3, h, w  # 이미지 경계에 닿는 객체
+        mask[y1:y2, x1:x2] = 255
+        mask[y1:y2:5, x1:x2:7] = 128
+        rgb = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+        rgb[mask == 0] = 0
+        xyz = (rng.standard_normal((h, w, 3)) * 50).astype(np.float16)
+        cv2.imwrite(os.path.join(template_dir, f'rgb_{i}.png'), rgb[:, :, ::-1])
+        cv2.imwrite(os.path.join(template_dir, f'mask_{i}.png'), mask)
+        np.save(os.path.join(template_dir, f'xyz_{i}.npy'), xyz)
+    return template_dir
+
+
+def reference_load_templates_from_files(template_dir, device):
+    """SAM-6D run_inference_custom.py의 템플릿 로드 (PIL 디코딩 + mask.getbbox + CropResizePad(224))"""
+    num_templates = len(glob.glob(f"{template_dir}/*.npy"))
+    boxes, masks, templates = [], [], []
+    for idx in range(num_templates):
+        image = Image.open(os.path.join(template_dir, 'rgb_' + str(idx) + '.png'))
+        mask = Image.open(os.path.join(template_dir, 'mask_' + str(idx) + '.png'))
+        boxes.append(mask.getbbox())
+
+        image = torch.from_numpy(np.array(image.convert("RGB")) / 255).float()
+        mask = torch.from_numpy(np.array(mask.convert("L")) / 255).float()
+        image = image * mask[:, :, None]
+        templates.append(image)
+        masks.append(mask.unsqueeze(-1))
+
+    templates = torch.stack(templates).permute(0, 3, 1, 2)
+    masks = torch.stack(masks).permute(0, 3, 1, 2)
+    boxes = torch.tensor(np.array(boxes))
+
+    proposal_processor = CropResizePad(224)
+    templates = proposal_processor(images=templates, boxes=boxes).to(device)
+    masks_cropped = proposal_processor(images=masks, boxes=boxes).to(device)
+    return templates, masks_cropped, boxes
+
+
+def get_loose_loader():
+    """SAM-6D 코어가 있으면 실제 load_templates_from_files, 없으면 위의 SAM-6D 구현"""
+    try:
+        from run_inference_custom_function import load_templates_from_files
+        return load_templates_from_files, 'run_inference_custom_function'
+    except ImportError:
+        return reference_load_templates_from_files, 'SAM-6D reference'
+
+
+def test_pack_matches_loose_files():
+    """같은 템플릿 디렉토리를 pack / loose 파일로 로드한 (templates, masks, boxes)가 같은지 확인"""
+    template_dir = make_template_dir()
+    try:
+        load_templates_from_files, source = get_loose_loader()
+        expected = load_templates_from_files(template_dir, 'cpu')
+
+        pack_path = render_template_pack.pack_template_dir(template_dir)
+        assert find_template_pack(template_dir) == pack_path
+        actual = load_templates_from_pack(TemplatePack(pack_path), 'cpu')
+
+        assert len(expected) == len(actual) == 3
+        for name, e, a in zip(('templates', 'masks', 'boxes'), expected, actual):
+            assert e.shape == a.shape, (name, e.shape, a.shape)
+            assert e.dtype == a.dtype, (name, e.dtype, a.dtype)
+            assert torch.allclose(e, a, atol=1e-6) if e.is_floating_point() else torch.equal(e, a), name
+        assert actual[0].shape == (6, 3, 224, 224) and actual[1].shape == (6, 1, 224, 224)
+        print(f'✅ load_templates_from_pack matches {source} (templates / masks / boxes)')
+        return True
+    finally:
+        shutil.rmtree(template_dir)
+
+
+if __name__ == '__main__':
+    print('템플릿 팩 테스트 시작...\n')
+
+    success = True
+    success &= test_pack_matches_loose_files()
+
+    print(f'\n=== 테스트 결과 ===')
+    print('✅ 모든 테스트 통과!' if success else '❌ 일부 테스트 실패')
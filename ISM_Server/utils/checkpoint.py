@@ -0,0 +1,66 @@
+# ISM_Server/utils/checkpoint.py - 체크포인트 로딩 (cold start 단축)
+#
+# - load_checkpoint: torch.load(mmap=True)로 파일 전체를 먼저 메모리에 읽지 않고, map_location으로 바로 대상 디바이스에 올림
+# - init_empty_weights: 체크포인트로 덮어쓸 파라미터의 무작위 초기화를 생략하고 대상 디바이스에 바로 생성
+#   (SAM ViT-H / DINOv2 ViT-L은 CPU 초기화 + GPU 복사에만 수 초 ~ 수십 초)
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+# false면 기존처럼 전체를 읽어서 로드 (mmap을 지원하지 않는 파일 시스템 등)
+USE_MMAP = os.getenv("ISM_CHECKPOINT_MMAP", "true").lower() == "true"
+
+# init_empty_weights 안에서 아무것도 하지 않게 바꿀 torch.nn.init 함수
+_INIT_FUNCTIONS = (
+    "uniform_", "normal_", "trunc_normal_", "constant_", "ones_", "zeros_", "eye_",
+    "xavier_uniform_", "xavier_normal_", "kaiming_uniform_", "kaiming_normal_", "orthogonal_",
+)
+
+
+def load_checkpoint(path, device="cpu"):
+    """state_dict 로드: mmap + weights_only로 읽어서 바로 device에 올림, 안 되면 기존 torch.load"""
+    start = time.perf_counter()
+    state_dict = None
+    if USE_MMAP:
+        try:
+            state_dict = torch.load(path, map_location=device, mmap=True, weights_only=True)
+        except Exception as e:
+            # 예전 (zip이 아닌) 형식 / 텐서 외 객체가 들어있는 체크포인트
+            logger.warning(f"mmap checkpoint load failed for {path}, falling back to torch.load: {e}")
+    if state_dict is None:
+        state_dict = torch.load(path, map_location=device)
+    logger.info(f"Checkpoint loaded: {path} -> {device} ({time.perf_counter() - start:.2f}s)")
+    return state_dict
+
+
+@contextmanager
+def init_empty_weights(device="cpu"):
+    """이 안에서 만든 모듈은 device에 바로 생성되고 파라미터 초기화를 건너뜀
+
+    파라미터 값은 쓰레기 값이므로 반드시 load_weights(strict)로 체크포인트를 불러와야 한다.
+    persistent=False 버퍼 (SAM pixel_mean 등)는 초기화 함수를 쓰지 않으므로 그대로 생성된다.
+    모델 모듈은 이 밖에서 import해야 한다 (안에서 처음 import된 모듈의 `from torch.nn.init import ...`는
+    no-op 함수를 계속 가리킴).
+    """
+    saved = {name: getattr(torch.nn.init, name) for name in _INIT_FUNCTIONS if hasattr(torch.nn.init, name)}
+    for name in saved:
+        setattr(torch.nn.init, name, lambda tensor, *args, **kwargs: tensor)
+    try:
+        with torch.device(device):
+            yield
+    finally:
+        for name, fn in saved.items():
+            setattr(torch.nn.init, name, fn)
+
+
+def load_weights(module, state_dict, strict=True):
+    """state_dict를 복사 없이 파라미터로 사용 (assign), 지원하지 않는 torch면 기존 방식으로 복사"""
+    try:
+        return module.load_state_dict(state_dict, strict=strict, assign=True)
+    except TypeError:
+        return module.load_state_dict(state_dict, strict=strict)
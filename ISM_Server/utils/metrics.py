@@ -0,0 +1,5 @@
+#!/usr/bin/env python3
+"""Prometheus 메트릭 (ISM 서버 설정, 구현은 sam6d_common/metrics.py)"""
+from sam6d_common.metrics import ServiceMetrics
+
+METRICS = ServiceMetrics("ism", env_prefix="ISM")
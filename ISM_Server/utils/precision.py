@@ -0,0 +1,139 @@
+# ISM_Server/utils/precision.py - SAM 이미지 인코더 / DINOv2 백본의 혼합 정밀도 (autocast) + channels-last
+#
+# 가중치는 fp32 그대로 두고 백본 forward만 autocast로 실행한다 (활성값이 fp16/bf16이라 VRAM / 시간 감소).
+# 백본 출력은 fp32로 되돌리므로 마스크 디코더, 유사도 / 점수 계산은 기존과 같은 fp32 경로를 탄다.
+# 정밀도를 켜기 전에 bench_precision.py로 fp32 대비 마스크 IoU / semantic score 순위를 확인할 것.
+import functools
+import logging
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+PRECISIONS = {"fp32": None, "fp16": torch.float16, "bf16": torch.bfloat16}
+
+
+def _module_device(module):
+    param = next(module.parameters(), None)
+    return param.device if param is not None else torch.device("cpu")
+
+
+def _to_float32(output):
+    """autocast 출력 (텐서 / dict / tuple / list)의 부동소수 텐서를 fp32로"""
+    if isinstance(output, torch.Tensor):
+        return output.float() if output.is_floating_point() else output
+    if isinstance(output, dict):
+        return {key: _to_float32(value) for key, value in output.items()}
+    if isinstance(output, (tuple, list)):
+        return type(output)(_to_float32(value) for value in output)
+    return output
+
+
+def set_precision(module, precision="fp32", channels_last=False):
+    """module.forward를 precision autocast로 실행 (다시 호출하면 설정 교체, fp32 + channels_last=False면 원래대로)
+
+    autocast 디바이스는 호출 시 입력 텐서의 디바이스를 따르므로 이후 .to(device)로 옮겨도 된다.
+    channels_last면 4D 가중치 (patch embedding / neck conv)와 4D 입력을 NHWC 메모리 배치로 바꾼다.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision: {precision} (expected one of {', '.join(PRECISIONS)})")
+    dtype = PRECISIONS[precision]
+    device = _module_device(module)
+    if dtype is torch.bfloat16 and device.type == "cuda" and not torch.cuda.is_bf16_supported():
+        logger.warning(f"bf16 is not supported on {torch.cuda.get_device_name(device)}, using fp16")
+        dtype, precision = torch.float16, "fp16"
+
+    forward = module.__dict__.pop("_fp32_forward", None) or module.forward
+    module.__dict__.pop("forward", None)
+    module.to(memory_format=torch.channels_last if channels_last else torch.contiguous_format)
+    module.precision, module.channels_last = precision, channels_last
+    if dtype is None and not channels_last:
+        return module
+
+    @functools.wraps(forward)
+    def precision_forward(*args, **kwargs):
+        if channels_last:
+            args = tuple(
+                arg.contiguous(memory_format=torch.channels_last)
+                if isinstance(arg, torch.Tensor) and arg.dim() == 4 else arg
+                for arg in args
+            )
+        if dtype is None:
+            return forward(*args, **kwargs)
+        device_type = next((arg.device.type for arg in args if isinstance(arg, torch.Tensor)), device.type)
+        with torch.autocast(device_type=device_type, dtype=dtype):
+            output = forward(*args, **kwargs)
+        return _to_float32(output)
+
+    module._fp32_forward = forward
+    module.forward = precision_forward
+    logger.info(f"{type(module).__name__}: precision={precision}, channels_last={channels_last}")
+    return module
+
+
+def mask_iou(masks_a, masks_b):
+    """[N, H, W] x [M, H, W] 마스크 (bool 또는 0~1 확률, 0.5 기준) → [N, M] IoU"""
+    a = (masks_a > 0.5).flatten(1).float()
+    b = (masks_b > 0.5).flatten(1).float()
+    intersection = a @ b.T
+    union = a.sum(1)[:, None] + b.sum(1)[None, :] - intersection
+    return intersection / union.clamp(min=1)
+
+
+def compare_masks(ref_masks, test_masks):
+    """fp32 마스크마다 test 마스크 중 최대 IoU (개수가 달라도 짝을 찾아 비교)"""
+    if len(ref_masks) == 0 or len(test_masks) == 0:
+        matched = len(ref_masks) == len(test_masks)
+        return {"num_ref": len(ref_masks), "num_test": len(test_masks),
+                "mean_iou": 1.0 if matched else 0.0, "min_iou": 1.0 if matched else 0.0}
+    best = mask_iou(ref_masks, test_masks.to(ref_masks.device)).max(dim=1).values
+    return {"num_ref": len(ref_masks), "num_test": len(test_masks),
+            "mean_iou": best.mean().item(), "min_iou": best.min().item()}
+
+
+def compare_semantic(ref, test, top_k=10):
+    """같은 제안에 대한 compute_semantic_score 결과 비교 (idx_selected_proposals, pred_idx_objects, semantic_score)
+
+    - selected_jaccard: confidence_thresh를 넘은 제안 집합의 일치도
+    - object_agreement: 양쪽에서 선택된 제안 중 같은 객체로 배정된 비율
+    - topk_overlap: 점수 상위 top_k 제안의 겹치는 비율, top1_match: 최고 점수 제안이 같은지
+    """
+    ref_idx, ref_obj, ref_score = (t.detach().cpu() for t in ref[:3])
+    test_idx, test_obj, test_score = (t.detach().cpu() for t in test[:3])
+    ref_sel, test_sel = set(ref_idx.tolist()), set(test_idx.tolist())
+    common = sorted(ref_sel & test_sel)
+    ref_pos = {idx: i for i, idx in enumerate(ref_idx.tolist())}
+    test_pos = {idx: i for i, idx in enumerate(test_idx.tolist())}
+
+    k = min(top_k, len(ref_idx), len(test_idx))
+    ref_top = ref_idx[torch.argsort(ref_score, descending=True)[:k]].tolist()
+    test_top = test_idx[torch.argsort(test_score, descending=True)[:k]].tolist()
+    score_diff = [abs(ref_score[ref_pos[i]].item() - test_score[test_pos[i]].item()) for i in common]
+    return {
+        "num_ref": len(ref_sel),
+        "num_test": len(test_sel),
+        "selected_jaccard": len(common) / len(ref_sel | test_sel) if ref_sel | test_sel else 1.0,
+        "object_agreement": (sum(ref_obj[ref_pos[i]].item() == test_obj[test_pos[i]].item() for i in common)
+                             / len(common)) if common else float(not ref_sel and not test_sel),
+        "topk_overlap": len(set(ref_top) & set(test_top)) / k if k else float(len(ref_idx) == len(test_idx)),
+        "top1_match": (ref_top[:1] == test_top[:1]),
+        "max_score_diff": max(score_diff, default=0.0),
+    }
+
+
+# 정밀도 모드를 배포에 켜도 되는 기준 (fp32 대비)
+PARITY_THRESHOLDS = {
+    "mean_iou": 0.95,
+    "selected_jaccard": 0.9,
+    "object_agreement": 0.98,
+    "topk_overlap": 0.9,
+}
+
+
+def parity_failures(metrics, thresholds=PARITY_THRESHOLDS):
+    """기준 미달 항목 목록 (비어 있으면 통과)"""
+    return [
+        f"{name}={metrics[name]:.4f} < {minimum}"
+        for name, minimum in thresholds.items()
+        if name in metrics and metrics[name] < minimum
+    ]
@@ -0,0 +1,101 @@
+# ISM_Server/utils/startup.py - 시작 단계 (liveness / readiness)와 합성 입력 워밍업
+#
+# 포트는 바로 열고 (liveness: /health), 모델 로드 / 워밍업 / 템플릿 프리로드는 백그라운드에서 진행한다.
+# 모두 끝나야 readiness (/ready)가 200이 되고 추론 요청을 받는다.
+import logging
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("starting", "loading_model", "warming_up", "preloading", "ready", "failed")
+
+
+class StartupState:
+    """시작 진행 단계와 단계별 소요 시간"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.stage = "starting"
+        self.error = None
+        self.durations = {}
+        self._stage_start = time.perf_counter()
+
+    def set_stage(self, stage):
+        if stage not in STAGES:
+            raise ValueError(f"Unknown startup stage: {stage}")
+        with self._lock:
+            now = time.perf_counter()
+            self.durations[self.stage] = round(now - self._stage_start, 3)
+            self.stage = stage
+            self._stage_start = now
+        logger.info(f"Startup stage: {stage}")
+
+    def fail(self, error):
+        self.error = str(error)
+        self.set_stage("failed")
+
+    @property
+    def ready(self):
+        return self.stage == "ready"
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "ready": self.stage == "ready",
+                "stage": self.stage,
+                "error": self.error,
+                "elapsed_sec": round(time.time() - self.started_at, 3),
+                "stage_durations_sec": dict(self.durations),
+            }
+
+
+def synthetic_image(height, width):
+    """워밍업용 RGB (그라디언트 배경 + 색 사각형, SAM이 마스크를 만들 수 있는 구조)"""
+    y, x = np.mgrid[0:height, 0:width]
+    image = np.stack([x * 255 // max(width - 1, 1), y * 255 // max(height - 1, 1), np.full_like(x, 96)], axis=-1)
+    image = image.astype(np.uint8)
+    for i, color in enumerate([(220, 40, 40), (40, 200, 60), (50, 80, 230), (240, 220, 30)]):
+        y1, x1 = height * (1 + (i // 2) * 4) // 10, width * (1 + (i % 2) * 4) // 10
+        image[y1:y1 + height * 3 // 10, x1:x1 + width * 3 // 10] = color
+    return image
+
+
+def synthetic_proposals(height, width, count, device):
+    """디스크립터 워밍업용 사각형 마스크 / 박스 (청크 하나를 채우는 개수)"""
+    masks = torch.zeros((count, height, width), dtype=torch.bool, device=device)
+    boxes = torch.zeros((count, 4), dtype=torch.float32, device=device)
+    for i in range(count):
+        h, w = height // 4 + (i * 7) % (height // 2), width // 4 + (i * 11) % (width // 2)
+        y1, x1 = (i * 13) % (height - h), (i * 17) % (width - w)
+        masks[i, y1:y1 + h, x1:x1 + w] = True
+        boxes[i] = torch.tensor([x1, y1, x1 + w, y1 + h], dtype=torch.float32)
+    return SimpleNamespace(masks=masks, boxes=boxes)
+
+
+def warmup_model(model, device, image_size=(480, 640), runs=1):
+    """합성 입력으로 SAM 마스크 생성 + DINOv2 디스크립터를 실행해서 첫 요청의 커널 선택 / 메모리 할당 비용을 미리 치름
+
+    실제 요청과 같은 경로 (segmentor_model.generate_masks / descriptor_model)를 쓰므로 cuDNN / cuBLAS 핸들,
+    CUDA 커널 로딩, 캐싱 할당기 블록이 준비된다. 반환값: 실행 횟수별 소요 시간 (초).
+    """
+    height, width = image_size
+    image = synthetic_image(height, width)
+    chunk_size = int(getattr(model.descriptor_model, "chunk_size", 16))
+    proposals = synthetic_proposals(height, width, chunk_size, device)
+    timings = []
+    with torch.no_grad():
+        for _ in range(runs):
+            start = time.perf_counter()
+            model.segmentor_model.generate_masks(image)
+            model.descriptor_model(image, proposals)
+            if torch.device(device).type == "cuda":
+                torch.cuda.synchronize()
+            timings.append(round(time.perf_counter() - start, 3))
+    logger.info(f"Warmup finished on {device} ({height}x{width}): {timings}s")
+    return timings
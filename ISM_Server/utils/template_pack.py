@@ -0,0 +1,32 @@
+"""
+templates.pack 리더 (ISM 템플릿 텐서 변환, 파일 형식 / 공용 리더는 sam6d_common/template_pack.py)
+"""
+import numpy as np
+import torch
+from utils.bbox_utils import CropResizePad
+from sam6d_common.template_pack import find_template_pack, TemplatePack
+
+
+def load_templates_from_pack(pack, device, image_size=224):
+    """
+    load_templates_from_files 와 같은 출력 (CropResizePad 처리된 templates / masks, boxes)
+    팩의 크롭이 loose 파일 로더가 쓰는 마스크 bbox 와 정확히 같으므로 크롭을 그대로 사용한다.
+    """
+    templates, masks, boxes, crop_boxes = [], [], [], []
+    for idx in range(pack.num_views):
+        rgb, mask, (y1, y2, x1, x2) = pack.get_crop(idx)
+        box = (x1, y1, x2, y2)
+        image = torch.from_numpy(np.asarray(rgb) / 255).float()
+        mask = torch.from_numpy(np.asarray(mask) / 255).float()
+        image = image * mask[:, :, None]
+        templates.append(image.permute(2, 0, 1))
+        masks.append(mask.unsqueeze(0))
+        boxes.append(box)
+        crop_boxes.append((0, 0, box[2] - box[0], box[3] - box[1]))
+
+    boxes = torch.tensor(np.array(boxes))
+    crop_boxes = torch.tensor(np.array(crop_boxes))
+    proposal_processor = CropResizePad(image_size)
+    templates = proposal_processor(images=templates, boxes=crop_boxes).to(device)
+    masks_cropped = proposal_processor(images=masks, boxes=crop_boxes).to(device)
+    return templates, masks_cropped, boxes
@@ -74,19 +74,38 @@ def AABB_to_OBB(AABB):
     corners = AABB.reshape(-1)[corner_index]
     return corners
 
-def depth_image_to_pointcloud_translate_torch(depth, scale, K):
-    u = torch.arange(0, depth.shape[2])
-    v = torch.arange(0, depth.shape[1])
+# per-pixel ray grids K^-1 [u, v, 1], keyed by (K, image size, device)
+_RAY_GRID_CACHE = {}
+_RAY_GRID_CACHE_SIZE = 8
+
+
+def get_pixel_ray_grid_torch(K, im_H, im_W, device):
+    K_key = tuple(float(v) for v in torch.as_tensor(K).reshape(-1).tolist())
+    key = (K_key, int(im_H), int(im_W), str(device))
+    rays = _RAY_GRID_CACHE.get(key)
+    if rays is None:
+        K64 = torch.tensor(K_key, dtype=torch.float64).reshape(3, 3)
+        v, u = torch.meshgrid(
+            torch.arange(im_H, dtype=torch.float64),
+            torch.arange(im_W, dtype=torch.float64),
+            indexing="ij",
+        )
+        pixels = torch.stack([u, v, torch.ones_like(u)], dim=-1)
+        rays = (pixels @ torch.linalg.inv(K64).T).to(device=device, dtype=torch.float32)
+        if len(_RAY_GRID_CACHE) >= _RAY_GRID_CACHE_SIZE:
+            _RAY_GRID_CACHE.pop(next(iter(_RAY_GRID_CACHE)))
+        _RAY_GRID_CACHE[key] = rays
+    return rays  # H x W x 3
 
-    u, v = torch.meshgrid(u, v, indexing="xy")
-    u = u.to(depth.device)
-    v = v.to(depth.device)
+
+def depth_image_to_pointcloud_translate_torch(depth, scale, K):
+    rays = get_pixel_ray_grid_torch(K, depth.shape[1], depth.shape[2], depth.device)
 
     # depth metric is mm, depth_scale metric is m
     # K metric is m
     Z = depth * scale / 1000
-    X = (u - K[0, 2]) * Z / K[0, 0]
-    Y = (v - K[1, 2]) * Z / K[1, 1]
+    X = rays[..., 0] * Z
+    Y = rays[..., 1] * Z
 
     valid = Z > 0
 
@@ -105,6 +124,30 @@ def depth_image_to_pointcloud_translate_torch(depth, scale, K):
     return translate
 
 
+def cropped_depth_to_pointcloud_translate_torch(depth, scale, K, masks, offsets):
+    """
+    Same result as depth_image_to_pointcloud_translate_torch(masks * depth) with full masks,
+    computed only over each mask crop window.
+    depth: H x W, masks: list of h_i x w_i crops, offsets: N x 2 (x, y) of the crops in the image
+    """
+    if len(masks) == 0:
+        return torch.zeros(0, 3, device=depth.device)
+    rays = get_pixel_ray_grid_torch(K, depth.shape[0], depth.shape[1], depth.device)
+
+    translate = []
+    for mask, (x, y) in zip(masks, offsets.tolist()):
+        h, w = mask.shape
+        Z = mask * depth[y : y + h, x : x + w] * scale / 1000
+        valid = Z > 0
+        Z = Z * valid
+        X = rays[y : y + h, x : x + w, 0] * Z
+        Y = rays[y : y + h, x : x + w, 1] * Z
+        valid_num = torch.count_nonzero(valid) + 1e-8
+        translate.append(torch.stack((X.sum(), Y.sum(), Z.sum())) / valid_num)
+
+    return torch.stack(translate)
+
+
 if __name__ == "__main__":
     mesh_path = (
         "/media/nguyen/Data/dataset/ShapeNet/ShapeNetCore.v2/"
@@ -2,8 +2,9 @@
 """
 API 엔드포인트 모듈
 """
+from .metrics import router as metrics_router
 from .objects import router as objects_router
 from .servers import router as servers_router
 from .workflow import router as workflow_router
 
-__all__ = ["objects_router", "servers_router", "workflow_router"]
\ No newline at end of file
+__all__ = ["metrics_router", "objects_router", "servers_router", "workflow_router"]
\ No newline at end of file
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Prometheus 메트릭 엔드포인트 (/metrics)
+"""
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from Main_Server.services.workflow_service import get_workflow_service
+from Main_Server.services.job_queue import get_job_queue
+from Main_Server.utils.metrics import METRICS
+from sam6d_common.metrics import CONTENT_TYPE
+
+router = APIRouter(tags=["metrics"])
+workflow_service = get_workflow_service()
+job_queue = get_job_queue()
+
+
+def _result_cache_hit_ratio():
+    stats = workflow_service.result_cache.get_stats()
+    return {(f"result_{kind}",): stats[kind]["hit_rate"] for kind in ("ism", "pem")}
+
+
+def _replica_outstanding():
+    return {
+        (f"replica:{name}:{r['url']}",): r["outstanding"]
+        for name, pool in workflow_service.replica_pools.items()
+        for r in pool.get_stats()["replicas"]
+    }
+
+
+def _rss_prefetch_buffered():
+    return {(f"rss_prefetch:{s['source_id']}",): s["buffered"] for s in workflow_service.rss_prefetch.status()}
+
+
+# 스크랩 시점에 계산되는 게이지 (서비스 객체는 호출 시마다 다시 읽음)
+METRICS.cache_hit_ratio.set_function(_result_cache_hit_ratio)
+METRICS.cache_entries.set_function(lambda: workflow_service.result_cache.get_stats()["entries"], cache="result")
+METRICS.queue_depth.set_function(lambda: job_queue.depth, queue="jobs")
+METRICS.queue_depth.set_function(lambda: workflow_service.artifact_writer.get_stats()["pending_items"], queue="artifacts")
+METRICS.queue_depth.set_function(_rss_prefetch_buffered)
+METRICS.queue_depth.set_function(_replica_outstanding)
+METRICS.queue_depth.set_function(
+    lambda: {(f"admission:{name}",): stats["queued"] for name, stats in workflow_service.admission.get_stats()["services"].items()}
+)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 텍스트 형식 메트릭 (단계별 지연 히스토그램, 캐시 적중률, 큐 깊이, 메모리)"""
+    return Response(content=METRICS.render(), media_type=CONTENT_TYPE)
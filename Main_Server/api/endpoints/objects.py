@@ -127,11 +127,8 @@ async def get_object_detail(class_name: str, object_name: str):
 
 @router.post("/scan", response_model=dict)
 async def scan_objects(request: ScanRequest):
-    """객체 디렉토리 재스캔"""
-    # 강제 스캔은 현재 구현에서 항상 실시간 스캔을 하므로
-    # 별도의 캐시 갱신이 필요 없음
-    
-    stats = scanner.get_statistics()
+    """객체 디렉토리 재스캔 (force면 카탈로그 인덱스 전체 재구축, 아니면 변경분만 갱신)"""
+    stats = scanner.rebuild() if request.force else scanner.get_statistics()
     
     return {
         "success": True,
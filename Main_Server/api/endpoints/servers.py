@@ -3,7 +3,7 @@
 서버 상태 모니터링 API 엔드포인트
 """
 from fastapi import APIRouter, HTTPException
-from typing import Dict
+from typing import Any, Dict
 
 from ..models import HealthResponse, ServerStatus, ServersStatusResponse
 import sys
@@ -61,7 +61,7 @@ async def get_server_status(server_name: str):
         )
     
     url = monitor.SERVERS[server_name]
-    status = await monitor.check_server_health(server_name, url)
+    status = monitor.report_health(server_name, await monitor.check_server_health(server_name, url))
     
     return ServerStatus(
         url=status["url"],
@@ -72,3 +72,7 @@ async def get_server_status(server_name: str):
     )
 
 
+@router.get("/replicas")
+async def get_replica_status() -> Dict[str, Any]:
+    """ISM / PEM replica 풀 상태 (replica별 처리 중 요청 수, 담당 객체 수, 라우팅 통계)"""
+    return {name: pool.get_stats() for name, pool in monitor.pools.items()}
@@ -2,26 +2,47 @@
 """
 워크플로우 오케스트레이션 API 엔드포인트
 """
+import asyncio
+import json
 import logging
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Dict, Optional
 
 from ..models import (
     HealthResponse, RenderTemplatesRequest, FullPipelineRequest, WorkflowResponse,
     RenderMissingTemplatesRequest, RenderAllTemplatesRequest, RenderSingleTemplateRequest,
-    RssFullPipelineRequest
+    RssFullPipelineRequest, RssPrefetchStartRequest, RssPrefetchStopRequest, JobStatus
 )
 import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
 from Main_Server.services.workflow_service import get_workflow_service
 from Main_Server.services.scanner import get_scanner
+from Main_Server.services.rss_prefetch import ContinuousConfig
+from Main_Server.services.job_queue import get_job_queue, JobQueueFull, FINISHED_STATES
+from Main_Server.services.admission import AdmissionRejected
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/workflow", tags=["workflow"])
 workflow_service = get_workflow_service()
 scanner = get_scanner()
+job_queue = get_job_queue()
+
+
+def _resolve_output_mode(output_mode: Optional[str], save_outputs: Optional[bool]) -> str:
+    """output_mode / save_outputs 요청 값을 출력 전략 (full/results_only/none)으로 변환"""
+    mode = output_mode
+    if mode is None:
+        if save_outputs is None:
+            mode = "full"
+        else:
+            mode = "full" if save_outputs else "none"
+    mode = mode.lower()
+    if mode not in {"full", "results_only", "none"}:
+        mode = "full"
+    return mode
 
 
 @router.get("/health", response_model=HealthResponse)
@@ -120,7 +141,7 @@ async def render_missing_templates(request: RenderMissingTemplatesRequest):
 
 @router.post("/render-templates-all", response_model=WorkflowResponse)
 async def render_all_templates(request: RenderAllTemplatesRequest):
-    """모든 객체 템플릿 생성 (강제 재생성 가능)
+    """모든 객체 템플릿 생성 (메쉬 내용이 바뀐 객체만 재렌더링)
     
     Args:
         request: 요청 데이터
@@ -137,15 +158,14 @@ async def render_all_templates(request: RenderAllTemplatesRequest):
         else:
             classes = scanner.scan_all_classes()
         
-        # 모든 객체 수집
+        # 모든 객체 수집 (템플릿이 있어도 메쉬가 바뀌었는지는 매니페스트로 서비스에서 판단)
         objects_to_render = []
         for class_info in classes:
             for obj in class_info["objects"]:
-                if force or not obj["has_template"]:
-                    objects_to_render.append({
-                        "class_name": class_info["name"],
-                        "object_name": obj["name"]
-                    })
+                objects_to_render.append({
+                    "class_name": class_info["name"],
+                    "object_name": obj["name"]
+                })
         
         if not objects_to_render:
             return WorkflowResponse(
@@ -167,13 +187,18 @@ async def render_all_templates(request: RenderAllTemplatesRequest):
         # 결과 집계
         successful = sum(1 for r in results if r["success"])
         total = len(results)
+        rendered = sum(r.get("rendered", 0) for r in results)
+        deduplicated = sum(r.get("deduplicated", 0) for r in results)
         
         return WorkflowResponse(
             success=successful > 0,
-            message=f"Generated templates for {successful}/{total} objects",
+            message=f"Generated templates for {successful}/{total} objects ({rendered} rendered, {deduplicated} deduplicated)",
             results={
                 "total": total,
                 "successful": successful,
+                "rendered": rendered,
+                "deduplicated": deduplicated,
+                "skipped": sum(r.get("skipped", 0) for r in results),
                 "force_regenerate": force,
                 "objects": objects_to_render
             }
@@ -213,15 +238,7 @@ async def execute_full_pipeline(request: FullPipelineRequest):
     """전체 파이프라인 실행 (Render → ISM → PEM)"""
     try:
         logger.info(f"파이프라인 실행 요청: {request.class_name}/{request.object_name}")
-        mode = request.output_mode
-        if mode is None:
-            if request.save_outputs is None:
-                mode = "full"
-            else:
-                mode = "full" if request.save_outputs else "none"
-        mode = mode.lower()
-        if mode not in {"full", "results_only", "none"}:
-            mode = "full"
+        mode = _resolve_output_mode(request.output_mode, request.save_outputs)
 
         result = await workflow_service.execute_full_pipeline(
             class_name=request.class_name,
@@ -233,12 +250,15 @@ async def execute_full_pipeline(request: FullPipelineRequest):
             frame_guess=request.frame_guess or False,
             request_tag="api-full-pipeline",
             output_mode=mode,
+            use_result_cache=request.use_result_cache,
         )
         summary = {
             "pose_results": result.get("pose_results", []),
             "num_poses": result.get("num_poses", 0),
             "output_dir": result.get("output_dir"),
             "request_tag": result.get("request_tag"),
+            "cache": result.get("cache"),
+            "timing": result.get("timing"),
         }
         if not result.get("success"):
             summary["error"] = result.get("error")
@@ -251,6 +271,9 @@ async def execute_full_pipeline(request: FullPipelineRequest):
             message="Pipeline execution completed" if result.get("success") else "Pipeline execution failed",
             results=summary
         )
+    except AdmissionRejected as e:
+        logger.warning(f"파이프라인 거절 (admission control): {e}")
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers=e.headers)
     except Exception as e:
         logger.error(f"파이프라인 실행 중 에러: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -260,15 +283,7 @@ async def execute_full_pipeline(request: FullPipelineRequest):
 async def execute_full_pipeline_from_rss(request: RssFullPipelineRequest):
     """RSS 서버에서 직접 프레임을 받아 전체 파이프라인 실행"""
     try:
-        mode = request.output_mode
-        if mode is None:
-            if request.save_outputs is None:
-                mode = "full"
-            else:
-                mode = "full" if request.save_outputs else "none"
-        mode = mode.lower()
-        if mode not in {"full", "results_only", "none"}:
-            mode = "full"
+        mode = _resolve_output_mode(request.output_mode, request.save_outputs)
 
         result = await workflow_service.execute_full_pipeline_from_rss(
             class_name=request.class_name,
@@ -281,12 +296,17 @@ async def execute_full_pipeline_from_rss(request: RssFullPipelineRequest):
             frame_guess=request.frame_guess or False,
             request_tag="api-full-pipeline-from-rss",
             output_mode=mode,
+            use_prefetched=request.use_prefetched,
+            max_frame_age_sec=request.max_frame_age_sec,
+            use_result_cache=request.use_result_cache,
         )
         summary = {
             "pose_results": result.get("pose_results", []),
             "num_poses": result.get("num_poses", 0),
             "output_dir": result.get("output_dir"),
             "request_tag": result.get("request_tag"),
+            "cache": result.get("cache"),
+            "timing": result.get("timing"),
         }
         if not result.get("success"):
             summary["error"] = result.get("error")
@@ -295,6 +315,229 @@ async def execute_full_pipeline_from_rss(request: RssFullPipelineRequest):
             message="Pipeline execution completed" if result.get("success") else "Pipeline execution failed",
             results=summary,
         )
+    except AdmissionRejected as e:
+        logger.warning(f"파이프라인 거절 (admission control): {e}")
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers=e.headers)
     except Exception as e:
         logger.error(f"RSS 파이프라인 실행 중 에러: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/rss-prefetch/start", response_model=WorkflowResponse)
+async def start_rss_prefetch(request: RssPrefetchStartRequest):
+    """RSS prefetch 루프 시작 (class_name / object_name 지정 시 연속 파이프라인 모드)"""
+    if bool(request.class_name) != bool(request.object_name):
+        raise HTTPException(status_code=400, detail="class_name and object_name must be given together")
+    base_url = workflow_service._rss_build_base(request.host, request.port, request.base)
+    continuous = None
+    if request.class_name:
+        continuous = ContinuousConfig(
+            class_name=request.class_name,
+            object_name=request.object_name,
+            every_n=request.every_n,
+            output_mode=request.output_mode,
+            frame_guess=request.frame_guess,
+        )
+    prefetcher = workflow_service.rss_prefetch.start(
+        base_url,
+        align_color=request.align_color,
+        buffer_size=request.buffer_size,
+        interval_sec=request.interval_sec,
+        continuous=continuous,
+    )
+    return WorkflowResponse(
+        success=True,
+        message=f"RSS prefetch started: {prefetcher.source_id}",
+        results=prefetcher.status(),
+    )
+
+
+@router.post("/rss-prefetch/stop", response_model=WorkflowResponse)
+async def stop_rss_prefetch(request: RssPrefetchStopRequest):
+    """RSS prefetch 루프 중지"""
+    source_id = request.source_id
+    if source_id is None:
+        base_url = workflow_service._rss_build_base(request.host, request.port, request.base)
+        source_id = workflow_service.rss_prefetch.source_id(base_url, request.align_color)
+    if not await workflow_service.rss_prefetch.stop(source_id):
+        raise HTTPException(status_code=404, detail=f"RSS prefetch not running: {source_id}")
+    return WorkflowResponse(success=True, message=f"RSS prefetch stopped: {source_id}")
+
+
+@router.get("/rss-prefetch")
+async def get_rss_prefetch_status():
+    """동작 중인 RSS prefetch 루프 상태"""
+    return {"sources": workflow_service.rss_prefetch.status()}
+
+
+@router.get("/rss-prefetch/events")
+async def stream_rss_prefetch_events(source_id: str = Query(..., description="prefetch 소스 ID")):
+    """연속 파이프라인 결과 스트림 (Server-Sent Events)"""
+    prefetcher = workflow_service.rss_prefetch.get(source_id)
+    if prefetcher is None:
+        raise HTTPException(status_code=404, detail=f"RSS prefetch not running: {source_id}")
+
+    async def event_stream():
+        queue = prefetcher.subscribe()
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15.0)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"data: {json.dumps(event, default=str)}\n\n"
+        finally:
+            prefetcher.unsubscribe(queue)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@router.get("/result-cache")
+async def get_result_cache_stats():
+    """ISM / PEM 결과 캐시 통계 (적중률, 항목 수, 메모리 사용량)"""
+    return workflow_service.result_cache.get_stats()
+
+
+@router.delete("/result-cache")
+async def clear_result_cache():
+    """ISM / PEM 결과 캐시 비우기"""
+    cleared = workflow_service.result_cache.clear()
+    return {"success": True, "cleared": cleared}
+
+
+@router.get("/server-status")
+async def get_server_status():
+    """ISM / PEM 호출 상태 (동시 제한 / 처리 중 / 대기 큐 / 거절 수, replica별 상태, 작업 큐 깊이)"""
+    return {
+        "admission": workflow_service.admission.get_stats(),
+        "replicas": {name: pool.get_stats() for name, pool in workflow_service.replica_pools.items()},
+        "job_queue": {"depth": job_queue.depth},
+    }
+
+
+# ============= 비동기 작업 API =============
+
+def _submit_job(job_type: str, priority: str, run, params: Dict) -> JSONResponse:
+    """작업 큐에 등록하고 job_id 반환 (큐가 가득 차면 503 + Retry-After)"""
+    try:
+        job = job_queue.submit(job_type, run, priority=priority, params=params)
+    except JobQueueFull as e:
+        logger.warning(f"작업 거절 (load shedding): {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    logger.info(f"작업 등록: {job.job_id} ({job_type}, priority={priority}, depth={job_queue.depth})")
+    response = WorkflowResponse(
+        success=True,
+        job_id=job.job_id,
+        message="Job queued",
+        results={"status_url": f"{router.prefix}/jobs/{job.job_id}", "queue_position": job_queue.queue_position(job.job_id)},
+    )
+    return JSONResponse(status_code=202, content=response.model_dump())
+
+
+@router.post("/jobs/full-pipeline", response_model=WorkflowResponse, status_code=202)
+async def submit_full_pipeline_job(request: FullPipelineRequest):
+    """전체 파이프라인을 작업 큐에 등록 (job_id 즉시 반환)"""
+    mode = _resolve_output_mode(request.output_mode, request.save_outputs)
+
+    async def run(progress):
+        return await workflow_service.execute_full_pipeline(
+            class_name=request.class_name,
+            object_name=request.object_name,
+            rgb_image=request.rgb_image,
+            depth_image=request.depth_image,
+            cam_params=request.cam_params,
+            output_dir=request.output_dir,
+            frame_guess=request.frame_guess or False,
+            request_tag="api-job-full-pipeline",
+            output_mode=mode,
+            progress=progress,
+            use_result_cache=request.use_result_cache,
+        )
+
+    params = {"class_name": request.class_name, "object_name": request.object_name, "output_mode": mode}
+    return _submit_job("full_pipeline", request.priority, run, params)
+
+
+@router.post("/jobs/full-pipeline-from-rss", response_model=WorkflowResponse, status_code=202)
+async def submit_full_pipeline_from_rss_job(request: RssFullPipelineRequest):
+    """RSS 전체 파이프라인을 작업 큐에 등록 (프레임은 작업 실행 시점에 수집)"""
+    mode = _resolve_output_mode(request.output_mode, request.save_outputs)
+
+    async def run(progress):
+        return await workflow_service.execute_full_pipeline_from_rss(
+            class_name=request.class_name,
+            object_name=request.object_name,
+            base=request.base,
+            host=request.host,
+            port=request.port,
+            align_color=request.align_color,
+            output_dir=request.output_dir,
+            frame_guess=request.frame_guess or False,
+            request_tag="api-job-full-pipeline-from-rss",
+            output_mode=mode,
+            use_prefetched=request.use_prefetched,
+            max_frame_age_sec=request.max_frame_age_sec,
+            progress=progress,
+            use_result_cache=request.use_result_cache,
+        )
+
+    params = {"class_name": request.class_name, "object_name": request.object_name, "output_mode": mode}
+    return _submit_job("full_pipeline_from_rss", request.priority, run, params)
+
+
+def _job_status(job) -> JobStatus:
+    return JobStatus(**job.to_dict(), queue_position=job_queue.queue_position(job.job_id))
+
+
+@router.get("/jobs")
+async def list_jobs(
+    status: Optional[str] = Query(None, description="상태 필터 (pending/running/completed/failed/cancelled)"),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """작업 목록 (최근 순) + 큐 상태"""
+    return {
+        "queue": job_queue.status(),
+        "jobs": [_job_status(job).model_dump(exclude={"result"}) for job in job_queue.list_jobs(status, limit)],
+    }
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str):
+    """작업 상태 / 단계별 진행 상황 / 결과"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return _job_status(job)
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """작업 상태 변경 스트림 (Server-Sent Events, 작업이 끝나면 종료)"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+
+    async def event_stream():
+        while True:
+            changed = job.changed
+            yield f"data: {_job_status(job).model_dump_json()}\n\n"
+            if job.status in FINISHED_STATES:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=15.0)
+            except asyncio.TimeoutError:
+                pass
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@router.delete("/jobs/{job_id}", response_model=WorkflowResponse)
+async def cancel_job(job_id: str):
+    """대기 / 실행 중인 작업 취소"""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    if not job_queue.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job already finished: {job.status}")
+    return WorkflowResponse(success=True, job_id=job_id, message="Job cancelled")
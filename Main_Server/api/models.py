@@ -94,7 +94,7 @@ class RenderTemplatesRequest(BaseModel):
     """템플릿 생성 요청"""
     class_name: str = Field(..., description="클래스 이름")
     object_names: List[str] = Field(..., description="객체 이름 목록")
-    force_regenerate: bool = Field(False, description="강제 재생성 여부")
+    force_regenerate: bool = Field(False, description="강제 재생성 여부 (매니페스트 없는 템플릿도 재생성, 메쉬 해시가 같은 템플릿은 스킵)")
 
 
 class RenderMissingTemplatesRequest(BaseModel):
@@ -105,7 +105,7 @@ class RenderMissingTemplatesRequest(BaseModel):
 class RenderAllTemplatesRequest(BaseModel):
     """모든 객체 템플릿 생성 요청"""
     class_name: Optional[str] = Field(None, description="클래스 이름 (None이면 모든 클래스)")
-    force: bool = Field(False, description="강제 재생성 여부")
+    force: bool = Field(False, description="강제 재생성 여부 (매니페스트 없는 템플릿도 재생성, 메쉬 해시가 같은 템플릿은 스킵)")
 
 
 class RenderSingleTemplateRequest(BaseModel):
@@ -130,6 +130,12 @@ class FullPipelineRequest(BaseModel):
         None,
         description="출력 전략 (full/results_only/none). 지정하지 않으면 save_outputs 값 기준으로 결정",
     )
+    use_result_cache: bool = Field(True, description="같은 프레임 / 객체의 ISM / PEM 결과 캐시 재사용")
+    priority: str = Field(
+        "interactive",
+        pattern="^(interactive|batch)$",
+        description="작업 큐 우선순위 (interactive/batch), /jobs 제출 시에만 사용",
+    )
 
 
 class WorkflowResponse(BaseModel):
@@ -155,16 +161,57 @@ class RssFullPipelineRequest(BaseModel):
         None,
         description="출력 전략 (full/results_only/none). 지정하지 않으면 save_outputs 값 기준으로 결정",
     )
+    use_prefetched: bool = Field(True, description="prefetch 루프가 동작 중이면 버퍼의 최신 프레임 사용")
+    max_frame_age_sec: Optional[float] = Field(
+        None,
+        description="prefetch 프레임 최대 허용 나이 (초), 지정하지 않으면 MAIN_SERVER_RSS_PREFETCH_MAX_AGE_SEC",
+    )
+    use_result_cache: bool = Field(True, description="같은 프레임 / 객체의 ISM / PEM 결과 캐시 재사용")
+    priority: str = Field(
+        "interactive",
+        pattern="^(interactive|batch)$",
+        description="작업 큐 우선순위 (interactive/batch), /jobs 제출 시에만 사용",
+    )
+
+
+class RssPrefetchStartRequest(BaseModel):
+    """RSS prefetch 루프 시작 요청 (class_name / object_name 지정 시 연속 파이프라인 모드)"""
+    base: Optional[str] = Field(None, description="예: http://192.168.0.197:51000")
+    host: Optional[str] = Field(None, description="RSS 서버 호스트")
+    port: Optional[int] = Field(None, description="RSS 서버 포트")
+    align_color: bool = Field(False, description="컬러 프레임 기준으로 정렬")
+    buffer_size: int = Field(4, ge=1, description="보관할 최신 프레임 수")
+    interval_sec: float = Field(0.1, ge=0.0, description="프레임 수집 간격 (초)")
+    class_name: Optional[str] = Field(None, description="연속 모드 클래스 이름")
+    object_name: Optional[str] = Field(None, description="연속 모드 객체 이름")
+    every_n: int = Field(1, ge=1, description="연속 모드에서 N번째 프레임마다 파이프라인 실행")
+    output_mode: str = Field("none", description="연속 모드 출력 전략 (full/results_only/none)")
+    frame_guess: bool = Field(False, description="카메라 프레임 유추 보정 활성화")
+
+
+class RssPrefetchStopRequest(BaseModel):
+    """RSS prefetch 루프 중지 요청 (source_id 또는 base/host/port + align_color)"""
+    source_id: Optional[str] = Field(None, description="prefetch 소스 ID")
+    base: Optional[str] = Field(None, description="예: http://192.168.0.197:51000")
+    host: Optional[str] = Field(None, description="RSS 서버 호스트")
+    port: Optional[int] = Field(None, description="RSS 서버 포트")
+    align_color: bool = Field(False, description="컬러 프레임 기준으로 정렬")
 
 
 class JobStatus(BaseModel):
     """작업 상태"""
     job_id: str = Field(..., description="작업 ID")
     job_type: str = Field(..., description="작업 타입")
-    status: str = Field(..., description="상태 (pending, running, completed, failed)")
+    status: str = Field(..., description="상태 (pending, running, completed, failed, cancelled)")
     progress: int = Field(..., description="진행률 (%)")
+    priority: Optional[str] = Field(None, description="우선순위 (interactive/batch)")
+    stage: Optional[str] = Field(None, description="현재 단계 (queued/capture/render/ism/pem/finalize)")
+    stages: List[Dict[str, Any]] = Field(default_factory=list, description="단계별 시작 시간 / 소요 시간")
+    queue_position: Optional[int] = Field(None, description="대기 순서 (대기 중일 때만)")
+    submitted_at: Optional[str] = Field(None, description="등록 시간")
     started_at: Optional[str] = Field(None, description="시작 시간")
     completed_at: Optional[str] = Field(None, description="완료 시간")
     error_message: Optional[str] = Field(None, description="에러 메시지")
+    result: Optional[Dict[str, Any]] = Field(None, description="결과 (완료 시)")
 
 
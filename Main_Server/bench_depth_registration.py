@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Depth → Color 정합 프레임당 비용 벤치마크 (기존 픽셀 루프 vs 벡터화 z-buffer vs torch)
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from Main_Server.utils.depth_registration import align_depth_to_color, get_depth_registration
+from test_depth_registration import legacy_align, sample_frame
+
+
+def timeit(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main(repeat=10):
+    try:
+        import torch
+    except ImportError:
+        torch = None
+
+    for W, H in [(640, 480), (1280, 720)]:
+        depth, K_d, K_c, T = sample_frame(W, H)
+        legacy_ms = timeit(lambda: legacy_align(depth, K_d, K_c, T, W, H), max(1, repeat // 5))
+        numpy_ms = timeit(lambda: align_depth_to_color(depth, K_d, K_c, T, (W, H)), repeat)
+        line = f"{W}x{H}: legacy loop {legacy_ms:8.1f} ms | numpy z-buffer {numpy_ms:6.1f} ms (x{legacy_ms / numpy_ms:.0f})"
+
+        if torch is not None:
+            registration = get_depth_registration(K_d, K_c, T, (W, H))
+            devices = ["cpu"] + (["cuda"] if torch.cuda.is_available() else [])
+            for device in devices:
+                depth_t = torch.from_numpy(depth.astype("int32")).to(device)
+
+                def run():
+                    registration.align_torch(depth_t)
+                    if device == "cuda":
+                        torch.cuda.synchronize()
+
+                line += f" | torch[{device}] {timeit(run, repeat):6.1f} ms"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
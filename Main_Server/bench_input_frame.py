@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+요청당 입력 이미지 처리 CPU 비용 벤치마크 (기존: 크기 추정용 전체 디코딩 + ISM / PEM 요청마다 JSON 직렬화
+vs InputFrame: 헤더에서 크기 + 이미지 JSON 한 번만 직렬화)
+"""
+import base64
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import cv2
+import numpy as np
+
+from Main_Server.utils.input_frame import InputFrame
+from test_input_frame import sample_frame
+
+CAM = {"cam_K": [600.0, 0.0, 640.0, 0.0, 600.0, 360.0, 0.0, 0.0, 1.0], "depth_scale": 1.0}
+ISM_FIELDS = {"cam_params": CAM, "template_dir": "/workspace/Estimation_Server/static/templates/ycb/obj_000001",
+              "cad_path": "/workspace/Estimation_Server/static/meshes/ycb/obj_000001.ply"}
+PEM_FIELDS = dict(ISM_FIELDS, seg_data=[{"bbox": [10, 20, 200, 240], "score": 0.9,
+                                         "segmentation": {"counts": list(range(400)), "size": [720, 1280]}}] * 10,
+                  det_score_thresh=0.2)
+
+
+def legacy_request(rgb_b64, depth_b64):
+    """기존 경로: cv2.imdecode로 크기 추정 + 요청마다 이미지를 포함한 dict를 json으로 직렬화 (httpx json=)"""
+    img = cv2.imdecode(np.frombuffer(base64.b64decode(rgb_b64), dtype=np.uint8), cv2.IMREAD_COLOR)
+    shape = img.shape[:2]
+    bodies = [
+        json.dumps({"rgb_image": rgb_b64, "depth_image": depth_b64, **fields},
+                   ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+        for fields in (ISM_FIELDS, PEM_FIELDS)
+    ]
+    return shape, bodies
+
+
+def frame_request(rgb_b64, depth_b64):
+    frame = InputFrame(rgb_b64, depth_b64)
+    shape = frame.shape
+    bodies = [frame.request_body(fields) for fields in (ISM_FIELDS, PEM_FIELDS)]
+    return shape, bodies
+
+
+def cpu_ms(fn, repeat):
+    fn()
+    start = time.process_time()
+    for _ in range(repeat):
+        fn()
+    return (time.process_time() - start) * 1000 / repeat
+
+
+def main(repeat=20):
+    for W, H in [(640, 480), (1280, 720), (1920, 1080)]:
+        rgb_b64, depth_b64 = sample_frame(W, H)
+        legacy, new = legacy_request(rgb_b64, depth_b64), frame_request(rgb_b64, depth_b64)
+        assert legacy[0] == new[0] and [json.loads(b) for b in legacy[1]] == [json.loads(b) for b in new[1]]
+
+        legacy_ms = cpu_ms(lambda: legacy_request(rgb_b64, depth_b64), repeat)
+        frame_ms = cpu_ms(lambda: frame_request(rgb_b64, depth_b64), repeat)
+        payload_mb = (len(rgb_b64) + len(depth_b64)) / 1e6
+        print(f"{W}x{H} ({payload_mb:.1f} MB base64): legacy {legacy_ms:6.1f} ms | InputFrame {frame_ms:5.1f} ms "
+              f"| saved {legacy_ms - frame_ms:5.1f} ms CPU / request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Main 서버 closed-loop 부하 테스트 (stub ISM / PEM / Render 서버, GPU 불필요)
+
+동시성 단계마다 N개의 가상 클라이언트가 응답을 받으면 바로 다음 요청을 보내며 (closed loop)
+섞인 트래픽을 보내고, 단계별 p50 / p95 / p99 지연, 처리량, 이벤트 루프 지연, 메모리를 보고한다.
+
+트래픽 종류 (--mix로 비율 지정):
+  pipeline  POST /workflow/full-pipeline (결과 캐시 미사용 → 매번 ISM / PEM 호출)
+  cached    POST /workflow/full-pipeline (같은 프레임 / 객체 조합 몇 개 반복 → 결과 캐시 적중)
+  job       POST /workflow/jobs/full-pipeline 후 GET /workflow/jobs/{id}로 완료까지 polling
+  status    GET /workflow/server-status
+
+기본은 같은 프로세스 실행: Main 서버 라우터 (WorkflowService 싱글톤 포함)를 띄우고
+ISM / PEM / Render 호출은 bench_stubs.py의 stub 앱으로 보낸다 (임시 카탈로그 사용).
+이벤트 루프 지연은 Main 서버와 같은 루프에서 측정되므로 WorkflowService가 루프를 막는
+구간 (이미지 디코딩, 큰 JSON 처리 등)이 그대로 드러난다.
+
+--main-url을 주면 실행 중인 Main 서버에 부하를 준다 (stub은 bench_stubs.py로 따로 실행,
+카탈로그는 서버의 것을 사용). 이때 이벤트 루프 지연은 측정하지 않고, 메모리는 서버 /metrics에서 읽는다.
+
+    python Main_Server/bench_load.py --levels 1,2,4,8 --requests 40
+    python Main_Server/bench_load.py --mix pipeline=1 --json load.json --max-p95-ms 1500
+"""
+import argparse
+import asyncio
+import base64
+import contextlib
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import cv2
+import httpx
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_stubs import add_profile_args, make_stub_apps, profiles_from_args, write_stub_templates
+
+CAM = {"cam_K": [600.0, 0.0, 320.0, 0.0, 600.0, 240.0, 0.0, 0.0, 1.0], "depth_scale": 1.0}
+WORKFLOW = "/api/v1/workflow"
+DEFAULT_MIX = "pipeline=0.5,cached=0.25,job=0.15,status=0.1"
+MEMORY_METRIC = "main_process_resident_memory_bytes"
+
+
+def parse_mix(value: str) -> Dict[str, float]:
+    """"pipeline=0.5,status=0.1" → 비율 dict"""
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in ("pipeline", "cached", "job", "status"):
+            raise ValueError(f"unknown traffic type: {name}")
+        mix[name] = float(weight or 1.0)
+    if sum(mix.values()) <= 0:
+        raise ValueError("traffic mix must have a positive weight")
+    return mix
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def latency_summary(values: List[float]) -> Dict[str, Optional[float]]:
+    """초 단위 지연 목록 → ms 단위 p50 / p95 / p99 / max"""
+    def ms(v):
+        return round(v * 1000.0, 1) if v is not None else None
+    return {"p50_ms": ms(percentile(values, 50)), "p95_ms": ms(percentile(values, 95)),
+            "p99_ms": ms(percentile(values, 99)), "max_ms": ms(max(values) if values else None)}
+
+
+def make_frames(count: int, image_size, seed: int = 0) -> List[Dict[str, str]]:
+    """PNG base64 RGB / Depth 프레임 (노이즈 이미지라 실제 카메라 프레임에 가까운 크기)"""
+    h, w = image_size
+    rng = np.random.default_rng(seed)
+    frames = []
+    for _ in range(count):
+        rgb = rng.integers(0, 256, size=(h, w, 3), dtype=np.uint8)
+        depth = rng.integers(300, 1500, size=(h, w), dtype=np.uint16)
+        frames.append({
+            "rgb_image": base64.b64encode(cv2.imencode(".png", rgb)[1].tobytes()).decode("ascii"),
+            "depth_image": base64.b64encode(cv2.imencode(".png", depth)[1].tobytes()).decode("ascii"),
+        })
+    return frames
+
+
+class LoopLagMonitor:
+    """interval마다 깨어나서 예정보다 늦게 깨어난 시간 (이벤트 루프가 막힌 시간)을 기록"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def start(self):
+        self.samples = []
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> Dict[str, Optional[float]]:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        summary = latency_summary(self.samples)
+        return {"lag_p50_ms": summary["p50_ms"], "lag_p99_ms": summary["p99_ms"], "lag_max_ms": summary["max_ms"]}
+
+
+class LoadDriver:
+    """closed-loop 가상 클라이언트 + 트래픽 종류별 요청"""
+
+    def __init__(self, client: httpx.AsyncClient, class_name: str, objects: List[str], frames, mix, args):
+        self.client = client
+        self.class_name = class_name
+        self.objects = objects
+        self.frames = frames
+        # cached 트래픽은 같은 (프레임, 객체) 조합 몇 개만 반복
+        self.cached_requests = [(frames[i % len(frames)], objects[i % len(objects)])
+                                for i in range(max(1, args.cached_frames))]
+        self.mix = mix
+        self.output_mode = args.output_mode
+        self.rng = random.Random(args.seed)
+
+    def _pipeline_body(self, frame, use_result_cache: bool, object_name: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "class_name": self.class_name,
+            "object_name": object_name or self.rng.choice(self.objects),
+            "cam_params": CAM,
+            "output_mode": self.output_mode,
+            "use_result_cache": use_result_cache,
+            **frame,
+        }
+
+    async def pipeline(self):
+        body = self._pipeline_body(self.rng.choice(self.frames), use_result_cache=False)
+        return await self.client.post(f"{WORKFLOW}/full-pipeline", json=body)
+
+    async def cached(self):
+        frame, object_name = self.rng.choice(self.cached_requests)
+        body = self._pipeline_body(frame, use_result_cache=True, object_name=object_name)
+        return await self.client.post(f"{WORKFLOW}/full-pipeline", json=body)
+
+    async def job(self):
+        body = self._pipeline_body(self.rng.choice(self.frames), use_result_cache=False)
+        response = await self.client.post(f"{WORKFLOW}/jobs/full-pipeline", json=body)
+        if response.status_code != 202:
+            return response
+        job_id = response.json()["job_id"]
+        while True:
+            await asyncio.sleep(0.02)
+            response = await self.client.get(f"{WORKFLOW}/jobs/{job_id}")
+            if response.status_code != 200 or response.json()["status"] in ("completed", "failed", "cancelled"):
+                return response
+
+    async def status(self):
+        return await self.client.get(f"{WORKFLOW}/server-status")
+
+    @staticmethod
+    def _succeeded(response: httpx.Response) -> bool:
+        if response.status_code >= 400:
+            return False
+        body = response.json()
+        if "status" in body and body.get("status") in ("failed", "cancelled"):
+            return False
+        return body.get("success", True) is not False
+
+    async def _client_loop(self, deadline: Optional[float], remaining: List[int], records: List[tuple]):
+        kinds, weights = zip(*self.mix.items())
+        while (deadline is None or time.perf_counter() < deadline) and remaining[0] > 0:
+            remaining[0] -= 1
+            kind = self.rng.choices(kinds, weights)[0]
+            start = time.perf_counter()
+            try:
+                response = await getattr(self, kind)()
+                status, ok = response.status_code, self._succeeded(response)
+            except httpx.HTTPError as e:
+                status, ok = type(e).__name__, False
+            records.append((kind, time.perf_counter() - start, status, ok))
+
+    async def run_level(self, concurrency: int, requests: int, duration: Optional[float],
+                        measure_lag: bool) -> Dict[str, Any]:
+        lag = LoopLagMonitor()
+        if measure_lag:
+            lag.start()
+        records: List[tuple] = []
+        remaining = [requests if requests > 0 else sys.maxsize]
+        deadline = time.perf_counter() + duration if duration else None
+        start = time.perf_counter()
+        await asyncio.gather(*(self._client_loop(deadline, remaining, records) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+        lag_summary = await lag.stop() if measure_lag else {"lag_p50_ms": None, "lag_p99_ms": None, "lag_max_ms": None}
+
+        by_kind = {}
+        for kind in self.mix:
+            latencies = [sec for k, sec, _, ok in records if k == kind and ok]
+            count = sum(1 for k, *_ in records if k == kind)
+            if count:
+                by_kind[kind] = {"count": count, "errors": count - len(latencies), **latency_summary(latencies)}
+        statuses: Dict[str, int] = {}
+        for _, _, status, ok in records:
+            if not ok:
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+        ok_latencies = [sec for _, sec, _, ok in records if ok]
+        return {
+            "concurrency": concurrency,
+            "requests": len(records),
+            "errors": len(records) - len(ok_latencies),
+            "error_statuses": statuses,
+            "elapsed_sec": round(elapsed, 3),
+            "throughput_rps": round(len(ok_latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+            **latency_summary(ok_latencies),
+            **lag_summary,
+            "by_kind": by_kind,
+        }
+
+
+async def scrape_memory(client: httpx.AsyncClient) -> Optional[float]:
+    """Main 서버 /metrics의 상주 메모리 (MB)"""
+    try:
+        response = await client.get("/metrics")
+        for line in response.text.splitlines():
+            if line.startswith(MEMORY_METRIC + " "):
+                return round(float(line.split()[1]) / 2**20, 1)
+    except (httpx.HTTPError, ValueError):
+        pass
+    return None
+
+
+def make_catalog(root: Path, class_name: str, objects: List[str], cold_objects: int):
+    """임시 카탈로그: 메시 + 템플릿 (앞의 cold_objects개는 템플릿 없이 → 첫 요청에서 Render stub 호출)"""
+    from Main_Server.utils.template_manifest import build_manifest, write_manifest
+
+    for i, name in enumerate(objects):
+        (root / "meshes" / class_name).mkdir(parents=True, exist_ok=True)
+        cad_path = root / "meshes" / class_name / f"{name}.ply"
+        cad_path.write_bytes(name.encode())
+        if i >= cold_objects:
+            template_dir = root / "templates" / class_name / name
+            write_stub_templates(template_dir)
+            write_manifest(template_dir, build_manifest(cad_path))
+
+
+@contextlib.contextmanager
+def in_process_main(args, stub_apps):
+    """같은 프로세스에 Main 서버 앱 구성 (ISM / PEM / Render 호출은 stub으로, 카탈로그는 임시 디렉토리)"""
+    from fastapi import FastAPI
+
+    from Main_Server.api.endpoints.metrics import router as metrics_router
+    from Main_Server.api.endpoints.workflow import router as workflow_router, workflow_service
+    from Main_Server.utils.tracing import TRACER
+    from sam6d_common.tracing import TracingMiddleware
+    from workflow_stubs import routed_http
+
+    # _to_container_path가 프로젝트 루트 아래 경로만 허용하므로 Main_Server 안에 생성
+    root = Path(tempfile.mkdtemp(prefix="bench_load_", dir=Path(__file__).resolve().parent))
+    objects = [f"obj_{i:02d}" for i in range(args.objects)]
+    make_catalog(root, args.class_name, objects, args.cold_objects)
+
+    app = FastAPI()
+    app.add_middleware(TracingMiddleware, tracer=TRACER)
+    app.include_router(workflow_router)
+    app.include_router(metrics_router)
+
+    paths = workflow_service.paths
+    try:
+        workflow_service.paths = dict(paths, meshes=root / "meshes", templates=root / "templates", output=root / "output")
+        with routed_http(stub_apps) as real_client:
+            client = real_client(transport=httpx.ASGITransport(app=app), base_url="http://main", timeout=600.0)
+            yield client, objects
+    finally:
+        workflow_service.paths = paths
+        shutil.rmtree(root, ignore_errors=True)
+
+
+async def run_benchmark(args, client: httpx.AsyncClient, objects: List[str], in_process: bool,
+                        stub_apps=None) -> Dict[str, Any]:
+    mix = parse_mix(args.mix)
+    h, w = (int(v) for v in args.image_size.lower().split("x"))
+    frames = make_frames(args.frames, (h, w), seed=args.seed)
+    driver = LoadDriver(client, args.class_name, objects, frames, mix, args)
+
+    levels = []
+    memory_start = await scrape_memory(client)
+    if args.warmup:
+        # 첫 요청의 렌더링 / import 비용이 첫 단계 결과에 섞이지 않게
+        await driver.run_level(1, args.warmup, None, measure_lag=False)
+    for concurrency in (int(v) for v in args.levels.split(",")):
+        stub_before = {name: app.state.stub.to_dict() for name, app in (stub_apps or {}).items()}
+        level = await driver.run_level(concurrency, args.requests, args.duration, measure_lag=in_process)
+        level["memory_mb"] = await scrape_memory(client)
+        if stub_apps:
+            level["stubs"] = {
+                name: {key: round(value - stub_before[name][key], 3) if key != "max_waiting" else value
+                       for key, value in app.state.stub.to_dict().items()}
+                for name, app in stub_apps.items()
+            }
+        levels.append(level)
+        if not args.quiet:
+            print_level(level, file=sys.__stdout__)
+
+    server_status = (await client.get(f"{WORKFLOW}/server-status")).json()
+    return {
+        "mode": "in-process" if in_process else args.main_url,
+        "mix": mix,
+        "memory_start_mb": memory_start,
+        "levels": levels,
+        "admission": server_status.get("admission"),
+    }
+
+
+def print_level(level: Dict[str, Any], file=None):
+    def fmt(value, unit=""):
+        return f"{value:.1f}{unit}" if isinstance(value, (int, float)) else "-"
+
+    print(
+        f"c={level['concurrency']:<3} n={level['requests']:<5} err={level['errors']:<4} "
+        f"rps={level['throughput_rps']:<7.2f} p50={fmt(level['p50_ms'])} p95={fmt(level['p95_ms'])} "
+        f"p99={fmt(level['p99_ms'])} ms | loop lag p99={fmt(level['lag_p99_ms'])} max={fmt(level['lag_max_ms'])} ms "
+        f"| rss={fmt(level['memory_mb'], 'MB')}",
+        file=file,
+    )
+    if level["error_statuses"]:
+        print(f"      errors by status: {level['error_statuses']}", file=file)
+    for kind, stats in level["by_kind"].items():
+        print(f"      {kind:<8} n={stats['count']:<5} err={stats['errors']:<4} p50={fmt(stats['p50_ms'])} "
+              f"p95={fmt(stats['p95_ms'])} p99={fmt(stats['p99_ms'])} ms", file=file)
+
+
+def check_regression(report: Dict[str, Any], max_p95_ms: Optional[float], max_error_rate: float) -> List[str]:
+    """단계별 p95 / 오류율 기준 초과 목록 (비어 있으면 통과)"""
+    problems = []
+    for level in report["levels"]:
+        if max_p95_ms is not None and level["p95_ms"] is not None and level["p95_ms"] > max_p95_ms:
+            problems.append(f"c={level['concurrency']}: p95 {level['p95_ms']}ms > {max_p95_ms}ms")
+        if level["requests"] and level["errors"] / level["requests"] > max_error_rate:
+            problems.append(f"c={level['concurrency']}: error rate {level['errors'] / level['requests']:.1%} "
+                            f"> {max_error_rate:.1%} ({level['error_statuses']})")
+    return problems
+
+
+async def live_objects(client: httpx.AsyncClient, class_name: str) -> List[str]:
+    response = await client.get(f"/api/v1/objects/classes/{class_name}")
+    response.raise_for_status()
+    return [obj["name"] for obj in response.json()["objects"] if obj["has_template"]]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Main 서버 closed-loop 부하 테스트 (stub ISM / PEM / Render)")
+    parser.add_argument("--main-url", help="실행 중인 Main 서버 (없으면 같은 프로세스에서 실행)")
+    parser.add_argument("--levels", default="1,2,4,8", help="동시성 단계 (쉼표 구분)")
+    parser.add_argument("--requests", type=int, default=40, help="단계별 요청 수 (0이면 --duration만 사용)")
+    parser.add_argument("--duration", type=float, default=None, help="단계별 최대 실행 시간 (초)")
+    parser.add_argument("--warmup", type=int, default=4, help="측정 전 순차 요청 수")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="트래픽 비율 (pipeline / cached / job / status)")
+    parser.add_argument("--class-name", default="ycb")
+    parser.add_argument("--objects", type=int, default=12, help="같은 프로세스 실행 시 임시 카탈로그 객체 수")
+    parser.add_argument("--object-names", default=None, help="--main-url 사용 시 객체 목록 (없으면 서버 카탈로그)")
+    parser.add_argument("--cold-objects", type=int, default=2, help="템플릿 없이 시작하는 객체 수 (Render 경로)")
+    parser.add_argument("--frames", type=int, default=8, help="서로 다른 입력 프레임 수")
+    parser.add_argument("--cached-frames", type=int, default=2, help="cached 트래픽이 반복하는 프레임 / 객체 조합 수")
+    parser.add_argument("--output-mode", default="none", choices=["none", "results_only", "full"])
+    parser.add_argument("--json", dest="json_path", help="결과 JSON 저장 경로")
+    parser.add_argument("--max-p95-ms", type=float, default=None, help="단계별 p95 상한 (넘으면 exit 1)")
+    parser.add_argument("--max-error-rate", type=float, default=0.0, help="단계별 오류율 상한 (넘으면 exit 1)")
+    parser.add_argument("--verbose", action="store_true", help="WorkflowService 로그 출력 (기본은 숨김)")
+    parser.add_argument("--quiet", action="store_true", help="단계별 결과 출력 생략")
+    add_profile_args(parser)
+    return parser
+
+
+def run(args) -> Dict[str, Any]:
+    """명령행 인자대로 부하 테스트 실행 후 보고서 반환"""
+    if args.main_url:
+        async def live():
+            async with httpx.AsyncClient(base_url=args.main_url.rstrip("/"), timeout=600.0) as client:
+                objects = args.object_names.split(",") if args.object_names else await live_objects(client, args.class_name)
+                if not objects:
+                    raise SystemExit(f"no objects with templates in class {args.class_name}")
+                return await run_benchmark(args, client, objects, in_process=False)
+        return asyncio.run(live())
+
+    stub_apps = dict(zip(("ism", "pem", "render"), make_stub_apps(profiles_from_args(args)).values()))
+    with in_process_main(args, dict(zip((8002, 8003, 8004), stub_apps.values()))) as (client, objects):
+        async def local():
+            async with client:
+                return await run_benchmark(args, client, objects, in_process=True, stub_apps=stub_apps)
+        # WorkflowService의 단계별 print는 숨김 (출력 비용은 그대로 포함됨)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(sys.stdout if args.verbose else devnull):
+            return asyncio.run(local())
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    report = run(args)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f"결과 저장: {args.json_path}")
+    problems = check_regression(report, args.max_p95_ms, args.max_error_rate)
+    for problem in problems:
+        print(f"[FAIL] {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
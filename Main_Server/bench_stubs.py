@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+부하 테스트용 ISM / PEM / Render stub 서버 (GPU 없이 CPU에서 실행)
+
+실제 서버와 같은 요청 / 응답 스키마 (ISM InferenceRequest / InferenceResponse,
+PEM PoseEstimationRequest / PoseEstimationResponse, Render RenderRequest / 작업 dict)를 쓰고,
+추론 대신 설정한 지연 (로그 정규 분포)만큼 기다린 뒤 설정한 크기의 결과를 돌려준다.
+
+- GPU 한 장처럼 동시에 처리하는 요청 수 (slots)를 제한하고 나머지는 서버 앞에서 대기
+- 템플릿 캐시 (LRU, cache_size)에 없는 template_dir은 cold_ms만큼 추가 지연
+- 결과 크기: 검출 수 (detections)와 마스크 형식 (rle / dense / none)
+- error_rate 비율만큼 success=False 응답
+- POST /cache/warm: cold_ms 뒤에 템플릿 캐시에 추가 (로드 중인 템플릿을 요청하면 끝날 때까지 대기)
+
+bench_load.py가 같은 프로세스에서 바로 사용하고, 단독 실행하면 8002 / 8003 / 8004 포트로 띄운다
+(실행 중인 Main 서버에 bench_load.py --main-url로 부하를 줄 때):
+
+    python Main_Server/bench_stubs.py --ism-latency-ms 400 --pem-latency-ms 250 --detections 10
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+from Main_Server.utils.tracing import TRACER
+from sam6d_common.rle import bbox_to_rle
+from sam6d_common.tracing import TracingMiddleware, span
+from PEM_Server.api.models import CacheWarmRequest, PoseEstimationRequest, PoseEstimationResponse
+from Render_Server.main import RenderRequest
+
+# 컨테이너 경로 (WorkflowService._to_container_path)를 stub이 실행되는 호스트 경로로 되돌릴 때 사용
+CONTAINER_ROOT = "/workspace/Estimation_Server"
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+# ISM_Server/main.py의 스키마와 동일 (ISM main은 최상위 utils 패키지를 쓰므로 Main_Server/utils와 이름이 겹쳐
+# 이 프로세스에서 import할 수 없어 여기에 복사)
+class InferenceRequest(BaseModel):
+    rgb_image: str
+    depth_image: str
+    cam_params: dict
+    template_dir: str
+    cad_path: str
+    output_dir: Optional[str] = None
+
+
+class InferenceResponse(BaseModel):
+    success: bool
+    detections: dict
+    inference_time: float
+    template_dir_used: str
+    cad_path_used: str
+    output_dir_used: Optional[str] = None
+    error_message: Optional[str] = None
+
+
+@dataclass
+class StubProfile:
+    """stub 서버 하나의 지연 / 결과 크기 설정"""
+    latency_ms: float = 300.0        # 요청당 처리 시간 중앙값
+    jitter: float = 0.2              # 로그 정규 분포 sigma (0이면 항상 latency_ms)
+    cold_ms: float = 0.0             # 템플릿 캐시에 없을 때 추가 지연 (템플릿 / CAD 로딩)
+    cache_size: int = 8              # 템플릿 캐시 크기 (LRU)
+    slots: int = 1                   # 동시에 처리하는 요청 수 (GPU 한 장이면 1)
+    detections: int = 5              # 결과 검출 수
+    mask_format: str = "rle"         # ISM 마스크 형식: rle / dense (H x W 리스트) / none
+    image_size: Tuple[int, int] = (480, 640)  # 마스크 크기 (H, W)
+    error_rate: float = 0.0          # success=False 응답 비율
+    seed: Optional[int] = None
+
+
+@dataclass
+class StubState:
+    """stub 서버의 처리 통계 (bench_load.py 보고서에 포함)"""
+    requests: int = 0
+    errors: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    warmed: int = 0
+    max_waiting: int = 0
+    busy_sec: float = 0.0
+    waiting: int = 0
+    cache: OrderedDict = field(default_factory=OrderedDict)
+
+    def to_dict(self):
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "warmed": self.warmed,
+            "max_waiting": self.max_waiting,
+            "busy_sec": round(self.busy_sec, 3),
+        }
+
+
+class _Processor:
+    """slots개의 가상 GPU + 템플릿 LRU 캐시 + 지연 샘플링"""
+
+    def __init__(self, profile: StubProfile):
+        self.profile = profile
+        self.state = StubState()
+        self.rng = random.Random(profile.seed)
+        self._slots = asyncio.Semaphore(max(1, profile.slots))
+        self._warming = {}
+
+    def _sample_latency(self) -> float:
+        median = self.profile.latency_ms / 1000.0
+        if self.profile.jitter <= 0:
+            return median
+        return median * self.rng.lognormvariate(0.0, self.profile.jitter)
+
+    def _insert(self, template_dir: str):
+        cache = self.state.cache
+        cache[template_dir] = True
+        cache.move_to_end(template_dir)
+        while len(cache) > max(0, self.profile.cache_size):
+            cache.popitem(last=False)
+
+    def _touch_cache(self, template_dir: str) -> bool:
+        if template_dir in self.state.cache:
+            self.state.cache.move_to_end(template_dir)
+            self.state.cache_hits += 1
+            return True
+        self._insert(template_dir)
+        self.state.cache_misses += 1
+        return False
+
+    def warm(self, template_dir: str) -> bool:
+        """백그라운드로 cold_ms 뒤에 캐시에 추가 (이미 있거나 로드 중이면 False)"""
+        if template_dir in self.state.cache or template_dir in self._warming:
+            return False
+
+        async def load():
+            await asyncio.sleep(self.profile.cold_ms / 1000.0)
+            self._insert(template_dir)
+            self.state.warmed += 1
+
+        task = asyncio.create_task(load())
+        self._warming[template_dir] = task
+        task.add_done_callback(lambda _: self._warming.pop(template_dir, None))
+        return True
+
+    async def run(self, template_dir: str) -> Tuple[float, bool]:
+        """가상 추론 (slots 대기 → 지연), (추론 시간, 실패 여부) 반환"""
+        state = self.state
+        state.requests += 1
+        state.waiting += 1
+        state.max_waiting = max(state.max_waiting, state.waiting)
+        try:
+            async with self._slots:
+                state.waiting -= 1
+                start = time.perf_counter()
+                if template_dir in self._warming:
+                    await self._warming[template_dir]
+                delay = self._sample_latency()
+                if not self._touch_cache(template_dir):
+                    delay += self.profile.cold_ms / 1000.0
+                with span("inference"):
+                    await asyncio.sleep(delay)
+                elapsed = time.perf_counter() - start
+                state.busy_sec += elapsed
+        except BaseException:
+            state.waiting = max(0, state.waiting - 1)
+            raise
+        failed = self.rng.random() < self.profile.error_rate
+        state.errors += int(failed)
+        return elapsed, failed
+
+    def boxes(self):
+        h, w = self.profile.image_size
+        for i in range(self.profile.detections):
+            bw, bh = max(2, w // 8), max(2, h // 8)
+            x1 = (i * bw) % max(1, w - bw)
+            y1 = (i * bh // 2) % max(1, h - bh)
+            yield [x1, y1, x1 + bw, y1 + bh], round(0.95 - 0.05 * i, 4)
+
+
+def _stub_app(name: str, processor: "_Processor") -> FastAPI:
+    """공통: 추적 미들웨어 + 캐시 워밍 (/cache/warm, /cache/stats)"""
+    app = FastAPI(title=f"{name} stub")
+    # 실제 서버처럼 Server-Timing을 돌려줘서 Main 서버 waterfall에 원격 span이 붙게 함
+    app.add_middleware(TracingMiddleware, tracer=TRACER)
+    app.state.stub = processor.state
+
+    @app.post("/cache/warm")
+    async def cache_warm(request: CacheWarmRequest):
+        queued, duplicate = [], []
+        for target in request.targets:
+            name = f"{target.class_name}/{target.object_name}"
+            key = target.template_dir or name
+            (queued if processor.warm(key) else duplicate).append(name)
+        return {"success": True, "queued": queued, "duplicate": duplicate, "rejected": []}
+
+    @app.get("/cache/stats")
+    async def cache_stats():
+        return {"caches": {"templates": {"entries": len(processor.state.cache), "keys": list(processor.state.cache)}},
+                "warmer": {"loading": list(processor._warming)}}
+
+    return app
+
+
+def make_ism_app(profile: Optional[StubProfile] = None) -> FastAPI:
+    """ISM stub (GET /health, GET /ready, POST /api/v1/inference)"""
+    processor = _Processor(profile or StubProfile())
+    app = _stub_app("ISM", processor)
+
+    @app.get("/health")
+    @app.get("/ready")
+    async def health():
+        return {"status": "healthy", "message": "ISM stub", "timestamp": time.time()}
+
+    @app.post("/api/v1/inference", response_model=InferenceResponse)
+    async def inference(request: InferenceRequest):
+        elapsed, failed = await processor.run(request.template_dir)
+        common = {
+            "inference_time": elapsed,
+            "template_dir_used": request.template_dir,
+            "cad_path_used": request.cad_path,
+            "output_dir_used": request.output_dir,
+        }
+        if failed:
+            return InferenceResponse(success=False, detections={}, error_message="stub: injected failure", **common)
+
+        h, w = processor.profile.image_size
+        masks, boxes, scores = [], [], []
+        for box, score in processor.boxes():
+            boxes.append(box)
+            scores.append(score)
+            if processor.profile.mask_format == "rle":
+                masks.append(bbox_to_rle(*box, h, w))
+            elif processor.profile.mask_format == "dense":
+                x1, y1, x2, y2 = box
+                masks.append([[1 if x1 <= x < x2 and y1 <= y < y2 else 0 for x in range(w)] for y in range(h)])
+        detections = {"masks": masks, "boxes": boxes, "scores": scores, "object_ids": [0] * len(boxes)}
+        return InferenceResponse(success=True, detections=detections, **common)
+
+    return app
+
+
+def make_pem_app(profile: Optional[StubProfile] = None) -> FastAPI:
+    """PEM stub (GET /api/v1/health, POST /api/v1/pose-estimation)"""
+    processor = _Processor(profile or StubProfile())
+    app = _stub_app("PEM", processor)
+
+    @app.get("/api/v1/health")
+    async def health():
+        return {"status": "healthy", "message": "PEM stub", "uptime": time.time()}
+
+    @app.post("/api/v1/pose-estimation", response_model=PoseEstimationResponse)
+    async def pose_estimation(request: PoseEstimationRequest):
+        elapsed, failed = await processor.run(request.template_dir)
+        common = {
+            "inference_time": elapsed,
+            "template_dir_used": request.template_dir,
+            "cad_path_used": request.cad_path,
+            "output_dir_used": request.output_dir,
+        }
+        if failed:
+            return PoseEstimationResponse(success=False, detections=[], pose_scores=[], pred_rot=[], pred_trans=[],
+                                          num_detections=0, error_message="stub: injected failure", **common)
+
+        # ISM seg_data 중 임계값 이상만 포즈 추정 (실제 PEM과 같이 seg_data 수에 따라 결과 크기가 정해짐)
+        kept = [seg for seg in request.seg_data if float(seg.get("score", 0.0)) >= request.det_score_thresh]
+        kept = kept[:max(0, processor.profile.detections)]
+        detections = [
+            {"bbox": seg.get("bbox"), "score": seg.get("score"), "category_id": seg.get("category_id", 1)}
+            for seg in kept
+        ]
+        return PoseEstimationResponse(
+            success=True,
+            detections=detections,
+            pose_scores=[round(0.9 - 0.05 * i, 4) for i in range(len(kept))],
+            pred_rot=[[[1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]] for _ in kept],
+            pred_trans=[[0.0, 0.0, 500.0 + 10.0 * i] for i in range(len(kept))],
+            num_detections=len(kept),
+            **common,
+        )
+
+    return app
+
+
+def write_stub_templates(template_dir: Path, num_views: int = 1):
+    """렌더링 결과 자리의 빈 rgb / mask / xyz 파일 (Main 서버 매니페스트 검사가 템플릿이 있다고 판단하는 최소 구성)"""
+    template_dir.mkdir(parents=True, exist_ok=True)
+    for i in range(num_views):
+        for name in (f"rgb_{i}.png", f"mask_{i}.png", f"xyz_{i}.npy"):
+            (template_dir / name).write_bytes(b"stub")
+
+
+def make_render_app(profile: Optional[StubProfile] = None, host_root: Path = PROJECT_ROOT) -> FastAPI:
+    """Render stub (GET /health, POST /render/templates)
+
+    wait=true면 완료된 작업 dict를 돌려주고, output_dir (컨테이너 경로는 host_root 기준으로 변환)에
+    빈 템플릿 파일을 만들어서 다음 요청부터는 Main 서버가 렌더링 단계를 건너뛰게 한다.
+    """
+    processor = _Processor(profile or StubProfile(latency_ms=2000.0, jitter=0.1))
+    app = _stub_app("Render", processor)
+    jobs = {}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy", "timestamp": time.time()}
+
+    async def run_job(job_id: str, req: RenderRequest):
+        job = jobs[job_id]
+        job.update(status="running", started_at=time.time())
+        with span("render"):
+            _, failed = await processor.run(req.output_dir)
+        if not failed:
+            output_dir = req.output_dir
+            if output_dir.startswith(CONTAINER_ROOT):
+                output_dir = str(host_root) + output_dir[len(CONTAINER_ROOT):]
+            write_stub_templates(Path(output_dir))
+        ended = time.time()
+        job.update(
+            status="failed" if failed else "succeeded",
+            returncode=1 if failed else 0,
+            ended_at=ended,
+            elapsed_sec=round(ended - job["started_at"], 3),
+        )
+
+    @app.post("/render/templates")
+    async def create_templates(req: RenderRequest, wait: bool = False, wait_timeout_sec: int = 1800):
+        job_id = f"stub-{len(jobs) + 1}"
+        jobs[job_id] = {"status": "queued", "cad_path": req.cad_path, "output_dir": req.output_dir,
+                        "created_at": time.time()}
+        task = asyncio.create_task(run_job(job_id, req))
+        if not wait:
+            return {"job_id": job_id, "status": "queued"}
+        try:
+            await asyncio.wait_for(asyncio.shield(task), timeout=wait_timeout_sec)
+        except asyncio.TimeoutError:
+            jobs[job_id].update(status="timeout", ended_at=time.time())
+        return jobs[job_id]
+
+    @app.get("/jobs/{job_id}")
+    async def get_job_status(job_id: str):
+        return jobs.get(job_id, {"error": "not_found"})
+
+    return app
+
+
+def add_profile_args(parser: argparse.ArgumentParser):
+    """stub 설정 명령행 인자 (bench_load.py와 공용)"""
+    group = parser.add_argument_group("stub servers")
+    group.add_argument("--ism-latency-ms", type=float, default=300.0)
+    group.add_argument("--pem-latency-ms", type=float, default=200.0)
+    group.add_argument("--render-latency-ms", type=float, default=2000.0)
+    group.add_argument("--jitter", type=float, default=0.2, help="로그 정규 분포 sigma")
+    group.add_argument("--cold-ms", type=float, default=500.0, help="템플릿 캐시 미스 시 추가 지연")
+    group.add_argument("--stub-cache-size", type=int, default=8)
+    group.add_argument("--gpu-slots", type=int, default=1, help="stub 서버별 동시 처리 수")
+    group.add_argument("--detections", type=int, default=5)
+    group.add_argument("--mask-format", choices=["rle", "dense", "none"], default="rle")
+    group.add_argument("--image-size", default="480x640", help="HxW")
+    group.add_argument("--error-rate", type=float, default=0.0)
+    group.add_argument("--seed", type=int, default=0)
+
+
+def profiles_from_args(args) -> dict:
+    h, w = (int(v) for v in args.image_size.lower().split("x"))
+    common = dict(jitter=args.jitter, cold_ms=args.cold_ms, cache_size=args.stub_cache_size, slots=args.gpu_slots,
+                  detections=args.detections, mask_format=args.mask_format, image_size=(h, w),
+                  error_rate=args.error_rate)
+    return {
+        "ism": StubProfile(latency_ms=args.ism_latency_ms, seed=args.seed, **common),
+        "pem": StubProfile(latency_ms=args.pem_latency_ms, seed=args.seed + 1, **common),
+        "render": StubProfile(latency_ms=args.render_latency_ms, jitter=args.jitter, seed=args.seed + 2),
+    }
+
+
+def make_stub_apps(profiles: dict) -> dict:
+    """기본 포트 → stub 앱 (ISM 8002, PEM 8003, Render 8004)"""
+    return {
+        8002: make_ism_app(profiles.get("ism")),
+        8003: make_pem_app(profiles.get("pem")),
+        8004: make_render_app(profiles.get("render")),
+    }
+
+
+async def serve(apps: dict, host: str):
+    import uvicorn
+
+    servers = [uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+               for port, app in apps.items()]
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ISM / PEM / Render stub 서버 (8002 / 8003 / 8004)")
+    parser.add_argument("--host", default="127.0.0.1")
+    add_profile_args(parser)
+    args = parser.parse_args()
+
+    apps = make_stub_apps(profiles_from_args(args))
+    print(f"stub 서버 시작: ISM :8002, PEM :8003, Render :8004 ({args.host})")
+    asyncio.run(serve(apps, args.host))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 """
 Main_Server - 중앙 관리 서버 (포트 8001)
 """
+import asyncio
 import sys
 import os
 import logging
@@ -37,9 +38,12 @@ for path in [project_root, estimation_root]:
     if path_str not in sys.path:
         sys.path.insert(0, path_str)
 
-from api.endpoints import objects_router, servers_router, workflow_router
+from api.endpoints import metrics_router, objects_router, servers_router, workflow_router
 from api.models import HealthResponse
 from utils.logging_config import setup_logging
+# 서비스 코드와 같은 모듈 (Main_Server.utils)을 써야 추적 context가 공유됨
+from Main_Server.utils.tracing import TRACER
+from sam6d_common.tracing import TracingMiddleware
 
 # 로깅 설정
 logger = setup_logging(
@@ -85,8 +89,40 @@ def check_docker_container_status(container_name: str) -> Tuple[Optional[bool],
         return False, f"error: {str(e)[:100]}"
 
 
-def ensure_service_running(name: str, health_url: str, compose_dir: Path, container_name: str = None, retries: int = 3, wait_seconds: int = 3) -> None:
-    """Ensure required service container is running by health check and optional docker compose up."""
+def wait_until_ready(name: str, health_url: str, timeout: float, interval: float = 3) -> bool:
+    """readiness 엔드포인트가 200이 될 때까지 대기 (503이면 시작 단계를 로그로 남김, 단계가 failed면 중단)"""
+    deadline = time.monotonic() + timeout
+    last_stage = None
+    while time.monotonic() < deadline:
+        try:
+            resp = requests.get(health_url, timeout=3)
+            if resp.status_code == 200:
+                logger.info(f"{name}: ready.")
+                return True
+            try:
+                status = resp.json()
+            except ValueError:
+                status = {}
+            stage = status.get("stage") if isinstance(status, dict) else None
+            if stage == "failed":
+                logger.error(f"{name}: startup failed: {status.get('error')}")
+                return False
+            if stage != last_stage:
+                logger.info(f"{name}: not ready yet (HTTP {resp.status_code}, stage={stage}).")
+                last_stage = stage
+        except Exception as exc:
+            logger.debug(f"{name}: readiness check failed: {exc}")
+        time.sleep(interval)
+    logger.error(f"{name}: not ready after {timeout:.0f}s. Please investigate manually.")
+    return False
+
+
+def ensure_service_running(name: str, health_url: str, compose_dir: Path, container_name: str = None, retries: int = 3, wait_seconds: int = 3, ready_timeout: Optional[float] = None) -> None:
+    """Ensure required service container is running by health check and optional docker compose up.
+
+    ready_timeout가 주어지면 health_url을 readiness 엔드포인트로 보고, 503 (살아 있지만 모델 로드 중)이면
+    컨테이너를 다시 띄우지 않고 200이 될 때까지 대기한다. 기동 후에도 retries 대신 ready_timeout 동안 대기.
+    """
     health_url = health_url.strip()
     if not health_url:
         logger.debug(f"{name}: health URL not provided; skipping auto-check.")
@@ -98,6 +134,10 @@ def ensure_service_running(name: str, health_url: str, compose_dir: Path, contai
         if resp.status_code == 200:
             logger.info(f"{name}: healthy (status {resp.status_code}).")
             return
+        if ready_timeout is not None and resp.status_code == 503:
+            logger.info(f"{name}: running but not ready yet, waiting up to {ready_timeout:.0f}s.")
+            wait_until_ready(name, health_url, ready_timeout, wait_seconds)
+            return
         logger.warning(f"{name}: health check returned {resp.status_code}, attempting to start container.")
     except Exception as exc:
         logger.warning(f"{name}: health check failed ({exc}), attempting to start container.")
@@ -169,6 +209,10 @@ def ensure_service_running(name: str, health_url: str, compose_dir: Path, contai
         return
 
     # 컨테이너가 시작될 때까지 대기하고 health check 재시도
+    if ready_timeout is not None:
+        logger.info(f"{name}: waiting up to {ready_timeout:.0f}s for service to become ready...")
+        wait_until_ready(name, health_url, ready_timeout, wait_seconds)
+        return
     logger.info(f"{name}: waiting for service to become healthy...")
     for attempt in range(1, retries + 1):
         time.sleep(wait_seconds)
@@ -190,9 +234,11 @@ logger.debug(f"AUTO_START_DEPENDENCIES={AUTO_START_DEPENDENCIES} (from env: {os.
 REQUIRED_SERVICES = [
     {
         "name": "ISM Server",
-        "health_url": os.getenv("ISM_HEALTH_URL", "http://localhost:8002/health"),
+        # /ready: 모델 로드 / 워밍업까지 끝나야 200 (로드 중에는 503 + 시작 단계)
+        "health_url": os.getenv("ISM_HEALTH_URL", "http://localhost:8002/ready"),
         "compose_dir": estimation_root / "ISM_Server",
         "container_name": "ism-server",
+        "ready_timeout": float(os.getenv("MAIN_SERVER_ISM_READY_TIMEOUT_SEC", "300")),
     },
     {
         "name": "PEM Server",
@@ -207,6 +253,10 @@ REQUIRED_SERVICES = [
         "container_name": "render-server",
     },
 ]
+# in-process 모드에서는 ISM / PEM 모델을 이 프로세스에서 실행하므로 컨테이너 불필요
+INFERENCE_MODE = os.getenv("MAIN_SERVER_INFERENCE_MODE", "http").lower()
+if INFERENCE_MODE == "inprocess":
+    REQUIRED_SERVICES = [s for s in REQUIRED_SERVICES if s["name"] not in ("ISM Server", "PEM Server")]
 
 
 @asynccontextmanager
@@ -229,6 +279,7 @@ async def lifespan(app: FastAPI):
                 health_url=service["health_url"],
                 compose_dir=service["compose_dir"],
                 container_name=service.get("container_name"),
+                ready_timeout=service.get("ready_timeout"),
             )
     else:
         logger.info("AUTO_START_DEPENDENCIES is disabled. Skipping container auto-start.")
@@ -242,10 +293,53 @@ async def lifespan(app: FastAPI):
         logger.info(f"템플릿 생성률: {stats['overall_completion_rate']:.1f}%")
     except Exception as e:
         logger.warning(f"초기 스캔 실패: {e}")
+
+    # in-process 추론 모델 로드 (MAIN_SERVER_INFERENCE_MODE=inprocess)
+    if INFERENCE_MODE == "inprocess":
+        try:
+            from Main_Server.services.inprocess_inference import get_inprocess_inference
+            await asyncio.to_thread(get_inprocess_inference().load)
+            logger.info("In-process ISM / PEM 모델 로드 완료")
+        except Exception as e:
+            logger.error(f"In-process 모델 로드 실패: {e}")
+
+    # RSS prefetch 루프 (MAIN_SERVER_RSS_PREFETCH_SOURCES)
+    try:
+        from Main_Server.services.workflow_service import get_workflow_service
+        started = get_workflow_service().rss_prefetch.start_from_env()
+        if started:
+            logger.info(f"RSS prefetch 시작: {started}")
+    except Exception as e:
+        logger.warning(f"RSS prefetch 시작 실패: {e}")
     
     yield
     
     # 종료 시 실행
+    try:
+        from Main_Server.services.job_queue import get_job_queue
+        await get_job_queue().shutdown()
+    except Exception as e:
+        logger.warning(f"작업 큐 종료 실패: {e}")
+
+    try:
+        from Main_Server.services.workflow_service import get_workflow_service
+        await get_workflow_service().rss_prefetch.stop_all()
+    except Exception as e:
+        logger.warning(f"RSS prefetch 종료 실패: {e}")
+
+    try:
+        from Main_Server.services.rss_client import get_rss_client
+        await get_rss_client().aclose()
+    except Exception as e:
+        logger.warning(f"RSS 클라이언트 종료 실패: {e}")
+
+    try:
+        from Main_Server.utils.artifact_writer import ARTIFACT_WRITER
+        if not ARTIFACT_WRITER.close(timeout=30.0):
+            logger.warning("산출물 저장 대기 시간 초과 (일부 파일이 저장되지 않았을 수 있음)")
+    except Exception as e:
+        logger.warning(f"산출물 저장기 종료 실패: {e}")
+
     logger.info("=" * 50)
     logger.info("Main Server shutting down...")
     logger.info("=" * 50)
@@ -266,12 +360,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Request-ID"],
 )
 
+# 요청 추적 (X-Request-ID / traceparent 전달, 응답에 Server-Timing 추가)
+app.add_middleware(TracingMiddleware, tracer=TRACER)
+
 # 라우터 등록
 app.include_router(objects_router)
 app.include_router(servers_router)
 app.include_router(workflow_router)
+app.include_router(metrics_router)
 
 
 @app.get("/", response_model=HealthResponse)
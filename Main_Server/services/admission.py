@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+ISM / PEM 호출 admission control (동시 요청 수 제한 + 대기 큐 + 마감 시간)
+
+ISM / PEM 서버는 GPU 모델 하나로 요청을 순서대로 처리하므로, 한꺼번에 요청을 보내면
+서버 앞에 쌓여 있다가 600 / 900초 httpx 타임아웃에 걸린다. 대신 Main 서버에서
+서비스별로 동시 요청 수를 제한하고, 나머지는 상한 있는 대기 큐에서 기다리게 한다.
+
+- 대기 큐가 가득 차면 바로 거절 (429)
+- 예상 대기 시간 (앞의 대기 수 / 동시 제한 × 최근 평균 지연)이 마감 시간을 넘거나,
+  실제로 마감 시간까지 자리가 나지 않으면 거절 (503)
+- 거절 시 예상 대기 시간을 Retry-After로 알려줌
+- 동시 제한은 AIMD로 조정: 최근 호출 지연의 중앙값이 목표 (최근 지연 하위 10% × tolerance) 이하면
+  조금씩 늘리고, 넘거나 호출이 실패하면 곱해서 줄임 (템플릿 캐시 미스 같은 한 번의 느린 호출은 무시)
+- 동시 제한 설정은 replica 하나 기준이며, replica 수만큼 곱해서 사용
+"""
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, Dict, Optional
+
+
+ADMISSION_ENABLED = os.getenv("MAIN_SERVER_ADMISSION_ENABLED", "true").lower() == "true"
+# 대기 큐에서 자리를 기다리는 최대 시간 (초)
+ADMISSION_DEADLINE_SEC = float(os.getenv("MAIN_SERVER_ADMISSION_DEADLINE_SEC", "60"))
+# 지연 목표 = 최근 지연 하위 10% × tolerance
+ADMISSION_LATENCY_TOLERANCE = float(os.getenv("MAIN_SERVER_ADMISSION_LATENCY_TOLERANCE", "2.0"))
+# 지연 초과 / 실패 시 동시 제한에 곱하는 값
+ADMISSION_DECREASE_FACTOR = float(os.getenv("MAIN_SERVER_ADMISSION_DECREASE_FACTOR", "0.7"))
+
+_LATENCY_WINDOW = 50
+# 지연 목표의 기준 (최근 _LATENCY_WINDOW개 지연의 하위 백분위)
+_BASELINE_PERCENTILE = 0.1
+# 이만큼의 최근 호출 지연 중앙값으로 감소 여부 판단
+_RECENT_WINDOW = 5
+_EWMA_ALPHA = 0.2
+
+
+def _service_env(service: str, name: str, default: str) -> str:
+    return os.getenv(f"MAIN_SERVER_{service.upper()}_{name}", default)
+
+
+class AdmissionRejected(Exception):
+    """동시 제한 / 대기 큐 / 마감 시간 때문에 요청을 받을 수 없음"""
+
+    def __init__(self, service: str, reason: str, retry_after: float, detail: str):
+        super().__init__(f"{service.upper()} admission rejected ({reason}): {detail}")
+        self.service = service
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+    @property
+    def status_code(self) -> int:
+        # 큐가 가득 참 → 429, 마감 시간 안에 처리 불가 → 503
+        return 429 if self.reason == "queue_full" else 503
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(self.retry_after)}
+
+
+def _percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+class AdaptiveLimiter:
+    """서비스 하나의 동시 요청 제한 (AIMD) + 상한 있는 대기 큐
+
+    initial_limit / min_limit / max_limit는 replica 하나 기준이며 replicas를 곱해서 사용한다.
+    """
+
+    def __init__(
+        self,
+        service: str,
+        initial_limit: Optional[int] = None,
+        min_limit: Optional[int] = None,
+        max_limit: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        deadline_sec: float = ADMISSION_DEADLINE_SEC,
+        tolerance: float = ADMISSION_LATENCY_TOLERANCE,
+        decrease_factor: float = ADMISSION_DECREASE_FACTOR,
+        replicas: int = 1,
+    ):
+        self.service = service
+        self.replica_min_limit = max(1, min_limit if min_limit is not None else int(_service_env(service, "CONCURRENCY_MIN", "1")))
+        self.replica_max_limit = max(self.replica_min_limit, max_limit if max_limit is not None else int(_service_env(service, "CONCURRENCY_MAX", "8")))
+        initial = initial_limit if initial_limit is not None else int(_service_env(service, "CONCURRENCY", "2"))
+        self.replicas = max(1, replicas)
+        self.min_limit = self.replica_min_limit * self.replicas
+        self.max_limit = self.replica_max_limit * self.replicas
+        self.limit = float(min(self.max_limit, max(self.min_limit, initial * self.replicas)))
+        self.max_queue = max_queue if max_queue is not None else int(_service_env(service, "QUEUE_SIZE", "16"))
+        self.deadline_sec = deadline_sec
+        self.tolerance = tolerance
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._latencies: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self._recent: Deque[float] = deque(maxlen=_RECENT_WINDOW)
+        self.ewma_latency: Optional[float] = None
+        self.stats = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_deadline": 0,
+                      "increases": 0, "decreases": 0}
+
+    @property
+    def current_limit(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    def set_replicas(self, replicas: int):
+        """replica 수가 정해지면 동시 제한 범위와 현재 제한을 replica 수에 맞춰 조정"""
+        replicas = max(1, replicas)
+        if replicas == self.replicas:
+            return
+        self.limit = self.limit / self.replicas * replicas
+        self.replicas = replicas
+        self.min_limit = self.replica_min_limit * replicas
+        self.max_limit = self.replica_max_limit * replicas
+        self.limit = min(float(self.max_limit), max(float(self.min_limit), self.limit))
+        self._admit_waiters()
+
+    @property
+    def baseline_latency(self) -> Optional[float]:
+        """지연 목표의 기준 (최근 지연 하위 10%, 가끔 빠른 호출 하나에 끌려가지 않게 최소값 대신 사용)"""
+        return _percentile(self._latencies, _BASELINE_PERCENTILE) if self._latencies else None
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for w in self._waiters if not w.done())
+
+    def estimated_wait(self, position: int) -> float:
+        """대기 순번 position (0부터)의 예상 대기 시간 (지연 기록이 없으면 0)"""
+        if self.ewma_latency is None:
+            return 0.0
+        return (position + 1) / self.current_limit * self.ewma_latency
+
+    def _reject(self, reason: str, retry_after: float, detail: str):
+        self.stats[f"rejected_{reason}"] += 1
+        raise AdmissionRejected(self.service, reason, retry_after, detail)
+
+    async def acquire(self, deadline: Optional[float] = None):
+        """자리가 날 때까지 대기 (deadline: time.monotonic 기준 마감 시각)"""
+        deadline = deadline if deadline is not None else time.monotonic() + self.deadline_sec
+        if self.in_flight < self.current_limit and not self.queued:
+            self.in_flight += 1
+            self.stats["admitted"] += 1
+            return
+
+        position = self.queued
+        if position >= self.max_queue:
+            self._reject("queue_full", self.estimated_wait(position),
+                         f"{position} waiting, limit {self.current_limit}")
+        wait = self.estimated_wait(position)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or wait > remaining:
+            self._reject("deadline", wait,
+                         f"estimated wait {wait:.1f}s exceeds deadline {max(0.0, remaining):.1f}s")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.stats["queued"] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), timeout=remaining)
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # 타임아웃과 동시에 자리를 넘겨받은 경우 → 그대로 사용
+                self.stats["admitted"] += 1
+                return
+            waiter.cancel()
+            self._reject("deadline", self.estimated_wait(self.queued), f"no slot within {self.deadline_sec:.0f}s")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # 자리를 받은 뒤 취소됨 → 반환하고 다음 대기자에게 넘김
+                self.in_flight -= 1
+                self._admit_waiters()
+            waiter.cancel()
+            raise
+        self.stats["admitted"] += 1
+
+    def _admit_waiters(self):
+        """빈 자리만큼 대기자를 순서대로 들여보냄"""
+        while self._waiters and self.in_flight < self.current_limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def release(self, latency: Optional[float] = None, failed: bool = False):
+        """호출 종료, 지연 / 실패를 보고 동시 제한 조정 (AIMD)"""
+        saturated = self.in_flight >= self.current_limit
+        if failed:
+            self._decrease()
+        elif latency is not None:
+            self._latencies.append(latency)
+            self._recent.append(latency)
+            self.ewma_latency = latency if self.ewma_latency is None else (
+                _EWMA_ALPHA * latency + (1 - _EWMA_ALPHA) * self.ewma_latency
+            )
+            # 한 번의 느린 호출 (템플릿 캐시 미스 등)이 아니라 최근 호출 대부분이 느릴 때만 감소
+            if (len(self._recent) == _RECENT_WINDOW
+                    and _percentile(self._recent, 0.5) > self.baseline_latency * self.tolerance):
+                self._decrease()
+                # 감소 후에는 새 제한에서 측정한 지연으로 다시 판단
+                self._recent.clear()
+            elif saturated and self.limit < self.max_limit:
+                # 제한에 걸려 있을 때만 증가 (한가할 때 제한이 계속 커지지 않게)
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.current_limit)
+                self.stats["increases"] += 1
+        self.in_flight = max(0, self.in_flight - 1)
+        self._admit_waiters()
+
+    def _decrease(self):
+        new_limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+        if new_limit < self.limit:
+            self.limit = new_limit
+            self.stats["decreases"] += 1
+
+    @asynccontextmanager
+    async def slot(self, deadline: Optional[float] = None):
+        """async with limiter.slot() as outcome: 호출 (지연은 자동 기록, 예외면 실패로 보고)
+
+        outcome["wait_sec"]: 대기 큐에서 기다린 시간, outcome["failed"]를 True로 바꾸면 실패로 보고
+        """
+        queued_at = time.monotonic()
+        await self.acquire(deadline)
+        start = time.monotonic()
+        outcome = {"failed": False, "wait_sec": start - queued_at}
+        try:
+            yield outcome
+        except Exception:
+            outcome["failed"] = True
+            raise
+        finally:
+            self.release(time.monotonic() - start, failed=outcome["failed"])
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.current_limit,
+            "limit_exact": round(self.limit, 3),
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "replicas": self.replicas,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "deadline_sec": self.deadline_sec,
+            "ewma_latency_sec": round(self.ewma_latency, 3) if self.ewma_latency is not None else None,
+            "baseline_latency_sec": round(self.baseline_latency, 3) if self._latencies else None,
+            **self.stats,
+        }
+
+
+class AdmissionController:
+    """서비스별 AdaptiveLimiter 모음"""
+
+    def __init__(self, services=("ism", "pem"), enabled: bool = ADMISSION_ENABLED, **limiter_kwargs):
+        self.enabled = enabled
+        self.limiters = {service: AdaptiveLimiter(service, **limiter_kwargs) for service in services}
+
+    def set_replicas(self, service: str, replicas: int):
+        """서비스의 replica 수만큼 동시 제한 범위를 늘림 (설정값은 replica 하나 기준)"""
+        limiter = self.limiters.get(service)
+        if limiter is not None:
+            limiter.set_replicas(replicas)
+
+    @asynccontextmanager
+    async def slot(self, service: str, deadline: Optional[float] = None):
+        limiter = self.limiters.get(service)
+        if not self.enabled or limiter is None:
+            yield {"failed": False, "wait_sec": 0.0}
+            return
+        async with limiter.slot(deadline) as outcome:
+            yield outcome
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "services": {service: limiter.get_stats() for service, limiter in self.limiters.items()},
+        }
+
+
+# 전역 admission controller 인스턴스
+_admission = None
+
+def get_admission_controller() -> AdmissionController:
+    """admission controller 인스턴스 반환 (싱글톤)"""
+    global _admission
+    if _admission is None:
+        _admission = AdmissionController()
+    return _admission
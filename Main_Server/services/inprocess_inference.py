@@ -0,0 +1,607 @@
+#!/usr/bin/env python3
+"""
+In-process (monolith) 추론: ISM / PEM 모델을 Main 서버 프로세스 안에서 실행
+
+단일 GPU 엣지 배포에서 ISM / PEM 서버를 따로 띄우면 프로세스마다 CUDA 컨텍스트가 생기고,
+이미지 / 감지 결과가 localhost base64 JSON과 PEM 임시 디렉토리를 거친다.
+MAIN_SERVER_INFERENCE_MODE=inprocess면 두 모델을 이 프로세스에 올려 CUDA 컨텍스트 하나에서 실행한다.
+
+- call_ism / call_pem은 WorkflowService._call_ism_server / _call_pem_server와 인자 / 응답 형식이 같음
+- 입력 이미지는 요청당 한 번 디코딩해서 ISM / PEM이 같이 사용 (InputFrame)
+- ISM 감지 결과 (마스크 / 박스 / 점수 텐서)는 InputFrame.tensors로 PEM에 바로 전달 (RLE / 임시 파일 없음)
+- GPU 작업은 lock 하나로 순서대로 실행하고, 이벤트 루프를 막지 않도록 스레드에서 실행
+- ISM_Server / PEM_Server / Main_Server의 같은 이름 최상위 모듈 (utils, model, ...)은 ModuleNamespace로 분리
+  (모델 로드 때 필요한 모듈을 찾아 두고, 추론은 sys.modules를 바꾸지 않고 실행)
+"""
+import abc
+import asyncio
+import importlib
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import cv2
+import numpy as np
+import torch
+
+from sam6d_common.rle import detections_to_bop, mask_to_rle, rle_to_mask
+from sam6d_common.tracing import span
+
+try:
+    from ..utils.path_utils import get_project_root
+    from ..utils.input_frame import InputFrame
+    from ..utils.artifact_writer import ARTIFACT_WRITER
+except ImportError:
+    from utils.path_utils import get_project_root
+    from utils.input_frame import InputFrame
+    from utils.artifact_writer import ARTIFACT_WRITER
+
+
+# http: ISM / PEM 서버 호출 (기존 동작) / inprocess: 이 프로세스에서 모델 실행
+INFERENCE_MODE = os.getenv("MAIN_SERVER_INFERENCE_MODE", "http").lower()
+# in-process 모델 디바이스 (auto면 CUDA가 있으면 cuda, 없으면 cpu)
+INPROCESS_DEVICE = os.getenv("MAIN_SERVER_INPROCESS_DEVICE", "auto").lower()
+
+PROJECT_ROOT = str(get_project_root())
+ISM_ROOT = os.path.join(PROJECT_ROOT, "ISM_Server")
+PEM_ROOT = os.path.join(PROJECT_ROOT, "PEM_Server")
+SAM6D_ROOT = os.getenv("MAIN_SERVER_SAM6D_ROOT") or os.path.join(PROJECT_ROOT, "SAM-6D", "SAM-6D")
+PEM_CONFIG_PATH = os.getenv("MAIN_SERVER_PEM_CONFIG_PATH") or os.path.join(
+    SAM6D_ROOT, "Pose_Estimation_Model", "config", "base.yaml"
+)
+PEM_CHECKPOINT_PATH = os.getenv("MAIN_SERVER_PEM_CHECKPOINT_PATH") or os.path.join(
+    SAM6D_ROOT, "Pose_Estimation_Model", "checkpoints", "sam-6d-pem-base.pth"
+)
+
+# ISM 서버 응답과 같이 상위 10개 감지 결과만 응답에 포함, PEM 서버와 같이 상위 5개만 포즈 추정
+ISM_MAX_OBJECTS = 10
+PEM_TOP_K = 5
+
+_IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+_IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+
+def resolve_device(name: str = INPROCESS_DEVICE) -> torch.device:
+    if name == "auto":
+        return torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    if name.startswith("cuda") and not torch.cuda.is_available():
+        print("[WARN] CUDA requested for in-process inference but not available, falling back to CPU")
+        return torch.device("cpu")
+    return torch.device(name)
+
+
+class ModuleNamespace:
+    """서버 하나의 sys.path / sys.modules를 분리해서 같은 이름의 최상위 모듈이 섞이지 않게 함
+
+    active() 안에서만 이 서버의 경로가 sys.path 앞에 오고 이 서버의 모듈이 sys.modules에 보인다.
+    나갈 때 Main 서버의 모듈 / sys.path를 되돌리고, 그 사이 import한 이 서버의 모듈과
+    추가된 sys.path 항목은 다음 진입을 위해 보관한다. 서드파티 패키지는 그대로 공유한다.
+
+    active()는 프로세스 전체의 sys.modules / sys.path / cwd를 바꾸므로 (그동안 다른 스레드의
+    import가 이 서버의 모듈을 볼 수 있음) 모델 로드 때만 사용한다. 요청 처리에 필요한 모듈은
+    로드 때 import_module()로 찾아 두고 active() 밖에서 호출한다.
+    """
+
+    def __init__(self, name: str, paths: List[str]):
+        self.name = name
+        self.paths = [os.path.abspath(p) for p in paths]
+        self.modules: Dict[str, ModuleType] = {}
+        self._lock = threading.RLock()
+
+    def _top_level_names(self) -> Set[str]:
+        """이 서버 경로에 있는 최상위 모듈 / 패키지 이름"""
+        names = {name.split(".")[0] for name in self.modules}
+        for path in self.paths:
+            if not os.path.isdir(path):
+                continue
+            for entry in os.listdir(path):
+                if entry.endswith(".py"):
+                    names.add(entry[:-3])
+                elif os.path.isdir(os.path.join(path, entry)) and not entry.startswith((".", "__")):
+                    names.add(entry)
+        return names
+
+    def _owns(self, name: str, module: Any, names: Set[str]) -> bool:
+        if name.split(".")[0] in names:
+            return True
+        module_file = getattr(module, "__file__", None) or ""
+        return any(module_file.startswith(path + os.sep) for path in self.paths)
+
+    def import_module(self, name: str) -> ModuleType:
+        """이 서버의 모듈을 import해서 반환 (모듈의 함수는 active() 밖에서 호출해도 됨)"""
+        with self.active():
+            return importlib.import_module(name)
+
+    @contextmanager
+    def active(self, cwd: Optional[str] = None):
+        with self._lock:
+            saved_path = list(sys.path)
+            saved_modules = dict(sys.modules)
+            names = self._top_level_names()
+            for name in list(sys.modules):
+                if name.split(".")[0] in names:
+                    del sys.modules[name]
+            sys.modules.update(self.modules)
+            sys.path[:0] = self.paths
+            importlib.invalidate_caches()
+            previous_cwd = os.getcwd()
+            if cwd:
+                os.chdir(cwd)
+            try:
+                yield self
+            finally:
+                if cwd:
+                    os.chdir(previous_cwd)
+                self.paths += [p for p in sys.path if p not in saved_path and p not in self.paths]
+                names = self._top_level_names()
+                for name, module in list(sys.modules.items()):
+                    if saved_modules.get(name) is not module and self._owns(name, module, names):
+                        self.modules[name] = module
+                        del sys.modules[name]
+                for name in names:
+                    sys.modules.pop(name, None)
+                sys.modules.update({k: v for k, v in saved_modules.items() if k.split(".")[0] in names})
+                sys.path[:] = saved_path
+                importlib.invalidate_caches()
+
+
+@dataclass
+class Detections:
+    """ISM 감지 결과 (점수 내림차순), ISM → PEM으로 텐서 그대로 전달"""
+    masks: torch.Tensor       # N x H x W bool
+    boxes: torch.Tensor       # N x 4 (x1, y1, x2, y2)
+    scores: torch.Tensor      # N
+    object_ids: torch.Tensor  # N
+
+    def __len__(self) -> int:
+        return int(self.scores.shape[0])
+
+    def top(self, k: int) -> "Detections":
+        order = torch.argsort(self.scores, descending=True)[:k]
+        return Detections(self.masks[order], self.boxes[order], self.scores[order], self.object_ids[order])
+
+    def to_response(self, max_objects: int = ISM_MAX_OBJECTS) -> Dict[str, Any]:
+        """ISM 서버 응답의 detections 형식 (마스크는 비압축 COCO RLE)"""
+        top = self.top(max_objects)
+        masks = top.masks.cpu().numpy()
+        return {
+            "masks": [mask_to_rle(mask) for mask in masks],
+            "boxes": top.boxes.cpu().tolist(),
+            "scores": top.scores.cpu().tolist(),
+            "object_ids": top.object_ids.cpu().tolist(),
+        }
+
+    @classmethod
+    def from_response(cls, detections: Dict[str, Any], image_shape: Optional[Tuple[int, int]]) -> "Detections":
+        """ISM 응답 형식 (결과 캐시 적중 / PEM 요청 seg_data 변환)에서 생성, 마스크가 없으면 박스 영역"""
+        boxes = list(detections.get("boxes") or [])
+        scores = list(detections.get("scores") or [])
+        object_ids = list(detections.get("object_ids") or [])
+        masks = list(detections.get("masks") or [])
+        n = min(len(boxes), len(scores))
+        mask_list = []
+        for i in range(n):
+            item = masks[i] if i < len(masks) else None
+            if isinstance(item, dict) and item.get("size") and isinstance(item.get("counts"), list):
+                mask_list.append(rle_to_mask(item))
+                continue
+            if image_shape is None:
+                raise ValueError("image shape is required to build masks from boxes")
+            h, w = image_shape
+            x1, y1, x2, y2 = [int(round(float(v))) for v in boxes[i]]
+            mask = np.zeros((h, w), dtype=bool)
+            mask[max(0, y1):min(h, max(y2, y1 + 1)), max(0, x1):min(w, max(x2, x1 + 1))] = True
+            mask_list.append(mask)
+        shape = tuple(mask_list[0].shape) if mask_list else tuple(image_shape or (0, 0))
+        return cls(
+            masks=torch.from_numpy(np.stack(mask_list)) if mask_list else torch.zeros((0,) + shape, dtype=torch.bool),
+            boxes=torch.tensor(boxes[:n], dtype=torch.float32).reshape(-1, 4),
+            scores=torch.tensor(scores[:n], dtype=torch.float32),
+            object_ids=torch.tensor(
+                [int(object_ids[i]) if i < len(object_ids) else 0 for i in range(n)], dtype=torch.long
+            ),
+        )
+
+
+def build_pem_inputs(
+    rgb: np.ndarray,
+    depth: np.ndarray,
+    cam_params: Dict[str, Any],
+    detections: Detections,
+    model_points: np.ndarray,
+    cfg: Any,
+    device: Any,
+    data_utils: ModuleType,
+) -> Tuple[Optional[Dict[str, torch.Tensor]], np.ndarray, np.ndarray, List[Dict[str, Any]]]:
+    """SAM-6D PEM 테스트 입력 (get_test_data와 같은 처리)을 파일 대신 배열 / 마스크 텐서에서 생성
+
+    rgb: H x W x 3 RGB, depth: 원본 depth (cam_params["depth_scale"] 적용 전).
+    cfg: test_dataset 설정 (n_sample_observed_point / rgb_mask_flag / img_size).
+    data_utils: PEM ModuleNamespace에서 찾아 둔 data_utils 모듈.
+    유효한 인스턴스가 없으면 input_data는 None.
+    """
+    get_bbox = data_utils.get_bbox
+    get_point_cloud_from_depth = data_utils.get_point_cloud_from_depth
+    get_resize_rgb_choose = data_utils.get_resize_rgb_choose
+
+    K = np.array(cam_params["cam_K"], dtype=np.float64).reshape(3, 3)
+    whole_image = rgb.astype(np.uint8)
+    whole_depth = depth.astype(np.float32) * float(cam_params.get("depth_scale", 1.0)) / 1000.0
+    whole_pts = get_point_cloud_from_depth(whole_depth, K)
+    radius = np.max(np.linalg.norm(model_points, axis=1))
+
+    all_rgb, all_cloud, all_rgb_choose, all_score, all_dets = [], [], [], [], []
+    masks = detections.masks.cpu().numpy()
+    for i, full_mask in enumerate(masks):
+        mask = np.logical_and(full_mask > 0, whole_depth > 0)
+        if np.sum(mask) <= 32:
+            continue
+        y1, y2, x1, x2 = get_bbox(mask)
+        mask = mask[y1:y2, x1:x2]
+        choose = mask.astype(np.float32).flatten().nonzero()[0]
+
+        cloud = whole_pts[y1:y2, x1:x2, :].reshape(-1, 3)[choose, :]
+        center = np.mean(cloud, axis=0)
+        flag = np.linalg.norm(cloud - center[None, :], axis=1) < radius * 1.2
+        if np.sum(flag) < 4:
+            continue
+        choose = choose[flag]
+        cloud = cloud[flag]
+
+        n_sample = cfg.n_sample_observed_point
+        choose_idx = np.random.choice(np.arange(len(choose)), n_sample, replace=len(choose) <= n_sample)
+        choose = choose[choose_idx]
+        cloud = cloud[choose_idx]
+
+        crop = whole_image[y1:y2, x1:x2, :][:, :, ::-1]
+        if cfg.rgb_mask_flag:
+            crop = crop * (mask[:, :, None] > 0).astype(np.uint8)
+        crop = cv2.resize(np.ascontiguousarray(crop), (cfg.img_size, cfg.img_size), interpolation=cv2.INTER_LINEAR)
+        crop = ((crop.astype(np.float32) / 255.0 - _IMAGENET_MEAN) / _IMAGENET_STD).transpose(2, 0, 1)
+        rgb_choose = get_resize_rgb_choose(choose, [y1, y2, x1, x2], cfg.img_size)
+
+        score = float(detections.scores[i])
+        bx1, by1, bx2, by2 = [float(v) for v in detections.boxes[i]]
+        all_rgb.append(torch.from_numpy(np.ascontiguousarray(crop)))
+        all_cloud.append(torch.from_numpy(cloud.astype(np.float32)))
+        all_rgb_choose.append(torch.from_numpy(np.asarray(rgb_choose)).long())
+        all_score.append(score)
+        all_dets.append({
+            "scene_id": 0,
+            "image_id": 0,
+            "category_id": int(detections.object_ids[i]) + 1,
+            "bbox": [bx1, by1, bx2 - bx1, by2 - by1],
+            "score": score,
+            "time": 0.0,
+            "segmentation": mask_to_rle(full_mask),
+        })
+
+    if not all_cloud:
+        return None, whole_image, whole_pts.reshape(-1, 3), all_dets
+
+    n = len(all_cloud)
+    input_data = {
+        "pts": torch.stack(all_cloud).to(device),
+        "rgb": torch.stack(all_rgb).to(device),
+        "rgb_choose": torch.stack(all_rgb_choose).to(device),
+        "score": torch.tensor(all_score, dtype=torch.float32).to(device),
+        "model": torch.from_numpy(model_points.astype(np.float32)).unsqueeze(0).repeat(n, 1, 1).to(device),
+        "K": torch.from_numpy(K.astype(np.float32)).unsqueeze(0).repeat(n, 1, 1).to(device),
+    }
+    return input_data, whole_image, whole_pts.reshape(-1, 3), all_dets
+
+
+class IsmBackend(abc.ABC):
+    """in-process ISM 백엔드: 프레임 → Detections"""
+
+    device = torch.device("cpu")
+
+    def load(self):
+        """모델 로드 (InProcessInference.load에서 한 번 호출)"""
+
+    @abc.abstractmethod
+    def segment(self, frame: InputFrame, cam_params: Dict[str, Any], template_dir: str, cad_path: str) -> Detections:
+        """프레임 하나의 감지 결과 (점수 내림차순)"""
+
+
+class PemBackend(abc.ABC):
+    """in-process PEM 백엔드: 프레임 + Detections → PEM 서버 응답과 같은 키 (pose_scores / pred_rot / pred_trans / ...)"""
+
+    device = torch.device("cpu")
+
+    def load(self):
+        """모델 로드 (InProcessInference.load에서 한 번 호출)"""
+
+    @abc.abstractmethod
+    def estimate(
+        self,
+        frame: InputFrame,
+        cam_params: Dict[str, Any],
+        detections: Detections,
+        template_dir: str,
+        cad_path: str,
+    ) -> Dict[str, Any]:
+        """감지 결과별 포즈 추정"""
+
+
+class Sam6dIsmBackend(IsmBackend):
+    """SAM-6D Instance_Segmentation_Model (ISM 서버와 같은 설정 / 템플릿 캐시)"""
+
+    def __init__(self, device: Optional[torch.device] = None, cache_size: int = int(os.getenv("ISM_MAX_CACHE_SIZE", 20))):
+        self.device = device or resolve_device()
+        self.cache_size = cache_size
+        self.namespace = ModuleNamespace(
+            "ism", [ISM_ROOT, os.path.join(SAM6D_ROOT, "Instance_Segmentation_Model")]
+        )
+        self.model = None
+        # load()에서 찾아 두는 ISM 모듈 (추론은 namespace 밖에서 호출)
+        self.core = None
+        self.template_pack = None
+
+    def load(self):
+        with self.namespace.active(cwd=ISM_ROOT):
+            from hydra import compose, initialize_config_dir
+            from hydra.utils import instantiate
+            from lru_cache import LRUCache
+
+            with initialize_config_dir(version_base=None, config_dir=os.path.join(ISM_ROOT, "configs")):
+                cfg = compose(config_name="run_inference.yaml")
+            with initialize_config_dir(version_base=None, config_dir=os.path.join(ISM_ROOT, "configs", "model")):
+                cfg.model = compose(config_name="ISM_sam.yaml")
+            model = instantiate(cfg.model)
+
+            model.descriptor_model.model = model.descriptor_model.model.to(self.device)
+            model.descriptor_model.model.device = self.device
+            if hasattr(model.segmentor_model, "predictor"):
+                model.segmentor_model.predictor.model = model.segmentor_model.predictor.model.to(self.device)
+            else:
+                model.segmentor_model.model.setup_model(device=self.device, verbose=True)
+            self.model = model
+            self.template_cache = LRUCache(capacity=self.cache_size)
+            self.cad_cache = LRUCache(capacity=self.cache_size)
+            self.core = importlib.import_module("run_inference_custom_function")
+            self.template_pack = importlib.import_module("utils.template_pack")
+        print(f"[INFO] In-process ISM model loaded on {self.device}")
+
+    def _templates(self, template_dir: str):
+        cached = self.template_cache.get(template_dir)
+        if cached:
+            return cached
+        pack = self.template_pack
+        pack_path = pack.find_template_pack(template_dir)
+        bundle = None
+        if pack_path is not None:
+            try:
+                bundle = pack.load_templates_from_pack(pack.TemplatePack(pack_path), self.device)
+            except Exception as e:
+                print(f"[WARN] Failed to load template pack {pack_path}, falling back to loose files: {e}")
+        if bundle is None:
+            bundle = self.core.load_templates_from_files(template_dir, self.device)
+        self.template_cache.put(template_dir, bundle)
+        return bundle
+
+    def _cad_points(self, cad_path: str) -> np.ndarray:
+        import trimesh
+
+        cached = self.cad_cache.get(cad_path)
+        if cached is not None:
+            return cached
+        points = trimesh.load_mesh(cad_path).sample(2048).astype(np.float32) / 1000.0
+        self.cad_cache.put(cad_path, points)
+        return points
+
+    def segment(self, frame, cam_params, template_dir, cad_path):
+        from PIL import Image
+        import io
+
+        templates_data, templates_masks, templates_boxes = self._templates(template_dir)
+        cad_points = self._cad_points(cad_path)
+        rgb = np.ascontiguousarray(frame.rgb[:, :, ::-1])
+        # ISM 서버와 같은 depth 변환 (결과를 HTTP 모드와 맞춤)
+        depth = np.array(Image.open(io.BytesIO(frame.depth_bytes)).convert("L"))
+        depth_batch = self.core.batch_input_data_from_params(depth, cam_params, self.device)
+        result = self.core.run_inference_core(
+            model=self.model,
+            rgb_array=rgb,
+            depth_batch=depth_batch,
+            cad_points=cad_points,
+            templates_data=templates_data,
+            templates_masks=templates_masks,
+            templates_boxes=templates_boxes,
+            device=self.device,
+            output_dir=None,
+            save_async=False,
+        )
+        det = result["detections"]
+        order = torch.argsort(torch.as_tensor(det.scores), descending=True)[:ISM_MAX_OBJECTS]
+        masks = det.masks[order]
+        masks = masks.full() if hasattr(masks, "full") else torch.as_tensor(masks)
+        return Detections(
+            masks=masks.bool(),
+            boxes=torch.as_tensor(det.boxes)[order].float(),
+            scores=torch.as_tensor(det.scores)[order].float(),
+            object_ids=torch.as_tensor(det.object_ids)[order].long(),
+        )
+
+
+class Sam6dPemBackend(PemBackend):
+    """SAM-6D Pose_Estimation_Model (PEM 서버의 ModelManager로 로드 / 템플릿 특징 캐시)"""
+
+    def __init__(self, device: Optional[torch.device] = None):
+        self.device = device or resolve_device()
+        self.namespace = ModuleNamespace("pem", [PEM_ROOT])
+        self.manager = None
+        # load()에서 찾아 두는 PEM 모듈 (추론은 namespace 밖에서 호출)
+        self.core = None
+        self.data_utils = None
+
+    def load(self):
+        with self.namespace.active(cwd=PEM_ROOT):
+            from core.config import settings
+
+            # PEM 서버 설정의 컨테이너 경로 대신 이 프로세스 기준 경로 (ModelManager 생성 전에 설정)
+            settings.workspace_root = PROJECT_ROOT
+            settings.sam6d_root = os.path.join(SAM6D_ROOT, "Pose_Estimation_Model")
+            settings.pem_server_root = PEM_ROOT
+            from core.model_manager import get_model_manager
+
+            manager = get_model_manager()
+            if not manager.load_model(PEM_CONFIG_PATH, PEM_CHECKPOINT_PATH, self.device.type):
+                raise RuntimeError("In-process PEM model loading failed")
+            self.manager = manager
+            self.core = importlib.import_module("run_inference_custom_function")
+            self.data_utils = importlib.import_module("data_utils")
+        print(f"[INFO] In-process PEM model loaded on {self.manager.device}")
+
+    def estimate(self, frame, cam_params, detections, template_dir, cad_path):
+        manager = self.manager
+        _, all_tem_pts, _, all_tem_feat = manager.get_template_bundle(template_dir)
+        cad_points = manager.get_cad_points(cad_path)
+        n_sample = manager.cfg.test_dataset.n_sample_model_point
+        model_points = cad_points[np.random.choice(len(cad_points), n_sample, replace=len(cad_points) < n_sample)]
+        input_data, whole_image, _, dets = build_pem_inputs(
+            frame.rgb[:, :, ::-1], frame.depth, cam_params, detections, model_points,
+            manager.cfg.test_dataset, manager.device, self.data_utils,
+        )
+        if input_data is None:
+            raise ValueError("No valid detections for pose estimation (mask / depth overlap too small)")
+        input_data["whole_image"] = whole_image
+        input_data["model_points"] = cad_points
+        return self.core.run_pose_estimation_core(
+            manager.model, input_data, all_tem_pts, all_tem_feat, manager.device, dets, None, save_async=False
+        )
+
+
+class InProcessInference:
+    """ISM / PEM 백엔드를 WorkflowService 호출 인터페이스 (call_ism / call_pem)로 제공"""
+
+    def __init__(self, ism: IsmBackend, pem: PemBackend):
+        self.ism = ism
+        self.pem = pem
+        self.loaded = False
+        # CUDA 컨텍스트 하나를 공유하므로 GPU 작업은 순서대로
+        self._gpu_lock = threading.Lock()
+        self.artifact_writer = ARTIFACT_WRITER
+
+    def load(self):
+        with self._gpu_lock:
+            if not self.loaded:
+                self.ism.load()
+                self.pem.load()
+                self.loaded = True
+
+    async def _run(self, fn, *args):
+        def run():
+            with self._gpu_lock:
+                return fn(*args)
+
+        return await asyncio.to_thread(run)
+
+    async def call_ism(
+        self,
+        frame: InputFrame,
+        cam_params: Dict[str, Any],
+        cad_path: str,
+        template_dir: str,
+        output_dir: Optional[str],
+        parent_output_dir: Optional[str] = None,
+        save_outputs: bool = True,
+    ) -> Dict[str, Any]:
+        """_call_ism_server와 같은 인자 / 응답, 감지 텐서는 frame.tensors["ism"]으로 PEM에 전달"""
+        start = time.perf_counter()
+        try:
+            with span("ism.inprocess"):
+                detections = await self._run(self.ism.segment, frame, cam_params, template_dir, cad_path)
+        except Exception as e:
+            error_msg = f"In-process ISM inference failed: {e}"
+            print(f"[ERROR] {error_msg}")
+            return {"success": False, "error": error_msg}
+        frame.tensors["ism"] = detections
+        inference_time = time.perf_counter() - start
+        response = detections.to_response()
+        print(f"[INFO] ISM 추론 완료 (in-process): {len(response['scores'])}개 객체 탐지")
+        if save_outputs and output_dir:
+            self.artifact_writer.write_json(
+                os.path.join(output_dir, "detection_ism.json"), detections_to_bop(response, inference_time)
+            )
+        return {
+            "success": True,
+            "detections": response,
+            "inference_time": inference_time,
+            "template_dir_used": template_dir,
+            "cad_path_used": cad_path,
+            "output_dir_used": output_dir,
+        }
+
+    async def call_pem(
+        self,
+        frame: InputFrame,
+        cam_params: Dict[str, Any],
+        cad_path: str,
+        template_dir: str,
+        ism_result: Dict[str, Any],
+        output_dir: Optional[str],
+        parent_output_dir: Optional[str] = None,
+        frame_guess: bool = False,
+        save_outputs: bool = True,
+        image_shape: Optional[Tuple[int, int]] = None,
+    ) -> Dict[str, Any]:
+        """_call_pem_server와 같은 인자 / 응답, 같은 요청의 ISM 감지 텐서를 그대로 사용
+
+        ISM 결과가 결과 캐시에서 온 경우 (텐서 없음)에는 응답의 RLE 마스크에서 만든다.
+        """
+        start = time.perf_counter()
+        detections = frame.tensors.get("ism")
+        try:
+            if detections is None:
+                detections = Detections.from_response((ism_result or {}).get("detections") or {}, image_shape)
+        except Exception as e:
+            print(f"[WARN] Failed to rebuild ISM detections: {e}")
+            detections = None
+        if detections is None or len(detections) == 0:
+            return {"success": False, "error": "Failed to extract seg_data from ISM result"}
+
+        try:
+            with span("pem.inprocess"):
+                result = await self._run(
+                    self.pem.estimate, frame, cam_params, detections.top(PEM_TOP_K), template_dir, cad_path
+                )
+        except Exception as e:
+            error_msg = f"In-process PEM inference failed: {e}"
+            print(f"[ERROR] {error_msg}")
+            return {"success": False, "error": error_msg}
+
+        response = {
+            "success": True,
+            "detections": result.get("detections", []),
+            "pose_scores": np.asarray(result["pose_scores"]).tolist(),
+            "pred_rot": np.asarray(result["pred_rot"]).tolist(),
+            "pred_trans": np.asarray(result["pred_trans"]).tolist(),
+            "num_detections": int(result["num_detections"]),
+            "inference_time": float(result.get("inference_time", time.perf_counter() - start)),
+            "template_dir_used": template_dir,
+            "cad_path_used": cad_path,
+            "output_dir_used": output_dir,
+        }
+        print(f"[INFO] PEM 추론 완료 (in-process): {response['num_detections']}개 포즈 추정")
+        if save_outputs and output_dir:
+            self.artifact_writer.write_json(os.path.join(output_dir, "detection_pem.json"), response["detections"])
+        return response
+
+
+# 전역 in-process 추론 인스턴스 (MAIN_SERVER_INFERENCE_MODE=inprocess일 때만 생성)
+_inprocess_inference: Optional[InProcessInference] = None
+
+
+def get_inprocess_inference() -> InProcessInference:
+    """in-process 추론 인스턴스 반환 (모델은 load()에서 로드)"""
+    global _inprocess_inference
+    if _inprocess_inference is None:
+        device = resolve_device()
+        _inprocess_inference = InProcessInference(Sam6dIsmBackend(device), Sam6dPemBackend(device))
+    return _inprocess_inference
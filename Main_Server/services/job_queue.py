@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+파이프라인 작업 큐 (비동기 작업 API)
+
+- 요청을 큐에 넣고 job_id를 바로 반환, 상태는 폴링 / 스트리밍으로 확인
+- 고정 크기 워커 풀이 우선순위 순서로 실행 (interactive가 batch보다 먼저)
+- 큐 깊이가 임계값을 넘으면 새 작업을 거절 (batch는 더 낮은 임계값에서 거절)
+- 단계별 진행 상황 (render / ism / pem)을 기록
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("MAIN_SERVER_JOB_WORKERS", "2"))
+# 대기 작업 수가 이 값 이상이면 interactive 작업도 거절
+JOB_QUEUE_MAX_DEPTH = int(os.getenv("MAIN_SERVER_JOB_QUEUE_MAX_DEPTH", "32"))
+# 대기 작업 수가 이 값 이상이면 batch 작업 거절 (interactive 여유분 확보)
+JOB_QUEUE_BATCH_MAX_DEPTH = int(os.getenv("MAIN_SERVER_JOB_QUEUE_BATCH_MAX_DEPTH", "16"))
+# 완료된 작업을 보관하는 최대 개수
+JOB_HISTORY_SIZE = int(os.getenv("MAIN_SERVER_JOB_HISTORY_SIZE", "500"))
+
+PRIORITIES = {"interactive": 0, "batch": 1}
+
+# 단계 이름 -> 진행률 (%)
+STAGE_PROGRESS = {"queued": 0, "capture": 5, "render": 10, "ism": 30, "pem": 65, "finalize": 95}
+
+PENDING, RUNNING, COMPLETED, FAILED, CANCELLED = "pending", "running", "completed", "failed", "cancelled"
+FINISHED_STATES = {COMPLETED, FAILED, CANCELLED}
+
+
+class JobQueueFull(Exception):
+    """큐 깊이가 임계값을 넘어 작업을 받을 수 없음"""
+
+    def __init__(self, depth: int, limit: int, priority: str):
+        super().__init__(f"Job queue is full ({depth}/{limit} pending, priority={priority})")
+        self.depth = depth
+        self.limit = limit
+        self.priority = priority
+
+
+@dataclass
+class PipelineJob:
+    """큐에 들어간 파이프라인 작업"""
+    job_id: str
+    job_type: str
+    priority: str
+    run: Callable[[Callable[[str], None]], Awaitable[Dict[str, Any]]]
+    params: Dict[str, Any] = field(default_factory=dict)
+    status: str = PENDING
+    stage: str = "queued"
+    progress: int = 0
+    stages: List[Dict[str, Any]] = field(default_factory=list)
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    completed_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error_message: Optional[str] = None
+    task: Optional[asyncio.Task] = None
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def set_stage(self, stage: str):
+        """단계 전환 기록 (이전 단계 소요 시간 포함)"""
+        now = time.time()
+        if self.stages and self.stages[-1].get("elapsed_sec") is None:
+            self.stages[-1]["elapsed_sec"] = round(now - self.stages[-1]["started_at"], 3)
+        self.stage = stage
+        self.progress = max(self.progress, STAGE_PROGRESS.get(stage, self.progress))
+        self.stages.append({"stage": stage, "started_at": now, "elapsed_sec": None})
+        self.notify()
+
+    def finish(self, status: str, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        self.set_stage(status)
+        self.stages[-1]["elapsed_sec"] = 0.0
+        self.status = status
+        self.result = result
+        self.error_message = error
+        self.completed_at = time.time()
+        if status == COMPLETED:
+            self.progress = 100
+        self.notify()
+
+    def notify(self):
+        # 대기 중인 스트림을 깨우고 다음 변경을 위한 새 이벤트로 교체
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        def iso(ts: Optional[float]) -> Optional[str]:
+            return datetime.fromtimestamp(ts).isoformat() if ts is not None else None
+
+        data = {
+            "job_id": self.job_id,
+            "job_type": self.job_type,
+            "priority": self.priority,
+            "status": self.status,
+            "stage": self.stage,
+            "progress": self.progress,
+            "stages": [
+                {"stage": s["stage"], "started_at": iso(s["started_at"]), "elapsed_sec": s["elapsed_sec"]}
+                for s in self.stages
+            ],
+            "submitted_at": iso(self.submitted_at),
+            "started_at": iso(self.started_at),
+            "completed_at": iso(self.completed_at),
+            "error_message": self.error_message,
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+
+class JobQueue:
+    """우선순위 작업 큐 + 고정 크기 워커 풀"""
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        max_depth: int = JOB_QUEUE_MAX_DEPTH,
+        batch_max_depth: int = JOB_QUEUE_BATCH_MAX_DEPTH,
+        history_size: int = JOB_HISTORY_SIZE,
+    ):
+        self.num_workers = max(1, workers)
+        self.max_depth = max_depth
+        self.batch_max_depth = min(batch_max_depth, max_depth)
+        self.history_size = history_size
+        self.jobs: "OrderedDict[str, PipelineJob]" = OrderedDict()
+        self.stats = {"submitted": 0, "rejected": 0, "completed": 0, "failed": 0, "cancelled": 0}
+        self._seq = 0
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._workers: List[asyncio.Task] = []
+
+    def _ensure_workers(self):
+        # 워커와 큐는 실행 중인 이벤트 루프에 묶이므로 루프가 바뀌면 새로 생성
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._queue = asyncio.PriorityQueue()
+            self._loop = loop
+            self._workers = []
+        alive = [w for w in self._workers if not w.done()]
+        for i in range(len(alive), self.num_workers):
+            # 첫 요청의 context (추적 등)를 물려받지 않도록 빈 context에서 시작
+            alive.append(contextvars.Context().run(asyncio.create_task, self._worker(), name=f"pipeline-worker-{i}"))
+        self._workers = alive
+
+    @property
+    def depth(self) -> int:
+        """대기 중인 작업 수"""
+        return sum(1 for job in self.jobs.values() if job.status == PENDING)
+
+    def submit(
+        self,
+        job_type: str,
+        run: Callable[[Callable[[str], None]], Awaitable[Dict[str, Any]]],
+        priority: str = "interactive",
+        params: Optional[Dict[str, Any]] = None,
+    ) -> PipelineJob:
+        """작업 등록 (run은 진행 콜백을 받아 결과 Dict를 반환하는 코루틴 함수)
+
+        Raises:
+            ValueError: 알 수 없는 priority
+            JobQueueFull: 큐 깊이가 임계값 이상
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority} (expected one of {list(PRIORITIES)})")
+        self._ensure_workers()
+
+        depth = self.depth
+        limit = self.max_depth if priority == "interactive" else self.batch_max_depth
+        if depth >= limit:
+            self.stats["rejected"] += 1
+            raise JobQueueFull(depth, limit, priority)
+
+        job = PipelineJob(
+            job_id=uuid.uuid4().hex,
+            job_type=job_type,
+            priority=priority,
+            run=run,
+            params=params or {},
+        )
+        job.set_stage("queued")
+        self.jobs[job.job_id] = job
+        self._seq += 1
+        self._queue.put_nowait((PRIORITIES[priority], self._seq, job.job_id))
+        self.stats["submitted"] += 1
+        self._trim_history()
+        return job
+
+    async def _worker(self):
+        while True:
+            _, _, job_id = await self._queue.get()
+            job = self.jobs.get(job_id)
+            try:
+                if job is None or job.status != PENDING:
+                    continue
+                job.status = RUNNING
+                job.started_at = time.time()
+                # 작업 단위 취소를 위해 별도 태스크로 실행 (워커는 계속 동작)
+                job.task = asyncio.create_task(job.run(job.set_stage))
+                try:
+                    result = await job.task
+                except asyncio.CancelledError:
+                    if job.status == CANCELLED:
+                        continue
+                    raise
+                except Exception as e:
+                    logger.error(f"[JOB] {job_id} 실패: {e}", exc_info=True)
+                    if job.status in FINISHED_STATES:
+                        continue
+                    job.finish(FAILED, error=str(e))
+                    self.stats["failed"] += 1
+                    continue
+                if job.status in FINISHED_STATES:
+                    # 태스크 완료와 워커 재개 사이에 취소된 경우 (취소 상태 유지)
+                    continue
+                if result.get("success", False):
+                    job.finish(COMPLETED, result=result)
+                    self.stats["completed"] += 1
+                else:
+                    job.finish(FAILED, result=result, error=result.get("error"))
+                    self.stats["failed"] += 1
+            finally:
+                if job is not None:
+                    job.task = None
+                self._queue.task_done()
+
+    def get(self, job_id: str) -> Optional[PipelineJob]:
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """대기 / 실행 중인 작업 취소 (이미 끝난 작업이면 False)"""
+        job = self.jobs.get(job_id)
+        if job is None or job.status in FINISHED_STATES:
+            return False
+        running_task = job.task if job.status == RUNNING else None
+        if running_task is not None and running_task.done():
+            # 실행은 끝났고 워커가 결과를 기록하기 직전
+            return False
+        job.finish(CANCELLED, error="cancelled")
+        self.stats["cancelled"] += 1
+        if running_task is not None:
+            running_task.cancel()
+        return True
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """대기 중인 작업의 실행 순서 (0부터), 대기 중이 아니면 None"""
+        job = self.jobs.get(job_id)
+        if job is None or job.status != PENDING:
+            return None
+        key = (PRIORITIES[job.priority], job.submitted_at)
+        return sum(
+            1 for other in self.jobs.values()
+            if other.status == PENDING and (PRIORITIES[other.priority], other.submitted_at) < key
+        )
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[PipelineJob]:
+        jobs = [job for job in reversed(self.jobs.values()) if status is None or job.status == status]
+        return jobs[:limit]
+
+    def _trim_history(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.status in FINISHED_STATES]
+        for job_id in finished[: max(0, len(finished) - self.history_size)]:
+            del self.jobs[job_id]
+
+    def status(self) -> Dict[str, Any]:
+        counts = {s: 0 for s in (PENDING, RUNNING, COMPLETED, FAILED, CANCELLED)}
+        for job in self.jobs.values():
+            counts[job.status] += 1
+        return {
+            "workers": self.num_workers,
+            "max_depth": self.max_depth,
+            "batch_max_depth": self.batch_max_depth,
+            "depth": counts[PENDING],
+            "jobs": counts,
+            **self.stats,
+        }
+
+    async def shutdown(self):
+        for worker in self._workers:
+            worker.cancel()
+        for worker in self._workers:
+            try:
+                await worker
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._workers = []
+
+
+# 전역 작업 큐 인스턴스
+_job_queue = None
+
+def get_job_queue() -> JobQueue:
+    """작업 큐 인스턴스 반환 (싱글톤)"""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue()
+    return _job_queue
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+ISM / PEM 서버 replica 풀 (객체 affinity 라우팅)
+
+서비스마다 여러 replica URL을 두고, (class_name, object_name)으로 consistent hashing해서
+같은 객체는 항상 같은 replica로 보낸다. replica별 템플릿 / 디스크립터 캐시
+(ISM_Server/lru_cache.py, PEM_Server/core/cache.py)가 카탈로그의 일정한 부분만 담당하게 되어
+캐시 적중률이 유지된다.
+
+- 해시 링의 첫 replica가 비정상 (연결 실패 후 cooldown 중)이거나 포화 상태
+  (처리 중인 요청 수 >= max_outstanding)면, 사용 가능한 replica 중 처리 중인 요청이
+  가장 적은 곳으로 보낸다 (least-outstanding).
+- 라우팅 키가 없으면 처음부터 least-outstanding (동률이면 돌아가며 선택).
+- replica 추가 / 제거 시 해당 replica 몫의 객체만 다른 replica로 옮겨간다 (가상 노드).
+"""
+import bisect
+import hashlib
+import itertools
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+
+# 쉼표로 구분한 replica base URL 목록
+ISM_REPLICAS = os.getenv("MAIN_SERVER_ISM_REPLICAS", "http://localhost:8002")
+PEM_REPLICAS = os.getenv("MAIN_SERVER_PEM_REPLICAS", "http://localhost:8003")
+# replica 하나가 동시에 처리 중일 수 있는 요청 수 (이상이면 포화로 보고 다른 replica 사용)
+REPLICA_MAX_OUTSTANDING = int(os.getenv("MAIN_SERVER_REPLICA_MAX_OUTSTANDING", "2"))
+# 연결 실패 후 라우팅에서 제외하는 시간 (초)
+REPLICA_COOLDOWN_SEC = float(os.getenv("MAIN_SERVER_REPLICA_COOLDOWN_SEC", "10"))
+# replica당 해시 링 가상 노드 수
+REPLICA_VNODES = int(os.getenv("MAIN_SERVER_REPLICA_VNODES", "64"))
+
+# ISM은 모델 로드 / 워밍업이 끝나야 200인 readiness 엔드포인트 (/health는 포트만 열리면 200)
+HEALTH_PATHS = {"ism": "/ready", "pem": "/api/v1/health"}
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def parse_replicas(value: str) -> List[str]:
+    """쉼표 구분 URL 목록 (끝의 / 제거, 중복 제거)"""
+    urls: List[str] = []
+    for url in value.split(","):
+        url = url.strip().rstrip("/")
+        if url and url not in urls:
+            urls.append(url)
+    return urls
+
+
+def routing_key(class_name: str, object_name: str) -> str:
+    return f"{class_name}/{object_name}"
+
+
+@dataclass
+class Replica:
+    """replica 하나의 상태"""
+    url: str
+    outstanding: int = 0
+    requests: int = 0
+    failures: int = 0
+    unhealthy_until: float = 0.0
+    last_error: Optional[str] = None
+    keys: set = field(default_factory=set)
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.unhealthy_until
+
+
+class ReplicaPool:
+    """서비스 하나의 replica 목록 + consistent hash 링"""
+
+    def __init__(
+        self,
+        name: str,
+        urls: List[str],
+        max_outstanding: int = REPLICA_MAX_OUTSTANDING,
+        cooldown_sec: float = REPLICA_COOLDOWN_SEC,
+        vnodes: int = REPLICA_VNODES,
+    ):
+        if not urls:
+            raise ValueError(f"{name}: at least one replica URL is required")
+        self.name = name
+        self.max_outstanding = max(1, max_outstanding)
+        self.cooldown_sec = cooldown_sec
+        self.health_path = HEALTH_PATHS.get(name, "/health")
+        self.replicas: Dict[str, Replica] = {url: Replica(url) for url in urls}
+        self._ring: List[tuple] = sorted((_hash(f"{url}#{i}"), url) for url in urls for i in range(vnodes))
+        self._ring_keys = [h for h, _ in self._ring]
+        self._lock = threading.Lock()
+        self._rotation = itertools.count()
+        self.stats = {"affinity": 0, "fallback": 0, "unkeyed": 0}
+
+    @property
+    def urls(self) -> List[str]:
+        return list(self.replicas)
+
+    def owner(self, key: str) -> str:
+        """키의 기본 replica (해시 링에서 키 다음 위치)"""
+        index = bisect.bisect(self._ring_keys, _hash(key)) % len(self._ring)
+        return self._ring[index][1]
+
+    def _available(self, replica: Replica, now: float) -> bool:
+        return replica.healthy(now) and replica.outstanding < self.max_outstanding
+
+    def _least_outstanding(self, candidates: List[Replica]) -> Replica:
+        # 동률이면 돌아가며 선택 (키 없는 요청이 한 replica에 몰리지 않게)
+        offset = next(self._rotation)
+        order = {url: (i - offset) % len(self.replicas) for i, url in enumerate(self.replicas)}
+        return min(candidates, key=lambda r: (r.outstanding, order[r.url]))
+
+    def acquire(self, key: Optional[str] = None) -> Replica:
+        """요청을 보낼 replica 선택 (처리 중 요청 수 증가, 끝나면 release 호출)"""
+        now = time.monotonic()
+        with self._lock:
+            replicas = list(self.replicas.values())
+            if key is None:
+                chosen = self._least_outstanding([r for r in replicas if self._available(r, now)] or replicas)
+                self.stats["unkeyed"] += 1
+            else:
+                owner = self.replicas[self.owner(key)]
+                if self._available(owner, now):
+                    chosen = owner
+                    self.stats["affinity"] += 1
+                else:
+                    # 비정상 / 포화 → 사용 가능한 replica 중 least-outstanding,
+                    # 모두 불가능하면 정상 replica (그것도 없으면 전체) 중 least-outstanding
+                    candidates = (
+                        [r for r in replicas if self._available(r, now)]
+                        or [r for r in replicas if r.healthy(now)]
+                        or replicas
+                    )
+                    chosen = self._least_outstanding(candidates)
+                    self.stats["fallback" if chosen is not owner else "affinity"] += 1
+                chosen.keys.add(key)
+            chosen.outstanding += 1
+            chosen.requests += 1
+            return chosen
+
+    def release(self, replica: Replica, failed: bool = False, error: Optional[str] = None):
+        """요청 종료 (failed면 cooldown 동안 라우팅에서 제외)"""
+        with self._lock:
+            replica.outstanding = max(0, replica.outstanding - 1)
+            if failed:
+                self._mark_unhealthy(replica, error)
+
+    def has_healthy(self, exclude=()) -> bool:
+        """exclude 밖에 정상 replica가 있는지"""
+        now = time.monotonic()
+        with self._lock:
+            return any(r.healthy(now) for url, r in self.replicas.items() if url not in exclude)
+
+    def report_health(self, url: str, healthy: bool, error: Optional[str] = None):
+        """헬스 체크 결과 반영 (ServerMonitor / 요청 전 헬스 체크)"""
+        with self._lock:
+            replica = self.replicas.get(url.rstrip("/"))
+            if replica is None:
+                return
+            if healthy:
+                replica.unhealthy_until = 0.0
+            else:
+                self._mark_unhealthy(replica, error)
+
+    def _mark_unhealthy(self, replica: Replica, error: Optional[str]):
+        replica.failures += 1
+        replica.last_error = error
+        replica.unhealthy_until = time.monotonic() + self.cooldown_sec
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "name": self.name,
+                "max_outstanding": self.max_outstanding,
+                "routing": dict(self.stats),
+                "replicas": [
+                    {
+                        "url": r.url,
+                        "healthy": r.healthy(now),
+                        "outstanding": r.outstanding,
+                        "requests": r.requests,
+                        "failures": r.failures,
+                        "objects": len(r.keys),
+                        "last_error": r.last_error,
+                    }
+                    for r in self.replicas.values()
+                ],
+            }
+
+
+# 전역 replica 풀 인스턴스
+_replica_pools = None
+
+def get_replica_pools() -> Dict[str, ReplicaPool]:
+    """ISM / PEM replica 풀 반환 (싱글톤)"""
+    global _replica_pools
+    if _replica_pools is None:
+        _replica_pools = {
+            "ism": ReplicaPool("ism", parse_replicas(ISM_REPLICAS)),
+            "pem": ReplicaPool("pem", parse_replicas(PEM_REPLICAS)),
+        }
+    return _replica_pools
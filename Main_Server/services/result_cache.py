@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+파이프라인 결과 캐시 (프레임 내용 기반)
+
+같은 프레임이 다시 들어오는 경우 (재시도, 같은 프레임의 여러 객체, 여러 소비자)
+ISM / PEM 결과를 다시 계산하지 않는다.
+
+- 키: (RGB + depth 해시, cam_params, 클래스/객체, 템플릿 버전)
+- ISM 감지 결과와 PEM 포즈를 따로 저장 → PEM만 실패했던 재시도는 ISM 결과를 재사용
+- 성공한 결과만 저장, TTL / 항목 수 / 메모리 상한 초과 시 오래된 것부터 제거 (LRU)
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+RESULT_CACHE_TTL_SEC = float(os.getenv("MAIN_SERVER_RESULT_CACHE_TTL_SEC", "300"))
+# 0이면 캐시 비활성화
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("MAIN_SERVER_RESULT_CACHE_MAX_ENTRIES", "256"))
+RESULT_CACHE_MAX_MB = float(os.getenv("MAIN_SERVER_RESULT_CACHE_MAX_MB", "256"))
+
+KINDS = ("ism", "pem")
+
+
+def frame_hash(rgb_image: str, depth_image: str) -> str:
+    """RGB / depth (base64) 내용 해시"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(rgb_image.encode("ascii") if isinstance(rgb_image, str) else rgb_image)
+    h.update(b"\0")
+    h.update(depth_image.encode("ascii") if isinstance(depth_image, str) else depth_image)
+    return h.hexdigest()
+
+
+def make_key(
+    frame_digest: str,
+    cam_params: Dict[str, Any],
+    class_name: str,
+    object_name: str,
+    template_version: str,
+) -> str:
+    """프레임 / 카메라 / 객체 / 템플릿 버전으로 ISM 캐시 키 생성"""
+    cam = json.dumps(cam_params, sort_keys=True, default=str)
+    return "|".join([frame_digest, hashlib.blake2b(cam.encode(), digest_size=8).hexdigest(), class_name, object_name, template_version])
+
+
+def estimate_size(value: Any) -> int:
+    """JSON 직렬화 길이의 대략적인 추정 (직렬화 없이)
+
+    숫자 리스트 (RLE counts / 좌표 등)는 원소를 보지 않고 길이로만 계산하므로
+    큰 마스크가 있어도 컨테이너 개수에 비례하는 시간만 든다.
+    """
+    if isinstance(value, dict):
+        return 2 + sum(len(str(k)) + 4 + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return 2
+        if isinstance(value[0], (int, float)):
+            return 2 + 8 * len(value)
+        return 2 + sum(2 + estimate_size(v) for v in value)
+    if isinstance(value, str):
+        return len(value) + 2
+    return 8
+
+
+class ResultCache:
+    """ISM / PEM 결과 LRU 캐시 (TTL + 항목 수 / 메모리 상한)"""
+
+    def __init__(
+        self,
+        ttl_sec: float = RESULT_CACHE_TTL_SEC,
+        max_entries: int = RESULT_CACHE_MAX_ENTRIES,
+        max_bytes: int = int(RESULT_CACHE_MAX_MB * 1024 * 1024),
+    ):
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # (kind, key) -> (stored_at, size, value)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._bytes = 0
+        self.stats = {kind: {"hits": 0, "misses": 0, "stores": 0} for kind in KINDS}
+        self.stats["evictions"] = 0
+        self.stats["expired"] = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, kind: str, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get((kind, key))
+            if entry is not None and time.monotonic() - entry[0] > self.ttl_sec:
+                self._remove((kind, key))
+                self.stats["expired"] += 1
+                entry = None
+            if entry is None:
+                self.stats[kind]["misses"] += 1
+                return None
+            self._entries.move_to_end((kind, key))
+            self.stats[kind]["hits"] += 1
+            return entry[2]
+
+    def put(self, kind: str, key: str, value: Dict[str, Any]):
+        """결과 저장 (크기는 estimate_size로 추정, 상한보다 큰 결과는 저장하지 않음)"""
+        if not self.enabled:
+            return
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove((kind, key))
+            self._entries[(kind, key)] = (time.monotonic(), size, value)
+            self._bytes += size
+            self.stats[kind]["stores"] += 1
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats["evictions"] += 1
+
+    def _remove(self, entry_key: Tuple[str, str]):
+        entry = self._entries.pop(entry_key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {kind: dict(self.stats[kind]) for kind in KINDS}
+            for kind in KINDS:
+                lookups = stats[kind]["hits"] + stats[kind]["misses"]
+                stats[kind]["hit_rate"] = round(stats[kind]["hits"] / lookups, 4) if lookups else None
+            return {
+                "enabled": self.enabled,
+                "ttl_sec": self.ttl_sec,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.stats["evictions"],
+                "expired": self.stats["expired"],
+                **stats,
+            }
+
+
+# 전역 결과 캐시 인스턴스
+_result_cache = None
+
+def get_result_cache() -> ResultCache:
+    """결과 캐시 인스턴스 반환 (싱글톤)"""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache()
+    return _result_cache
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+RSS (RealSense 스트리밍 서버) 비동기 클라이언트
+
+- httpx.AsyncClient 하나로 연결을 재사용 (keep-alive)
+- 캘리브레이션 / 상태와 프레임 (color_raw, depth_raw)을 동시에 요청
+- base URL별 카메라 정보 (intrinsics, depth scale, extrinsics, 해상도)를 TTL 동안 캐시
+"""
+import asyncio
+import json
+import io
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+import numpy as np
+from PIL import Image
+
+
+RSS_TIMEOUT_SEC = float(os.getenv("MAIN_SERVER_RSS_TIMEOUT_SEC", "10"))
+# 캘리브레이션 / 상태 캐시 유지 시간 (초), 0이면 매 요청마다 다시 수집
+RSS_CALIBRATION_TTL_SEC = float(os.getenv("MAIN_SERVER_RSS_CALIBRATION_TTL_SEC", "60"))
+
+
+@dataclass
+class RssCameraInfo:
+    """RSS 카메라 정보 (캘리브레이션 / 상태에서 추출)"""
+    calibration: Dict[str, Any]
+    status: Dict[str, Any]
+    depth_scale: float
+    camK_depth: Optional[np.ndarray]
+    camK_color: Optional[np.ndarray]
+    T_d2c: Optional[np.ndarray]
+    width: int
+    height: int
+    fetched_at: float
+
+
+@dataclass
+class RssFrame:
+    """파이프라인 입력으로 변환된 RSS 프레임 (PNG base64 + 카메라 파라미터)"""
+    base_url: str
+    align_color: bool
+    camera: RssCameraInfo
+    cam_params: Dict[str, Any]
+    rgb_b64: str
+    depth_b64: str
+    captured_at: float  # time.time()
+    seq: int = 0
+
+    @property
+    def age_sec(self) -> float:
+        return time.time() - self.captured_at
+
+
+def _resolution_from(js: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+    """캘리브레이션 / 상태 JSON에서 컬러 해상도 추출 (save_from_rss.py와 같은 키 사용)"""
+    width = js.get("image_width") or js.get("width") or js.get("img_width")
+    height = js.get("image_height") or js.get("height") or js.get("img_height")
+    if width is None or height is None:
+        for key in ["color_intrinsics", "color", "rgb"]:
+            sub = js.get(key)
+            if isinstance(sub, dict) and sub.get("width") and sub.get("height"):
+                width, height = sub["width"], sub["height"]
+                break
+    if width is None or height is None:
+        return None, None
+    return int(width), int(height)
+
+
+class RssClient:
+    """RSS 서버 비동기 클라이언트 (연결 재사용 + 카메라 정보 캐시)"""
+
+    def __init__(
+        self,
+        timeout: float = RSS_TIMEOUT_SEC,
+        calibration_ttl: float = RSS_CALIBRATION_TTL_SEC,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.timeout = timeout
+        self.calibration_ttl = calibration_ttl
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._camera_info: Dict[str, RssCameraInfo] = {}
+        self._camera_locks: Dict[str, asyncio.Lock] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # AsyncClient는 생성된 이벤트 루프에 묶이므로 루프가 바뀌면 새로 생성
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+                transport=self.transport,
+            )
+            self._client_loop = loop
+            self._camera_locks = {}
+        return self._client
+
+    async def fetch_binary(self, url: str) -> bytes:
+        r = await self._get_client().get(url)
+        r.raise_for_status()
+        return r.content
+
+    async def fetch_json(self, url: str) -> Dict[str, Any]:
+        r = await self._get_client().get(url)
+        r.raise_for_status()
+        try:
+            return r.json()
+        except Exception:
+            return json.loads(r.text)
+
+    async def get_camera_info(self, base_url: str, parser, refresh: bool = False) -> RssCameraInfo:
+        """base URL의 카메라 정보 (TTL 캐시, 동시 요청은 한 번만 수집)
+
+        Args:
+            parser: (calibration, status) -> (depth_scale, camK_depth, camK_color, T_d2c) 추출 함수
+        """
+        cached = self._camera_info.get(base_url)
+        if not refresh and cached is not None and time.monotonic() - cached.fetched_at < self.calibration_ttl:
+            return cached
+
+        self._get_client()
+        lock = self._camera_locks.setdefault(base_url, asyncio.Lock())
+        async with lock:
+            cached = self._camera_info.get(base_url)
+            if not refresh and cached is not None and time.monotonic() - cached.fetched_at < self.calibration_ttl:
+                return cached
+
+            calib, status = await asyncio.gather(
+                self.fetch_json(f"{base_url}/camera/calibration"),
+                self.fetch_json(f"{base_url}/camera/status"),
+            )
+            depth_scale, camK_depth, camK_color, T_d2c = parser(calib, status)
+
+            width, height = _resolution_from(calib)
+            if width is None:
+                width, height = _resolution_from(status)
+            if width is None:
+                # 해상도 정보가 없는 RSS만 JPEG 헤더로 확인 (캐시되므로 TTL마다 한 번)
+                color_jpg = await self.fetch_binary(f"{base_url}/streams/color_jpeg")
+                with Image.open(io.BytesIO(color_jpg)) as im:
+                    width, height = im.size
+
+            info = RssCameraInfo(
+                calibration=calib,
+                status=status,
+                depth_scale=depth_scale,
+                camK_depth=camK_depth,
+                camK_color=camK_color,
+                T_d2c=T_d2c,
+                width=int(width),
+                height=int(height),
+                fetched_at=time.monotonic(),
+            )
+            self._camera_info[base_url] = info
+            return info
+
+    async def fetch_frame(self, base_url: str) -> Tuple[bytes, bytes]:
+        """color_raw / depth_raw 동시 수집"""
+        color_raw, depth_raw = await asyncio.gather(
+            self.fetch_binary(f"{base_url}/streams/color_raw"),
+            self.fetch_binary(f"{base_url}/streams/depth_raw"),
+        )
+        return color_raw, depth_raw
+
+    def invalidate(self, base_url: Optional[str] = None):
+        """카메라 정보 캐시 삭제 (base_url이 None이면 전체)"""
+        if base_url is None:
+            self._camera_info.clear()
+        else:
+            self._camera_info.pop(base_url, None)
+
+    async def aclose(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+# 전역 RSS 클라이언트 인스턴스
+_rss_client = None
+
+def get_rss_client() -> RssClient:
+    """RSS 클라이언트 인스턴스 반환 (싱글톤)"""
+    global _rss_client
+    if _rss_client is None:
+        _rss_client = RssClient()
+    return _rss_client
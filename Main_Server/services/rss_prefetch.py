@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+RSS 프레임 prefetch 루프 (최신 프레임 링 버퍼)
+
+RSS 소스 (base URL + align_color)마다 백그라운드 태스크가 계속 프레임을 수집해서
+정합 / 인코딩까지 끝난 최신 N개 프레임을 보관한다. 파이프라인 요청은 RSS 왕복 없이
+가장 최신 프레임을 바로 사용한다.
+
+연속 모드: N번째 프레임마다 파이프라인을 실행하고 결과를 구독자 (SSE 등)에게 전달한다.
+이전 파이프라인이 아직 실행 중이면 해당 프레임은 건너뛴다 (요청이 쌓이지 않음).
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+try:
+    from .rss_client import RssFrame
+except ImportError:
+    from services.rss_client import RssFrame
+
+
+logger = logging.getLogger(__name__)
+
+# 시작 시 prefetch를 켤 RSS 소스 (쉼표 구분 base URL, "|color" 접미사면 align_color)
+RSS_PREFETCH_SOURCES = os.getenv("MAIN_SERVER_RSS_PREFETCH_SOURCES", "")
+RSS_PREFETCH_BUFFER_SIZE = int(os.getenv("MAIN_SERVER_RSS_PREFETCH_BUFFER_SIZE", "4"))
+RSS_PREFETCH_INTERVAL_SEC = float(os.getenv("MAIN_SERVER_RSS_PREFETCH_INTERVAL_SEC", "0.1"))
+# 이보다 오래된 prefetch 프레임은 사용하지 않고 새로 수집
+RSS_PREFETCH_MAX_AGE_SEC = float(os.getenv("MAIN_SERVER_RSS_PREFETCH_MAX_AGE_SEC", "1.0"))
+
+_MAX_BACKOFF_SEC = 5.0
+_SUBSCRIBER_QUEUE_SIZE = 16
+
+
+@dataclass
+class ContinuousConfig:
+    """연속 파이프라인 모드 설정"""
+    class_name: str
+    object_name: str
+    every_n: int = 1
+    output_mode: str = "none"
+    frame_guess: bool = False
+
+
+class RssPrefetcher:
+    """RSS 소스 하나의 prefetch 루프 + 링 버퍼 + (선택) 연속 파이프라인"""
+
+    def __init__(
+        self,
+        source_id: str,
+        base_url: str,
+        align_color: bool,
+        capture: Callable[..., Awaitable[RssFrame]],
+        run_pipeline: Callable[..., Awaitable[Dict[str, Any]]],
+        buffer_size: int = RSS_PREFETCH_BUFFER_SIZE,
+        interval_sec: float = RSS_PREFETCH_INTERVAL_SEC,
+        continuous: Optional[ContinuousConfig] = None,
+    ):
+        self.source_id = source_id
+        self.base_url = base_url
+        self.align_color = align_color
+        self.capture = capture
+        self.run_pipeline = run_pipeline
+        self.interval_sec = interval_sec
+        self.continuous = continuous
+        self.frames: Deque[RssFrame] = deque(maxlen=max(1, buffer_size))
+        self.seq = 0
+        self.stats: Dict[str, Any] = {
+            "captured": 0,
+            "errors": 0,
+            "last_error": None,
+            "last_capture_ms": None,
+            "pipelines_run": 0,
+            "pipelines_skipped": 0,
+        }
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._pipeline_task: Optional[asyncio.Task] = None
+        self._new_frame = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        if not self.running:
+            # 시작 요청의 context (추적 등)를 물려받지 않도록 빈 context에서 실행
+            self._task = contextvars.Context().run(
+                asyncio.create_task, self._run(), name=f"rss-prefetch:{self.source_id}"
+            )
+
+    async def stop(self):
+        for task in (self._task, self._pipeline_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._task = None
+        self._pipeline_task = None
+
+    async def _run(self):
+        backoff = self.interval_sec or 0.1
+        while True:
+            start = time.monotonic()
+            try:
+                frame = await self.capture(self.base_url, self.align_color, verbose=False)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                self.stats["last_error"] = str(e)
+                logger.warning(f"[RSS prefetch] {self.source_id} 수집 실패: {e}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, _MAX_BACKOFF_SEC)
+                continue
+
+            backoff = self.interval_sec or 0.1
+            self.seq += 1
+            frame.seq = self.seq
+            self.frames.append(frame)
+            self.stats["captured"] += 1
+            self.stats["last_capture_ms"] = round((time.monotonic() - start) * 1000, 1)
+            self._new_frame.set()
+            self._new_frame = asyncio.Event()
+
+            if self.continuous is not None and frame.seq % max(1, self.continuous.every_n) == 0:
+                self._maybe_run_pipeline(frame)
+
+            await asyncio.sleep(max(0.0, self.interval_sec - (time.monotonic() - start)))
+
+    def latest(self, max_age_sec: Optional[float] = None) -> Optional[RssFrame]:
+        """가장 최신 프레임 (max_age_sec보다 오래됐으면 None)"""
+        if not self.frames:
+            return None
+        frame = self.frames[-1]
+        if max_age_sec is not None and frame.age_sec > max_age_sec:
+            return None
+        return frame
+
+    async def wait_frame(self, timeout: float) -> Optional[RssFrame]:
+        """다음 프레임이 들어올 때까지 대기"""
+        event = self._new_frame
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return self.latest()
+
+    # ----- 연속 파이프라인 -----
+
+    def _maybe_run_pipeline(self, frame: RssFrame):
+        if self._pipeline_task is not None and not self._pipeline_task.done():
+            self.stats["pipelines_skipped"] += 1
+            return
+        self._pipeline_task = asyncio.create_task(self._run_pipeline(frame))
+
+    async def _run_pipeline(self, frame: RssFrame):
+        config = self.continuous
+        start = time.monotonic()
+        event: Dict[str, Any] = {
+            "source_id": self.source_id,
+            "seq": frame.seq,
+            "captured_at": frame.captured_at,
+            "class_name": config.class_name,
+            "object_name": config.object_name,
+        }
+        try:
+            result = await self.run_pipeline(
+                frame,
+                class_name=config.class_name,
+                object_name=config.object_name,
+                frame_guess=config.frame_guess,
+                output_mode=config.output_mode,
+                request_tag=f"rss-continuous-{config.object_name}",
+            )
+            event.update({
+                "success": result.get("success", False),
+                "num_poses": result.get("num_poses", 0),
+                "pose_results": result.get("pose_results", []),
+                "output_dir": result.get("output_dir"),
+                "error": result.get("error"),
+            })
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            event.update({"success": False, "error": str(e)})
+        event["elapsed_sec"] = round(time.monotonic() - start, 3)
+        self.stats["pipelines_run"] += 1
+        self.publish(event)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def publish(self, event: Dict[str, Any]):
+        """구독자에게 결과 전달 (느린 구독자는 가장 오래된 결과부터 버림)"""
+        for queue in list(self._subscribers):
+            if queue.full():
+                try:
+                    queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    pass
+            queue.put_nowait(event)
+
+    def status(self) -> Dict[str, Any]:
+        latest = self.latest()
+        return {
+            "source_id": self.source_id,
+            "base_url": self.base_url,
+            "align_color": self.align_color,
+            "running": self.running,
+            "interval_sec": self.interval_sec,
+            "buffer_size": self.frames.maxlen,
+            "buffered": len(self.frames),
+            "latest_seq": latest.seq if latest else None,
+            "latest_age_ms": round(latest.age_sec * 1000, 1) if latest else None,
+            "continuous": asdict(self.continuous) if self.continuous else None,
+            "subscribers": len(self._subscribers),
+            **self.stats,
+        }
+
+
+class RssPrefetchManager:
+    """RSS 소스별 prefetch 루프 관리"""
+
+    def __init__(
+        self,
+        capture: Callable[..., Awaitable[RssFrame]],
+        run_pipeline: Callable[..., Awaitable[Dict[str, Any]]],
+    ):
+        self.capture = capture
+        self.run_pipeline = run_pipeline
+        self.sources: Dict[str, RssPrefetcher] = {}
+
+    @staticmethod
+    def source_id(base_url: str, align_color: bool) -> str:
+        return f"{base_url}|{'color' if align_color else 'depth'}"
+
+    def start(
+        self,
+        base_url: str,
+        align_color: bool = False,
+        buffer_size: int = RSS_PREFETCH_BUFFER_SIZE,
+        interval_sec: float = RSS_PREFETCH_INTERVAL_SEC,
+        continuous: Optional[ContinuousConfig] = None,
+    ) -> RssPrefetcher:
+        """prefetch 시작 (이미 동작 중이면 설정만 갱신)"""
+        source_id = self.source_id(base_url, align_color)
+        prefetcher = self.sources.get(source_id)
+        if prefetcher is None:
+            prefetcher = RssPrefetcher(
+                source_id, base_url, align_color, self.capture, self.run_pipeline,
+                buffer_size=buffer_size, interval_sec=interval_sec, continuous=continuous,
+            )
+            self.sources[source_id] = prefetcher
+        else:
+            prefetcher.interval_sec = interval_sec
+            prefetcher.continuous = continuous
+            if prefetcher.frames.maxlen != buffer_size:
+                prefetcher.frames = deque(prefetcher.frames, maxlen=max(1, buffer_size))
+        prefetcher.start()
+        logger.info(f"[RSS prefetch] started {source_id} (buffer={buffer_size}, interval={interval_sec}s, continuous={continuous is not None})")
+        return prefetcher
+
+    def start_from_env(self) -> List[str]:
+        """MAIN_SERVER_RSS_PREFETCH_SOURCES에 지정된 소스 시작"""
+        started = []
+        for item in filter(None, (x.strip() for x in RSS_PREFETCH_SOURCES.split(","))):
+            base_url, _, suffix = item.partition("|")
+            prefetcher = self.start(base_url.rstrip("/"), align_color=suffix.strip().lower() == "color")
+            started.append(prefetcher.source_id)
+        return started
+
+    async def stop(self, source_id: str) -> bool:
+        prefetcher = self.sources.pop(source_id, None)
+        if prefetcher is None:
+            return False
+        await prefetcher.stop()
+        logger.info(f"[RSS prefetch] stopped {source_id}")
+        return True
+
+    async def stop_all(self):
+        for source_id in list(self.sources):
+            await self.stop(source_id)
+
+    def get(self, source_id: str) -> Optional[RssPrefetcher]:
+        return self.sources.get(source_id)
+
+    def latest_frame(
+        self, base_url: str, align_color: bool, max_age_sec: Optional[float] = None
+    ) -> Optional[RssFrame]:
+        """동작 중인 prefetch 루프의 최신 프레임 (없거나 오래됐으면 None)"""
+        prefetcher = self.sources.get(self.source_id(base_url, align_color))
+        if prefetcher is None or not prefetcher.running:
+            return None
+        return prefetcher.latest(RSS_PREFETCH_MAX_AGE_SEC if max_age_sec is None else max_age_sec)
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [prefetcher.status() for prefetcher in self.sources.values()]
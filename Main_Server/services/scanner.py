@@ -3,8 +3,14 @@
 Static 폴더 스캔 서비스
 """
 import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
 try:
@@ -21,11 +27,175 @@ except ImportError:  # 패키지 상위 컨텍스트 없이 실행되는 경우
     from utils.path_utils import get_static_paths
 
 
+logger = logging.getLogger(__name__)
+
+CAD_EXTENSIONS = ['.ply', '.obj', '.stl']
+
+# 카탈로그 인덱스 (SQLite) 경로, 비어 있으면 static/.catalog_index.sqlite3 / "none"이면 메모리만 사용
+CATALOG_INDEX_PATH = os.getenv("MAIN_SERVER_CATALOG_INDEX_PATH", "")
+# 이 시간(초) 안에 확인한 클래스 / 객체는 파일 시스템을 다시 보지 않음
+CATALOG_REFRESH_SEC = float(os.getenv("MAIN_SERVER_CATALOG_REFRESH_SEC", "2.0"))
+
+
+def _mtime_ns(path: Path) -> int:
+    """수정 시간 (ns), 없으면 -1"""
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return -1
+
+
+class CatalogIndex:
+    """객체 카탈로그 인덱스 (메모리 + SQLite)
+
+    객체별로 (CAD 파일 이름 / 크기 / mtime, 템플릿 디렉토리 mtime) 시그니처와 객체 정보를 저장한다.
+    시그니처가 같으면 템플릿 디렉토리를 다시 glob 하지 않는다.
+    SQLite 파일은 재시작 시 인덱스를 바로 복원하기 위한 것이며, 열 수 없으면 메모리만 사용한다.
+    batch() 안의 갱신은 하나의 트랜잭션으로 묶여 마지막에 한 번만 commit 한다.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._pending_commit = False
+        self._objects: Dict[str, Dict[str, Dict[str, Any]]] = {}  # class -> object -> entry
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path is not None:
+            try:
+                db_path.parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS objects ("
+                    "class_name TEXT NOT NULL, object_name TEXT NOT NULL, "
+                    "signature TEXT NOT NULL, info TEXT NOT NULL, "
+                    "PRIMARY KEY (class_name, object_name))"
+                )
+                self._db.commit()
+                self._load()
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"카탈로그 인덱스 DB 사용 불가 ({db_path}), 메모리 인덱스만 사용: {e}")
+                self._db = None
+
+    def _load(self):
+        for class_name, object_name, signature, info in self._db.execute(
+            "SELECT class_name, object_name, signature, info FROM objects"
+        ):
+            self._objects.setdefault(class_name, {})[object_name] = {
+                "signature": tuple(json.loads(signature)),
+                "info": json.loads(info),
+                "checked_at": 0.0,
+            }
+
+    def _execute(self, sql: str, params: Tuple = ()):
+        if self._db is None:
+            return
+        try:
+            self._db.execute(sql, params)
+            if self._batch_depth:
+                self._pending_commit = True
+            else:
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"카탈로그 인덱스 DB 갱신 실패: {e}")
+
+    def _commit(self):
+        try:
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"카탈로그 인덱스 DB commit 실패: {e}")
+
+    @contextmanager
+    def batch(self):
+        """스캔 한 번의 DB 갱신을 하나의 트랜잭션으로 묶음 (중첩 가능, 가장 바깥에서 commit)"""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0 and self._pending_commit:
+                    self._pending_commit = False
+                    self._commit()
+
+    def get(self, class_name: str, object_name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._objects.get(class_name, {}).get(object_name)
+
+    def put(self, class_name: str, object_name: str, signature: Tuple, info: Dict[str, Any]):
+        with self._lock:
+            entry = self._objects.setdefault(class_name, {}).get(object_name)
+            changed = entry is None or entry["signature"] != signature
+            self._objects[class_name][object_name] = {
+                "signature": signature,
+                "info": info,
+                "checked_at": time.monotonic(),
+            }
+            if changed:
+                self._execute(
+                    "INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?)",
+                    (class_name, object_name, json.dumps(list(signature)), json.dumps(info)),
+                )
+
+    def touch(self, class_name: str, object_name: str):
+        with self._lock:
+            entry = self._objects.get(class_name, {}).get(object_name)
+            if entry is not None:
+                entry["checked_at"] = time.monotonic()
+
+    def remove(self, class_name: str, object_name: Optional[str] = None):
+        """객체 (object_name이 None이면 클래스 전체) 제거"""
+        with self._lock:
+            if object_name is None:
+                self._objects.pop(class_name, None)
+                self._execute("DELETE FROM objects WHERE class_name = ?", (class_name,))
+            else:
+                self._objects.get(class_name, {}).pop(object_name, None)
+                self._execute(
+                    "DELETE FROM objects WHERE class_name = ? AND object_name = ?",
+                    (class_name, object_name),
+                )
+
+    def invalidate(self, class_name: str, object_name: Optional[str] = None):
+        """다음 조회 시 파일 시스템을 다시 확인하도록 표시"""
+        with self._lock:
+            entries = self._objects.get(class_name, {})
+            targets = entries.values() if object_name is None else [entries.get(object_name)]
+            for entry in targets:
+                if entry is not None:
+                    entry["checked_at"] = 0.0
+
+    def object_names(self, class_name: str) -> List[str]:
+        with self._lock:
+            return list(self._objects.get(class_name, {}).keys())
+
+    def class_names(self) -> List[str]:
+        with self._lock:
+            return list(self._objects.keys())
+
+    def clear(self):
+        with self._lock:
+            self._objects.clear()
+            self._execute("DELETE FROM objects")
+
+
 class StaticScanner:
-    """Static 폴더를 스캔하여 객체 정보를 수집하는 클래스"""
+    """Static 폴더를 스캔하여 객체 정보를 수집하는 클래스
+
+    결과는 CatalogIndex에 캐시되며, mtime 시그니처로 변경된 객체만 다시 스캔한다.
+    """
     
-    def __init__(self):
+    def __init__(self, index_path: Optional[str] = None):
         self.paths = get_static_paths()
+        index_path = CATALOG_INDEX_PATH if index_path is None else index_path
+        if index_path.lower() == "none":
+            db_path = None
+        else:
+            db_path = Path(index_path) if index_path else self.paths["root"] / "static" / ".catalog_index.sqlite3"
+        self.index = CatalogIndex(db_path)
+        # class -> (확인 시각, 메시 디렉토리 mtime, CAD 파일 목록)
+        self._class_listings: Dict[str, Tuple[float, int, List[Path]]] = {}
+        self._lock = threading.RLock()
     
     def scan_all_classes(self) -> List[Dict[str, Any]]:
         """모든 클래스 스캔
@@ -35,20 +205,52 @@ class StaticScanner:
         """
         classes = []
         meshes_dir = self.paths["meshes"]
-        templates_dir = self.paths["templates"]
         
         if not meshes_dir.exists():
             return classes
         
-        # 메시 디렉토리의 각 클래스 폴더 스캔
-        for class_dir in sorted(meshes_dir.iterdir()):
-            if class_dir.is_dir():
-                class_name = class_dir.name
-                class_info = self.scan_class(class_name)
-                if class_info:
-                    classes.append(class_info)
+        with self.index.batch():
+            # 메시 디렉토리의 각 클래스 폴더 스캔
+            class_names = set()
+            for class_dir in sorted(meshes_dir.iterdir()):
+                if class_dir.is_dir():
+                    class_name = class_dir.name
+                    class_names.add(class_name)
+                    class_info = self.scan_class(class_name)
+                    if class_info:
+                        classes.append(class_info)
+
+            # 삭제된 클래스 정리
+            for class_name in self.index.class_names():
+                if class_name not in class_names:
+                    self._forget_class(class_name)
         
         return classes
+
+    def _forget_class(self, class_name: str):
+        with self._lock:
+            self._class_listings.pop(class_name, None)
+        self.index.remove(class_name)
+
+    def _list_cad_files(self, class_name: str) -> List[Path]:
+        """클래스의 CAD 파일 목록 (메시 디렉토리 mtime이 같으면 캐시 사용)"""
+        meshes_class_dir = self.paths["meshes"] / class_name
+        now = time.monotonic()
+        with self._lock:
+            cached = self._class_listings.get(class_name)
+        if cached is not None and now - cached[0] < CATALOG_REFRESH_SEC:
+            return cached[2]
+
+        dir_mtime = _mtime_ns(meshes_class_dir)
+        if cached is not None and cached[1] == dir_mtime:
+            cad_files = cached[2]
+        else:
+            cad_files = []
+            for ext in CAD_EXTENSIONS:
+                cad_files.extend(list_files_in_dir(meshes_class_dir, f"*{ext}"))
+        with self._lock:
+            self._class_listings[class_name] = (now, dir_mtime, cad_files)
+        return cad_files
     
     def scan_class(self, class_name: str) -> Optional[Dict[str, Any]]:
         """특정 클래스 스캔
@@ -59,18 +261,21 @@ class StaticScanner:
         Returns:
             Dict: 클래스 정보 또는 None
         """
+        with self.index.batch():
+            return self._scan_class(class_name)
+
+    def _scan_class(self, class_name: str) -> Optional[Dict[str, Any]]:
         meshes_class_dir = self.paths["meshes"] / class_name
-        templates_class_dir = self.paths["templates"] / class_name
         
         if not meshes_class_dir.exists():
+            self._forget_class(class_name)
             return None
         
         # CAD 파일 스캔 - 여러 형식 지원
-        cad_files = []
-        for ext in ['.ply', '.obj', '.stl']:
-            cad_files.extend(list_files_in_dir(meshes_class_dir, f"*{ext}"))
+        cad_files = self._list_cad_files(class_name)
         
         if not cad_files:
+            self.index.remove(class_name)
             return None
         
         # 객체 정보 수집
@@ -84,6 +289,12 @@ class StaticScanner:
                 objects.append(object_info)
                 if object_info["has_template"]:
                     template_count += 1
+
+        # CAD 파일이 삭제된 객체 정리
+        object_names = {cad_file.stem for cad_file in cad_files}
+        for object_name in self.index.object_names(class_name):
+            if object_name not in object_names:
+                self.index.remove(class_name, object_name)
         
         # 클래스 요약
         return {
@@ -96,7 +307,7 @@ class StaticScanner:
         }
     
     def scan_object(self, class_name: str, object_name: str) -> Optional[Dict[str, Any]]:
-        """특정 객체 스캔
+        """특정 객체 스캔 (인덱스 조회, 시그니처가 바뀐 경우에만 다시 스캔)
         
         Args:
             class_name: 클래스 이름
@@ -105,17 +316,36 @@ class StaticScanner:
         Returns:
             Dict: 객체 정보 또는 None
         """
+        entry = self.index.get(class_name, object_name)
+        if entry is not None and time.monotonic() - entry["checked_at"] < CATALOG_REFRESH_SEC:
+            return dict(entry["info"])
+
         # CAD 파일 정보 - 여러 형식 지원
         cad_file = None
-        for ext in ['.ply', '.obj', '.stl']:
+        for ext in CAD_EXTENSIONS:
             candidate = self.paths["meshes"] / class_name / f"{object_name}{ext}"
             if candidate.exists():
                 cad_file = candidate
                 break
         
         if not cad_file or not cad_file.exists():
+            if entry is not None:
+                self.index.remove(class_name, object_name)
             return None
-        
+
+        template_dir = self.paths["templates"] / class_name / object_name
+        cad_stat = cad_file.stat()
+        signature = (cad_file.name, cad_stat.st_size, cad_stat.st_mtime_ns, _mtime_ns(template_dir))
+        if entry is not None and entry["signature"] == signature:
+            self.index.touch(class_name, object_name)
+            return dict(entry["info"])
+
+        info = self._build_object_info(object_name, cad_file, template_dir)
+        self.index.put(class_name, object_name, signature, info)
+        return dict(info)
+
+    def _build_object_info(self, object_name: str, cad_file: Path, template_dir: Path) -> Dict[str, Any]:
+        """객체 정보 생성 (템플릿 파일 개수 집계 포함)"""
         cad_info = {
             "name": object_name,
             "cad_file": cad_file.name,
@@ -125,7 +355,6 @@ class StaticScanner:
         }
         
         # 템플릿 정보
-        template_dir = self.paths["templates"] / class_name / object_name
         has_template = template_dir.exists() and len(list_files_in_dir(template_dir, "*")) > 0
         
         template_files = get_template_file_counts(template_dir) if has_template else {
@@ -153,6 +382,24 @@ class StaticScanner:
             **template_info,
             "status": status
         }
+
+    def invalidate(self, class_name: str, object_name: Optional[str] = None):
+        """렌더링 등으로 바뀐 객체 (또는 클래스)를 다음 조회 시 다시 확인"""
+        with self._lock:
+            self._class_listings.pop(class_name, None)
+        self.index.invalidate(class_name, object_name)
+
+    def rebuild(self) -> Dict[str, Any]:
+        """인덱스를 비우고 전체 재스캔
+
+        Returns:
+            Dict: 통계 정보
+        """
+        with self._lock:
+            self._class_listings.clear()
+        with self.index.batch():
+            self.index.clear()
+            return self.get_statistics()
     
     def get_statistics(self) -> Dict[str, Any]:
         """전체 통계 정보 반환
@@ -8,8 +8,10 @@ from datetime import datetime
 from typing import Dict, Optional
 try:
     from ..utils.path_utils import get_static_paths
+    from ..services.replica_pool import get_replica_pools
 except ImportError:
     from utils.path_utils import get_static_paths
+    from services.replica_pool import get_replica_pools
 
 
 class ServerMonitor:
@@ -22,6 +24,25 @@ class ServerMonitor:
     }
     
     TIMEOUT_SECONDS = 5
+
+    def __init__(self):
+        # ISM / PEM은 replica 풀의 replica 전체 (replica가 여러 개면 ism-1, ism-2, ...)
+        self.pools = get_replica_pools()
+        servers = {}
+        for name, pool in self.pools.items():
+            urls = pool.urls
+            if len(urls) == 1:
+                servers[name] = urls[0]
+            else:
+                servers.update({f"{name}-{i}": url for i, url in enumerate(urls, start=1)})
+        self.SERVERS = {**servers, **{k: v for k, v in self.SERVERS.items() if k not in self.pools}}
+
+    def report_health(self, name: str, status: Dict) -> Dict:
+        """헬스 체크 결과를 replica 풀에 반영 (비정상 replica는 cooldown 동안 라우팅 제외)"""
+        pool = self.pools.get(name.split("-")[0])
+        if pool is not None:
+            pool.report_health(status["url"], status["status"] == "healthy", status.get("error_message"))
+        return status
     
     async def check_server_health(self, name: str, url: str) -> Dict:
         """서버 상태 확인
@@ -35,8 +56,9 @@ class ServerMonitor:
         """
         start_time = datetime.now()
         
-        # PEM 서버는 /api/v1/health, 다른 서버는 /health 사용
-        health_endpoint = "/api/v1/health" if name == "pem" else "/health"
+        # replica 풀의 헬스 경로 (ISM /ready, PEM /api/v1/health), 다른 서버는 /health 사용
+        pool = self.pools.get(name.split("-")[0])
+        health_endpoint = pool.health_path if pool is not None else "/health"
         
         try:
             async with httpx.AsyncClient(timeout=self.TIMEOUT_SECONDS) as client:
@@ -99,6 +121,8 @@ class ServerMonitor:
         ]
         
         results = await asyncio.gather(*tasks)
+        for name, status in zip(self.SERVERS, results):
+            self.report_health(name, status)
         
         # 결과를 딕셔너리로 변환
         server_statuses = {}
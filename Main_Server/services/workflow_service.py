@@ -4,13 +4,12 @@
 """
 import asyncio
 from pathlib import Path
-from typing import Dict, Optional, Any, List, Tuple
+from typing import Awaitable, Callable, Dict, Optional, Any, List, Tuple
 from datetime import datetime
 import time
 import httpx
 import requests
 import base64
-import json
 import cv2
 import numpy as np
 import io
@@ -19,18 +18,56 @@ import os
 try:
     from ..utils.path_utils import get_static_paths, get_project_root
     from ..services.scanner import get_scanner
+    from ..services.rss_client import get_rss_client, RssCameraInfo, RssFrame
+    from ..services.rss_prefetch import RssPrefetchManager
+    from ..services.result_cache import get_result_cache, frame_hash, make_key
+    from ..services.replica_pool import get_replica_pools, routing_key
+    from ..services.admission import AdmissionRejected, get_admission_controller
+    from ..utils.depth_registration import align_depth_to_color
+    from ..utils.artifact_writer import ARTIFACT_WRITER
+    from ..utils.input_frame import InputFrame
+    from ..utils.metrics import METRICS
+    from ..utils.tracing import TRACER
+    from ..utils.template_manifest import (
+        DEFAULT_RENDER_PARAMS, build_manifest, check_template, find_identical_template,
+        TemplateMeshIndex, copy_template, write_manifest, template_version,
+    )
 except ImportError:
     from utils.path_utils import get_static_paths, get_project_root
     from services.scanner import get_scanner
+    from services.rss_client import get_rss_client, RssCameraInfo, RssFrame
+    from services.rss_prefetch import RssPrefetchManager
+    from services.result_cache import get_result_cache, frame_hash, make_key
+    from services.replica_pool import get_replica_pools, routing_key
+    from services.admission import AdmissionRejected, get_admission_controller
+    from utils.depth_registration import align_depth_to_color
+    from utils.artifact_writer import ARTIFACT_WRITER
+    from utils.input_frame import InputFrame
+    from utils.metrics import METRICS
+    from utils.tracing import TRACER
+    from utils.template_manifest import (
+        DEFAULT_RENDER_PARAMS, build_manifest, check_template, find_identical_template,
+        TemplateMeshIndex, copy_template, write_manifest, template_version,
+    )
+from sam6d_common.artifact_writer import is_png_base64
+from sam6d_common.rle import mask_to_rle, bbox_to_rle, detections_to_bop
+from sam6d_common.tracing import span, propagation_headers, record_remote_timing
 import requests
 import base64
 from PIL import Image
-from pycocotools import mask as mask_utils
 
 
 SAVE_INPUT_IMAGES = os.getenv("MAIN_SERVER_SAVE_INPUT_IMAGES", "false").lower() == "true"
 SAVE_SERVER_RESPONSES = os.getenv("MAIN_SERVER_SAVE_SERVER_RESPONSES", "false").lower() == "true"
 SAVE_CAMERA_PARAMS = os.getenv("MAIN_SERVER_SAVE_CAMERA_PARAMS", "true").lower() == "true"
+# ISM 호출과 함께 PEM 서버에 템플릿 캐시 워밍 요청 (PEM 템플릿 로드가 ISM 추론과 겹치게)
+PEM_WARM_HINT = os.getenv("MAIN_SERVER_PEM_WARM_HINT", "true").lower() == "true"
+PEM_WARM_HINT_TIMEOUT_SEC = float(os.getenv("MAIN_SERVER_PEM_WARM_HINT_TIMEOUT_SEC", "2"))
+# http: ISM / PEM 서버 호출 / inprocess: ISM / PEM 모델을 이 프로세스에서 실행 (services/inprocess_inference.py)
+INFERENCE_MODE = os.getenv("MAIN_SERVER_INFERENCE_MODE", "http").lower()
+
+PIPELINE_RUNS = METRICS.registry.counter("pipeline_runs_total", "Full pipeline runs by result", ["result"])
+PEM_WARM_HINTS = METRICS.registry.counter("pem_warm_hints_total", "PEM cache warm hints sent on ISM dispatch", ["result"])
 
 
 class WorkflowService:
@@ -39,6 +76,28 @@ class WorkflowService:
     def __init__(self):
         self.paths = get_static_paths()
         self.scanner = get_scanner()
+        self.rss_client = get_rss_client()
+        self.result_cache = get_result_cache()
+        self.artifact_writer = ARTIFACT_WRITER
+        self.replica_pools = get_replica_pools()
+        self.admission = get_admission_controller()
+        # in-process 모드 추론 엔진 (torch / SAM-6D 의존성은 이 모드에서만 import)
+        self.inprocess = None
+        if INFERENCE_MODE == "inprocess":
+            try:
+                from ..services.inprocess_inference import get_inprocess_inference
+            except ImportError:
+                from services.inprocess_inference import get_inprocess_inference
+            self.inprocess = get_inprocess_inference()
+        # 동시 제한 설정은 replica 하나 기준 (in-process 모드는 이 프로세스의 모델 하나)
+        for service, pool in self.replica_pools.items():
+            self.admission.set_replicas(service, 1 if self.inprocess is not None else len(pool.replicas))
+        # 응답을 기다리지 않는 백그라운드 요청 (PEM warm hint), 끝나기 전에 GC되지 않게 보관
+        self._background_tasks = set()
+        self.rss_prefetch = RssPrefetchManager(
+            capture=self._rss_capture_frame,
+            run_pipeline=self._run_pipeline_on_frame,
+        )
     
     def _normalize_tag(self, tag: Optional[str], default: str) -> str:
         """출력 디렉토리 이름에 사용할 태그 문자열 정규화"""
@@ -61,16 +120,23 @@ class WorkflowService:
         force_regenerate: bool = False
     ) -> Dict[str, Any]:
         """템플릿 생성 워크플로우
+
+        템플릿 디렉토리의 매니페스트 (메쉬 내용 해시 / 렌더링 파라미터 / 렌더러 버전)가
+        현재 메쉬와 일치하면 스킵하고, 달라진 객체만 다시 렌더링한다.
+        같은 내용의 메쉬로 생성된 템플릿이 이미 있으면 렌더링 대신 복사한다.
         
         Args:
             class_name: 클래스 이름
             object_names: 객체 이름 목록
-            force_regenerate: 강제 재생성 여부
+            force_regenerate: 매니페스트가 없는 (이전 버전에서 생성된) 템플릿도 재생성
+                (매니페스트가 일치하는 템플릿은 스킵)
             
         Returns:
             Dict: 워크플로우 결과
         """
         results = []
+        # 카탈로그의 매니페스트는 요청당 한 번만 읽음 (같은 메쉬 내용 → 템플릿 디렉토리)
+        mesh_index = TemplateMeshIndex(self.paths["templates"])
         
         for object_name in object_names:
             try:
@@ -89,38 +155,10 @@ class WorkflowService:
                         "error": f"CAD file not found: {object_name} (looking for .ply, .obj, or .stl)"
                     })
                     continue
-                
-                # 템플릿 출력 디렉토리
-                template_output_dir = self.paths["templates"] / class_name / object_name
-                
-                # 이미 템플릿이 있고 강제 재생성이 아닌 경우 스킵
-                if template_output_dir.exists() and not force_regenerate:
-                    results.append({
-                        "object_name": object_name,
-                        "success": True,
-                        "skipped": True,
-                        "message": "Template already exists"
-                    })
-                    continue
-                
-                # Render 서버 호출
-                result = await self._call_render_server(
-                    cad_path=str(cad_path),
-                    template_output_dir=str(template_output_dir)
-                )
-                
-                if result and result.get("success"):
-                    results.append({
-                        "object_name": object_name,
-                        "success": True,
-                        "result": result
-                    })
-                else:
-                    results.append({
-                        "object_name": object_name,
-                        "success": False,
-                        "error": "Render server failed"
-                    })
+
+                results.append(await self._sync_template(
+                    class_name, object_name, cad_path, force_regenerate=force_regenerate, mesh_index=mesh_index
+                ))
                     
             except Exception as e:
                 results.append({
@@ -135,9 +173,87 @@ class WorkflowService:
             "success": successful > 0,
             "total": len(object_names),
             "successful": successful,
+            "rendered": sum(1 for r in results if r.get("success") and "result" in r),
+            "deduplicated": sum(1 for r in results if r.get("deduplicated")),
+            "skipped": sum(1 for r in results if r.get("skipped")),
             "results": results
         }
     
+    async def _sync_template(
+        self,
+        class_name: str,
+        object_name: str,
+        cad_path: Path,
+        force_regenerate: bool = False,
+        mesh_index: Optional[TemplateMeshIndex] = None,
+    ) -> Dict[str, Any]:
+        """템플릿 하나를 현재 메쉬에 맞춤 (매니페스트 일치 → 스킵, 같은 메쉬의 템플릿 → 복사, 아니면 렌더링)
+
+        여러 객체를 처리할 때는 mesh_index (카탈로그 매니페스트 인덱스)를 하나 만들어서 넘긴다
+        (새로 렌더링 / 복사한 템플릿은 여기에 추가됨).
+        """
+        template_output_dir = self.paths["templates"] / class_name / object_name
+
+        # 메쉬 해싱은 파일 크기에 비례하므로 이벤트 루프 밖에서 실행
+        expected = await asyncio.to_thread(build_manifest, cad_path, DEFAULT_RENDER_PARAMS)
+        is_current, reason = await asyncio.to_thread(check_template, template_output_dir, expected)
+
+        # 매니페스트가 일치하면 스킵, 매니페스트 없는 기존 템플릿은 강제 재생성일 때만 재생성
+        if is_current or (reason == "no_manifest" and not force_regenerate):
+            return {
+                "object_name": object_name,
+                "success": True,
+                "skipped": True,
+                "reason": reason,
+                "message": "Template already exists"
+            }
+
+        # 같은 메쉬 내용으로 생성된 템플릿이 있으면 복사
+        if mesh_index is None:
+            mesh_index = TemplateMeshIndex(self.paths["templates"])
+        source_dir = await asyncio.to_thread(
+            find_identical_template, mesh_index, expected, template_output_dir
+        )
+        if source_dir is not None:
+            copied = await asyncio.to_thread(copy_template, source_dir, template_output_dir)
+            write_manifest(template_output_dir, dict(expected, copied_from=str(source_dir.relative_to(self.paths["templates"]))))
+            mesh_index.add(expected["mesh_sha256"], template_output_dir)
+            self.scanner.invalidate(class_name, object_name)
+            return {
+                "object_name": object_name,
+                "success": True,
+                "deduplicated": True,
+                "reason": reason,
+                "source": str(source_dir),
+                "copied_files": copied
+            }
+
+        # Render 서버 호출
+        with METRICS.time_stage("render"):
+            result = await self._call_render_server(
+                cad_path=str(cad_path),
+                template_output_dir=str(template_output_dir),
+                render_params=expected["render_params"]
+            )
+
+        # Render 서버는 wait 모드에서 job 정보 (status)를 반환
+        # 렌더링 결과가 바뀌었으므로 카탈로그 인덱스 갱신 대상으로 표시
+        self.scanner.invalidate(class_name, object_name)
+        if result and (result.get("success") or result.get("status") == "succeeded"):
+            write_manifest(template_output_dir, expected)
+            mesh_index.add(expected["mesh_sha256"], template_output_dir)
+            return {
+                "object_name": object_name,
+                "success": True,
+                "reason": reason,
+                "result": result
+            }
+        return {
+            "object_name": object_name,
+            "success": False,
+            "error": "Render server failed"
+        }
+
     async def execute_full_pipeline(
         self,
         class_name: str,
@@ -149,8 +265,13 @@ class WorkflowService:
         frame_guess: bool = False,
         request_tag: Optional[str] = None,
         output_mode: str = "full",
+        progress: Optional[Callable[[str], None]] = None,
+        use_result_cache: bool = True,
     ) -> Dict[str, Any]:
         """전체 파이프라인 실행 (Render → ISM → PEM)
+
+        같은 프레임 / 카메라 / 객체 / 템플릿 버전의 ISM / PEM 결과는 결과 캐시에서 재사용한다
+        (캐시 적중 시 ISM / PEM 서버의 시각화 파일은 다시 생성되지 않음).
         
         Args:
             class_name: 클래스 이름
@@ -159,13 +280,48 @@ class WorkflowService:
             depth_image: Base64 인코딩된 Depth 이미지
             cam_params: 카메라 파라미터 (intrinsics)
             output_dir: 출력 디렉토리 (없으면 자동 생성)
+            progress: 단계 전환 콜백 (render / ism / pem / finalize), 작업 큐에서 사용
+            use_result_cache: ISM / PEM 결과 캐시 사용 여부
             
         Returns:
-            Dict: 파이프라인 결과
+            Dict: 파이프라인 결과 (timing: 단계별 지연 waterfall, ISM / PEM / Render 서버 내부 단계 포함)
         """
+        with TRACER.trace_or_span("pipeline") as (trace, pipeline_span):
+            result = await self._run_full_pipeline(
+                class_name, object_name, rgb_image, depth_image, cam_params,
+                output_dir=output_dir,
+                frame_guess=frame_guess,
+                request_tag=request_tag,
+                output_mode=output_mode,
+                progress=progress,
+                use_result_cache=use_result_cache,
+            )
+        result["timing"] = {
+            "trace_id": trace.trace_id,
+            "request_id": trace.request_id,
+            "waterfall": trace.waterfall(pipeline_span),
+        }
+        return result
+
+    async def _run_full_pipeline(
+        self,
+        class_name: str,
+        object_name: str,
+        rgb_image: str,
+        depth_image: str,
+        cam_params: Dict[str, Any],
+        output_dir: Optional[str] = None,
+        frame_guess: bool = False,
+        request_tag: Optional[str] = None,
+        output_mode: str = "full",
+        progress: Optional[Callable[[str], None]] = None,
+        use_result_cache: bool = True,
+    ) -> Dict[str, Any]:
+        """execute_full_pipeline 본체 (추적 span 안에서 실행)"""
         mode = (output_mode or "full").lower()
         if mode not in {"full", "results_only", "none"}:
             mode = "full"
+        progress = progress or (lambda stage: None)
 
         save_all = mode == "full"
         save_summary = mode in {"full", "results_only"}
@@ -199,10 +355,17 @@ class WorkflowService:
         template_dir = self.paths["templates"] / class_name / object_name
         
         results = {}
-        image_shape = self._infer_image_shape(rgb_image)
+        cache_status = {"ism": "off", "pem": "off"}
+        # ISM / PEM replica 선택 키 (같은 객체는 템플릿 캐시가 있는 같은 replica로)
+        replica_key = routing_key(class_name, object_name)
+        # 입력 이미지는 요청당 한 번만 디코딩 / 직렬화 (크기는 헤더에서)
+        frame = InputFrame(rgb_image, depth_image)
+        with METRICS.time_stage("decode"):
+            image_shape = frame.shape
         
         # 파이프라인 메타데이터 수집
         start_time = datetime.now()
+        start_perf = time.perf_counter()
         
         if save_all and output_path is not None:
             self._save_input_data(output_path, rgb_image, depth_image, cam_params)
@@ -210,48 +373,84 @@ class WorkflowService:
         try:
             # 1단계: 템플릿 생성 (Render)
             print("[INFO] Step 1: Rendering templates...")
-            if not template_dir.exists():
-                render_result = await self._call_render_server(
-                    cad_path=str(cad_path),
-                    template_output_dir=str(template_dir)
-                )
-                results["render"] = render_result
-            else:
-                print("[INFO] Template already exists, skipping render step")
-                results["render"] = {"skipped": True}
+            progress("render")
+            # 디렉토리가 있어도 메쉬가 제자리에서 수정되었으면 (매니페스트 불일치) 다시 렌더링
+            results["render"] = await self._sync_template(class_name, object_name, cad_path)
+            if results["render"].get("skipped"):
+                print(f"[INFO] Template up to date ({results['render']['reason']}), skipping render step")
             
+            # 결과 캐시 키 (템플릿 버전은 렌더링 이후 기준)
+            cache_key = None
+            if use_result_cache and self.result_cache.enabled:
+                with METRICS.time_stage("cache_key"):
+                    cache_key = make_key(
+                        frame_hash(rgb_image, depth_image), cam_params, class_name, object_name,
+                        template_version(template_dir),
+                    )
+
             # 2단계: 객체 감지 (ISM)
             print("[INFO] Step 2: Running ISM inference...")
-            ism_output_dir = (output_path / "ism") if (save_all and output_path is not None) else None
-            ism_result = await self._call_ism_server(
-                rgb_image=rgb_image,
-                depth_image=depth_image,
-                cam_params=cam_params,
-                cad_path=str(cad_path),
-                template_dir=str(template_dir),
-                output_dir=str(ism_output_dir) if ism_output_dir is not None else None,
-                parent_output_dir=str(output_path) if save_all and output_path is not None else None,
-                save_outputs=save_all,
-            )
-            results["ism"] = ism_result
+            progress("ism")
+            ism_result = self.result_cache.get("ism", cache_key) if cache_key else None
+            if ism_result is not None:
+                print("[INFO] ISM 결과 캐시 적중, ISM 서버 호출 생략")
+                cache_status["ism"] = "hit"
+                results["ism"] = dict(ism_result, cached=True)
+                if save_all and output_path is not None:
+                    self._save_cached_detections(output_path, "ism", ism_result)
+            else:
+                ism_output_dir = (output_path / "ism") if (save_all and output_path is not None) else None
+                self._send_pem_warm_hint(replica_key, class_name, object_name, cad_path, template_dir)
+                with METRICS.time_stage("ism"):
+                    ism_result = await self._call_with_replica(
+                        "ism", replica_key, self.inprocess.call_ism if self.inprocess else self._call_ism_server,
+                        frame=frame,
+                        cam_params=cam_params,
+                        cad_path=str(cad_path),
+                        template_dir=str(template_dir),
+                        output_dir=str(ism_output_dir) if ism_output_dir is not None else None,
+                        parent_output_dir=str(output_path) if save_all and output_path is not None else None,
+                        save_outputs=save_all,
+                    )
+                results["ism"] = ism_result
+                if cache_key:
+                    cache_status["ism"] = "miss"
+                    if ism_result.get("success", False):
+                        self.result_cache.put("ism", cache_key, ism_result)
             
             # 3단계: 포즈 추정 (PEM)
             print("[INFO] Step 3: Running PEM inference...")
-            pem_output_dir = (output_path / "pem") if (save_all and output_path is not None) else None
-            pem_result = await self._call_pem_server(
-                rgb_image=rgb_image,
-                depth_image=depth_image,
-                cam_params=cam_params,
-                cad_path=str(cad_path),
-                template_dir=str(template_dir),
-                ism_result=ism_result,
-                output_dir=str(pem_output_dir) if pem_output_dir is not None else None,
-                parent_output_dir=str(output_path) if save_all and output_path is not None else None,
-                frame_guess=frame_guess,
-                save_outputs=save_all,
-                image_shape=image_shape,
-            )
-            results["pem"] = pem_result
+            progress("pem")
+            pem_cache_key = f"{cache_key}|frame_guess={frame_guess}" if cache_key else None
+            pem_result = self.result_cache.get("pem", pem_cache_key) if pem_cache_key else None
+            if pem_result is not None:
+                print("[INFO] PEM 결과 캐시 적중, PEM 서버 호출 생략")
+                cache_status["pem"] = "hit"
+                results["pem"] = dict(pem_result, cached=True)
+                if save_all and output_path is not None:
+                    self._save_cached_detections(output_path, "pem", pem_result)
+            else:
+                pem_output_dir = (output_path / "pem") if (save_all and output_path is not None) else None
+                with METRICS.time_stage("pem"):
+                    pem_result = await self._call_with_replica(
+                        "pem", replica_key, self.inprocess.call_pem if self.inprocess else self._call_pem_server,
+                        frame=frame,
+                        cam_params=cam_params,
+                        cad_path=str(cad_path),
+                        template_dir=str(template_dir),
+                        ism_result=ism_result,
+                        output_dir=str(pem_output_dir) if pem_output_dir is not None else None,
+                        parent_output_dir=str(output_path) if save_all and output_path is not None else None,
+                        frame_guess=frame_guess,
+                        save_outputs=save_all,
+                        image_shape=image_shape,
+                    )
+                results["pem"] = pem_result
+                if pem_cache_key:
+                    cache_status["pem"] = "miss"
+                    if pem_result.get("success", False):
+                        self.result_cache.put("pem", pem_cache_key, pem_result)
+            progress("finalize")
 
             pose_summary = self._extract_pose_summary(pem_result)
 
@@ -274,14 +473,22 @@ class WorkflowService:
                 self._save_metadata(output_path, metadata)
             if save_summary and output_path is not None:
                 self._save_pose_summary(output_path, True, pose_summary, None)
-            
+
+            METRICS.observe_stage("pipeline", time.perf_counter() - start_perf)
+            PIPELINE_RUNS.inc(result="success")
             return {
                 "success": True,
                 "output_dir": output_dir if save_summary else None,
                 "request_tag": tag_value,
                 "pose_results": pose_summary,
                 "num_poses": len(pose_summary),
+                "cache": cache_status,
             }
+
+        except AdmissionRejected:
+            # ISM / PEM 동시 제한 초과 → 호출한 쪽 (API)에서 429 / 503으로 응답
+            PIPELINE_RUNS.inc(result="rejected")
+            raise
             
         except Exception as e:
             # 파이프라인 실패 - 메타데이터 저장
@@ -307,6 +514,8 @@ class WorkflowService:
             if save_summary and output_path is not None:
                 self._save_pose_summary(output_path, False, pose_summary, str(e))
 
+            METRICS.observe_stage("pipeline", time.perf_counter() - start_perf)
+            PIPELINE_RUNS.inc(result="failure")
             return {
                 "success": False,
                 "error": str(e),
@@ -314,8 +523,20 @@ class WorkflowService:
                 "request_tag": tag_value,
                 "pose_results": pose_summary,
                 "num_poses": len(pose_summary),
+                "cache": cache_status,
             }
     
+    def _save_cached_detections(self, output_path: Path, kind: str, result: Dict[str, Any]):
+        """결과 캐시 적중 시 서버가 저장했을 ism/detection_ism.json / pem/detection_pem.json을 캐시된 결과로 저장
+
+        시각화 이미지 (vis_*.png)는 추론 중간 결과가 필요하므로 저장하지 않는다.
+        """
+        if kind == "ism":
+            detections = detections_to_bop(result.get("detections") or {}, result.get("inference_time", 0.0))
+        else:
+            detections = result.get("detections") or []
+        self.artifact_writer.write_json(output_path / kind / f"detection_{kind}.json", detections)
+
     def _to_container_path(self, host_path: Path) -> str:
         """호스트 경로를 컨테이너 경로로 변환"""
         project_root = get_project_root()
@@ -325,7 +546,8 @@ class WorkflowService:
     async def _call_render_server(
         self,
         cad_path: str,
-        template_output_dir: str
+        template_output_dir: str,
+        render_params: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Render 서버 호출"""
         cad_path_obj = Path(cad_path)
@@ -339,13 +561,16 @@ class WorkflowService:
         url = "http://localhost:8004/render/templates"
         data = {
             "cad_path": cad_container,
-            "output_dir": template_container
+            "output_dir": template_container,
+            **(render_params or DEFAULT_RENDER_PARAMS)
         }
         params = {"wait": True, "wait_timeout_sec": 3600}
         
         try:
             async with httpx.AsyncClient(timeout=3720.0) as client:
-                response = await client.post(url, json=data, params=params)
+                with span("render.http") as http_span:
+                    response = await client.post(url, json=data, params=params, headers=propagation_headers())
+                record_remote_timing(http_span, response.headers.get("server-timing"), "render")
                 if response.status_code == 200:
                     return response.json()
                 else:
@@ -355,11 +580,91 @@ class WorkflowService:
         except Exception as e:
             return {"success": False, "error": str(e)}
     
+    def _send_pem_warm_hint(
+        self,
+        key: Optional[str],
+        class_name: str,
+        object_name: str,
+        cad_path: Path,
+        template_dir: Path,
+    ):
+        """이 객체를 담당하는 PEM replica에 /cache/warm 요청 (기다리지 않음, 실패는 무시)
+
+        ISM 추론 동안 PEM이 템플릿 번들 (로드 + 특징 추출)을 미리 캐시에 올려두면,
+        PEM 요청은 캐시에서 바로 시작한다. 이미 캐시에 있으면 PEM 쪽에서 바로 끝난다.
+        """
+        # 키가 없으면 (affinity 끔) PEM 요청이 어느 replica로 갈지 모르므로 생략, in-process면 PEM 서버 없음
+        if not PEM_WARM_HINT or key is None or self.inprocess is not None:
+            return
+        try:
+            url = f"{self.replica_pools['pem'].owner(key)}/cache/warm"
+            body = {"targets": [{
+                "class_name": class_name,
+                "object_name": object_name,
+                "template_dir": self._to_container_path(template_dir),
+                "cad_path": self._to_container_path(cad_path),
+            }]}
+        except ValueError as e:
+            print(f"[WARN] PEM warm hint skipped: {e}")
+            return
+        headers = propagation_headers()
+
+        async def send():
+            try:
+                async with httpx.AsyncClient(timeout=PEM_WARM_HINT_TIMEOUT_SEC) as client:
+                    response = await client.post(url, json=body, headers=headers)
+                PEM_WARM_HINTS.inc(result="sent" if response.status_code == 200 else "rejected")
+            except Exception as e:
+                PEM_WARM_HINTS.inc(result="failed")
+                print(f"[WARN] PEM warm hint failed ({url}): {e}")
+
+        task = asyncio.create_task(send())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _call_with_replica(
+        self,
+        service: str,
+        key: Optional[str],
+        call: Callable[..., Awaitable[Dict[str, Any]]],
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """admission 자리를 받고 replica 풀에서 서버를 골라 call(server_url=..., **kwargs) 실행
+
+        서비스별 동시 요청 수를 넘으면 대기 큐에서 기다리고, 마감 시간 안에 자리가 나지 않으면
+        AdmissionRejected (API에서 429 / 503 + Retry-After)를 올린다.
+        같은 key (클래스/객체)는 같은 replica로 보낸다. 연결 실패 / 타임아웃이면 해당 replica를
+        cooldown 동안 라우팅에서 제외하고, 연결 실패면 다른 replica로 한 번씩 다시 시도한다.
+        in-process 모드에서는 replica 없이 admission 자리만 받고 call(**kwargs)를 실행한다.
+        """
+        pool = self.replica_pools[service]
+        tried = set()
+        async with self.admission.slot(service) as admission:
+            METRICS.observe_stage(f"{service}_admission_wait", admission["wait_sec"])
+            if self.inprocess is not None:
+                return await call(**kwargs)
+            while True:
+                replica = pool.acquire(key)
+                tried.add(replica.url)
+                result: Dict[str, Any] = {}
+                failed = False
+                try:
+                    result = await call(server_url=replica.url, **kwargs)
+                    failed = bool(result.get("unreachable") or result.get("timed_out"))
+                finally:
+                    pool.release(replica, failed=failed, error=result.get("error") if failed else None)
+                if not result.get("unreachable") or not pool.has_healthy(exclude=tried):
+                    # 실패한 호출은 동시 제한을 줄이는 신호로 사용 (AIMD)
+                    admission["failed"] = failed
+                    return result
+                print(f"[WARN] {service.upper()} replica {replica.url} 연결 실패, 다른 replica로 재시도")
+
     async def _check_server_health(self, server_name: str, health_url: str) -> bool:
         """서버 헬스 체크"""
         try:
             async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(health_url)
+                with span(f"{server_name.lower()}.health_check"):
+                    response = await client.get(health_url)
                 if response.status_code == 200:
                     print(f"[INFO] {server_name} 서버 헬스 체크: OK")
                     return True
@@ -395,16 +700,16 @@ class WorkflowService:
     
     async def _call_ism_server(
         self,
-        rgb_image: str,
-        depth_image: str,
+        frame: InputFrame,
         cam_params: Dict[str, Any],
         cad_path: str,
         template_dir: str,
         output_dir: Optional[str],
         parent_output_dir: Optional[str] = None,
         save_outputs: bool = True,
+        server_url: str = "http://localhost:8002",
     ) -> Dict[str, Any]:
-        """ISM 서버 호출"""
+        """ISM 서버 호출 (server_url: 호출할 replica, _call_with_replica에서 지정)"""
         cad_obj = Path(cad_path)
         template_obj = Path(template_dir)
         output_container = None
@@ -426,13 +731,12 @@ class WorkflowService:
             print(f"  Output: {output_container}")
         
         # 서버 헬스 체크
-        health_ok = await self._check_server_health("ISM", "http://localhost:8002/health")
+        health_ok = await self._check_server_health("ISM", f"{server_url}/ready")
         if not health_ok:
             print(f"[WARN] ISM 서버 헬스 체크 실패했지만 요청을 계속 진행합니다...")
         
+        # 이미지는 frame.request_body에서 직렬화해둔 바이트로 붙임
         inference_request = {
-            "rgb_image": rgb_image,
-            "depth_image": depth_image,
             "cam_params": cam_params,
             "template_dir": template_container,
             "cad_path": cad_container,
@@ -441,7 +745,7 @@ class WorkflowService:
             inference_request["output_dir"] = output_container
         
         # ISM 서버 호출
-        url = "http://localhost:8002/api/v1/inference"
+        url = f"{server_url}/api/v1/inference"
         timeout = 600.0
         start_time = time.time()
         
@@ -455,11 +759,13 @@ class WorkflowService:
                 # 비동기 HTTP 클라이언트 사용 (httpx)
                 async with httpx.AsyncClient(timeout=timeout) as client:
                     print(f"[INFO] ISM 서버에 요청 전송 중... (타임아웃: {timeout}초)")
-                    response = await client.post(
-                        url,
-                        json=inference_request,
-                        headers={"Content-Type": "application/json"},
-                    )
+                    with span("ism.http", replica=server_url) as http_span:
+                        response = await client.post(
+                            url,
+                            content=frame.request_body(inference_request),
+                            headers={"Content-Type": "application/json", **propagation_headers()},
+                        )
+                    record_remote_timing(http_span, response.headers.get("server-timing"), "ism")
                     
                     elapsed = time.time() - start_time
                     monitor_task.cancel()  # 모니터링 태스크 종료
@@ -480,9 +786,8 @@ class WorkflowService:
                         if save_outputs and parent_output_path is not None and SAVE_SERVER_RESPONSES:
                             try:
                                 ism_log_path = parent_output_path / "ism_server_response.json"
-                                with open(ism_log_path, "w", encoding="utf-8") as f:
-                                    json.dump(result, f, indent=2, ensure_ascii=False)
-                                print(f"[INFO] ISM response saved to: {ism_log_path}")
+                                self.artifact_writer.write_json(ism_log_path, result)
+                                print(f"[INFO] ISM response queued: {ism_log_path}")
                             except Exception as log_err:
                                 print(f"[WARN] Failed to save ISM response log: {log_err}")
                         elif save_outputs and parent_output_path is not None:
@@ -501,13 +806,13 @@ class WorkflowService:
                 monitor_task.cancel()
                 error_msg = f"ISM Server timeout after {elapsed:.2f}초: {str(e)}"
                 print(f"[ERROR] {error_msg}")
-                return {"success": False, "error": error_msg}
+                return {"success": False, "error": error_msg, "timed_out": True}
             except httpx.ConnectError as e:
                 elapsed = time.time() - start_time
                 monitor_task.cancel()
                 error_msg = f"ISM Server connection error after {elapsed:.2f}초: {str(e)}"
                 print(f"[ERROR] {error_msg}")
-                return {"success": False, "error": error_msg}
+                return {"success": False, "error": error_msg, "unreachable": True}
             except httpx.HTTPStatusError as e:
                 elapsed = time.time() - start_time
                 monitor_task.cancel()
@@ -529,8 +834,7 @@ class WorkflowService:
     
     async def _call_pem_server(
         self,
-        rgb_image: str,
-        depth_image: str,
+        frame: InputFrame,
         cam_params: Dict[str, Any],
         cad_path: str,
         template_dir: str,
@@ -540,8 +844,9 @@ class WorkflowService:
         frame_guess: bool = False,
         save_outputs: bool = True,
         image_shape: Optional[Tuple[int, int]] = None,
+        server_url: str = "http://localhost:8003",
     ) -> Dict[str, Any]:
-        """PEM 서버 호출"""
+        """PEM 서버 호출 (server_url: 호출할 replica, _call_with_replica에서 지정)"""
         cad_obj = Path(cad_path)
         template_obj = Path(template_dir)
         parent_output_path = Path(parent_output_dir) if (save_outputs and parent_output_dir) else None
@@ -560,15 +865,14 @@ class WorkflowService:
         # 이미지와 카메라 파라미터는 이미 전달받음
         
         # ISM 결과 로드
-        seg_data = self._extract_seg_data(ism_result, top_k=10, image_shape=image_shape)
+        with span("pem.seg_data"):
+            seg_data = self._extract_seg_data(ism_result, top_k=10, image_shape=image_shape)
         
         if not seg_data:
             return {"success": False, "error": "Failed to extract seg_data from ISM result"}
         
         # PEM 요청 데이터
         pem_request = {
-            "rgb_image": rgb_image,
-            "depth_image": depth_image,
             "cam_params": cam_params,
             "cad_path": cad_container,
             "seg_data": seg_data,
@@ -583,7 +887,7 @@ class WorkflowService:
             pem_request["frame_guess"] = True
         
         # PEM 서버 호출
-        url = "http://localhost:8003/api/v1/pose-estimation"
+        url = f"{server_url}/api/v1/pose-estimation"
         timeout = 900.0
         start_time = time.time()
         
@@ -595,7 +899,7 @@ class WorkflowService:
             print(f"  Output: {output_container}")
         
         # 서버 헬스 체크
-        health_ok = await self._check_server_health("PEM", "http://localhost:8003/api/v1/health")
+        health_ok = await self._check_server_health("PEM", f"{server_url}/api/v1/health")
         if not health_ok:
             print(f"[WARN] PEM 서버 헬스 체크 실패했지만 요청을 계속 진행합니다...")
         
@@ -609,10 +913,13 @@ class WorkflowService:
                 # 비동기 HTTP 클라이언트 사용 (httpx)
                 async with httpx.AsyncClient(timeout=timeout) as client:
                     print(f"[INFO] PEM 서버에 요청 전송 중... (타임아웃: {timeout}초)")
-                    response = await client.post(
-                        url,
-                        json=pem_request,
-                    )
+                    with span("pem.http", replica=server_url) as http_span:
+                        response = await client.post(
+                            url,
+                            content=frame.request_body(pem_request),
+                            headers={"Content-Type": "application/json", **propagation_headers()},
+                        )
+                    record_remote_timing(http_span, response.headers.get("server-timing"), "pem")
                     
                     elapsed = time.time() - start_time
                     monitor_task.cancel()  # 모니터링 태스크 종료
@@ -636,9 +943,8 @@ class WorkflowService:
                         if save_outputs and parent_output_path is not None and SAVE_SERVER_RESPONSES:
                             try:
                                 pem_log_path = parent_output_path / "pem_server_response.json"
-                                with open(pem_log_path, "w", encoding="utf-8") as f:
-                                    json.dump(result, f, indent=2, ensure_ascii=False)
-                                print(f"[INFO] PEM response saved to: {pem_log_path}")
+                                self.artifact_writer.write_json(pem_log_path, result)
+                                print(f"[INFO] PEM response queued: {pem_log_path}")
                             except Exception as log_err:
                                 print(f"[WARN] Failed to save PEM response log: {log_err}")
                         elif save_outputs and parent_output_path is not None:
@@ -657,13 +963,13 @@ class WorkflowService:
                 monitor_task.cancel()
                 error_msg = f"PEM Server timeout after {elapsed:.2f}초: {str(e)}"
                 print(f"[ERROR] {error_msg}")
-                return {"success": False, "error": error_msg}
+                return {"success": False, "error": error_msg, "timed_out": True}
             except httpx.ConnectError as e:
                 elapsed = time.time() - start_time
                 monitor_task.cancel()
                 error_msg = f"PEM Server connection error after {elapsed:.2f}초: {str(e)}"
                 print(f"[ERROR] {error_msg}")
-                return {"success": False, "error": error_msg}
+                return {"success": False, "error": error_msg, "unreachable": True}
             except httpx.HTTPStatusError as e:
                 elapsed = time.time() - start_time
                 monitor_task.cancel()
@@ -720,19 +1026,6 @@ class WorkflowService:
         port = port or 51000
         return f"http://{host}:{port}"
 
-    def _rss_fetch_binary(self, url: str) -> bytes:
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-        return r.content
-
-    def _rss_fetch_json(self, url: str) -> Dict[str, Any]:
-        r = requests.get(url, timeout=10)
-        r.raise_for_status()
-        try:
-            return r.json()
-        except Exception:
-            return json.loads(r.text)
-
     def _rss_extract_K(self, js: Dict[str, Any]) -> Optional[np.ndarray]:
         def try_make_mat(val) -> Optional[np.ndarray]:
             try:
@@ -847,31 +1140,8 @@ class WorkflowService:
                                     pass
         return None
 
-    async def execute_full_pipeline_from_rss(
-        self,
-        class_name: str,
-        object_name: str,
-        base: Optional[str] = None,
-        host: Optional[str] = None,
-        port: Optional[int] = None,
-        align_color: bool = False,
-        output_dir: Optional[str] = None,
-        frame_guess: bool = False,
-        request_tag: Optional[str] = None,
-        output_mode: str = "full",
-    ) -> Dict[str, Any]:
-        """RSS 서버에서 직접 데이터 수집 후 전체 파이프라인 실행"""
-        start_ts = datetime.now()
-        print(f"[RSS] >>> begin execute_from_rss at {start_ts.isoformat()} class={class_name} obj={object_name}")
-        base_url = self._rss_build_base(host, port, base)
-        print(f"[RSS] base_url={base_url} align_color={align_color} frame_guess={frame_guess}")
-
-        # 캘리브/상태 수집
-        print("[RSS] fetch calibration/status ...")
-        calib = self._rss_fetch_json(f"{base_url}/camera/calibration")
-        status = self._rss_fetch_json(f"{base_url}/camera/status")
-        print("[RSS] calibration/status fetched")
-
+    def _rss_parse_camera(self, calib: Dict[str, Any], status: Dict[str, Any]):
+        """캘리브레이션 / 상태에서 (depth_scale, camK_depth, camK_color, T_d2c) 추출"""
         depth_scale = self._rss_extract_depth_scale(calib) or self._rss_extract_depth_scale(status) or 1.0
         camK_depth = self._rss_extract_K(calib)
         if camK_depth is None:
@@ -884,102 +1154,155 @@ class WorkflowService:
             cy = ci.get('cy', ci.get('ppy'))
             if all(v is not None for v in [fx, fy, cx, cy]):
                 camK_color = np.array([[float(fx), 0.0, float(cx)], [0.0, float(fy), float(cy)], [0.0, 0.0, 1.0]])
-        print(f"[RSS] depth_scale={depth_scale} camK_depth={'ok' if camK_depth is not None else 'none'} camK_color={'ok' if camK_color is not None else 'none'}")
-        T_d2c = self._rss_extract_extrinsics(calib) or self._rss_extract_extrinsics(status)
-        print(f"[RSS] extrinsics(depth->color)={'ok' if T_d2c is not None else 'none'}")
-
-        camK = camK_color if (align_color and camK_color is not None) else camK_depth
-        if camK is None:
-            raise Exception('Failed to infer camera intrinsics from RSS calibration/status')
+        T_d2c = self._rss_extract_extrinsics(calib)
+        if T_d2c is None:
+            T_d2c = self._rss_extract_extrinsics(status)
+        return depth_scale, camK_depth, camK_color, T_d2c
 
-        cam_params = {
-            'cam_K': [float(camK[0,0]), 0.0, float(camK[0,2]), 0.0, float(camK[1,1]), float(camK[1,2]), 0.0, 0.0, 1.0],
-            'depth_scale': float(depth_scale)
-        }
-        print("[RSS] cam_params prepared")
+    def _rss_prepare_frame(
+        self,
+        color_raw: bytes,
+        depth_raw: bytes,
+        camera: RssCameraInfo,
+        align_color: bool,
+    ) -> Tuple[str, str]:
+        """raw 프레임 → (RGB PNG base64, depth PNG base64), 필요 시 depth를 컬러 좌표로 정렬"""
+        W, H = camera.width, camera.height
+        camK_depth, camK_color, T_d2c = camera.camK_depth, camera.camK_color, camera.T_d2c
 
-        # 컬러/뎁스 수집 (raw 기반 → PNG 바이트로 변환)
-        print("[RSS] fetch color_jpeg ...")
-        color_jpg_start = time.time()
-        color_jpg = self._rss_fetch_binary(f"{base_url}/streams/color_jpeg")
-        print(f"[RSS] color_jpeg fetched ({time.time() - color_jpg_start:.2f}초)")
-        
-        with Image.open(io.BytesIO(color_jpg)) as im:
-            W, H = im.size
-        print(f"[RSS] color size W={W} H={H}")
-
-        print("[RSS] fetch color_raw ...")
-        color_raw_start = time.time()
-        color_raw = self._rss_fetch_binary(f"{base_url}/streams/color_raw")
-        print(f"[RSS] color_raw fetched ({time.time() - color_raw_start:.2f}초)")
-        
         expected = W * H * 3
         if len(color_raw) < expected:
             raise Exception(f"color_raw size {len(color_raw)} < expected {expected}")
         arr = np.frombuffer(color_raw[:expected], dtype=np.uint8).reshape((H, W, 3))
         arr_rgb = arr[..., ::-1]
-        rgb_png_bytes = io.BytesIO()
-        Image.fromarray(arr_rgb).save(rgb_png_bytes, format='PNG')
-        rgb_b64 = base64.b64encode(rgb_png_bytes.getvalue()).decode('utf-8')
-        print("[RSS] color prepared")
-
-        print("[RSS] fetch depth_raw ...")
-        depth_raw_start = time.time()
-        depth_raw = self._rss_fetch_binary(f"{base_url}/streams/depth_raw")
-        print(f"[RSS] depth_raw fetched ({time.time() - depth_raw_start:.2f}초)")
-        
+        with METRICS.time_stage("encode"):
+            rgb_png_bytes = io.BytesIO()
+            Image.fromarray(arr_rgb).save(rgb_png_bytes, format='PNG')
+            rgb_b64 = base64.b64encode(rgb_png_bytes.getvalue()).decode('utf-8')
+
         expected_d = W * H * 2
         if len(depth_raw) < expected_d:
             raise Exception(f"depth_raw size {len(depth_raw)} < expected {expected_d}")
         depth = np.frombuffer(depth_raw[:expected_d], dtype=np.uint16).reshape((H, W))
-        print("[RSS] depth prepared (raw)")
 
         # align depth to color if requested and extrinsics available
         if align_color and (T_d2c is not None) and (camK_color is not None) and (camK_depth is not None):
-            z_m = depth.astype(np.float32) / 1000.0
-            fx_d, fy_d, cx_d, cy_d = float(camK_depth[0,0]), float(camK_depth[1,1]), float(camK_depth[0,2]), float(camK_depth[1,2])
-            fx_c, fy_c, cx_c, cy_c = float(camK_color[0,0]), float(camK_color[1,1]), float(camK_color[0,2]), float(camK_color[1,2])
-
-            us = np.arange(W, dtype=np.float32)
-            vs = np.arange(H, dtype=np.float32)
-            uu, vv = np.meshgrid(us, vs)
-            Z = z_m
-            valid = Z > 0
-            Xd = (uu - cx_d) / fx_d * Z
-            Yd = (vv - cy_d) / fy_d * Z
-
-            R = T_d2c[:3, :3]
-            t = T_d2c[:3, 3]
-            Xc = R[0,0]*Xd + R[0,1]*Yd + R[0,2]*Z + t[0]
-            Yc = R[1,0]*Xd + R[1,1]*Yd + R[1,2]*Z + t[1]
-            Zc = R[2,0]*Xd + R[2,1]*Yd + R[2,2]*Z + t[2]
-
-            uc = fx_c * (Xc / (Zc + 1e-9)) + cx_c
-            vc = fy_c * (Yc / (Zc + 1e-9)) + cy_c
-
-            aligned = np.zeros((H, W), dtype=np.float32)
-            uc_i = np.rint(uc).astype(np.int32)
-            vc_i = np.rint(vc).astype(np.int32)
-            m = valid & (Zc > 0) & (uc_i >= 0) & (uc_i < W) & (vc_i >= 0) & (vc_i < H)
-            inds = np.where(m)
-            flat_idx = vc_i[inds] * W + uc_i[inds]
-            order = np.argsort(Zc[inds])
-            flat_idx = flat_idx[order]
-            z_vals = Zc[inds][order]
-            seen = set()
-            for i in range(len(flat_idx)):
-                k = int(flat_idx[i])
-                if k in seen:
-                    continue
-                seen.add(k)
-                r = k // W
-                c = k % W
-                aligned[r, c] = z_vals[i]
-            depth = np.clip(np.rint(aligned * 1000.0), 0, 65535).astype(np.uint16)
+            with METRICS.time_stage("depth_align"):
+                depth = align_depth_to_color(depth, camK_depth, camK_color, T_d2c, (W, H))
+
+        with METRICS.time_stage("encode"):
+            depth_png_bytes = io.BytesIO()
+            Image.fromarray(depth, mode='I;16').save(depth_png_bytes, format='PNG')
+            depth_b64 = base64.b64encode(depth_png_bytes.getvalue()).decode('utf-8')
+        return rgb_b64, depth_b64
+
+    async def _rss_capture_frame(self, base_url: str, align_color: bool, verbose: bool = True) -> RssFrame:
+        """RSS에서 프레임 한 장 수집 후 파이프라인 입력으로 변환
+
+        카메라 정보 (캐시)와 color_raw / depth_raw를 비동기로 동시에 수집하고,
+        프레임 변환 (정렬 / PNG 인코딩)은 스레드에서 실행해 이벤트 루프를 막지 않는다.
+        verbose=False면 로그를 남기지 않는다 (prefetch 루프).
+        """
+        log = print if verbose else (lambda *args, **kwargs: None)
+        log("[RSS] fetch camera info / color_raw / depth_raw ...")
+        fetch_start = time.time()
+        camera, (color_raw, depth_raw) = await asyncio.gather(
+            self.rss_client.get_camera_info(base_url, self._rss_parse_camera),
+            self.rss_client.fetch_frame(base_url),
+        )
+        captured_at = time.time()
+        METRICS.observe_stage("rss_fetch", captured_at - fetch_start)
+        log(f"[RSS] fetched ({captured_at - fetch_start:.2f}초)")
+        log(f"[RSS] depth_scale={camera.depth_scale} camK_depth={'ok' if camera.camK_depth is not None else 'none'} camK_color={'ok' if camera.camK_color is not None else 'none'}")
+        log(f"[RSS] extrinsics(depth->color)={'ok' if camera.T_d2c is not None else 'none'}")
+        log(f"[RSS] color size W={camera.width} H={camera.height}")
 
-        depth_png_bytes = io.BytesIO()
-        Image.fromarray(depth, mode='I;16').save(depth_png_bytes, format='PNG')
-        depth_b64 = base64.b64encode(depth_png_bytes.getvalue()).decode('utf-8')
+        camK = camera.camK_color if (align_color and camera.camK_color is not None) else camera.camK_depth
+        if camK is None:
+            raise Exception('Failed to infer camera intrinsics from RSS calibration/status')
+
+        cam_params = {
+            'cam_K': [float(camK[0,0]), 0.0, float(camK[0,2]), 0.0, float(camK[1,1]), float(camK[1,2]), 0.0, 0.0, 1.0],
+            'depth_scale': float(camera.depth_scale)
+        }
+        log("[RSS] cam_params prepared")
+
+        rgb_b64, depth_b64 = await asyncio.to_thread(
+            self._rss_prepare_frame, color_raw, depth_raw, camera, align_color
+        )
+        log("[RSS] color/depth prepared")
+        return RssFrame(
+            base_url=base_url,
+            align_color=align_color,
+            camera=camera,
+            cam_params=cam_params,
+            rgb_b64=rgb_b64,
+            depth_b64=depth_b64,
+            captured_at=captured_at,
+        )
+
+    async def _run_pipeline_on_frame(
+        self,
+        frame: RssFrame,
+        class_name: str,
+        object_name: str,
+        frame_guess: bool = False,
+        output_mode: str = "none",
+        request_tag: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """수집된 RSS 프레임으로 전체 파이프라인 실행 (연속 모드에서 사용)"""
+        label = self._normalize_tag(request_tag, "rss-continuous")
+        output_dir = None
+        if output_mode != "none":
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_dir = str(self.paths["output"] / f"{timestamp}_{label}_{frame.seq}")
+        return await self.execute_full_pipeline(
+            class_name=class_name,
+            object_name=object_name,
+            rgb_image=frame.rgb_b64,
+            depth_image=frame.depth_b64,
+            cam_params=frame.cam_params,
+            output_dir=output_dir,
+            frame_guess=frame_guess,
+            request_tag=label,
+            output_mode=output_mode,
+        )
+
+    async def execute_full_pipeline_from_rss(
+        self,
+        class_name: str,
+        object_name: str,
+        base: Optional[str] = None,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        align_color: bool = False,
+        output_dir: Optional[str] = None,
+        frame_guess: bool = False,
+        request_tag: Optional[str] = None,
+        output_mode: str = "full",
+        use_prefetched: bool = True,
+        max_frame_age_sec: Optional[float] = None,
+        progress: Optional[Callable[[str], None]] = None,
+        use_result_cache: bool = True,
+    ) -> Dict[str, Any]:
+        """RSS 서버에서 직접 데이터 수집 후 전체 파이프라인 실행
+
+        해당 RSS 소스의 prefetch 루프가 동작 중이면 버퍼의 최신 프레임을 바로 사용하고,
+        없거나 max_frame_age_sec보다 오래된 경우에만 새로 수집한다.
+        """
+        start_ts = datetime.now()
+        print(f"[RSS] >>> begin execute_from_rss at {start_ts.isoformat()} class={class_name} obj={object_name}")
+        base_url = self._rss_build_base(host, port, base)
+        print(f"[RSS] base_url={base_url} align_color={align_color} frame_guess={frame_guess}")
+
+        frame = self.rss_prefetch.latest_frame(base_url, align_color, max_frame_age_sec) if use_prefetched else None
+        if frame is not None:
+            print(f"[RSS] use prefetched frame seq={frame.seq} age={frame.age_sec * 1000:.0f}ms")
+        else:
+            if progress is not None:
+                progress("capture")
+            frame = await self._rss_capture_frame(base_url, align_color)
+        cam_params, rgb_b64, depth_b64 = frame.cam_params, frame.rgb_b64, frame.depth_b64
 
         mode = (output_mode or "full").lower()
         if mode not in {"full", "results_only", "none"}:
@@ -1003,6 +1326,8 @@ class WorkflowService:
             frame_guess=frame_guess,
             request_tag=label,
             output_mode=mode,
+            progress=progress,
+            use_result_cache=use_result_cache,
         )
         end_ts = datetime.now()
         print(f"[RSS] <<< end execute_from_rss at {end_ts.isoformat()} duration={(end_ts-start_ts).total_seconds():.2f}s success={result.get('success', False)}")
@@ -1066,17 +1391,8 @@ class WorkflowService:
                     elif isinstance(mask_item, list):
                         try:
                             mask_array = np.array(mask_item, dtype=np.uint8)
-                            if mask_array.ndim == 2:
-                                h, w = mask_array.shape
-                                if mask_array.max() > 0:
-                                    rle = mask_utils.encode(np.asfortranarray(mask_array))
-                                    counts = rle.get("counts")
-                                    if isinstance(counts, bytes):
-                                        counts = counts.decode("utf-8")
-                                    seg = {
-                                        "size": [int(h), int(w)],
-                                        "counts": counts,
-                                    }
+                            if mask_array.ndim == 2 and mask_array.max() > 0:
+                                seg = mask_to_rle(mask_array)
                         except Exception as mask_err:
                             print(f"[WARN] Failed to convert mask array to RLE: {mask_err}")
                 if seg is None:
@@ -1103,19 +1419,6 @@ class WorkflowService:
         
         return top_seg_data
     
-    def _infer_image_shape(self, rgb_image_b64: str) -> Optional[Tuple[int, int]]:
-        try:
-            rgb_bytes = base64.b64decode(rgb_image_b64)
-            rgb_array = np.frombuffer(rgb_bytes, dtype=np.uint8)
-            img = cv2.imdecode(rgb_array, cv2.IMREAD_COLOR)
-            if img is None:
-                return None
-            h, w = img.shape[:2]
-            return int(h), int(w)
-        except Exception as e:
-            print(f"[WARN] Failed to infer image shape: {e}")
-            return None
-
     def _create_bbox_segmentation(
         self,
         bbox: List[float],
@@ -1134,59 +1437,47 @@ class WorkflowService:
             y1 = max(0, min(h - 1, y1))
             x2 = max(x1 + 1, min(w, x2))
             y2 = max(y1 + 1, min(h, y2))
-            mask = np.zeros((h, w), dtype=np.uint8)
-            mask[y1:y2, x1:x2] = 1
-            if mask.sum() == 0:
-                return None
-            rle = mask_utils.encode(np.asfortranarray(mask))
-            counts = rle.get("counts")
-            if isinstance(counts, bytes):
-                counts = counts.decode("utf-8")
-            return {
-                "size": [int(h), int(w)],
-                "counts": counts,
-            }
+            return bbox_to_rle(x1, y1, x2, y2, h, w)
         except Exception as e:
             print(f"[WARN] Failed to build fallback segmentation from bbox {bbox}: {e}")
             return None
 
     def _save_input_data(self, output_path: Path, rgb_image: str, depth_image: str, cam_params: Dict[str, Any]):
-        """입력 데이터(RGB, Depth, 카메라 파라미터)를 output 디렉토리에 저장"""
+        """입력 데이터(RGB, Depth, 카메라 파라미터)를 output 디렉토리에 저장 (백그라운드 저장)
+
+        PNG 입력은 디코딩 / 재인코딩 없이 원본 바이트를 그대로 저장한다.
+        """
         try:
             if SAVE_INPUT_IMAGES:
-                # RGB 이미지 저장
-                rgb_bytes = base64.b64decode(rgb_image)
-                rgb_array = np.frombuffer(rgb_bytes, dtype=np.uint8)
-                rgb_cv = cv2.imdecode(rgb_array, cv2.IMREAD_COLOR)
-                if rgb_cv is not None:
-                    cv2.imwrite(str(output_path / "input_rgb.png"), rgb_cv)
-                    print(f"[INFO] RGB image saved: {output_path / 'input_rgb.png'}")
-                
-                # Depth 이미지 저장
-                depth_bytes = base64.b64decode(depth_image)
-                depth_array = np.frombuffer(depth_bytes, dtype=np.uint8)
-                # 전달 포맷이 PNG이므로 이미지 디코드 사용 (16-bit 보존)
-                depth_cv = cv2.imdecode(depth_array, cv2.IMREAD_UNCHANGED)
-                if depth_cv is not None:
-                    # 16-bit PNG로 저장
-                    cv2.imwrite(str(output_path / "input_depth.png"), depth_cv)
-                    print(f"[INFO] Depth image saved: {output_path / 'input_depth.png'}")
-                else:
-                    # 디코드 실패 시 원본 PNG 바이트를 그대로 기록 (fallback)
-                    raw_path = output_path / "input_depth.png"
-                    with open(raw_path, "wb") as f:
-                        f.write(depth_bytes)
-                    print(f"[WARN] Depth decode failed; wrote raw PNG bytes to: {raw_path}")
+                self._queue_input_image(output_path / "input_rgb.png", rgb_image, cv2.IMREAD_COLOR)
+                # depth는 16-bit PNG 그대로 보존
+                self._queue_input_image(output_path / "input_depth.png", depth_image, cv2.IMREAD_UNCHANGED)
+                print(f"[INFO] Input images queued: {output_path}")
             else:
                 print("[INFO] Skipping input image persistence (MAIN_SERVER_SAVE_INPUT_IMAGES != true)")
             
             if SAVE_CAMERA_PARAMS:
-                # 카메라 파라미터 저장
-                with open(output_path / "camera_params.json", "w", encoding="utf-8") as f:
-                    json.dump(cam_params, f, indent=2, ensure_ascii=False)
-                    print(f"[INFO] Camera parameters saved: {output_path / 'camera_params.json'}")
+                self.artifact_writer.write_json(output_path / "camera_params.json", cam_params)
         except Exception as e:
             print(f"[WARN] Failed to save input data: {e}")
+
+    def _queue_input_image(self, path: Path, image_b64: str, imread_flag: int):
+        """입력 이미지 저장 예약 (PNG는 원본 그대로, 그 외 포맷은 저장 스레드에서 PNG로 변환)"""
+        if is_png_base64(image_b64):
+            self.artifact_writer.write_base64(path, image_b64)
+            return
+
+        def encode_png() -> bytes:
+            raw = base64.b64decode(image_b64)
+            image = cv2.imdecode(np.frombuffer(raw, dtype=np.uint8), imread_flag)
+            if image is None:
+                # 디코드 실패 시 원본 바이트를 그대로 기록 (fallback)
+                print(f"[WARN] Image decode failed; writing raw bytes to: {path}")
+                return raw
+            ok, encoded = cv2.imencode(".png", image)
+            return encoded.tobytes() if ok else raw
+
+        self.artifact_writer.write_with(path, encode_png, size_hint=len(image_b64))
     
     def _create_metadata(
         self,
@@ -1304,12 +1595,11 @@ class WorkflowService:
         return summary
     
     def _save_metadata(self, output_path: Path, metadata: Dict[str, Any]):
-        """메타데이터를 JSON 파일로 저장"""
+        """메타데이터를 JSON 파일로 저장 (백그라운드 저장)"""
         try:
             metadata_file = output_path / "pipeline_metadata.json"
-            with open(metadata_file, "w", encoding="utf-8") as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
-            print(f"[INFO] Pipeline metadata saved to {metadata_file}")
+            self.artifact_writer.write_json(metadata_file, metadata)
+            print(f"[INFO] Pipeline metadata queued: {metadata_file}")
         except Exception as e:
             print(f"[WARN] Failed to save metadata: {e}")
 
@@ -1323,9 +1613,8 @@ class WorkflowService:
             }
             if error:
                 payload["error"] = error
-            with open(summary_path, "w", encoding="utf-8") as f:
-                json.dump(payload, f, indent=2, ensure_ascii=False)
-            print(f"[INFO] Pose summary saved to {summary_path}")
+            self.artifact_writer.write_json(summary_path, payload)
+            print(f"[INFO] Pose summary queued: {summary_path}")
         except Exception as e:
             print(f"[WARN] Failed to save pose summary: {e}")
 
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+ISM / PEM admission control 테스트 (ISM / PEM 서버 호출은 가짜 함수로 대체)
+"""
+import asyncio
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi import FastAPI
+
+from Main_Server.api.endpoints.workflow import router as workflow_router, workflow_service
+from Main_Server.services.admission import AdaptiveLimiter, AdmissionController, AdmissionRejected
+from bench_load import make_catalog
+
+CAM = {"cam_K": [600.0, 0.0, 320.0, 0.0, 600.0, 240.0, 0.0, 0.0, 1.0], "depth_scale": 1.0}
+
+
+def test_queue_and_deadline():
+    """동시 제한 / 대기 큐 상한 (429) / 마감 시간 (503) / FIFO 확인"""
+    async def run():
+        limiter = AdaptiveLimiter("ism", initial_limit=1, max_limit=1, max_queue=2, deadline_sec=0.2)
+        order = []
+
+        async def call(name, hold):
+            async with limiter.slot():
+                order.append(name)
+                await asyncio.sleep(hold)
+
+        first = asyncio.create_task(call("first", 0.05))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(call(name, 0.01)) for name in ("second", "third")]
+        await asyncio.sleep(0)
+        assert limiter.in_flight == 1 and limiter.queued == 2
+
+        # 대기 큐가 가득 참 → 바로 429
+        start = time.perf_counter()
+        try:
+            await limiter.acquire()
+            raise AssertionError("queue full should be rejected")
+        except AdmissionRejected as e:
+            assert e.status_code == 429 and e.headers["Retry-After"] == "1"
+        assert time.perf_counter() - start < 0.01
+
+        await asyncio.gather(first, *waiters)
+        assert order == ["first", "second", "third"] and limiter.in_flight == 0
+
+        # 예상 대기 시간이 마감 시간보다 길면 기다리지 않고 503
+        limiter.ewma_latency = 5.0
+        await limiter.acquire()
+        try:
+            await limiter.acquire(deadline=time.monotonic() + 1.0)
+            raise AssertionError("deadline should be rejected")
+        except AdmissionRejected as e:
+            assert e.status_code == 503 and e.reason == "deadline" and int(e.headers["Retry-After"]) >= 5
+
+        # 예상은 맞았지만 실제로 마감 시간까지 자리가 안 나면 503
+        limiter.ewma_latency = 0.01
+        start = time.perf_counter()
+        try:
+            await limiter.acquire()
+            raise AssertionError("waiting past the deadline should be rejected")
+        except AdmissionRejected as e:
+            assert e.status_code == 503
+        assert 0.15 < time.perf_counter() - start < 1.0 and limiter.queued == 0
+        limiter.release(0.01)
+        stats = limiter.get_stats()
+        assert stats["rejected_queue_full"] == 1 and stats["rejected_deadline"] == 2 and stats["in_flight"] == 0
+
+    asyncio.run(run())
+    print("✅ bounded queue (429) / deadline (503) / FIFO")
+    return True
+
+
+def test_aimd():
+    """지연이 목표 이하면 동시 제한 증가, 넘거나 실패하면 감소"""
+    limiter = AdaptiveLimiter("pem", initial_limit=2, min_limit=1, max_limit=4, tolerance=2.0, decrease_factor=0.5)
+    for _ in range(10):
+        limiter.in_flight = limiter.current_limit  # 제한에 걸린 상태
+        limiter.release(1.0)
+    assert limiter.current_limit == 4, limiter.get_stats()
+
+    limiter.in_flight = 1
+    limiter.release(30.0)  # 템플릿 캐시 미스 같은 한 번의 느린 호출은 무시
+    assert limiter.current_limit == 4
+    for _ in range(2):
+        limiter.in_flight = 1
+        limiter.release(3.0)  # 최근 5개 지연의 중앙값이 하위 10% 지연 (1초) × 2 초과
+    assert limiter.current_limit == 2
+    limiter.in_flight = 1
+    limiter.release(failed=True)
+    assert limiter.current_limit == 1
+    limiter.in_flight = 1
+    limiter.release(failed=True)
+    assert limiter.current_limit == 1 and limiter.limit == 1.0  # 최소값 유지
+
+    # 한가할 때 (제한에 안 걸림)는 늘리지 않음
+    limiter.in_flight = 0
+    limiter.release(1.0)
+    assert limiter.limit == 1.0
+    print(f"✅ AIMD limit adjustment ({limiter.stats['increases']} increases, {limiter.stats['decreases']} decreases)")
+    return True
+
+
+def test_replica_scaling():
+    """동시 제한 설정은 replica 하나 기준이고 replica 수만큼 곱해지는지 확인"""
+    limiter = AdaptiveLimiter("ism", initial_limit=2, min_limit=1, max_limit=4, replicas=3)
+    assert (limiter.current_limit, limiter.min_limit, limiter.max_limit) == (6, 3, 12)
+
+    controller = AdmissionController(initial_limit=2, min_limit=1, max_limit=4)
+    controller.set_replicas("pem", 2)
+    stats = controller.get_stats()["services"]
+    assert (stats["pem"]["limit"], stats["pem"]["max_limit"], stats["pem"]["replicas"]) == (4, 8, 2)
+    assert (stats["ism"]["limit"], stats["ism"]["max_limit"]) == (2, 4)
+    controller.set_replicas("pem", 1)
+    assert controller.limiters["pem"].current_limit == 2
+    print("✅ per-replica concurrency limits")
+    return True
+
+
+def test_pipeline_rejection():
+    """동시 요청이 몰리면 초과분은 API에서 429 + Retry-After로 빨리 거절되는지 확인"""
+    root = Path(tempfile.mkdtemp(prefix="admission_test_"))
+    paths = workflow_service.paths
+    call_ism, call_pem = workflow_service._call_ism_server, workflow_service._call_pem_server
+    admission = workflow_service.admission
+    try:
+        workflow_service.paths = dict(paths, meshes=root / "meshes", templates=root / "templates", output=root / "output")
+        make_catalog(root, "ycb", ["a"], cold_objects=0)
+
+        async def slow_ism(**kwargs):
+            await asyncio.sleep(0.2)
+            return {"success": True, "detections": {"masks": [], "boxes": [[0, 0, 1, 1]], "scores": [0.9]}}
+
+        async def fake_pem(**kwargs):
+            return {"success": True, "pose_scores": [0.8], "pred_rot": [[[1, 0, 0], [0, 1, 0], [0, 0, 1]]], "pred_trans": [[0, 0, 500]]}
+
+        workflow_service._call_ism_server = slow_ism
+        workflow_service._call_pem_server = fake_pem
+        workflow_service.admission = AdmissionController(initial_limit=1, max_limit=1, max_queue=1, deadline_sec=5.0)
+
+        app = FastAPI()
+        app.include_router(workflow_router)
+
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://main") as client:
+                async def post(i):
+                    start = time.perf_counter()
+                    response = await client.post("/api/v1/workflow/full-pipeline", json={
+                        "class_name": "ycb", "object_name": "a", "rgb_image": f"admission-{i}", "depth_image": "d",
+                        "cam_params": CAM, "output_mode": "none", "use_result_cache": False,
+                    })
+                    return response, time.perf_counter() - start
+
+                results = await asyncio.gather(*(post(i) for i in range(3)))
+                status = (await client.get("/api/v1/workflow/server-status")).json()
+                return results, status
+
+        results, status = asyncio.run(run())
+        codes = sorted(response.status_code for response, _ in results)
+        assert codes == [200, 200, 429], codes
+        rejected, rejected_sec = next((r, sec) for r, sec in results if r.status_code == 429)
+        assert rejected.headers["Retry-After"] and rejected_sec < 0.15, rejected_sec
+        assert "ISM admission rejected" in rejected.json()["detail"]
+
+        ism = status["admission"]["services"]["ism"]
+        assert ism["admitted"] == 2 and ism["rejected_queue_full"] == 1 and ism["in_flight"] == 0
+        assert "replicas" in status and "job_queue" in status
+        print(f"✅ burst of 3 → {codes} (rejected in {rejected_sec * 1000:.0f}ms, Retry-After {rejected.headers['Retry-After']}s)")
+        return True
+    finally:
+        workflow_service.paths = paths
+        workflow_service._call_ism_server, workflow_service._call_pem_server = call_ism, call_pem
+        workflow_service.admission = admission
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    print("admission control 테스트 시작...\n")
+
+    success = True
+    success &= test_queue_and_deadline()
+    success &= test_aimd()
+    success &= test_replica_scaling()
+    success &= test_pipeline_rejection()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
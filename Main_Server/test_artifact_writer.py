@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+백그라운드 산출물 저장기 테스트 (ISM / PEM 서버 호출은 가짜 함수로 대체)
+"""
+import asyncio
+import base64
+import json
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from Main_Server.services import workflow_service as workflow_module
+from sam6d_common.artifact_writer import ArtifactWriter, is_png_base64
+from bench_load import make_catalog
+from workflow_stubs import make_service
+
+CAM = {"cam_K": [600.0, 0.0, 320.0, 0.0, 600.0, 240.0, 0.0, 0.0, 1.0], "depth_scale": 1.0}
+
+
+def png_base64(image: np.ndarray) -> str:
+    ok, encoded = cv2.imencode(".png", image)
+    assert ok
+    return base64.b64encode(encoded.tobytes()).decode("ascii")
+
+
+def blocked_writer(**kwargs):
+    """첫 작업이 release.set() 전까지 끝나지 않는 저장기 (저장 스레드가 바쁜 상황 재현)"""
+    writer = ArtifactWriter(**kwargs)
+    release = threading.Event()
+    writer.call(release.wait)
+    return writer, release
+
+
+def test_write_and_flush():
+    """저장 / flush / raw passthrough (원본 바이트 그대로) 확인"""
+    root = Path(tempfile.mkdtemp(prefix="artifact_writer_test_"))
+    try:
+        writer = ArtifactWriter()
+        rgb = png_base64(np.random.randint(0, 255, (48, 64, 3), dtype=np.uint8))
+        assert is_png_base64(rgb) and not is_png_base64(base64.b64encode(b"\xff\xd8\xff").decode())
+
+        writer.write_base64(root / "rgb.png", rgb)
+        writer.write_json(root / "sub" / "meta.json", {"한글": 1})
+        writer.write_bytes(root / "raw.bin", b"abc")
+        writer.write_with(root / "skipped.png", lambda: None)
+        writer.write_with(root / "broken.png", lambda: 1 / 0)
+        assert writer.flush(timeout=5.0)
+
+        assert (root / "rgb.png").read_bytes() == base64.b64decode(rgb)
+        assert json.loads((root / "sub" / "meta.json").read_text(encoding="utf-8")) == {"한글": 1}
+        assert (root / "raw.bin").read_bytes() == b"abc"
+        assert not (root / "skipped.png").exists() and not (root / "broken.png").exists()
+        assert not list(root.rglob("*.tmp"))
+
+        stats = writer.get_stats()
+        assert stats["written"] == 3 and stats["failed"] == 1 and stats["pending_items"] == 0
+        assert writer.close(timeout=5.0)
+        print(f"✅ write / flush / raw passthrough ({stats['batches']} batches, fsync {stats['fsync_sec']}s)")
+        return True
+    finally:
+        shutil.rmtree(root)
+
+
+def test_queue_full_policies():
+    """큐가 가득 찼을 때 spill은 바로 저장하고 drop은 버리는지 확인"""
+    root = Path(tempfile.mkdtemp(prefix="artifact_writer_test_"))
+    try:
+        writer, release = blocked_writer(max_items=2, policy="spill")
+        assert writer.write_bytes(root / "queued.bin", b"1")
+        assert writer.write_bytes(root / "spilled.bin", b"2")
+        assert (root / "spilled.bin").exists() and not (root / "queued.bin").exists()
+        release.set()
+        assert writer.close(timeout=5.0)
+        assert (root / "queued.bin").exists() and writer.get_stats()["spilled"] == 1
+
+        writer, release = blocked_writer(max_items=10, max_bytes=100, policy="drop")
+        assert writer.write_bytes(root / "small.bin", b"x" * 60)
+        assert not writer.write_bytes(root / "dropped.bin", b"x" * 60)
+        release.set()
+        assert writer.close(timeout=5.0)
+        assert (root / "small.bin").exists() and not (root / "dropped.bin").exists()
+        assert writer.get_stats()["dropped"] == 1
+        print("✅ spill / drop policy")
+        return True
+    finally:
+        shutil.rmtree(root)
+
+
+def test_pipeline_does_not_wait_for_writes():
+    """output_mode=full 파이프라인이 파일 저장을 기다리지 않고, 저장 후 입력 PNG가 원본과 같은지 확인"""
+    root = Path(tempfile.mkdtemp(prefix="artifact_writer_test_"))
+    save_input_images = workflow_module.SAVE_INPUT_IMAGES
+    try:
+        workflow_module.SAVE_INPUT_IMAGES = True
+        make_catalog(root, "ycb", ["a"], cold_objects=0)
+        writer, release = blocked_writer()
+
+        async def fake_ism(**kwargs):
+            return {"success": True, "detections": {"masks": [], "boxes": [[0, 0, 1, 1]], "scores": [0.9]}}
+
+        async def fake_pem(**kwargs):
+            return {"success": True, "pose_scores": [0.8], "pred_rot": [[[1, 0, 0], [0, 1, 0], [0, 0, 1]]], "pred_trans": [[0, 0, 500]]}
+
+        service = make_service(root, ism=fake_ism, pem=fake_pem, artifact_writer=writer)
+
+        rgb = png_base64(np.random.randint(0, 255, (48, 64, 3), dtype=np.uint8))
+        depth = png_base64(np.random.randint(0, 4000, (48, 64), dtype=np.uint16))
+
+        def run(mode):
+            start = time.perf_counter()
+            result = asyncio.run(service.execute_full_pipeline("ycb", "a", rgb, depth, CAM, output_mode=mode))
+            assert result["success"], result
+            return result, time.perf_counter() - start
+
+        _, none_sec = run("none")
+        result, full_sec = run("full")
+        output_path = Path(result["output_dir"])
+        # 저장 스레드가 막혀 있어도 파이프라인은 끝나고, 파일은 아직 없음
+        assert not (output_path / "input_rgb.png").exists()
+        assert not (output_path / "pipeline_metadata.json").exists()
+
+        release.set()
+        assert service.artifact_writer.close(timeout=5.0)
+        assert (output_path / "input_rgb.png").read_bytes() == base64.b64decode(rgb)
+        assert (output_path / "input_depth.png").read_bytes() == base64.b64decode(depth)
+        for name in ("camera_params.json", "pipeline_metadata.json", "pose_results.json"):
+            assert (output_path / name).exists(), name
+        print(f"✅ full mode does not wait for writes (none {none_sec * 1000:.1f}ms / full {full_sec * 1000:.1f}ms)")
+        return True
+    finally:
+        workflow_module.SAVE_INPUT_IMAGES = save_input_images
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    print("산출물 저장기 테스트 시작...\n")
+
+    success = True
+    success &= test_write_and_flush()
+    success &= test_queue_full_policies()
+    success &= test_pipeline_does_not_wait_for_writes()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+카탈로그 인덱스 (StaticScanner) 증분 갱신 / 영속화 테스트
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import Main_Server.services.scanner as scanner_module
+from Main_Server.services.scanner import StaticScanner
+
+
+def make_catalog(root: Path, num_classes=3, num_objects=50, num_views=42):
+    """임시 static 폴더 (메시 + 절반의 객체에 템플릿)"""
+    for c in range(num_classes):
+        for o in range(num_objects):
+            mesh = root / "meshes" / f"class_{c}" / f"obj_{o}.ply"
+            mesh.parent.mkdir(parents=True, exist_ok=True)
+            mesh.write_bytes(b"ply")
+            if o % 2 == 0:
+                template_dir = root / "templates" / f"class_{c}" / f"obj_{o}"
+                template_dir.mkdir(parents=True, exist_ok=True)
+                for i in range(num_views):
+                    for name in (f"rgb_{i}.png", f"mask_{i}.png", f"xyz_{i}.npy"):
+                        (template_dir / name).touch()
+
+
+def make_scanner(root: Path, index_path: str) -> StaticScanner:
+    scanner = StaticScanner(index_path=index_path)
+    scanner.paths = dict(scanner.paths, root=root, meshes=root / "meshes", templates=root / "templates")
+    return scanner
+
+
+def reference_scan(root: Path):
+    """인덱스 없이 매번 새로 스캔한 결과 (비교 기준)"""
+    scanner = make_scanner(root, "none")
+    return scanner.scan_all_classes()
+
+
+def test_incremental_updates():
+    """템플릿 추가 / 메쉬 추가·삭제 후 결과가 전체 재스캔과 같은지 확인"""
+    root = Path(tempfile.mkdtemp(prefix="catalog_test_"))
+    try:
+        make_catalog(root)
+        scanner = make_scanner(root, str(root / "index.sqlite3"))
+        assert scanner.scan_all_classes() == reference_scan(root)
+
+        # 템플릿 생성 (렌더링 후 invalidate) / 새 메쉬 / 메쉬 삭제
+        template_dir = root / "templates" / "class_0" / "obj_1"
+        template_dir.mkdir(parents=True)
+        (template_dir / "rgb_0.png").touch()
+        scanner.invalidate("class_0", "obj_1")
+        (root / "meshes" / "class_1" / "obj_new.obj").write_bytes(b"obj")
+        (root / "meshes" / "class_2" / "obj_3.ply").unlink()
+        scanner.invalidate("class_1")
+        scanner.invalidate("class_2")
+
+        assert scanner.scan_object("class_0", "obj_1")["has_template"]
+        assert scanner.scan_all_classes() == reference_scan(root)
+        assert scanner.scan_object("class_2", "obj_3") is None
+        print("✅ incremental updates")
+        return True
+    finally:
+        shutil.rmtree(root)
+
+
+def test_persistence_and_rebuild():
+    """재시작 후 SQLite 인덱스 복원, force 재구축 결과 확인"""
+    root = Path(tempfile.mkdtemp(prefix="catalog_test_"))
+    try:
+        make_catalog(root)
+        index_path = str(root / "index.sqlite3")
+        expected = make_scanner(root, index_path).scan_all_classes()
+
+        restored = make_scanner(root, index_path)
+        assert len(restored.index.class_names()) == 3
+        assert restored.scan_object("class_0", "obj_0") == expected[0]["objects"][0]
+        assert restored.scan_all_classes() == expected
+
+        stats = restored.rebuild()
+        assert stats["total_objects"] == 150 and stats["total_templates"] == 75
+        print("✅ persistence / rebuild")
+        return True
+    finally:
+        shutil.rmtree(root)
+
+
+class CommitCounter:
+    """sqlite3.Connection 래퍼 - commit 횟수만 센다"""
+
+    def __init__(self, db):
+        self.db = db
+        self.commits = 0
+
+    def commit(self):
+        self.commits += 1
+        self.db.commit()
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+
+def test_scan_single_transaction():
+    """스캔 한 번의 인덱스 갱신이 commit 한 번으로 묶이는지 확인"""
+    root = Path(tempfile.mkdtemp(prefix="catalog_test_"))
+    try:
+        make_catalog(root)
+        index_path = str(root / "index.sqlite3")
+        scanner = make_scanner(root, index_path)
+        counter = CommitCounter(scanner.index._db)
+        scanner.index._db = counter
+
+        expected = scanner.scan_all_classes()
+        assert counter.commits == 1, counter.commits
+        scanner.invalidate("class_0")
+        scanner.scan_all_classes()
+        assert counter.commits == 1, counter.commits  # 변경 없음 → DB 갱신 없음
+
+        stats = scanner.rebuild()
+        assert counter.commits == 2 and stats["total_objects"] == 150, counter.commits
+        assert make_scanner(root, index_path).scan_all_classes() == expected
+        print("✅ one commit per scan")
+        return True
+    finally:
+        shutil.rmtree(root)
+
+
+def test_scan_speed():
+    """인덱스 적용 전후 반복 스캔 시간 비교"""
+    root = Path(tempfile.mkdtemp(prefix="catalog_test_"))
+    try:
+        make_catalog(root, num_classes=4, num_objects=250)
+        legacy = make_scanner(root, "none")
+        refresh_sec = scanner_module.CATALOG_REFRESH_SEC
+        scanner_module.CATALOG_REFRESH_SEC = 0.0  # TTL 없이 매번 mtime 확인 (최악의 경우)
+        try:
+            # 비교 기준: 객체마다 템플릿 디렉토리 glob (기존 scan_object)
+            start = time.perf_counter()
+            for class_name in ("class_0", "class_1", "class_2", "class_3"):
+                for o in range(250):
+                    legacy._build_object_info(
+                        f"obj_{o}", root / "meshes" / class_name / f"obj_{o}.ply",
+                        root / "templates" / class_name / f"obj_{o}",
+                    )
+            full_ms = (time.perf_counter() - start) * 1000
+
+            indexed = make_scanner(root, "none")
+            indexed.scan_all_classes()
+            start = time.perf_counter()
+            indexed.scan_all_classes()
+            incremental_ms = (time.perf_counter() - start) * 1000
+        finally:
+            scanner_module.CATALOG_REFRESH_SEC = refresh_sec
+
+        start = time.perf_counter()
+        indexed.scan_all_classes()
+        cached_ms = (time.perf_counter() - start) * 1000
+        print(f"   1000 objects: full scan {full_ms:.1f} ms | mtime check {incremental_ms:.1f} ms | cached {cached_ms:.1f} ms")
+        print("✅ scan speed")
+        return True
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    print("카탈로그 인덱스 테스트 시작...\n")
+
+    success = True
+    success &= test_incremental_updates()
+    success &= test_persistence_and_rebuild()
+    success &= test_scan_single_transaction()
+    success &= test_scan_speed()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
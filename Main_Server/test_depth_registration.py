@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Depth → Color 정합 (벡터화 z-buffer) 동등성 테스트
+"""
+import importlib.util
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np
+
+from Main_Server.utils.depth_registration import align_depth_to_color, get_depth_registration
+
+
+def legacy_align(depth, camK_depth, camK_color, T_d2c, W, H):
+    """기존 픽셀 루프 구현 (비교 기준)"""
+    z_m = depth.astype(np.float32) / 1000.0
+    fx_d, fy_d, cx_d, cy_d = float(camK_depth[0,0]), float(camK_depth[1,1]), float(camK_depth[0,2]), float(camK_depth[1,2])
+    fx_c, fy_c, cx_c, cy_c = float(camK_color[0,0]), float(camK_color[1,1]), float(camK_color[0,2]), float(camK_color[1,2])
+
+    us = np.arange(W, dtype=np.float32)
+    vs = np.arange(H, dtype=np.float32)
+    uu, vv = np.meshgrid(us, vs)
+    Z = z_m
+    valid = Z > 0
+    Xd = (uu - cx_d) / fx_d * Z
+    Yd = (vv - cy_d) / fy_d * Z
+
+    R = T_d2c[:3, :3]
+    t = T_d2c[:3, 3]
+    Xc = R[0,0]*Xd + R[0,1]*Yd + R[0,2]*Z + t[0]
+    Yc = R[1,0]*Xd + R[1,1]*Yd + R[1,2]*Z + t[1]
+    Zc = R[2,0]*Xd + R[2,1]*Yd + R[2,2]*Z + t[2]
+
+    uc = fx_c * (Xc / (Zc + 1e-9)) + cx_c
+    vc = fy_c * (Yc / (Zc + 1e-9)) + cy_c
+
+    aligned = np.zeros((H, W), dtype=np.float32)
+    uc_i = np.rint(uc).astype(np.int32)
+    vc_i = np.rint(vc).astype(np.int32)
+    m = valid & (Zc > 0) & (uc_i >= 0) & (uc_i < W) & (vc_i >= 0) & (vc_i < H)
+    inds = np.where(m)
+    flat_idx = vc_i[inds] * W + uc_i[inds]
+    order = np.argsort(Zc[inds])
+    flat_idx = flat_idx[order]
+    z_vals = Zc[inds][order]
+    seen = set()
+    for i in range(len(flat_idx)):
+        k = int(flat_idx[i])
+        if k in seen:
+            continue
+        seen.add(k)
+        r = k // W
+        c = k % W
+        aligned[r, c] = z_vals[i]
+    return np.clip(np.rint(aligned * 1000.0), 0, 65535).astype(np.uint16)
+
+
+def sample_frame(W=640, H=480, seed=0):
+    """RealSense 유사 캘리브레이션 + 가림이 생기는 depth (앞쪽 박스 + 배경 + 무효 픽셀)"""
+    rng = np.random.default_rng(seed)
+    K_d = np.array([[385.0, 0, W / 2 - 1.5], [0, 385.0, H / 2 + 0.7], [0, 0, 1]])
+    K_c = np.array([[615.0, 0, W / 2 + 2.1], [0, 615.0, H / 2 - 1.3], [0, 0, 1]])
+    angle = np.deg2rad(1.5)
+    T = np.eye(4)
+    T[:3, :3] = [[np.cos(angle), 0, np.sin(angle)], [0, 1, 0], [-np.sin(angle), 0, np.cos(angle)]]
+    T[:3, 3] = [0.015, 0.0003, -0.0002]
+    depth = rng.integers(1500, 2500, (H, W)).astype(np.uint16)
+    depth[H // 3 : 2 * H // 3, W // 3 : 2 * W // 3] = rng.integers(400, 450, (2 * H // 3 - H // 3, 2 * W // 3 - W // 3))
+    depth[rng.random((H, W)) < 0.05] = 0
+    return depth, K_d, K_c, T
+
+
+def test_matches_legacy():
+    """벡터화 결과가 기존 루프 결과와 같은지 확인
+
+    기존 구현은 역투영 좌표를 float32로 한 번 반올림하므로 rint 경계 (x.5 px)에 걸친
+    극소수 픽셀만 달라질 수 있다 (프레임당 수 픽셀).
+    """
+    for seed in range(5):
+        depth, K_d, K_c, T = sample_frame(seed=seed)
+        H, W = depth.shape
+        expected = legacy_align(depth, K_d, K_c, T, W, H)
+        actual = align_depth_to_color(depth, K_d, K_c, T, (W, H))
+        assert actual.dtype == np.uint16 and actual.shape == expected.shape
+        mismatch = np.count_nonzero(actual != expected)
+        assert mismatch / actual.size < 1e-4, mismatch
+    print(f"✅ matches legacy loop (last frame: {mismatch} / {actual.size} px differ)")
+    return True
+
+
+def test_registration_cache():
+    """같은 캘리브레이션이면 ray 그리드를 재사용하는지 확인"""
+    depth, K_d, K_c, T = sample_frame()
+    H, W = depth.shape
+    first = get_depth_registration(K_d, K_c, T, (W, H))
+    assert get_depth_registration(K_d.copy(), K_c.copy(), T.copy(), (W, H)) is first
+    assert get_depth_registration(K_d, K_c, T, (W // 2, H // 2)) is not first
+    print("✅ registration cache")
+    return True
+
+
+def test_connector_copy():
+    """RSSServer_connector/save_from_rss.py의 독립 복사본이 공유 구현과 같은 결과인지 확인"""
+    path = Path(__file__).resolve().parents[1] / "RSSServer_connector" / "save_from_rss.py"
+    spec = importlib.util.spec_from_file_location("save_from_rss", path)
+    save_from_rss = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(save_from_rss)
+    for seed in range(3):
+        depth, K_d, K_c, T = sample_frame(seed=seed)
+        H, W = depth.shape
+        expected = align_depth_to_color(depth, K_d, K_c, T, (W, H))
+        assert np.array_equal(save_from_rss.align_depth_to_color(depth, K_d, K_c, T, (W, H)), expected)
+    print("✅ RSSServer_connector copy matches")
+    return True
+
+
+def test_torch_path():
+    """torch (scatter_reduce amin) 결과가 NumPy 결과와 같은지 확인 (float32 반올림 경계 제외)"""
+    try:
+        import torch
+    except ImportError:
+        print("⚠️ torch not installed, skipped")
+        return True
+    depth, K_d, K_c, T = sample_frame()
+    H, W = depth.shape
+    expected = align_depth_to_color(depth, K_d, K_c, T, (W, H)).astype(np.int32)
+    actual = get_depth_registration(K_d, K_c, T, (W, H)).align_torch(torch.from_numpy(depth.astype(np.int32))).numpy()
+    mismatch = np.count_nonzero(actual != expected) / actual.size
+    assert mismatch < 1e-3, mismatch
+    print(f"✅ torch path (mismatch {mismatch:.2e})")
+    return True
+
+
+if __name__ == "__main__":
+    print("Depth 정합 테스트 시작...\n")
+
+    success = True
+    success &= test_matches_legacy()
+    success &= test_registration_cache()
+    success &= test_connector_copy()
+    success &= test_torch_path()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
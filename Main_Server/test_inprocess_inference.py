@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+In-process (monolith) 추론 모드 테스트
+
+SAM-6D 모델 대신 CPU torch로 동작하는 간단한 ISM (depth 임계값 분할) / PEM (마스크 중심점) 백엔드를 사용한다.
+같은 백엔드를 HTTP 모드에서는 ISM / PEM API 형식의 앱 (StubTransport)으로, in-process 모드에서는
+InProcessInference로 실행해서 두 모드의 파이프라인 결과가 같은지 확인한다.
+"""
+import asyncio
+import base64
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import torch
+from fastapi import FastAPI
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_load import make_catalog
+from bench_stubs import InferenceRequest, PoseEstimationRequest
+from Main_Server.services.inprocess_inference import (
+    PEM_ROOT, PEM_TOP_K, Detections, InProcessInference, IsmBackend, ModuleNamespace, PemBackend, build_pem_inputs,
+)
+from Main_Server.utils.input_frame import InputFrame
+from workflow_stubs import make_service, routed_http
+
+CAM = {"cam_K": [60.0, 0.0, 32.0, 0.0, 60.0, 24.0, 0.0, 0.0, 1.0], "depth_scale": 1.0}
+
+
+def sample_scene(w=64, h=48, seed=0):
+    """배경 (1000mm) 앞에 물체 두 개 (500mm / 600mm), (RGB PNG base64, depth PNG base64)"""
+    rng = np.random.default_rng(seed)
+    rgb = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+    depth = np.full((h, w), 1000, dtype=np.uint16)
+    depth[10:25, 8:28] = 500
+    depth[20:40, 36:58] = 600
+    encode = lambda image: base64.b64encode(cv2.imencode(".png", image)[1].tobytes()).decode("ascii")
+    return encode(rgb), encode(depth)
+
+
+class ThresholdIsm(IsmBackend):
+    """900mm보다 가까운 depth 값마다 물체 하나 (가까울수록 높은 점수)"""
+
+    def __init__(self):
+        self.last = None
+
+    def segment(self, frame, cam_params, template_dir, cad_path):
+        depth = torch.from_numpy(frame.depth.astype(np.int64))
+        levels = torch.unique(depth[(depth > 0) & (depth < 900)])
+        masks = torch.stack([depth == level for level in levels])
+        boxes = []
+        for mask in masks:
+            ys, xs = torch.nonzero(mask, as_tuple=True)
+            boxes.append([xs.min().item(), ys.min().item(), xs.max().item() + 1, ys.max().item() + 1])
+        self.last = Detections(
+            masks=masks,
+            boxes=torch.tensor(boxes, dtype=torch.float32),
+            scores=torch.tensor([0.9 - 0.1 * i for i in range(len(levels))]),
+            object_ids=torch.zeros(len(levels), dtype=torch.long),
+        )
+        return self.last
+
+
+class CentroidPem(PemBackend):
+    """마스크 영역 3D 점의 평균을 translation으로 (rotation은 단위 행렬)"""
+
+    def __init__(self):
+        self.calls = []
+
+    def estimate(self, frame, cam_params, detections, template_dir, cad_path):
+        self.calls.append(detections)
+        K = np.array(cam_params["cam_K"]).reshape(3, 3)
+        depth = torch.from_numpy(frame.depth.astype(np.float32)) * cam_params["depth_scale"] / 1000.0
+        trans = []
+        for mask in detections.masks:
+            ys, xs = torch.nonzero(mask & (depth > 0), as_tuple=True)
+            z = depth[ys, xs]
+            x = (xs.float() - K[0, 2]) * z / K[0, 0]
+            y = (ys.float() - K[1, 2]) * z / K[1, 1]
+            trans.append(torch.stack([x.mean(), y.mean(), z.mean()]))
+        n = len(detections)
+        return {
+            "pose_scores": detections.scores,
+            "pred_rot": torch.eye(3).repeat(n, 1, 1),
+            "pred_trans": torch.stack(trans),
+            "num_detections": n,
+            "detections": [],
+            "inference_time": 0.0,
+        }
+
+
+def make_http_apps(ism: IsmBackend, pem: PemBackend):
+    """같은 백엔드를 ISM / PEM 서버 API 형식으로 제공 (HTTP 모드: base64 / RLE 직렬화를 거침)"""
+    ism_app, pem_app = FastAPI(), FastAPI()
+
+    @ism_app.get("/health")
+    @ism_app.get("/ready")
+    async def ism_health():
+        return {"status": "healthy"}
+
+    @ism_app.post("/api/v1/inference")
+    async def inference(request: InferenceRequest):
+        frame = InputFrame(request.rgb_image, request.depth_image)
+        detections = ism.segment(frame, request.cam_params, request.template_dir, request.cad_path)
+        return {"success": True, "detections": detections.to_response(), "inference_time": 0.0,
+                "template_dir_used": request.template_dir, "cad_path_used": request.cad_path}
+
+    @pem_app.get("/api/v1/health")
+    async def pem_health():
+        return {"status": "healthy"}
+
+    @pem_app.post("/api/v1/pose-estimation")
+    async def pose_estimation(request: PoseEstimationRequest):
+        frame = InputFrame(request.rgb_image, request.depth_image)
+        seg_data = [seg for seg in request.seg_data if float(seg["score"]) >= request.det_score_thresh]
+        detections = Detections.from_response({
+            "masks": [seg["segmentation"] for seg in seg_data],
+            "boxes": [seg["bbox"] for seg in seg_data],
+            "scores": [seg["score"] for seg in seg_data],
+            "object_ids": [seg["category_id"] for seg in seg_data],
+        }, frame.shape).top(PEM_TOP_K)
+        result = pem.estimate(frame, request.cam_params, detections, request.template_dir, request.cad_path)
+        return {"success": True, "detections": [], "pose_scores": result["pose_scores"].tolist(),
+                "pred_rot": result["pred_rot"].tolist(), "pred_trans": result["pred_trans"].tolist(),
+                "num_detections": result["num_detections"], "inference_time": 0.0,
+                "template_dir_used": request.template_dir, "cad_path_used": request.cad_path}
+
+    return ism_app, pem_app
+
+
+def run_pipeline(root: Path, rgb_b64: str, depth_b64: str, inprocess=None, apps=None):
+    service = make_service(root, inprocess=inprocess)
+    # in-process 모드에서는 서버가 없음 (HTTP 요청이 나가면 연결 실패)
+    with routed_http(apps or {}):
+        result = asyncio.run(service.execute_full_pipeline("ycb", "obj_00", rgb_b64, depth_b64, CAM,
+                                                           output_mode="none"))
+    assert result["success"], result
+    return result
+
+
+def test_module_namespace_isolation():
+    """서버별 같은 이름의 최상위 패키지 (utils)가 섞이지 않고, 나가면 Main 모듈 / sys.path가 복원됨"""
+    root = Path(tempfile.mkdtemp(prefix="inprocess_ns_test_"))
+    try:
+        for name in ("ism", "pem"):
+            (root / name / "utils").mkdir(parents=True)
+            (root / name / "utils" / "__init__.py").write_text(f"NAME = {name!r}\n")
+            (root / name / "utils" / "helper.py").write_text("from utils import NAME\n")
+        import utils as main_utils  # Main_Server/utils (main.py와 같이 최상위 utils)
+        saved_path = list(sys.path)
+        ism_ns, pem_ns = ModuleNamespace("ism", [str(root / "ism")]), ModuleNamespace("pem", [str(root / "pem")])
+
+        with ism_ns.active():
+            from utils.helper import NAME as ism_name
+            import utils as ism_utils
+        with pem_ns.active():
+            from utils.helper import NAME as pem_name
+            # ModelManager._setup_paths처럼 안에서 추가한 경로는 다음 진입 때도 사용
+            sys.path.append(str(root / "pem" / "extra"))
+        assert (ism_name, pem_name) == ("ism", "pem")
+        assert sys.modules["utils"] is main_utils and sys.path == saved_path
+
+        with ism_ns.active():
+            import utils
+            assert utils is ism_utils and "utils.helper" in sys.modules
+        with pem_ns.active():
+            assert str(root / "pem" / "extra") in sys.path
+        assert sys.modules["utils"] is main_utils and sys.path == saved_path
+        print("✅ per-server module namespaces (utils / utils.helper isolated, Main modules and sys.path restored)")
+        return True
+    finally:
+        shutil.rmtree(root)
+
+
+def test_backend_interface():
+    """백엔드는 segment / estimate를 구현해야 생성 가능 (load는 선택)"""
+    for base in (IsmBackend, PemBackend):
+        try:
+            base()
+            raise AssertionError(f"{base.__name__} should be abstract")
+        except TypeError:
+            pass
+    ThresholdIsm().load()
+    CentroidPem().load()
+    print("✅ abstract ISM / PEM backend interface")
+    return True
+
+
+def test_build_pem_inputs():
+    """get_test_data와 같은 PEM 입력을 파일 없이 배열 / 마스크 텐서에서 생성 (작은 마스크는 제외)"""
+    rgb = np.random.default_rng(1).integers(0, 256, (48, 64, 3), dtype=np.uint8)
+    depth = np.full((48, 64), 500, dtype=np.uint16)
+    masks = torch.zeros((2, 48, 64), dtype=torch.bool)
+    masks[0, 10:30, 20:44] = True
+    masks[1, 0:4, 0:4] = True  # 16 픽셀 (<= 32) → 제외
+    detections = Detections(masks, torch.tensor([[20.0, 10, 44, 30], [0, 0, 4, 4]]),
+                            torch.tensor([0.9, 0.8]), torch.tensor([3, 4]))
+    model_points = np.random.default_rng(2).uniform(-0.05, 0.05, (128, 3)).astype(np.float32)
+    cfg = SimpleNamespace(n_sample_observed_point=64, rgb_mask_flag=True, img_size=32)
+
+    # 로드 때처럼 PEM 모듈을 찾아 두고 namespace 밖에서 호출
+    data_utils = ModuleNamespace("pem", [str(Path(PEM_ROOT) / "utils")]).import_module("data_utils")
+    assert "data_utils" not in sys.modules
+    input_data, whole_image, whole_pts, dets = build_pem_inputs(rgb, depth, CAM, detections, model_points,
+                                                                cfg, "cpu", data_utils)
+    assert input_data["pts"].shape == (1, 64, 3) and input_data["rgb"].shape == (1, 3, 32, 32)
+    assert input_data["rgb_choose"].shape == (1, 64) and int(input_data["rgb_choose"].max()) < 32 * 32
+    assert input_data["model"].shape == (1, 128, 3) and input_data["K"].shape == (1, 3, 3)
+    assert torch.allclose(input_data["pts"][0, :, 2], torch.tensor(0.5))
+    assert whole_pts.shape == (48 * 64, 3) and whole_image.shape == rgb.shape
+    assert len(dets) == 1 and dets[0]["category_id"] == 4 and dets[0]["bbox"] == [20.0, 10.0, 24.0, 20.0]
+    # ImageNet 정규화 범위 (ToTensor + Normalize와 같음)
+    assert -2.2 < float(input_data["rgb"].min()) and float(input_data["rgb"].max()) < 2.7
+    print("✅ PEM inputs from arrays / mask tensors (small masks dropped, no temp files)")
+    return True
+
+
+def test_http_and_inprocess_modes_match():
+    """같은 백엔드로 HTTP 모드와 in-process 모드의 포즈 결과가 같고, in-process는 감지 텐서를 그대로 전달"""
+    root = Path(tempfile.mkdtemp(prefix="inprocess_test_", dir=Path(__file__).resolve().parent))
+    try:
+        make_catalog(root, "ycb", ["obj_00"], cold_objects=0)
+        rgb_b64, depth_b64 = sample_scene()
+
+        ism, pem = ThresholdIsm(), CentroidPem()
+        ism_app, pem_app = make_http_apps(ism, pem)
+        http = run_pipeline(root, rgb_b64, depth_b64, apps={8002: ism_app, 8003: pem_app})
+
+        rebuilt = []
+        original = Detections.__dict__["from_response"]
+
+        def counting(cls, *args):
+            rebuilt.append(args)
+            return original.__func__(cls, *args)
+
+        engine = InProcessInference(ThresholdIsm(), CentroidPem())
+        Detections.from_response = classmethod(counting)
+        try:
+            local = run_pipeline(root, rgb_b64, depth_b64, inprocess=engine)
+        finally:
+            Detections.from_response = original
+
+        assert http["num_poses"] == local["num_poses"] == 2
+        for a, b in zip(http["pose_results"], local["pose_results"]):
+            assert a["score"] == b["score"] and np.allclose(a["rotation"], b["rotation"]) \
+                and np.allclose(a["translation"], b["translation"])
+        assert not rebuilt, "in-process PEM should receive ISM tensors, not RLE"
+        assert torch.equal(engine.pem.calls[0].masks, engine.ism.last.masks)
+
+        # ISM 결과가 결과 캐시에서 온 경우 (텐서 없음): 응답의 RLE 마스크에서 같은 결과
+        async def from_cached():
+            ism_result = await engine.call_ism(InputFrame(rgb_b64, depth_b64), CAM, "cad", "tpl", None)
+            return await engine.call_pem(InputFrame(rgb_b64, depth_b64), CAM, "cad", "tpl", ism_result, None)
+
+        cached = asyncio.run(from_cached())
+        assert cached["success"] and np.allclose(cached["pred_trans"], [p["translation"] for p in local["pose_results"]])
+        print(f"✅ HTTP and in-process modes return the same {local['num_poses']} poses "
+              f"(in-process: no HTTP calls, ISM tensors passed to PEM)")
+        return True
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    print("In-process 추론 모드 테스트 시작...\n")
+
+    success = True
+    success &= test_module_namespace_isolation()
+    success &= test_backend_interface()
+    success &= test_build_pem_inputs()
+    success &= test_http_and_inprocess_modes_match()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
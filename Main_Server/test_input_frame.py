@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+요청 단위 입력 프레임 (헤더 기반 이미지 크기 / 한 번만 디코딩 / 요청 본문 재사용) 테스트
+"""
+import base64
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import cv2
+import numpy as np
+
+from Main_Server.utils import input_frame
+from Main_Server.utils.input_frame import InputFrame, header_image_size
+
+
+def encode(image, ext, params=()):
+    ok, buf = cv2.imencode(ext, image, list(params))
+    assert ok
+    return base64.b64encode(buf.tobytes()).decode("ascii")
+
+
+def sample_frame(w=1280, h=720, seed=0):
+    """(RGB PNG base64, 16-bit depth PNG base64), 압축이 잘 안 되는 실제 크기 프레임"""
+    rng = np.random.default_rng(seed)
+    rgb = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+    depth = rng.integers(300, 3000, (h, w), dtype=np.uint16)
+    return encode(rgb, ".png"), encode(depth, ".png")
+
+
+def test_header_image_size():
+    """PNG / JPEG (baseline, progressive, EXIF 포함) 크기를 디코딩 없이 헤더에서 읽는지 확인"""
+    image = np.zeros((37, 53, 3), dtype=np.uint8)
+    assert header_image_size(encode(image, ".png")) == (37, 53)
+    assert header_image_size(encode(image[..., 0].astype(np.uint16), ".png")) == (37, 53)
+    assert header_image_size(encode(image, ".jpg")) == (37, 53)
+    assert header_image_size(encode(image, ".jpg", (cv2.IMWRITE_JPEG_PROGRESSIVE, 1))) == (37, 53)
+
+    # APP1 (EXIF) 세그먼트가 SOF 앞에 있어도 건너뜀
+    raw = base64.b64decode(encode(image, ".jpg"))
+    app1 = b"\xff\xe1" + (2 + 1000).to_bytes(2, "big") + b"\0" * 1000
+    assert header_image_size(base64.b64encode(raw[:2] + app1 + raw[2:]).decode()) == (37, 53)
+
+    # 그 외 포맷 / 깨진 데이터는 None (InputFrame은 디코딩으로 대체)
+    assert header_image_size(encode(image, ".bmp")) is None
+    assert header_image_size("iVBORw0KGgo!!!") is None and header_image_size("r") is None
+    frame = InputFrame(encode(image, ".bmp"), "")
+    assert frame.shape == (37, 53) and frame.rgb is not None
+    assert InputFrame("r", "d").shape is None
+    print("✅ PNG / JPEG header size (baseline, progressive, EXIF), decode fallback for other formats")
+    return True
+
+
+def test_decode_once_and_request_body():
+    """크기 조회는 픽셀 디코딩 없이, 디코딩은 한 번만, 요청 본문은 json.dumps 결과와 같은 JSON"""
+    rgb_b64, depth_b64 = sample_frame(64, 48)
+    frame = InputFrame(rgb_b64, depth_b64)
+    calls = {"imdecode": 0}
+    real_imdecode = input_frame.cv2.imdecode
+
+    def counting_imdecode(*args):
+        calls["imdecode"] += 1
+        return real_imdecode(*args)
+
+    input_frame.cv2.imdecode = counting_imdecode
+    try:
+        assert frame.shape == (48, 64) and calls["imdecode"] == 0
+        assert frame.rgb.shape == (48, 64, 3) and frame.rgb is frame.rgb
+        assert calls["imdecode"] == 1
+    finally:
+        input_frame.cv2.imdecode = real_imdecode
+
+    fields = {"cam_params": {"cam_K": [1.0, 0.0, 2.5], "depth_scale": 1.0}, "template_dir": "/t/한글", "seg_data": []}
+    body = frame.request_body(fields)
+    assert json.loads(body) == {"rgb_image": rgb_b64, "depth_image": depth_b64, **fields}
+    assert json.loads(frame.request_body({})) == {"rgb_image": rgb_b64, "depth_image": depth_b64}
+    # 이미지 부분은 요청마다 다시 직렬화하지 않음
+    assert frame._images_json is frame._images_json
+    print("✅ header shape without decode, single decode, request body reuses serialized images")
+    return True
+
+
+if __name__ == "__main__":
+    print("입력 프레임 테스트 시작...\n")
+
+    success = True
+    success &= test_header_image_size()
+    success &= test_decode_once_and_request_body()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+비동기 파이프라인 작업 큐 테스트 (파이프라인 실행은 가짜 함수로 대체)
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from Main_Server.services.job_queue import JobQueue, JobQueueFull
+
+
+def make_run(name, order, delay=0.02, success=True):
+    """실행 순서를 기록하고 단계 콜백을 호출하는 가짜 파이프라인"""
+    async def run(progress):
+        order.append(name)
+        for stage in ("render", "ism", "pem", "finalize"):
+            progress(stage)
+            await asyncio.sleep(delay / 4)
+        return {"success": success, "num_poses": 1, "error": None if success else "boom"}
+    return run
+
+
+def test_priority_and_progress():
+    """대기 중에는 interactive가 batch보다 먼저 실행되고, 단계별 진행 상황이 기록되는지 확인"""
+    async def run():
+        queue = JobQueue(workers=1, max_depth=10, batch_max_depth=10)
+        order = []
+        first = queue.submit("test", make_run("first", order))
+        await asyncio.sleep(0)  # first가 워커에 잡힘
+        batch = [queue.submit("test", make_run(f"batch{i}", order), priority="batch") for i in range(2)]
+        interactive = queue.submit("test", make_run("interactive", order))
+        assert queue.queue_position(interactive.job_id) == 0
+        assert queue.queue_position(batch[1].job_id) == 2
+
+        failed = queue.submit("test", make_run("failed", order, success=False), priority="batch")
+        while not all(j.status in ("completed", "failed") for j in [first, interactive, failed, *batch]):
+            await asyncio.sleep(0.01)
+        await queue.shutdown()
+        return order, first, failed, queue
+
+    order, first, failed, queue = asyncio.run(run())
+    assert order == ["first", "interactive", "batch0", "batch1", "failed"], order
+    assert first.progress == 100
+    assert [s["stage"] for s in first.stages] == ["queued", "render", "ism", "pem", "finalize", "completed"]
+    assert all(s["elapsed_sec"] is not None for s in first.stages)
+    assert failed.status == "failed" and failed.error_message == "boom"
+    assert queue.stats["completed"] == 4 and queue.stats["failed"] == 1
+    print("✅ priority order / stage progress")
+    return True
+
+
+def test_load_shedding_and_cancel():
+    """큐 깊이 임계값 초과 시 거절 (batch 먼저)되고, 실행 중 작업을 취소해도 워커가 계속 동작하는지 확인"""
+    async def run():
+        queue = JobQueue(workers=1, max_depth=3, batch_max_depth=1)
+        order = []
+        long_job = queue.submit("test", make_run("long", order, delay=10.0))
+        await asyncio.sleep(0.01)  # long이 실행을 시작할 때까지 대기
+        queue.submit("test", make_run("b0", order), priority="batch")
+        try:
+            queue.submit("test", make_run("b1", order), priority="batch")
+            raise AssertionError("batch job should be rejected")
+        except JobQueueFull as e:
+            assert e.limit == 1
+        queue.submit("test", make_run("i0", order))
+        queue.submit("test", make_run("i1", order))
+        try:
+            queue.submit("test", make_run("i2", order))
+            raise AssertionError("interactive job should be rejected")
+        except JobQueueFull:
+            pass
+
+        start = time.perf_counter()
+        assert queue.cancel(long_job.job_id)
+        assert not queue.cancel(long_job.job_id)
+        while len(order) < 4 or queue.depth > 0 or any(j.status == "running" for j in queue.jobs.values()):
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        await queue.shutdown()
+        return order, long_job, queue, elapsed
+
+    order, long_job, queue, elapsed = asyncio.run(run())
+    assert long_job.status == "cancelled"
+    assert order == ["long", "i0", "i1", "b0"], order
+    assert queue.stats["rejected"] == 2 and queue.stats["cancelled"] == 1
+    assert elapsed < 2.0
+    print("✅ load shedding / cancel")
+    return True
+
+
+def test_cancel_race():
+    """실행이 끝난 직후의 취소는 거절되고, 취소된 작업의 결과가 상태를 덮어쓰지 않는지 확인"""
+    async def run():
+        queue = JobQueue(workers=1, max_depth=10, batch_max_depth=10)
+
+        async def instant(progress):
+            return {"success": True}
+
+        async def swallow_cancel(progress):
+            try:
+                await asyncio.sleep(10.0)
+            except asyncio.CancelledError:
+                pass  # 취소를 삼키고 결과 반환
+            return {"success": True}
+
+        done = queue.submit("test", instant)
+        while not (done.task is not None and done.task.done()):
+            await asyncio.sleep(0)
+        # 태스크는 끝났지만 워커가 아직 결과를 기록하지 않은 시점
+        assert done.status == "running"
+        assert not queue.cancel(done.job_id)
+
+        swallowed = queue.submit("test", swallow_cancel)
+        while swallowed.status != "running":
+            await asyncio.sleep(0.01)
+        assert queue.cancel(swallowed.job_id)
+        while swallowed.task is not None:
+            await asyncio.sleep(0.01)
+        await queue.shutdown()
+        return done, swallowed, queue
+
+    done, swallowed, queue = asyncio.run(run())
+    assert done.status == "completed" and done.progress == 100
+    assert swallowed.status == "cancelled" and swallowed.result is None
+    assert queue.stats["completed"] == 1 and queue.stats["cancelled"] == 1
+    print("✅ cancel / finish race")
+    return True
+
+
+if __name__ == "__main__":
+    print("작업 큐 테스트 시작...\n")
+
+    success = True
+    success &= test_priority_and_progress()
+    success &= test_load_shedding_and_cancel()
+    success &= test_cancel_race()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+부하 테스트 harness (bench_load.py / bench_stubs.py) 테스트 (짧은 지연의 stub으로 작은 부하만 실행)
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import bench_load
+from bench_stubs import StubProfile, make_ism_app, make_pem_app
+
+
+def test_stub_schemas():
+    """stub이 실제 ISM / PEM 요청 스키마를 검사하고, 설정한 크기의 응답을 돌려주는지 확인"""
+    ism = make_ism_app(StubProfile(latency_ms=1.0, jitter=0.0, cold_ms=20.0, cache_size=1, detections=3,
+                                   image_size=(48, 64)))
+    pem = make_pem_app(StubProfile(latency_ms=1.0, jitter=0.0, detections=2))
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=ism), base_url="http://ism") as client:
+            request = {"rgb_image": "r", "depth_image": "d", "cam_params": {}, "template_dir": "/t/a", "cad_path": "/c/a.ply"}
+            assert (await client.post("/api/v1/inference", json={"rgb_image": "r"})).status_code == 422
+            first = (await client.post("/api/v1/inference", json=request)).json()
+            second = await client.post("/api/v1/inference", json=request)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=pem), base_url="http://pem") as client:
+            seg_data = [{"bbox": box, "score": score} for box, score in zip(first["detections"]["boxes"], first["detections"]["scores"])]
+            pose = (await client.post("/api/v1/pose-estimation", json={**request, "seg_data": seg_data})).json()
+        return first, second, pose
+
+    first, second, pose = asyncio.run(run())
+    assert first["success"] and len(first["detections"]["masks"]) == 3
+    assert first["detections"]["masks"][0]["size"] == [48, 64]
+    # 템플릿 캐시 미스만 cold_ms 추가
+    assert first["inference_time"] >= 0.02 > second.json()["inference_time"]
+    assert "inference" in second.headers["server-timing"]
+    assert pose["num_detections"] == 2 and len(pose["pred_rot"]) == 2
+    assert ism.state.stub.to_dict()["cache_hits"] == 1
+    print("✅ stub ISM / PEM schemas and payload sizes")
+    return True
+
+
+def test_closed_loop_report():
+    """같은 프로세스 Main 서버에 작은 부하를 주고 단계별 보고서 항목 확인"""
+    args = bench_load.build_parser().parse_args([
+        "--levels", "1,3", "--requests", "9", "--warmup", "2", "--objects", "4", "--cold-objects", "1",
+        "--frames", "2", "--image-size", "48x64", "--ism-latency-ms", "5", "--pem-latency-ms", "5",
+        "--render-latency-ms", "5", "--cold-ms", "0", "--quiet",
+    ])
+    report = bench_load.run(args)
+
+    assert [level["concurrency"] for level in report["levels"]] == [1, 3]
+    for level in report["levels"]:
+        assert level["requests"] == 9 and level["errors"] == 0, level
+        assert level["p50_ms"] <= level["p95_ms"] <= level["p99_ms"] <= level["max_ms"]
+        assert level["throughput_rps"] > 0 and level["memory_mb"] > 0
+        assert level["lag_p99_ms"] is not None
+        assert set(level["by_kind"]) <= {"pipeline", "cached", "job", "status"}
+    stubs = report["levels"][1]["stubs"]
+    assert stubs["ism"]["requests"] > 0 and stubs["pem"]["requests"] > 0
+    assert report["admission"]["services"]["ism"]["in_flight"] == 0
+
+    assert bench_load.check_regression(report, max_p95_ms=None, max_error_rate=0.0) == []
+    problems = bench_load.check_regression(report, max_p95_ms=0.001, max_error_rate=0.0)
+    assert len(problems) == 2 and "p95" in problems[0]
+    level = report["levels"][1]
+    print(f"✅ closed-loop report (c=3: {level['throughput_rps']} rps, p95 {level['p95_ms']}ms, "
+          f"loop lag p99 {level['lag_p99_ms']}ms)")
+    return True
+
+
+if __name__ == "__main__":
+    print("부하 테스트 harness 테스트 시작...\n")
+
+    success = True
+    success &= test_stub_schemas()
+    success &= test_closed_loop_report()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
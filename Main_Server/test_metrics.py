@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Prometheus 메트릭 테스트 (ISM / PEM 서버 호출은 가짜 함수로 대체)
+"""
+import asyncio
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from Main_Server.api.endpoints.metrics import router as metrics_router, workflow_service
+from Main_Server.utils.metrics import METRICS
+from sam6d_common.metrics import Registry
+from bench_load import make_catalog
+
+CAM = {"cam_K": [600.0, 0.0, 320.0, 0.0, 600.0, 240.0, 0.0, 0.0, 1.0], "depth_scale": 1.0}
+
+
+def test_text_format():
+    """histogram / counter / gauge가 Prometheus 텍스트 형식으로 출력되는지 확인"""
+    registry = Registry(namespace="test")
+    histogram = registry.histogram("stage_seconds", "stage latency", ["stage"], buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage="ism")
+    histogram.observe(0.5, stage="ism")
+    histogram.observe(5.0, stage="ism")
+    registry.counter("runs_total", "runs", ["result"]).inc(result="success")
+    gauge = registry.gauge("hit_ratio", "hit ratio", ["cache"])
+    gauge.set_function(lambda: 0.75, cache="template")
+    gauge.set_function(lambda: {("result_ism",): 0.5, ("result_pem",): None})
+    gauge.set_function(lambda: 1 / 0, cache="broken")
+    assert registry.histogram("stage_seconds", "stage latency", ["stage"]) is histogram
+
+    text = registry.render()
+    for line in (
+        "# TYPE test_stage_seconds histogram",
+        'test_stage_seconds_bucket{stage="ism",le="0.1"} 1',
+        'test_stage_seconds_bucket{stage="ism",le="1.0"} 2',
+        'test_stage_seconds_bucket{stage="ism",le="+Inf"} 3',
+        'test_stage_seconds_sum{stage="ism"} 5.55',
+        'test_stage_seconds_count{stage="ism"} 3',
+        'test_runs_total{result="success"} 1',
+        'test_hit_ratio{cache="template"} 0.75',
+        'test_hit_ratio{cache="result_ism"} 0.5',
+    ):
+        assert line in text.splitlines(), line
+    # 값이 None이거나 콜백이 실패한 시계열은 생략
+    assert "result_pem" not in text and "broken" not in text
+
+    try:
+        histogram.observe(1.0)
+        raise AssertionError("missing label should be rejected")
+    except ValueError:
+        pass
+    print("✅ Prometheus text format")
+    return True
+
+
+def test_pipeline_stages_and_endpoint():
+    """파이프라인 단계 시간이 기록되고 /metrics에서 스크랩되는지 확인"""
+    root = Path(tempfile.mkdtemp(prefix="metrics_test_"))
+    paths = workflow_service.paths
+    call_ism, call_pem = workflow_service._call_ism_server, workflow_service._call_pem_server
+    try:
+        workflow_service.paths = dict(paths, meshes=root / "meshes", templates=root / "templates", output=root / "output")
+        make_catalog(root, "ycb", ["a"], cold_objects=0)
+
+        async def fake_ism(**kwargs):
+            return {"success": True, "detections": {"masks": [], "boxes": [[0, 0, 1, 1]], "scores": [0.9]}}
+
+        async def fake_pem(**kwargs):
+            return {"success": True, "pose_scores": [0.8], "pred_rot": [[[1, 0, 0], [0, 1, 0], [0, 0, 1]]], "pred_trans": [[0, 0, 500]]}
+
+        workflow_service._call_ism_server = fake_ism
+        workflow_service._call_pem_server = fake_pem
+
+        before = {stage: METRICS.stage_seconds.count(stage=stage) for stage in ("decode", "ism", "pem", "pipeline")}
+        result = asyncio.run(workflow_service.execute_full_pipeline(
+            "ycb", "a", "metrics-test-rgb", "metrics-test-depth", CAM, output_mode="none"
+        ))
+        assert result["success"], result
+        for stage, count in before.items():
+            assert METRICS.stage_seconds.count(stage=stage) == count + 1, stage
+
+        app = FastAPI()
+        app.include_router(metrics_router)
+        response = TestClient(app).get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        lines = response.text.splitlines()
+        assert any(line.startswith('main_stage_duration_seconds_count{stage="pem"}') for line in lines)
+        assert any(line.startswith('main_pipeline_runs_total{result="success"}') for line in lines)
+        assert any(line.startswith('main_queue_depth{queue="jobs"}') for line in lines)
+        assert any(line.startswith("main_process_resident_memory_bytes ") for line in lines)
+        print(f"✅ pipeline stages / /metrics endpoint ({len(response.content)} bytes)")
+        return True
+    finally:
+        workflow_service.paths = paths
+        workflow_service._call_ism_server, workflow_service._call_pem_server = call_ism, call_pem
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    print("메트릭 테스트 시작...\n")
+
+    success = True
+    success &= test_text_format()
+    success &= test_pipeline_stages_and_endpoint()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
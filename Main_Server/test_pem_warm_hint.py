@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+PEM warm hint 테스트 (ISM / PEM 서버는 bench_stubs.py의 stub 앱으로 대체)
+
+ISM 호출과 함께 PEM에 /cache/warm을 보내면, PEM 템플릿 로드 (stub의 cold_ms)가
+ISM 추론과 겹쳐서 PEM 요청은 캐시 적중으로 시작하는지 확인한다.
+"""
+import asyncio
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_load import make_catalog
+from bench_stubs import StubProfile, make_ism_app, make_pem_app
+from Main_Server.services import workflow_service as workflow_module
+from workflow_stubs import make_service, routed_http
+
+CAM = {"cam_K": [600.0, 0.0, 320.0, 0.0, 600.0, 240.0, 0.0, 0.0, 1.0], "depth_scale": 1.0}
+# 1x1 PNG (bbox segmentation용 이미지 크기 추정)
+RGB = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAAAAAA6fptVAAAACklEQVR4nGNgAAAAAgABSK+kcQAAAABJRU5ErkJggg=="
+
+
+def run_once(root: Path, hint: bool):
+    """객체 하나를 처음으로 처리 (PEM 템플릿 캐시가 빈 상태), (소요 시간, PEM stub 통계) 반환"""
+    ism = make_ism_app(StubProfile(latency_ms=150.0, jitter=0.0, image_size=(1, 1), detections=1))
+    pem = make_pem_app(StubProfile(latency_ms=10.0, jitter=0.0, cold_ms=150.0))
+    service = make_service(root)
+    real_hint = workflow_module.PEM_WARM_HINT
+    try:
+        workflow_module.PEM_WARM_HINT = hint
+
+        async def run():
+            start = time.perf_counter()
+            result = await service.execute_full_pipeline("ycb", "obj_00", RGB, RGB, CAM, output_mode="none")
+            assert result["success"], result
+            return time.perf_counter() - start
+
+        with routed_http({8002: ism, 8003: pem}):
+            elapsed = asyncio.run(run())
+    finally:
+        workflow_module.PEM_WARM_HINT = real_hint
+    return elapsed, pem.state.stub.to_dict()
+
+
+def test_warm_hint_overlaps_ism():
+    """warm hint를 보내면 PEM 템플릿 로드가 ISM 추론 중에 끝나서 PEM 요청이 캐시 적중"""
+    root = Path(tempfile.mkdtemp(prefix="pem_warm_hint_test_", dir=Path(__file__).resolve().parent))
+    try:
+        make_catalog(root, "ycb", ["obj_00"], cold_objects=0)
+        cold_sec, cold = run_once(root, hint=False)
+        warm_sec, warm = run_once(root, hint=True)
+
+        assert cold["cache_misses"] == 1 and cold["warmed"] == 0, cold
+        assert warm["cache_hits"] == 1 and warm["cache_misses"] == 0 and warm["warmed"] == 1, warm
+        assert warm_sec < cold_sec - 0.1, (warm_sec, cold_sec)
+        print(f"✅ PEM warm hint: first request {cold_sec * 1000:.0f}ms → {warm_sec * 1000:.0f}ms (PEM template cache hit)")
+        return True
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    print("PEM warm hint 테스트 시작...\n")
+
+    success = True
+    success &= test_warm_hint_overlaps_ism()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
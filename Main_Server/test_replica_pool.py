@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+ISM / PEM replica 풀 테스트
+
+replica는 같은 프로세스의 가짜 ASGI 앱 (템플릿 캐시 크기가 제한된 stub)으로 대체해서
+객체 affinity 라우팅이 round-robin보다 캐시 적중률이 높은지 확인한다.
+"""
+import asyncio
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi import FastAPI, Request
+
+from Main_Server.services import workflow_service as workflow_module
+from Main_Server.services.replica_pool import ReplicaPool, routing_key
+from Main_Server.utils.template_manifest import write_manifest
+from workflow_stubs import make_service, routed_http
+
+CAM = {"cam_K": [600.0, 0.0, 320.0, 0.0, 600.0, 240.0, 0.0, 0.0, 1.0], "depth_scale": 1.0}
+# 1x1 PNG (bbox segmentation용 이미지 크기 추정)
+RGB = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAAAAAA6fptVAAAACklEQVR4nGNgAAAAAgABSK+kcQAAAABJRU5ErkJggg=="
+
+OBJECTS = [f"obj_{i:02d}" for i in range(12)]
+STUB_CACHE_SIZE = 6
+
+
+def stub_replica(name: str) -> FastAPI:
+    """ISM / PEM 역할을 하는 stub (템플릿 캐시 STUB_CACHE_SIZE개, LRU)"""
+    app = FastAPI()
+    app.state.cache = {"ism": OrderedDict(), "pem": OrderedDict()}
+    app.state.stats = {"hits": 0, "misses": 0}
+
+    def touch(kind: str, template_dir: str):
+        cache = app.state.cache[kind]
+        if template_dir in cache:
+            cache.move_to_end(template_dir)
+            app.state.stats["hits"] += 1
+        else:
+            cache[template_dir] = True
+            app.state.stats["misses"] += 1
+            while len(cache) > STUB_CACHE_SIZE:
+                cache.popitem(last=False)
+
+    @app.get("/health")
+    @app.get("/ready")
+    @app.get("/api/v1/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.post("/api/v1/inference")
+    async def ism(request: Request):
+        touch("ism", (await request.json())["template_dir"])
+        return {"success": True, "replica": name, "detections": {"masks": [], "boxes": [[0, 0, 1, 1]], "scores": [0.9]}}
+
+    @app.post("/api/v1/pose-estimation")
+    async def pem(request: Request):
+        touch("pem", (await request.json())["template_dir"])
+        return {"success": True, "replica": name, "pose_scores": [0.8],
+                "pred_rot": [[[1, 0, 0], [0, 1, 0], [0, 0, 1]]], "pred_trans": [[0, 0, 500]]}
+
+    return app
+
+
+def test_routing():
+    """consistent hashing / 비정상 · 포화 시 least-outstanding / cooldown 확인"""
+    urls = [f"http://replica-{i}:9000" for i in range(3)]
+    pool = ReplicaPool("ism", urls, max_outstanding=1, cooldown_sec=0.05)
+    keys = [routing_key("ycb", name) for name in OBJECTS * 4]
+
+    owners = {key: pool.owner(key) for key in keys}
+    assert len(set(owners.values())) == 3, owners
+    for key in keys:
+        replica = pool.acquire(key)
+        assert replica.url == owners[key]
+        pool.release(replica)
+    assert pool.get_stats()["routing"]["affinity"] == len(keys)
+
+    # replica 하나를 빼도 나머지 replica가 담당하던 객체는 그대로 (가상 노드)
+    reduced = ReplicaPool("ism", urls[:2])
+    assert all(reduced.owner(key) == owner for key, owner in owners.items() if owner != urls[2])
+
+    # 포화 → 처리 중 요청이 가장 적은 replica
+    key = keys[0]
+    first = pool.acquire(key)
+    second = pool.acquire(key)
+    assert second.url != first.url and second.outstanding == 1
+    pool.release(first)
+    pool.release(second)
+
+    # 연결 실패 → cooldown 동안 다른 replica, 끝나면 원래 replica로 복귀
+    replica = pool.acquire(key)
+    pool.release(replica, failed=True, error="connection refused")
+    assert pool.acquire(key).url != owners[key]
+    time.sleep(0.06)
+    assert pool.acquire(key).url == owners[key]
+    assert pool.get_stats()["routing"]["fallback"] == 2
+
+    # 키가 없으면 돌아가며 선택
+    free = ReplicaPool("pem", urls)
+    chosen = []
+    for _ in range(3):
+        replica = free.acquire(None)
+        chosen.append(replica.url)
+        free.release(replica)
+    assert sorted(chosen) == urls
+    print("✅ consistent hashing / least-outstanding fallback / cooldown")
+    return True
+
+
+def run_workload(root: Path, affinity: bool, down=()):
+    """12개 객체를 4번씩 (고정 seed로 섞은 순서) 처리하고 stub 캐시 적중률 반환"""
+    apps = {port: stub_replica(f"ism-{port}") for port in (9101, 9102, 9103)}
+    apps.update({port: stub_replica(f"pem-{port}") for port in (9201, 9202, 9203)})
+    service = make_service(root, replica_pools={
+        "ism": ReplicaPool("ism", [f"http://localhost:{port}" for port in apps if port < 9200]),
+        "pem": ReplicaPool("pem", [f"http://localhost:{port}" for port in apps if port >= 9200]),
+    })
+    real_key = workflow_module.routing_key
+    try:
+        if not affinity:
+            workflow_module.routing_key = lambda class_name, object_name: None
+
+        order = OBJECTS * 4
+        random.Random(0).shuffle(order)
+
+        async def run():
+            for name in order:
+                result = await service.execute_full_pipeline("ycb", name, RGB, RGB, CAM, output_mode="none")
+                assert result["success"], result
+
+        with routed_http(apps, down):
+            asyncio.run(run())
+    finally:
+        workflow_module.routing_key = real_key
+    hits = sum(app.state.stats["hits"] for app in apps.values())
+    misses = sum(app.state.stats["misses"] for app in apps.values())
+    return hits / (hits + misses), service
+
+
+def test_affinity_improves_cache_hits():
+    """객체 affinity 라우팅이 round-robin보다 replica 캐시 적중률이 높은지 확인"""
+    root = Path(tempfile.mkdtemp(prefix="replica_pool_test_", dir=Path(__file__).resolve().parent))
+    try:
+        for name in OBJECTS:
+            (root / "meshes" / "ycb").mkdir(parents=True, exist_ok=True)
+            (root / "meshes" / "ycb" / f"{name}.ply").write_bytes(name.encode())
+            (root / "templates" / "ycb" / name).mkdir(parents=True)
+            write_manifest(root / "templates" / "ycb" / name, {"mesh_sha256": name})
+
+        round_robin, _ = run_workload(root, affinity=False)
+        affinity, service = run_workload(root, affinity=True)
+        assert affinity > round_robin + 0.3, (affinity, round_robin)
+        assert service.replica_pools["ism"].get_stats()["routing"]["affinity"] == len(OBJECTS) * 4
+
+        # replica 하나가 죽어도 다른 replica로 재시도해서 모두 성공
+        _, degraded = run_workload(root, affinity=True, down=(9102, 9202))
+        stats = degraded.replica_pools["ism"].get_stats()
+        down = next(r for r in stats["replicas"] if r["url"].endswith(":9102"))
+        assert down["failures"] >= 1 and not down["healthy"]
+        print(f"✅ stub replica cache hit ratio: affinity {affinity:.0%} vs round-robin {round_robin:.0%} "
+              f"(degraded fallbacks {stats['routing']['fallback']})")
+        return True
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    print("replica 풀 테스트 시작...\n")
+
+    success = True
+    success &= test_routing()
+    success &= test_affinity_improves_cache_hits()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
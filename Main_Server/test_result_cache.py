@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+ISM / PEM 결과 캐시 테스트 (ISM / PEM 서버 호출은 가짜 함수로 대체)
+"""
+import asyncio
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from Main_Server.services.result_cache import ResultCache, estimate_size
+from bench_load import make_catalog
+from bench_stubs import write_stub_templates
+from workflow_stubs import make_service as make_stub_service
+
+CAM = {"cam_K": [600.0, 0.0, 320.0, 0.0, 600.0, 240.0, 0.0, 0.0, 1.0], "depth_scale": 1.0}
+# 1x1 PNG (output_mode="full"에서 입력 이미지 저장용)
+PNG = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAAAAAA6fptVAAAACklEQVR4nGNgAAAAAgABSK+kcQAAAABJRU5ErkJggg=="
+
+
+def make_service(root: Path):
+    """임시 static 폴더 + 가짜 ISM / PEM 서버 (호출 기록, PEM 실패 횟수 지정 가능)"""
+    make_catalog(root, "ycb", ["a", "b"], cold_objects=0)
+    calls = {"render": 0, "ism": 0, "pem": 0, "pem_failures": 0}
+
+    async def fake_render(cad_path, template_output_dir, render_params=None):
+        calls["render"] += 1
+        write_stub_templates(Path(template_output_dir))
+        return {"status": "succeeded", "returncode": 0}
+
+    async def fake_ism(**kwargs):
+        calls["ism"] += 1
+        return {"success": True, "detections": {"masks": [{"size": [1, 1], "counts": [0, 1]}], "boxes": [[0, 0, 1, 1]], "scores": [0.9]}}
+
+    async def fake_pem(**kwargs):
+        calls["pem"] += 1
+        if calls["pem_failures"] > 0:
+            calls["pem_failures"] -= 1
+            return {"success": False, "error": "PEM timeout"}
+        return {"success": True, "detections": [{"score": 0.8}], "pose_scores": [0.8], "pred_rot": [[[1, 0, 0], [0, 1, 0], [0, 0, 1]]], "pred_trans": [[0, 0, 500]]}
+
+    service = make_stub_service(root, render=fake_render, ism=fake_ism, pem=fake_pem,
+                                result_cache=ResultCache(ttl_sec=60, max_entries=16))
+    return service, calls
+
+
+def run_pipeline(service, object_name="a", rgb="rgb-frame-1", **kwargs):
+    return asyncio.run(service.execute_full_pipeline(
+        "ycb", object_name, rgb, "depth-frame-1", CAM, output_mode="none", **kwargs
+    ))
+
+
+def test_repeated_frame_and_pem_retry():
+    """같은 프레임 재요청은 ISM / PEM을 건너뛰고, PEM 실패 후 재시도는 ISM 결과를 재사용하는지 확인"""
+    root = Path(tempfile.mkdtemp(prefix="result_cache_test_"))
+    try:
+        service, calls = make_service(root)
+        result = run_pipeline(service)
+        assert result["cache"] == {"ism": "miss", "pem": "miss"}
+        result = run_pipeline(service)
+        assert result["cache"] == {"ism": "hit", "pem": "hit"} and result["num_poses"] == 1
+        assert (calls["ism"], calls["pem"]) == (1, 1)
+
+        # 다른 프레임 / 다른 객체 / 캐시 미사용은 다시 계산
+        run_pipeline(service, rgb="rgb-frame-2")
+        run_pipeline(service, object_name="b")
+        run_pipeline(service, use_result_cache=False)
+        assert (calls["ism"], calls["pem"]) == (4, 4)
+
+        # PEM 실패는 캐시하지 않고, 재시도 시 ISM만 재사용
+        calls["pem_failures"] = 1
+        assert run_pipeline(service, rgb="rgb-frame-3")["cache"] == {"ism": "miss", "pem": "miss"}
+        result = run_pipeline(service, rgb="rgb-frame-3")
+        assert result["cache"] == {"ism": "hit", "pem": "miss"} and result["num_poses"] == 1
+        assert (calls["ism"], calls["pem"]) == (5, 6)
+
+        # 메쉬를 제자리에서 수정하면 템플릿을 다시 렌더링하고 (매니페스트 변경) 캐시 무효
+        assert calls["render"] == 0
+        (root / "meshes" / "ycb" / "a.ply").write_bytes(b"a-scaled")
+        assert run_pipeline(service)["cache"] == {"ism": "miss", "pem": "miss"}
+        assert calls["render"] == 1
+        assert run_pipeline(service)["cache"] == {"ism": "hit", "pem": "hit"} and calls["render"] == 1
+
+        stats = service.result_cache.get_stats()
+        assert stats["ism"]["hits"] == 3 and stats["pem"]["hits"] == 2
+        print(f"✅ repeated frame / PEM-only retry (ism hit rate {stats['ism']['hit_rate']})")
+        return True
+    finally:
+        shutil.rmtree(root)
+
+
+def test_full_output_on_hit():
+    """output_mode=full에서 캐시 적중이어도 ism/ · pem/ 감지 결과 파일이 저장되는지 확인"""
+    root = Path(tempfile.mkdtemp(prefix="result_cache_test_"))
+    try:
+        service, calls = make_service(root)
+        for run in ("first", "second"):
+            result = asyncio.run(service.execute_full_pipeline(
+                "ycb", "a", PNG, PNG, CAM, output_dir=str(root / "output" / run), output_mode="full"
+            ))
+            assert result["success"]
+        assert result["cache"] == {"ism": "hit", "pem": "hit"} and (calls["ism"], calls["pem"]) == (1, 1)
+        service.artifact_writer.flush()
+
+        output = root / "output" / "second"
+        ism = json.loads((output / "ism" / "detection_ism.json").read_text())
+        pem = json.loads((output / "pem" / "detection_pem.json").read_text())
+        assert len(ism) == 1 and ism[0]["bbox"] == [0.0, 0.0, 1.0, 1.0] and ism[0]["score"] == 0.9
+        assert pem == [{"score": 0.8}]
+        print("✅ full output on cache hit")
+        return True
+    finally:
+        shutil.rmtree(root)
+
+
+def test_size_estimate():
+    """직렬화 없이 추정한 크기가 JSON 길이와 비슷한지 확인 (RLE 마스크 포함 감지 결과)"""
+    masks = [{"size": [480, 640], "counts": list(range(0, 60_000, 7))} for _ in range(20)]
+    value = {
+        "success": True,
+        "detections": {"masks": masks, "boxes": [[1.5, 2.5, 100.0, 200.0]] * 20, "scores": [0.9] * 20},
+        "inference_time": 0.123,
+    }
+    actual = len(json.dumps(value))
+    estimate = estimate_size(value)
+    assert 0.5 * actual < estimate < 2.0 * actual, (estimate, actual)
+    print(f"✅ size estimate ({estimate} vs json {actual} bytes)")
+    return True
+
+
+def test_bounds():
+    """항목 수 / 메모리 상한과 TTL 확인"""
+    cache = ResultCache(ttl_sec=0.05, max_entries=3, max_bytes=10_000)
+    for i in range(5):
+        cache.put("ism", f"k{i}", {"i": i})
+    assert cache.get("ism", "k0") is None and cache.get("ism", "k4") == {"i": 4}
+    assert cache.get_stats()["entries"] == 3 and cache.get_stats()["evictions"] == 2
+    time.sleep(0.06)
+    assert cache.get("ism", "k4") is None and cache.get_stats()["expired"] == 1
+
+    cache.put("pem", "big", {"data": "x" * 6000})
+    cache.put("pem", "big2", {"data": "x" * 6000})
+    assert cache.get("pem", "big") is None and cache.get_stats()["bytes"] <= 10_000
+    cache.put("pem", "huge", {"data": "x" * 20_000})
+    assert cache.get("pem", "huge") is None
+    assert ResultCache(max_entries=0).enabled is False
+    print("✅ size / memory / TTL bounds")
+    return True
+
+
+if __name__ == "__main__":
+    print("결과 캐시 테스트 시작...\n")
+
+    success = True
+    success &= test_repeated_frame_and_pem_retry()
+    success &= test_full_output_on_hit()
+    success &= test_size_estimate()
+    success &= test_bounds()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
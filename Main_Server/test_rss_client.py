@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+RSS 비동기 클라이언트 테스트 (httpx.MockTransport로 가짜 RSS 서버 구성)
+"""
+import asyncio
+import base64
+import io
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import httpx
+import numpy as np
+from PIL import Image
+
+from Main_Server.services.rss_client import RssClient
+from Main_Server.services.workflow_service import WorkflowService
+
+W, H = 64, 48
+BASE_URL = "http://rss.test:51000"
+
+
+def make_fake_rss(calibration, latency=0.05):
+    """요청 경로별 호출 횟수 / 동시 요청 수를 기록하는 가짜 RSS"""
+    rng = np.random.default_rng(0)
+    color = rng.integers(0, 256, (H, W, 3), dtype=np.uint8)
+    depth = rng.integers(300, 2000, (H, W), dtype=np.uint16)
+    jpeg = io.BytesIO()
+    Image.fromarray(color).save(jpeg, format="JPEG")
+    stats = {"calls": {}, "in_flight": 0, "max_in_flight": 0}
+
+    async def handler(request: httpx.Request):
+        path = request.url.path
+        stats["calls"][path] = stats["calls"].get(path, 0) + 1
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        await asyncio.sleep(latency)
+        stats["in_flight"] -= 1
+        if path == "/camera/calibration":
+            return httpx.Response(200, json=calibration)
+        if path == "/camera/status":
+            return httpx.Response(200, json={"depth_scale": 1.0})
+        if path == "/streams/color_raw":
+            return httpx.Response(200, content=color.tobytes())
+        if path == "/streams/depth_raw":
+            return httpx.Response(200, content=depth.tobytes())
+        if path == "/streams/color_jpeg":
+            return httpx.Response(200, content=jpeg.getvalue())
+        return httpx.Response(404)
+
+    return httpx.MockTransport(handler), stats, color, depth
+
+
+CALIBRATION = {
+    "width": W,
+    "height": H,
+    "depth_intrinsics": {"fx": 60.0, "fy": 60.0, "ppx": 32.0, "ppy": 24.0},
+}
+
+
+def test_concurrent_fetch_and_cache():
+    """캘리브레이션 / 상태 / 프레임이 동시에 요청되고, 카메라 정보가 캐시되는지 확인"""
+    transport, stats, color, depth = make_fake_rss(CALIBRATION)
+    service = WorkflowService()
+    service.rss_client = RssClient(calibration_ttl=60, transport=transport)
+
+    async def run():
+        results = []
+        for _ in range(3):
+            results.append(await asyncio.gather(
+                service.rss_client.get_camera_info(BASE_URL, service._rss_parse_camera),
+                service.rss_client.fetch_frame(BASE_URL),
+            ))
+        await service.rss_client.aclose()
+        return results
+
+    results = asyncio.run(run())
+    assert stats["calls"]["/camera/calibration"] == 1 and stats["calls"]["/camera/status"] == 1
+    assert stats["calls"]["/streams/color_raw"] == 3 and "/streams/color_jpeg" not in stats["calls"]
+    assert stats["max_in_flight"] == 4
+
+    camera, (color_raw, depth_raw) = results[-1]
+    assert (camera.width, camera.height) == (W, H)
+    rgb_b64, depth_b64 = service._rss_prepare_frame(color_raw, depth_raw, camera, align_color=False)
+    rgb = np.array(Image.open(io.BytesIO(base64.b64decode(rgb_b64))))
+    assert np.array_equal(rgb, color[..., ::-1])
+    assert np.array_equal(np.array(Image.open(io.BytesIO(base64.b64decode(depth_b64)))), depth)
+    print("✅ concurrent fetch / calibration cache")
+    return True
+
+
+def test_resolution_fallback_to_jpeg():
+    """캘리브레이션에 해상도가 없으면 JPEG 헤더로 한 번만 확인하는지 확인"""
+    calibration = {k: v for k, v in CALIBRATION.items() if k not in ("width", "height")}
+    transport, stats, _, _ = make_fake_rss(calibration, latency=0.0)
+    client = RssClient(calibration_ttl=60, transport=transport)
+    service = WorkflowService()
+
+    async def run():
+        for _ in range(2):
+            camera = await client.get_camera_info(BASE_URL, service._rss_parse_camera)
+        await client.aclose()
+        return camera
+
+    camera = asyncio.run(run())
+    assert (camera.width, camera.height) == (W, H)
+    assert stats["calls"]["/streams/color_jpeg"] == 1
+    print("✅ resolution fallback (JPEG header)")
+    return True
+
+
+if __name__ == "__main__":
+    print("RSS 클라이언트 테스트 시작...\n")
+
+    success = True
+    success &= test_concurrent_fetch_and_cache()
+    success &= test_resolution_fallback_to_jpeg()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+RSS prefetch 루프 테스트 (가짜 RSS + 가짜 파이프라인)
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from Main_Server.services.rss_client import RssClient
+from Main_Server.services.rss_prefetch import ContinuousConfig
+from Main_Server.services.workflow_service import WorkflowService
+from Main_Server.test_rss_client import BASE_URL, CALIBRATION, make_fake_rss
+
+
+def make_service(latency=0.01):
+    transport, stats, _, _ = make_fake_rss(CALIBRATION, latency=latency)
+    service = WorkflowService()
+    service.rss_client = RssClient(calibration_ttl=60, transport=transport)
+    return service, stats
+
+
+def test_prefetched_frame_is_used():
+    """prefetch 루프가 동작 중이면 요청 시 RSS를 다시 호출하지 않고 최신 프레임을 쓰는지 확인"""
+    service, stats = make_service()
+    seen = []
+
+    async def fake_pipeline(**kwargs):
+        seen.append(kwargs)
+        return {"success": True, "pose_results": [], "num_poses": 0}
+
+    service.execute_full_pipeline = fake_pipeline
+
+    async def run():
+        prefetcher = service.rss_prefetch.start(BASE_URL, buffer_size=3, interval_sec=0.01)
+        while prefetcher.stats["captured"] < 5:
+            await asyncio.sleep(0.01)
+        await service.rss_prefetch.stop_all()
+        assert len(prefetcher.frames) == 3
+        latest = prefetcher.latest()
+
+        # prefetch 중지 후에는 버퍼를 쓰지 않고 새로 수집
+        assert service.rss_prefetch.latest_frame(BASE_URL, False) is None
+        service.rss_prefetch.start(BASE_URL, interval_sec=10.0)
+        while service.rss_prefetch.latest_frame(BASE_URL, False) is None:
+            await asyncio.sleep(0.01)
+        calls_before = stats["calls"]["/streams/color_raw"]
+        start = time.perf_counter()
+        result = await service.execute_full_pipeline_from_rss("ycb", "obj", base=BASE_URL, output_mode="none")
+        elapsed = time.perf_counter() - start
+        assert stats["calls"]["/streams/color_raw"] == calls_before
+        assert result["success"] and seen[-1]["rgb_image"] == service.rss_prefetch.latest_frame(BASE_URL, False).rgb_b64
+
+        # 허용 나이를 넘으면 새로 수집
+        await asyncio.sleep(0.05)
+        await service.execute_full_pipeline_from_rss(
+            "ycb", "obj", base=BASE_URL, output_mode="none", max_frame_age_sec=0.01
+        )
+        assert stats["calls"]["/streams/color_raw"] == calls_before + 1
+        await service.rss_prefetch.stop_all()
+        await service.rss_client.aclose()
+        return latest, elapsed
+
+    latest, elapsed = asyncio.run(run())
+    assert latest.seq >= 5
+    print(f"✅ prefetched frame used (pipeline start {elapsed * 1000:.1f}ms)")
+    return True
+
+
+def test_continuous_mode_skips_while_busy():
+    """연속 모드에서 이전 파이프라인이 실행 중이면 프레임을 건너뛰고, 결과가 구독자에게 전달되는지 확인"""
+    service, _ = make_service(latency=0.0)
+    in_flight = {"now": 0, "max": 0}
+
+    async def slow_pipeline(frame, **kwargs):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.05)
+        in_flight["now"] -= 1
+        return {"success": True, "num_poses": 1, "pose_results": [{"seq": frame.seq}]}
+
+    service.rss_prefetch.run_pipeline = slow_pipeline
+
+    async def run():
+        prefetcher = service.rss_prefetch.start(
+            BASE_URL, interval_sec=0.005, continuous=ContinuousConfig("ycb", "obj", every_n=1)
+        )
+        queue = prefetcher.subscribe()
+        events = [await asyncio.wait_for(queue.get(), timeout=5.0) for _ in range(3)]
+        status = prefetcher.status()
+        await service.rss_prefetch.stop_all()
+        await service.rss_client.aclose()
+        return events, status
+
+    events, status = asyncio.run(run())
+    assert in_flight["max"] == 1
+    assert status["pipelines_skipped"] > 0
+    assert all(e["success"] and e["num_poses"] == 1 for e in events)
+    assert [e["seq"] for e in events] == sorted(e["seq"] for e in events)
+    print(f"✅ continuous mode (run={status['pipelines_run']}, skipped={status['pipelines_skipped']})")
+    return True
+
+
+if __name__ == "__main__":
+    print("RSS prefetch 테스트 시작...\n")
+
+    success = True
+    success &= test_prefetched_frame_is_used()
+    success &= test_continuous_mode_skips_while_busy()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
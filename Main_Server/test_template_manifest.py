@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+템플릿 매니페스트 기반 증분 렌더링 테스트 (Render 서버 호출은 가짜 렌더러로 대체)
+"""
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from Main_Server.utils import template_manifest
+from Main_Server.utils.template_manifest import MANIFEST_FILENAME, load_manifest
+from workflow_stubs import make_service as make_stub_service
+
+
+def make_service(root: Path):
+    """임시 static 폴더를 쓰는 WorkflowService와 렌더링 호출 기록"""
+    calls = []
+
+    async def fake_render(cad_path, template_output_dir, render_params=None):
+        calls.append(Path(template_output_dir).name)
+        out = Path(template_output_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        content = Path(cad_path).read_bytes()
+        for i in range(2):
+            (out / f"rgb_{i}.png").write_bytes(content)
+            (out / f"mask_{i}.png").write_bytes(content)
+            (out / f"xyz_{i}.npy").write_bytes(content)
+        return {"status": "succeeded", "returncode": 0}
+
+    return make_stub_service(root, render=fake_render), calls
+
+
+def write_mesh(root: Path, name: str, content: bytes):
+    path = root / "meshes" / "ycb" / f"{name}.ply"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return path
+
+
+def test_incremental_render():
+    """변경된 메쉬만 재렌더링되고, 같은 내용의 메쉬는 복사되는지 확인"""
+    root = Path(tempfile.mkdtemp(prefix="manifest_test_"))
+    try:
+        service, calls = make_service(root)
+        write_mesh(root, "a", b"mesh-a")
+        write_mesh(root, "b", b"mesh-b")
+        write_mesh(root, "a_copy", b"mesh-a")
+
+        result = asyncio.run(service.render_templates("ycb", ["a", "b", "a_copy"]))
+        assert calls == ["a", "b"], calls
+        assert result["rendered"] == 2 and result["deduplicated"] == 1
+        copied = root / "templates" / "ycb" / "a_copy"
+        assert (copied / "rgb_1.png").read_bytes() == b"mesh-a"
+        assert load_manifest(copied)["copied_from"] == os.path.join("ycb", "a")
+
+        # 변경 없음 -> 전부 스킵 (force여도 매니페스트가 일치하면 스킵)
+        calls.clear()
+        result = asyncio.run(service.render_templates("ycb", ["a", "b", "a_copy"], force_regenerate=True))
+        assert calls == [] and result["skipped"] == 3
+
+        # 제자리 수정된 메쉬만 재렌더링
+        write_mesh(root, "b", b"mesh-b-scaled")
+        result = asyncio.run(service.render_templates("ycb", ["a", "b", "a_copy"]))
+        assert calls == ["b"], calls
+        assert result["results"][1]["reason"] == "mesh_changed"
+        print("✅ incremental render / dedup")
+        return True
+    finally:
+        shutil.rmtree(root)
+
+
+def test_manifest_index_read_once():
+    """요청 하나에서 stale 객체가 여러 개여도 카탈로그 매니페스트는 한 번만 읽는지 확인"""
+    root = Path(tempfile.mkdtemp(prefix="manifest_test_"))
+    real_load = template_manifest.TemplateMeshIndex._load
+    loads = []
+
+    def counting_load(index):
+        loads.append(index.templates_root)
+        return real_load(index)
+
+    try:
+        service, calls = make_service(root)
+        names = [f"obj_{i}" for i in range(6)]
+        for name in names:
+            write_mesh(root, name, f"mesh-{name}".encode())
+        template_manifest.TemplateMeshIndex._load = counting_load
+        asyncio.run(service.render_templates("ycb", names))
+        assert len(loads) == 1 and calls == names
+
+        # 같은 내용의 메쉬 3개가 한꺼번에 바뀌면 하나만 렌더링하고 나머지는 복사
+        calls.clear()
+        for name in names[:3]:
+            write_mesh(root, name, b"mesh-shared")
+        result = asyncio.run(service.render_templates("ycb", names))
+        assert len(loads) == 2 and calls == ["obj_0"], calls
+        assert result["deduplicated"] == 2 and result["skipped"] == 3
+        print("✅ catalog manifests read once per request")
+        return True
+    finally:
+        template_manifest.TemplateMeshIndex._load = real_load
+        shutil.rmtree(root)
+
+
+def test_legacy_template_without_manifest():
+    """매니페스트 없는 기존 템플릿은 기본적으로 유지하고, force일 때만 재생성하는지 확인"""
+    root = Path(tempfile.mkdtemp(prefix="manifest_test_"))
+    try:
+        service, calls = make_service(root)
+        write_mesh(root, "a", b"mesh-a")
+        asyncio.run(service.render_templates("ycb", ["a"]))
+        (root / "templates" / "ycb" / "a" / MANIFEST_FILENAME).unlink()
+        calls.clear()
+
+        result = asyncio.run(service.render_templates("ycb", ["a"]))
+        assert calls == [] and result["results"][0]["reason"] == "no_manifest"
+        asyncio.run(service.render_templates("ycb", ["a"], force_regenerate=True))
+        assert calls == ["a"]
+        assert load_manifest(root / "templates" / "ycb" / "a") is not None
+        print("✅ legacy template without manifest")
+        return True
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    print("템플릿 매니페스트 테스트 시작...\n")
+
+    success = True
+    success &= test_incremental_render()
+    success &= test_manifest_index_read_once()
+    success &= test_legacy_template_without_manifest()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
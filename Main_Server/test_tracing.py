@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+요청 추적 테스트 (ISM / PEM 서버는 같은 프로세스의 가짜 ASGI 앱으로 대체)
+"""
+import asyncio
+import base64
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import httpx
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from Main_Server.api.endpoints.workflow import router as workflow_router, workflow_service
+from Main_Server.services.job_queue import JobQueue
+from Main_Server.utils.metrics import METRICS
+from Main_Server.utils.tracing import TRACER
+from sam6d_common import tracing
+from bench_load import make_catalog
+
+
+def png_base64(image: np.ndarray) -> str:
+    ok, encoded = cv2.imencode(".png", image)
+    assert ok
+    return base64.b64encode(encoded.tobytes()).decode("ascii")
+
+
+CAM = {"cam_K": [600.0, 0.0, 320.0, 0.0, 600.0, 240.0, 0.0, 0.0, 1.0], "depth_scale": 1.0}
+
+
+def test_server_timing_format():
+    """중첩 span이 Server-Timing으로 나가고, 원격 span으로 다시 붙는지 확인"""
+    with TRACER.start_trace("POST /api/v1/inference") as (trace, root):
+        with tracing.span("decode"):
+            time.sleep(0.002)
+        with METRICS.time_stage("inference"):
+            with tracing.span("sam_proposals"):
+                time.sleep(0.002)
+        header = trace.server_timing(root)
+
+    entries = tracing.parse_server_timing(header)
+    assert [e["name"] for e in entries] == ["POST__api_v1_inference", "decode", "inference", "sam_proposals"]
+    assert [e["depth"] for e in entries] == [0, 1, 1, 2]
+    assert entries[3]["start"] >= entries[2]["start"] and entries[3]["dur"] <= entries[2]["dur"]
+    assert tracing.parse_server_timing('cache;desc="hit", db;dur=53') == [
+        {"name": "cache", "dur": 0.0, "start": 0.0, "depth": 0},
+        {"name": "db", "dur": 53.0, "start": 0.0, "depth": 0},
+    ]
+
+    # 호출한 쪽 추적에 원격 span으로 추가 (네트워크 시간은 앞뒤로 반씩)
+    caller = tracing.Trace("main")
+    http_span = caller.start_span("ism.http", None, start=0.0)
+    http_span.end = 0.1
+    caller.add_remote_timing("request;dur=80;start=0;depth=0, inference;dur=50;start=20;depth=1", http_span, "ism")
+    waterfall = caller.waterfall(http_span)
+    assert [(w["name"], w["server"], w["depth"]) for w in waterfall] == [
+        ("ism.http", "main", 0), ("request", "ism", 1), ("inference", "ism", 2),
+    ]
+    assert waterfall[1]["start_ms"] == 10.0 and waterfall[2]["start_ms"] == 30.0
+    # Server-Timing에는 자기 서버 span만
+    assert tracing.parse_server_timing(caller.server_timing(http_span))[-1]["name"] == "ism.http"
+    print(f"✅ Server-Timing format ({header})")
+    return True
+
+
+def test_propagation_and_sink():
+    """traceparent / X-Request-ID 전달, 추적 밖에서는 no-op, JSONL 기록 확인"""
+    assert tracing.propagation_headers() == {}
+    with tracing.span("outside") as outside:
+        assert outside is None
+
+    root_dir = Path(tempfile.mkdtemp(prefix="tracing_test_"))
+    sink = TRACER.sink
+    try:
+        TRACER.sink = str(root_dir / "traces.jsonl")
+        parent = "00-" + "a" * 32 + "-" + "b" * 16 + "-01"
+        with TRACER.start_trace("request", request_id="req-1", traceparent=parent) as (trace, root):
+            with tracing.span("ism.http") as http_span:
+                headers = tracing.propagation_headers()
+        assert trace.trace_id == "a" * 32 and trace.request_id == "req-1"
+        assert headers == {"X-Request-ID": "req-1", "traceparent": f"00-{'a' * 32}-{http_span.span_id}-01"}
+
+        # 잘못된 traceparent면 새 추적
+        with TRACER.start_trace("request", traceparent="garbage") as (other, _):
+            pass
+        assert other.trace_id != "a" * 32 and other.request_id == other.trace_id
+
+        deadline = time.monotonic() + 5.0
+        while time.monotonic() < deadline:
+            lines = (root_dir / "traces.jsonl").read_text().splitlines() if (root_dir / "traces.jsonl").exists() else []
+            if len(lines) >= 2:
+                break
+            time.sleep(0.01)
+        record = json.loads(lines[0])
+        assert record["trace_id"] == "a" * 32 and record["service"] == "main"
+        assert record["spans"][0]["parent_id"] == "b" * 16
+        otlp = tracing.to_otlp(record)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        assert otlp[1]["parentSpanId"] == otlp[0]["spanId"] and otlp[0]["parentSpanId"] == "b" * 16
+        print("✅ traceparent propagation / JSONL sink")
+        return True
+    finally:
+        TRACER.sink = sink
+        shutil.rmtree(root_dir)
+
+
+def test_background_task_context():
+    """요청 안에서 시작한 작업 큐 워커 / 태스크가 끝난 요청의 추적을 이어 쓰지 않는지 확인"""
+    async def run():
+        queue = JobQueue(workers=1)
+        seen = []
+
+        async def job(progress):
+            seen.append(tracing.current_trace())
+            with TRACER.trace_or_span("job") as (trace, root):
+                seen.append((trace.trace_id, root.name))
+            return {"success": True}
+
+        async def late():
+            await asyncio.sleep(0.01)
+            with TRACER.trace_or_span("late") as (trace, root):
+                return trace.trace_id, root.name
+
+        # 첫 /jobs 요청 안에서 워커가 생성됨
+        with TRACER.start_trace("POST /api/v1/jobs") as (request_trace, _):
+            submitted = queue.submit("test", job)
+            late_task = asyncio.create_task(late())
+        while submitted.status != "completed":
+            await asyncio.sleep(0.01)
+        await queue.shutdown()
+        return request_trace, seen, await late_task
+
+    request_trace, seen, late = asyncio.run(run())
+    assert seen[0] is None, "worker inherited the request trace"
+    assert seen[1][0] != request_trace.trace_id and seen[1][1] == "job"
+    # context를 물려받은 태스크라도 요청 (root span)이 끝났으면 새 추적
+    assert late[0] != request_trace.trace_id and late[1] == "late"
+    print("✅ background tasks start their own traces")
+    return True
+
+
+def make_fake_servers(seen: dict) -> FastAPI:
+    """ISM (8002) / PEM (8003) 역할을 하는 가짜 앱 (경로로 구분)"""
+    app = FastAPI()
+    app.add_middleware(tracing.TracingMiddleware, tracer=TRACER)
+
+    @app.get("/health")
+    @app.get("/api/v1/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.post("/api/v1/inference")
+    async def ism(request: Request):
+        seen["ism"] = dict(request.headers)
+        with METRICS.time_stage("inference"):
+            time.sleep(0.005)
+        return {"success": True, "detections": {"masks": [], "boxes": [[0, 0, 8, 8]], "scores": [0.9]}}
+
+    @app.post("/api/v1/pose-estimation")
+    async def pem(request: Request):
+        seen["pem"] = dict(request.headers)
+        with METRICS.time_stage("inference"):
+            time.sleep(0.005)
+        return {"success": True, "pose_scores": [0.8], "pred_rot": [[[1, 0, 0], [0, 1, 0], [0, 0, 1]]], "pred_trans": [[0, 0, 500]]}
+
+    return app
+
+
+def test_pipeline_waterfall():
+    """/full-pipeline 응답에 ISM / PEM 내부 단계까지 포함한 waterfall과 Server-Timing이 붙는지 확인"""
+    root = Path(tempfile.mkdtemp(prefix="tracing_test_", dir=Path(__file__).resolve().parent))
+    paths = workflow_service.paths
+    seen = {}
+    fake_servers = make_fake_servers(seen)
+    real_client = httpx.AsyncClient
+
+    class RoutedClient(real_client):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, transport=httpx.ASGITransport(app=fake_servers), **kwargs)
+
+    try:
+        workflow_service.paths = dict(paths, meshes=root / "meshes", templates=root / "templates", output=root / "output")
+        make_catalog(root, "ycb", ["a"], cold_objects=0)
+        httpx.AsyncClient = RoutedClient
+
+        app = FastAPI()
+        app.add_middleware(tracing.TracingMiddleware, tracer=TRACER)
+        app.include_router(workflow_router)
+        response = TestClient(app).post(
+            "/api/v1/workflow/full-pipeline",
+            json={
+                "class_name": "ycb", "object_name": "a",
+                "rgb_image": png_base64(np.zeros((48, 64, 3), dtype=np.uint8)),
+                "depth_image": png_base64(np.zeros((48, 64), dtype=np.uint16)),
+                "cam_params": CAM, "output_mode": "none", "use_result_cache": False,
+            },
+            headers={"X-Request-ID": "pipeline-req"},
+        )
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert body["success"], body
+        assert response.headers["x-request-id"] == "pipeline-req"
+
+        # 같은 추적 ID / 요청 ID가 ISM / PEM으로 전달됨
+        timing = body["results"]["timing"]
+        for server in ("ism", "pem"):
+            assert seen[server]["x-request-id"] == "pipeline-req"
+            assert seen[server]["traceparent"].split("-")[1] == timing["trace_id"]
+
+        steps = [(w["name"], w["server"]) for w in timing["waterfall"]]
+        for step in (("pipeline", "main"), ("decode", "main"), ("ism.http", "main"), ("inference", "ism"),
+                     ("pem.seg_data", "main"), ("pem.http", "main"), ("inference", "pem")):
+            assert step in steps, step
+        assert all(w["start_ms"] >= 0 for w in timing["waterfall"])
+
+        server_timing = [e["name"] for e in tracing.parse_server_timing(response.headers["server-timing"])]
+        assert "pipeline" in server_timing and "ism.http" in server_timing and "inference" not in server_timing
+        print(f"✅ pipeline waterfall ({len(steps)} spans, trace {timing['trace_id'][:8]})")
+        return True
+    finally:
+        httpx.AsyncClient = real_client
+        workflow_service.paths = paths
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    print("요청 추적 테스트 시작...\n")
+
+    success = True
+    success &= test_server_timing_format()
+    success &= test_propagation_and_sink()
+    success &= test_background_task_context()
+    success &= test_pipeline_waterfall()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Depth → Color 정합 (registration)
+
+depth 픽셀을 3D로 역투영 → depth→color extrinsics 변환 → color 카메라로 투영하고,
+같은 color 픽셀에 여러 점이 떨어지면 가장 가까운 (Z 최소) 점을 남긴다 (z-buffer).
+
+- 픽셀 ray 그리드 (R @ ((u - cx) / fx, (v - cy) / fy, 1))는 캘리브레이션별로 한 번만 계산
+- z-buffer는 (픽셀, Z) 키 정렬 후 픽셀별 첫 값 선택으로 벡터화 (파이썬 루프 없음)
+- torch 텐서를 넘기면 scatter_reduce(amin)로 GPU에서도 계산 가능
+
+WorkflowService (RSS 파이프라인)가 사용한다. RSSServer_connector/save_from_rss.py에는 Main_Server 없이 실행되도록
+같은 구현의 복사본이 있다 (test_depth_registration.py가 결과 일치를 확인).
+"""
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class DepthRegistration:
+    """캘리브레이션 하나에 대한 depth → color 정합기 (ray 그리드 캐시)"""
+
+    def __init__(
+        self,
+        K_depth: np.ndarray,
+        K_color: np.ndarray,
+        T_depth_to_color: np.ndarray,
+        depth_size: Tuple[int, int],
+        color_size: Optional[Tuple[int, int]] = None,
+    ):
+        """
+        Args:
+            K_depth / K_color: 3x3 intrinsics
+            T_depth_to_color: 4x4 extrinsics (meter)
+            depth_size / color_size: (W, H), color_size가 없으면 depth_size와 동일
+        """
+        self.depth_size = (int(depth_size[0]), int(depth_size[1]))
+        self.color_size = tuple(int(s) for s in color_size) if color_size is not None else self.depth_size
+        self.fx_d, self.fy_d = float(K_depth[0, 0]), float(K_depth[1, 1])
+        self.cx_d, self.cy_d = float(K_depth[0, 2]), float(K_depth[1, 2])
+        self.fx_c, self.fy_c = float(K_color[0, 0]), float(K_color[1, 1])
+        self.cx_c, self.cy_c = float(K_color[0, 2]), float(K_color[1, 2])
+        T_depth_to_color = np.array(T_depth_to_color, dtype=float)
+        self.R = T_depth_to_color[:3, :3]
+        self.t = T_depth_to_color[:3, 3]
+
+        W_d, H_d = self.depth_size
+        uu, vv = np.meshgrid(np.arange(W_d, dtype=np.float32), np.arange(H_d, dtype=np.float32))
+        self.ray_x = (uu - self.cx_d) / self.fx_d
+        self.ray_y = (vv - self.cy_d) / self.fy_d
+        # color 카메라 좌표 = ray_c * Z + t, ray_c = R @ (ray_x, ray_y, 1) (캘리브레이션별 상수)
+        self.ray_c = np.einsum("ij,jhw->ihw", self.R, np.stack([self.ray_x, self.ray_y, np.ones_like(self.ray_x)]).astype(np.float64))
+        self._torch_rays = {}
+
+    def project(self, z_m: np.ndarray):
+        """depth (meter) → color 픽셀 좌표 (uc_i, vc_i)와 color 카메라 Z"""
+        Xc = self.ray_c[0] * z_m + self.t[0]
+        Yc = self.ray_c[1] * z_m + self.t[1]
+        Zc = self.ray_c[2] * z_m + self.t[2]
+
+        inv_z = 1.0 / (Zc + 1e-9)
+        uc = self.fx_c * Xc * inv_z + self.cx_c
+        vc = self.fy_c * Yc * inv_z + self.cy_c
+        return np.rint(uc).astype(np.int32), np.rint(vc).astype(np.int32), Zc
+
+    def align(self, depth: np.ndarray, depth_unit: float = 1000.0) -> np.ndarray:
+        """depth 이미지 (uint16 등, depth_unit 단위/meter) → color 좌표계 depth (uint16 mm)"""
+        W_c, H_c = self.color_size
+        z_m = depth.astype(np.float32) / depth_unit
+        uc_i, vc_i, Zc = self.project(z_m)
+
+        m = (z_m > 0) & (Zc > 0) & (uc_i >= 0) & (uc_i < W_c) & (vc_i >= 0) & (vc_i < H_c)
+        flat_idx = vc_i[m].astype(np.int64) * W_c + uc_i[m]
+        z_vals = Zc[m].astype(np.float32)
+
+        # z-buffer: (픽셀 인덱스 << 32 | Z의 float32 비트) 하나의 키로 정렬
+        # (양수 float32 비트는 값 순서와 같으므로 픽셀별 첫 값이 가장 가까운 점)
+        keys = np.sort((flat_idx << 32) | z_vals.view(np.uint32).astype(np.int64))
+        flat_sorted = keys >> 32
+        first = np.ones(len(keys), dtype=bool)
+        first[1:] = flat_sorted[1:] != flat_sorted[:-1]
+        nearest = (keys[first] & 0xFFFFFFFF).astype(np.uint32).view(np.float32)
+
+        aligned = np.zeros((H_c, W_c), dtype=np.float32)
+        aligned.reshape(-1)[flat_sorted[first]] = nearest
+        return np.clip(np.rint(aligned * 1000.0), 0, 65535).astype(np.uint16)
+
+    def align_torch(self, depth, depth_unit: float = 1000.0):
+        """torch 버전 (depth: H x W 텐서), 결과는 같은 device의 int32 mm 텐서 (torch uint16 연산 제한)"""
+        import torch
+
+        device = depth.device
+        if device not in self._torch_rays:
+            self._torch_rays[device] = (
+                torch.from_numpy(self.ray_x).to(device),
+                torch.from_numpy(self.ray_y).to(device),
+                torch.from_numpy(self.R).float().to(device),
+                torch.from_numpy(self.t).float().to(device),
+            )
+        ray_x, ray_y, R, t = self._torch_rays[device]
+        W_c, H_c = self.color_size
+
+        Z = depth.float() / depth_unit
+        P = torch.stack([ray_x * Z, ray_y * Z, Z])  # 3 x H x W
+        Pc = torch.einsum("ij,jhw->ihw", R, P) + t[:, None, None]
+        Zc = Pc[2]
+        uc_i = torch.round(self.fx_c * (Pc[0] / (Zc + 1e-9)) + self.cx_c).long()
+        vc_i = torch.round(self.fy_c * (Pc[1] / (Zc + 1e-9)) + self.cy_c).long()
+
+        m = (Z > 0) & (Zc > 0) & (uc_i >= 0) & (uc_i < W_c) & (vc_i >= 0) & (vc_i < H_c)
+        flat_idx = vc_i[m] * W_c + uc_i[m]
+        aligned = torch.full((H_c * W_c,), float("inf"), device=device)
+        aligned.scatter_reduce_(0, flat_idx, Zc[m], reduce="amin")
+        aligned[torch.isinf(aligned)] = 0
+        return torch.clamp(torch.round(aligned * 1000.0), 0, 65535).to(torch.int32).reshape(H_c, W_c)
+
+
+@lru_cache(maxsize=8)
+def _get_registration(key: bytes, depth_size: Tuple[int, int], color_size: Tuple[int, int]) -> DepthRegistration:
+    values = np.frombuffer(key, dtype=np.float64)
+    return DepthRegistration(
+        values[:9].reshape(3, 3), values[9:18].reshape(3, 3), values[18:34].reshape(4, 4), depth_size, color_size
+    )
+
+
+def get_depth_registration(
+    K_depth: np.ndarray,
+    K_color: np.ndarray,
+    T_depth_to_color: np.ndarray,
+    depth_size: Tuple[int, int],
+    color_size: Optional[Tuple[int, int]] = None,
+) -> DepthRegistration:
+    """캘리브레이션별로 캐시된 DepthRegistration 반환"""
+    key = np.concatenate([
+        np.asarray(K_depth, dtype=np.float64).reshape(-1),
+        np.asarray(K_color, dtype=np.float64).reshape(-1),
+        np.asarray(T_depth_to_color, dtype=np.float64).reshape(-1),
+    ]).tobytes()
+    depth_size = (int(depth_size[0]), int(depth_size[1]))
+    color_size = (int(color_size[0]), int(color_size[1])) if color_size is not None else depth_size
+    return _get_registration(key, depth_size, color_size)
+
+
+def align_depth_to_color(
+    depth: np.ndarray,
+    K_depth: np.ndarray,
+    K_color: np.ndarray,
+    T_depth_to_color: np.ndarray,
+    color_size: Optional[Tuple[int, int]] = None,
+    depth_unit: float = 1000.0,
+) -> np.ndarray:
+    """depth 이미지를 color 좌표계로 정합 (uint16 mm), color_size는 (W, H)"""
+    H_d, W_d = depth.shape
+    registration = get_depth_registration(K_depth, K_color, T_depth_to_color, (W_d, H_d), color_size)
+    return registration.align(depth, depth_unit)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+요청 단위 입력 프레임 (RGB / depth base64)
+
+파이프라인 한 번에서 같은 이미지를 여러 번 디코딩 / 직렬화하지 않도록 한 번 만든 결과를 보관한다.
+
+- 이미지 크기는 PNG / JPEG 헤더만 읽어서 구함 (픽셀 디코딩 없음, 그 외 포맷만 디코딩)
+- base64 디코딩 / 픽셀 디코딩은 처음 필요할 때 한 번만
+- ISM / PEM 요청 JSON의 이미지 부분은 한 번만 직렬화하고, 요청마다 나머지 필드만 붙임
+- in-process 모드에서는 단계 간 결과 (ISM 감지 텐서 등)를 tensors에 담아 다음 단계로 넘김
+"""
+import base64
+import binascii
+import json
+import struct
+from functools import cached_property
+from typing import Any, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# JPEG SOF 마커 (DHT C4 / JPG C8 / DAC CC 제외)
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# JPEG 헤더 (EXIF 썸네일 포함)를 찾을 때 디코딩할 base64 접두사 길이 (4의 배수)
+_JPEG_HEADER_B64 = 64 * 1024
+
+
+def _decode_prefix(image_b64: str, length: int) -> bytes:
+    """base64 앞부분만 디코딩 (length는 4의 배수)"""
+    return base64.b64decode(image_b64[:length])
+
+
+def png_size(head: bytes) -> Optional[Tuple[int, int]]:
+    """PNG 시그니처 + IHDR (앞 24바이트)에서 (h, w)"""
+    if len(head) < 24 or not head.startswith(PNG_SIGNATURE) or head[12:16] != b"IHDR":
+        return None
+    w, h = struct.unpack(">II", head[16:24])
+    return int(h), int(w)
+
+
+def jpeg_size(data: bytes) -> Optional[Tuple[int, int]]:
+    """JPEG 마커를 따라가며 SOF 세그먼트의 (h, w), 데이터 안에 없으면 None"""
+    if not data.startswith(b"\xff\xd8"):
+        return None
+    i = 2
+    while i + 4 <= len(data):
+        if data[i] != 0xFF:
+            return None
+        marker = data[i + 1]
+        if marker == 0xFF:
+            i += 1
+            continue
+        if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        (length,) = struct.unpack(">H", data[i + 2:i + 4])
+        if marker in _JPEG_SOF:
+            if i + 9 > len(data):
+                return None
+            h, w = struct.unpack(">HH", data[i + 5:i + 9])
+            return int(h), int(w)
+        if marker == 0xDA:
+            return None
+        i += 2 + length
+    return None
+
+
+def header_image_size(image_b64: str) -> Optional[Tuple[int, int]]:
+    """base64 이미지의 (h, w)를 헤더만 읽어서 반환 (PNG / JPEG 외 포맷이면 None)"""
+    try:
+        if image_b64.startswith("iVBORw0KGgo"):
+            return png_size(_decode_prefix(image_b64, 32))
+        if image_b64.startswith("/9j/"):
+            return jpeg_size(_decode_prefix(image_b64, _JPEG_HEADER_B64))
+    except (binascii.Error, ValueError, struct.error):
+        return None
+    return None
+
+
+class InputFrame:
+    """파이프라인 요청 하나의 입력 이미지 (디코딩 / 직렬화 결과를 한 번만 만들어 재사용)"""
+
+    def __init__(self, rgb_b64: str, depth_b64: str):
+        self.rgb_b64 = rgb_b64
+        self.depth_b64 = depth_b64
+        # in-process 추론 단계 간에 직렬화 없이 넘기는 결과 (예: "ism" → 감지 마스크 / 박스 / 점수 텐서)
+        self.tensors: Dict[str, Any] = {}
+
+    @cached_property
+    def rgb_bytes(self) -> bytes:
+        return base64.b64decode(self.rgb_b64)
+
+    @cached_property
+    def depth_bytes(self) -> bytes:
+        return base64.b64decode(self.depth_b64)
+
+    @cached_property
+    def rgb(self) -> Optional[np.ndarray]:
+        """입력 이미지 픽셀, 채널 순서는 BGR (cv2.imdecode), 처음 접근할 때 한 번만 디코딩, 디코딩 실패 시 None"""
+        try:
+            return cv2.imdecode(np.frombuffer(self.rgb_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+        except Exception as e:
+            print(f"[WARN] Failed to decode RGB image: {e}")
+            return None
+
+    @cached_property
+    def depth(self) -> Optional[np.ndarray]:
+        """depth 픽셀 (원본 비트 깊이 유지, 처음 접근할 때 한 번만 디코딩), 디코딩 실패 시 None"""
+        try:
+            return cv2.imdecode(np.frombuffer(self.depth_bytes, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+        except Exception as e:
+            print(f"[WARN] Failed to decode depth image: {e}")
+            return None
+
+    @cached_property
+    def shape(self) -> Optional[Tuple[int, int]]:
+        """RGB 이미지 (h, w), 헤더로 알 수 없는 포맷만 디코딩"""
+        size = header_image_size(self.rgb_b64)
+        if size is not None:
+            return size
+        image = self.rgb
+        if image is None:
+            return None
+        h, w = image.shape[:2]
+        return int(h), int(w)
+
+    @cached_property
+    def _images_json(self) -> bytes:
+        # '"rgb_image":"...","depth_image":"..."' (ISM / PEM 요청 공통)
+        return (
+            b'"rgb_image":' + json.dumps(self.rgb_b64).encode("utf-8")
+            + b',"depth_image":' + json.dumps(self.depth_b64).encode("utf-8")
+        )
+
+    def request_body(self, fields: Dict[str, Any]) -> bytes:
+        """이미지 + fields를 담은 JSON 요청 본문 (이미지 부분은 직렬화해둔 바이트 재사용)"""
+        rest = json.dumps(fields, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+        tail = b"," + rest[1:].encode("utf-8") if fields else b"}"
+        return b"{" + self._images_json + tail
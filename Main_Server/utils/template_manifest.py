@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+템플릿 매니페스트 (template_manifest.json)
+
+템플릿 디렉토리마다 어떤 메쉬 내용 / 렌더링 파라미터 / 렌더러 버전으로 생성되었는지 기록해서
+- 메쉬가 제자리에서 수정된 경우 (scale_ycb_down.py 등) stale 템플릿을 감지하고
+- 변경된 객체만 다시 렌더링하며
+- 내용이 같은 메쉬는 렌더링 대신 기존 템플릿을 복사한다.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from .path_utils import get_project_root
+except ImportError:
+    from utils.path_utils import get_project_root
+
+
+MANIFEST_FILENAME = "template_manifest.json"
+MANIFEST_VERSION = 1
+
+# Render_Server RenderRequest 기본값과 동일 (Main_Server는 이 값으로 렌더링 요청)
+DEFAULT_RENDER_PARAMS: Dict[str, Any] = {"colorize": False, "base_color": 0.05}
+
+# 템플릿 디렉토리에서 렌더링 결과로 취급하는 파일 (복사 대상)
+TEMPLATE_FILE_PATTERNS = ("rgb_*.png", "mask_*.png", "xyz_*.npy", "templates.pack")
+
+# 렌더러 버전에 포함되는 Render_Server 파일 (내용이 바뀌면 모든 템플릿이 stale)
+_RENDERER_FILES = ("render_custom_templates.py",)
+
+_HASH_CHUNK_SIZE = 1 << 20
+
+# (path, size, mtime_ns) -> sha256, 대형 카탈로그에서 같은 메쉬를 반복 해싱하지 않도록
+_hash_cache: Dict[Tuple[str, int, int], str] = {}
+_hash_cache_lock = threading.Lock()
+
+
+def file_sha256(path: Path) -> str:
+    """파일 내용 sha256 (크기 / mtime이 같으면 캐시된 값 사용)"""
+    stat = path.stat()
+    key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    with _hash_cache_lock:
+        cached = _hash_cache.get(key)
+    if cached is not None:
+        return cached
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    value = digest.hexdigest()
+    with _hash_cache_lock:
+        _hash_cache[key] = value
+    return value
+
+
+@lru_cache(maxsize=1)
+def get_renderer_version() -> str:
+    """Render_Server 렌더링 스크립트 내용 해시 (없으면 'unknown')"""
+    render_dir = get_project_root() / "Render_Server"
+    digest = hashlib.sha256()
+    found = False
+    for name in _RENDERER_FILES:
+        path = render_dir / name
+        if path.is_file():
+            digest.update(name.encode("utf-8"))
+            digest.update(path.read_bytes())
+            found = True
+    return digest.hexdigest()[:16] if found else "unknown"
+
+
+def build_manifest(cad_path: Path, render_params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """메쉬 파일과 렌더링 파라미터로 기대 매니페스트 생성"""
+    return {
+        "version": MANIFEST_VERSION,
+        "mesh_file": cad_path.name,
+        "mesh_sha256": file_sha256(cad_path),
+        "render_params": dict(render_params or DEFAULT_RENDER_PARAMS),
+        "renderer_version": get_renderer_version(),
+    }
+
+
+def load_manifest(template_dir: Path) -> Optional[Dict[str, Any]]:
+    """템플릿 디렉토리의 매니페스트 로드 (없거나 깨졌으면 None)"""
+    path = template_dir / MANIFEST_FILENAME
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def template_version(template_dir: Path) -> str:
+    """템플릿 내용 버전 (결과 캐시 키용)
+
+    매니페스트가 있으면 매니페스트 내용 (메쉬 해시 / 파라미터 / 렌더러 / 생성 시간) 해시,
+    없으면 (기존 템플릿) 디렉토리 mtime을 사용한다.
+    """
+    try:
+        return "manifest:" + hashlib.sha256((template_dir / MANIFEST_FILENAME).read_bytes()).hexdigest()[:16]
+    except OSError:
+        pass
+    try:
+        return f"mtime:{template_dir.stat().st_mtime_ns}"
+    except OSError:
+        return "missing"
+
+
+def write_manifest(template_dir: Path, manifest: Dict[str, Any]) -> Path:
+    """매니페스트 저장 (임시 파일에 쓴 뒤 교체)"""
+    manifest = dict(manifest, created_at=datetime.now().isoformat())
+    path = template_dir / MANIFEST_FILENAME
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def has_template_files(template_dir: Path) -> bool:
+    """렌더링 결과 (rgb / mask / xyz)가 모두 있는지 확인"""
+    if not template_dir.is_dir():
+        return False
+    num_views = len(list(template_dir.glob("rgb_*.png")))
+    return (
+        num_views > 0
+        and len(list(template_dir.glob("mask_*.png"))) == num_views
+        and len(list(template_dir.glob("xyz_*.npy"))) == num_views
+    )
+
+
+def check_template(template_dir: Path, expected: Dict[str, Any]) -> Tuple[bool, str]:
+    """템플릿이 기대 매니페스트와 일치하는지 확인
+
+    Returns:
+        (is_current, reason) - reason: up_to_date / missing / no_manifest /
+        mesh_changed / render_params_changed / renderer_changed
+    """
+    if not has_template_files(template_dir):
+        return False, "missing"
+    manifest = load_manifest(template_dir)
+    if manifest is None:
+        return False, "no_manifest"
+    if manifest.get("mesh_sha256") != expected["mesh_sha256"]:
+        return False, "mesh_changed"
+    if manifest.get("render_params") != expected["render_params"]:
+        return False, "render_params_changed"
+    if manifest.get("renderer_version") != expected["renderer_version"]:
+        return False, "renderer_changed"
+    return True, "up_to_date"
+
+
+class TemplateMeshIndex:
+    """카탈로그 매니페스트의 mesh_sha256 → 템플릿 디렉토리 목록
+
+    처음 조회할 때 매니페스트를 한 번만 읽는다 (렌더링 요청 하나의 여러 객체가 공유).
+    이후 새로 렌더링 / 복사한 템플릿은 add로 추가한다.
+    """
+
+    def __init__(self, templates_root: Path):
+        self.templates_root = templates_root
+        self._dirs: Optional[Dict[str, List[Path]]] = None
+
+    def _load(self) -> Dict[str, List[Path]]:
+        dirs: Dict[str, List[Path]] = {}
+        for manifest_path in self.templates_root.glob(f"*/*/{MANIFEST_FILENAME}"):
+            manifest = load_manifest(manifest_path.parent)
+            if manifest and manifest.get("mesh_sha256"):
+                dirs.setdefault(manifest["mesh_sha256"], []).append(manifest_path.parent)
+        return dirs
+
+    def candidates(self, mesh_sha256: str) -> List[Path]:
+        if self._dirs is None:
+            self._dirs = self._load()
+        return list(self._dirs.get(mesh_sha256, ()))
+
+    def add(self, mesh_sha256: str, template_dir: Path):
+        # 아직 읽지 않았으면 처음 조회할 때 디스크에서 같이 읽힘
+        if self._dirs is not None and template_dir not in self._dirs.setdefault(mesh_sha256, []):
+            self._dirs[mesh_sha256].append(template_dir)
+
+
+def find_identical_template(index: TemplateMeshIndex, expected: Dict[str, Any], exclude: Optional[Path] = None) -> Optional[Path]:
+    """같은 메쉬 내용 / 파라미터 / 렌더러로 생성된 다른 템플릿 디렉토리 검색"""
+    exclude = exclude.resolve() if exclude is not None else None
+    for template_dir in index.candidates(expected["mesh_sha256"]):
+        if exclude is not None and template_dir.resolve() == exclude:
+            continue
+        is_current, _ = check_template(template_dir, expected)
+        if is_current:
+            return template_dir
+    return None
+
+
+def copy_template(src_dir: Path, dst_dir: Path) -> int:
+    """렌더링 결과 파일 복사 (기존 렌더링 결과는 먼저 삭제), 복사한 파일 개수 반환
+
+    하드링크는 이후 제자리 재렌더링 시 원본까지 바뀌므로 사용하지 않는다.
+    """
+    dst_dir.mkdir(parents=True, exist_ok=True)
+    for pattern in TEMPLATE_FILE_PATTERNS:
+        for path in dst_dir.glob(pattern):
+            path.unlink()
+    copied = 0
+    for pattern in TEMPLATE_FILE_PATTERNS:
+        for path in src_dir.glob(pattern):
+            shutil.copy2(path, dst_dir / path.name)
+            copied += 1
+    return copied
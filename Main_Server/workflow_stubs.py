@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+테스트 / 벤치마크용 WorkflowService 구성
+
+- make_service: 임시 static 폴더 (meshes / templates / output)를 쓰는 WorkflowService,
+  Render / ISM / PEM 호출은 넘긴 가짜 함수로 대체
+- routed_http: WorkflowService가 만드는 httpx.AsyncClient 요청을 포트별 stub 앱 (bench_stubs.py 등)으로 보냄
+"""
+import contextlib
+import sys
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Iterable, Optional
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from Main_Server.services.result_cache import ResultCache
+from Main_Server.services.workflow_service import WorkflowService
+
+FakeCall = Callable[..., Awaitable[dict]]
+
+
+def make_service(
+    root: Path,
+    render: Optional[FakeCall] = None,
+    ism: Optional[FakeCall] = None,
+    pem: Optional[FakeCall] = None,
+    result_cache: Optional[ResultCache] = None,
+    **attrs,
+) -> WorkflowService:
+    """
+    root 아래 static 폴더를 쓰는 WorkflowService (결과 캐시는 기본 미사용)
+
+    render / ism / pem을 주면 _call_render_server / _call_ism_server / _call_pem_server를 대체하고,
+    나머지 키워드 (artifact_writer, replica_pools, inprocess 등)는 그대로 속성으로 설정한다.
+    """
+    service = WorkflowService()
+    service.result_cache = result_cache or ResultCache(max_entries=0)
+    service.paths = dict(service.paths, meshes=root / "meshes", templates=root / "templates", output=root / "output")
+    if render is not None:
+        service._call_render_server = render
+    if ism is not None:
+        service._call_ism_server = ism
+    if pem is not None:
+        service._call_pem_server = pem
+    for name, value in attrs.items():
+        setattr(service, name, value)
+    return service
+
+
+class StubTransport(httpx.AsyncBaseTransport):
+    """포트 (8002 / 8003 / 8004 또는 replica 포트)로 stub 앱 선택, down에 있는 포트는 연결 실패"""
+
+    def __init__(self, apps: Dict[int, object], down: Iterable[int] = ()):
+        self.transports = {port: httpx.ASGITransport(app=app) for port, app in apps.items()}
+        self.down = set(down)
+
+    async def handle_async_request(self, request):
+        transport = self.transports.get(request.url.port)
+        if transport is None or request.url.port in self.down:
+            raise httpx.ConnectError(f"no stub for port {request.url.port}", request=request)
+        return await transport.handle_async_request(request)
+
+
+@contextlib.contextmanager
+def routed_http(apps: Dict[int, object], down: Iterable[int] = ()):
+    """블록 안에서 만든 httpx.AsyncClient는 StubTransport를 씀 (원래 클래스를 yield, 나가면 복원)"""
+    real_client = httpx.AsyncClient
+    transport = StubTransport(apps, down)
+
+    class RoutedClient(real_client):
+        def __init__(self, *args, **kwargs):
+            kwargs["transport"] = transport
+            super().__init__(*args, **kwargs)
+
+    httpx.AsyncClient = RoutedClient
+    try:
+        yield real_client
+    finally:
+        httpx.AsyncClient = real_client
@@ -0,0 +1,50 @@
+# PEM_Server/api/endpoints/cache.py
+"""
+템플릿 / CAD 캐시 관리 엔드포인트 (워밍은 백그라운드, 추론을 막지 않음)
+"""
+from fastapi import APIRouter
+import sys
+import os
+
+# 프로젝트 루트를 sys.path에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from ..models import CacheWarmRequest, CacheEvictRequest
+from core.model_manager import get_model_manager
+from sam6d_common.cache_warmer import resolve_targets
+
+router = APIRouter(prefix="/cache", tags=["cache"])
+
+# 모델 매니저 인스턴스 가져오기
+model_manager = get_model_manager()
+
+
+def _roots():
+    static_root = os.path.join(model_manager.settings.workspace_root, "static")
+    return os.path.join(static_root, "templates"), os.path.join(static_root, "meshes")
+
+
+@router.post("/warm")
+async def warm_cache(request: CacheWarmRequest):
+    """클래스 / 객체를 백그라운드에서 캐시에 로드 (바로 반환, 클래스 전체는 캐시 용량까지)"""
+    templates_root, meshes_root = _roots()
+    items = resolve_targets(request.targets, templates_root, meshes_root,
+                            limit=model_manager.template_cache.capacity)
+    return {"success": True, **model_manager.warmer.submit(items)}
+
+
+@router.post("/evict")
+async def evict_cache(request: CacheEvictRequest):
+    """캐시에서 클래스 / 객체 제거 (대기 중인 워밍도 취소)"""
+    if request.all:
+        result = model_manager.evict_assets()
+    else:
+        result = model_manager.evict_assets(resolve_targets(request.targets, *_roots()))
+    cancelled = result.pop("cancelled")
+    return {"success": True, "evicted": result, "cancelled": cancelled}
+
+
+@router.get("/stats")
+async def cache_stats():
+    """캐시 항목 / 적중률과 워밍 대기열 상태"""
+    return model_manager.get_cache_stats()
@@ -0,0 +1,21 @@
+# PEM_Server/api/endpoints/metrics.py
+"""
+Prometheus 메트릭 엔드포인트
+"""
+from fastapi import APIRouter
+from fastapi.responses import Response
+import sys
+import os
+
+# 프로젝트 루트를 sys.path에 추가
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from utils.metrics import METRICS
+from sam6d_common.metrics import CONTENT_TYPE
+
+router = APIRouter(tags=["metrics"])
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """단계별 지연 히스토그램, 캐시 적중률, 큐 깊이, GPU / 호스트 메모리 (Prometheus 텍스트 형식)"""
+    return Response(content=METRICS.render(), media_type=CONTENT_TYPE)
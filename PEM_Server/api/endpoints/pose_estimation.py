@@ -10,6 +10,7 @@ import sys
 import base64
 import io
 import json
+import shutil
 import tempfile
 import logging
 import numpy as np
@@ -25,11 +26,16 @@ from ..models import (
     ErrorResponse
 )
 from core.model_manager import get_model_manager
+from core.config import settings
+from utils.artifact_writer import ARTIFACT_WRITER
+from utils.metrics import METRICS
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1", tags=["pose-estimation"])
 
+METRICS.queue_depth.set_function(lambda: ARTIFACT_WRITER.get_stats()["pending_items"], queue="artifacts")
+
 def decode_base64_image(base64_str: str) -> np.ndarray:
     """Base64 문자열을 이미지 배열로 디코딩"""
     try:
@@ -48,6 +54,50 @@ def decode_base64_image(base64_str: str) -> np.ndarray:
     except Exception as e:
         raise ValueError(f"Failed to decode base64 image: {e}")
 
+def save_base64_image(base64_str: str, path: str):
+    """Base64 이미지를 PNG 파일로 저장
+
+    PNG 입력은 디코딩 / 재인코딩 없이 원본 바이트를 그대로 쓰고,
+    RGBA PNG나 다른 포맷만 decode_base64_image로 변환해서 저장한다.
+    """
+    data = base64.b64decode(base64_str)
+    # PNG IHDR의 color type (25번째 바이트): 6 = RGBA
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) > 25 and data[25] != 6:
+        with open(path, "wb") as f:
+            f.write(data)
+        return
+    Image.fromarray(decode_base64_image(base64_str)).save(path)
+
+def render_pem_vis(rgb_path: str, pred_rot, pred_trans, model_points, cam_K) -> bytes:
+    """포즈 결과 (3D bbox)를 그린 이미지를 원본과 나란히 붙여 PNG 바이트로 반환"""
+    from utils.draw_utils import draw_detections
+
+    rgb = np.array(Image.open(rgb_path).convert("RGB"))
+    num_instances = len(pred_rot)
+    intrinsics = np.tile(np.asarray(cam_K, dtype=np.float32).reshape(1, 3, 3), (num_instances, 1, 1))
+    vis = draw_detections(
+        rgb.copy(), np.asarray(pred_rot), np.asarray(pred_trans),
+        np.asarray(model_points) * 1000, intrinsics, color=(255, 0, 0),
+    )
+    buffer = io.BytesIO()
+    Image.fromarray(np.concatenate([rgb, np.asarray(vis, dtype=np.uint8)], axis=1)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def queue_pem_outputs(output_dir: str, result: Dict[str, Any], rgb_path: str, model_points, cam_K):
+    """detection_pem.json / vis_pem.png 저장 예약 (그리기 / 인코딩 / 파일 쓰기는 저장 스레드에서 수행)
+
+    rgb_path는 임시 디렉토리 파일이므로 임시 디렉토리 삭제도 같은 저장기에 (이후 순서로) 예약해야 한다.
+    """
+    writer = ARTIFACT_WRITER
+    writer.write_json(os.path.join(output_dir, "detection_pem.json"), result.get("detections", []))
+    if result["num_detections"] > 0:
+        pred_rot = result["pred_rot"]
+        pred_trans = result["pred_trans"]
+        writer.write_with(
+            os.path.join(output_dir, "vis_pem.png"),
+            lambda: render_pem_vis(rgb_path, pred_rot, pred_trans, model_points, cam_K),
+        )
+
 def decode_base64_depth_image(base64_str: str, shape: tuple) -> np.ndarray:
     """Base64 문자열을 깊이 이미지 배열로 디코딩 (원본 데이터 타입 유지)"""
     try:
@@ -148,15 +198,12 @@ async def estimate_pose(request: PoseEstimationRequest):
         temp_dir = tempfile.mkdtemp(prefix="pem_")
         logger.info(f"Created temporary directory: {temp_dir}")
         
-        # RGB 이미지 디코딩 및 저장
-        rgb_array = decode_base64_image(request.rgb_image)
-        rgb_path = os.path.join(temp_dir, "rgb.png")
-        Image.fromarray(rgb_array).save(rgb_path)
-        
-        # Depth 이미지 디코딩 및 저장
-        depth_array = decode_base64_image(request.depth_image)
-        depth_path = os.path.join(temp_dir, "depth.png")
-        Image.fromarray(depth_array).save(depth_path)
+        # RGB / Depth 이미지 저장 (PNG는 원본 바이트 그대로)
+        with METRICS.time_stage("decode"):
+            rgb_path = os.path.join(temp_dir, "rgb.png")
+            save_base64_image(request.rgb_image, rgb_path)
+            depth_path = os.path.join(temp_dir, "depth.png")
+            save_base64_image(request.depth_image, depth_path)
         
         # 카메라 파라미터 저장
         cam_path = os.path.join(temp_dir, "camera.json")
@@ -191,19 +238,22 @@ async def estimate_pose(request: PoseEstimationRequest):
         )
 
         logger.info("Fetching templates (with caching)")
-        all_tem, all_tem_pts, all_tem_choose, all_tem_feat = model_manager.get_template_bundle(
-            request.template_dir
-        )
+        with METRICS.time_stage("template_cache"):
+            all_tem, all_tem_pts, all_tem_choose, all_tem_feat = model_manager.get_template_bundle(
+                request.template_dir
+            )
         
         # 테스트 데이터 로딩 (임계값 제거)
         logger.info("Loading test data from files")
-        input_data, whole_image, whole_pts, model_points, detections = load_test_data_from_files(
-            rgb_path, depth_path, cam_path, request.cad_path, seg_path, 
-            0.0, model_manager.cfg.test_dataset, model_manager.device  # 임계값을 0.0으로 설정
-        )
+        with METRICS.time_stage("preprocess"):
+            input_data, whole_image, whole_pts, model_points, detections = load_test_data_from_files(
+                rgb_path, depth_path, cam_path, request.cad_path, seg_path, 
+                0.0, model_manager.cfg.test_dataset, model_manager.device  # 임계값을 0.0으로 설정
+            )
 
         # CAD 포인트는 캐시된 값을 사용
-        cad_points = model_manager.get_cad_points(request.cad_path)
+        with METRICS.time_stage("cad_cache"):
+            cad_points = model_manager.get_cad_points(request.cad_path)
         model_points = cad_points
         input_data['model_points'] = cad_points
         
@@ -211,29 +261,45 @@ async def estimate_pose(request: PoseEstimationRequest):
         input_data['whole_image'] = whole_image
         input_data['model_points'] = model_points
         
-        # 핵심 추론 실행
+        # 핵심 추론 실행 (결과 파일은 기본적으로 백그라운드 저장기가 저장)
         logger.info("Running pose estimation core")
-        result = run_pose_estimation_core(
-            model_manager.model, input_data, all_tem_pts, all_tem_feat, 
-            model_manager.device, detections, output_dir, save_async=True
-        )
-        
+        if settings.core_save_outputs:
+            with METRICS.time_stage("inference"):
+                result = run_pose_estimation_core(
+                    model_manager.model, input_data, all_tem_pts, all_tem_feat, 
+                    model_manager.device, detections, output_dir, save_async=True
+                )
+        else:
+            with METRICS.time_stage("inference"):
+                result = run_pose_estimation_core(
+                    model_manager.model, input_data, all_tem_pts, all_tem_feat, 
+                    model_manager.device, detections, None, save_async=False
+                )
+            if request.output_dir:
+                try:
+                    queue_pem_outputs(request.output_dir, result, rgb_path, model_points, request.cam_params["cam_K"])
+                except Exception as save_error:
+                    logger.warning(f"Failed to queue PEM outputs: {save_error}")
+        
+        with METRICS.time_stage("encode"):
+            response = PoseEstimationResponse(
+                success=True,
+                detections=result.get("detections", []),
+                pose_scores=result["pose_scores"].tolist(),
+                pred_rot=result["pred_rot"].tolist(),
+                pred_trans=result["pred_trans"].tolist(),
+                num_detections=result["num_detections"],
+                inference_time=result["inference_time"],
+                template_dir_used=request.template_dir,
+                cad_path_used=request.cad_path,
+                output_dir_used=output_dir,
+                error_message=None
+            )
+
         processing_time = time.time() - start_time
+        METRICS.observe_stage("request", processing_time)
         logger.info(f"Pose estimation completed in {processing_time:.3f}s")
-        
-        return PoseEstimationResponse(
-            success=True,
-            detections=result.get("detections", []),
-            pose_scores=result["pose_scores"].tolist(),
-            pred_rot=result["pred_rot"].tolist(),
-            pred_trans=result["pred_trans"].tolist(),
-            num_detections=result["num_detections"],
-            inference_time=result["inference_time"],
-            template_dir_used=request.template_dir,
-            cad_path_used=request.cad_path,
-            output_dir_used=output_dir,
-            error_message=None
-        )
+        return response
         
     except HTTPException:
         raise
@@ -257,14 +323,10 @@ async def estimate_pose(request: PoseEstimationRequest):
             error_message=str(e)
         )
     finally:
-        # 임시 파일들 정리
+        # 임시 파일들 정리 (저장 스레드에서 삭제 → 앞서 예약된 시각화가 임시 RGB를 읽은 뒤 삭제됨)
         if temp_dir and os.path.exists(temp_dir):
-            try:
-                import shutil
-                shutil.rmtree(temp_dir)
-                logger.info(f"Cleaned up temporary directory: {temp_dir}")
-            except Exception as e:
-                logger.warning(f"Failed to clean up temporary directory: {e}")
+            if not ARTIFACT_WRITER.call(shutil.rmtree, temp_dir, ignore_errors=True):
+                shutil.rmtree(temp_dir, ignore_errors=True)
 
 @router.get("/pose-estimation/status")
 async def get_pose_estimation_status():
@@ -56,6 +56,22 @@ class PoseEstimationResponse(BaseModel):
     output_dir_used: Optional[str] = None  # 사용된 출력 경로
     error_message: Optional[str] = None
 
+class CacheTarget(BaseModel):
+    """캐시 워밍 / 제거 대상"""
+    class_name: str
+    object_name: Optional[str] = None   # 없으면 클래스 전체
+    template_dir: Optional[str] = None  # 직접 지정 (없으면 static/templates/<class>/<object>)
+    cad_path: Optional[str] = None      # 직접 지정 (없으면 static/meshes/<class>/<object>.ply 등)
+
+class CacheWarmRequest(BaseModel):
+    """캐시 워밍 요청"""
+    targets: List[CacheTarget]
+
+class CacheEvictRequest(BaseModel):
+    """캐시 제거 요청"""
+    targets: List[CacheTarget] = []
+    all: bool = False                   # true면 캐시 전체 비움
+
 class ErrorResponse(BaseModel):
     """에러 응답"""
     error: str
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# PEM_Server/bench_geo_embedding.py - GeometricStructureEmbedding 피크 메모리 / 시간 벤치마크
+import argparse
+import time
+
+import torch
+
+from test_geo_embedding import (
+    GeometricStructureEmbedding,
+    make_cfg,
+    reference_embedding_indices,
+    sample_points,
+)
+
+
+def reference_forward(module, points):
+    """기존 방식 forward (전체 (B, N, N, k, 3) 확장)"""
+    d_indices, a_indices = reference_embedding_indices(module, points)
+    d_embeddings = module.proj_d(module.embedding(d_indices))
+    a_embeddings = module.proj_a(module.embedding(a_indices)).max(dim=3)[0]
+    return d_embeddings + a_embeddings
+
+
+def measure(fn, device):
+    if device == 'cuda':
+        torch.cuda.synchronize()
+        torch.cuda.empty_cache()
+        torch.cuda.reset_peak_memory_stats()
+        base = torch.cuda.memory_allocated()
+    start = time.perf_counter()
+    with torch.no_grad():
+        fn()
+    if device == 'cuda':
+        torch.cuda.synchronize()
+        peak = (torch.cuda.max_memory_allocated() - base) / 1024 ** 2
+    else:
+        peak = float('nan')
+    return (time.perf_counter() - start) * 1000, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    parser.add_argument('--num-point', type=int, default=197)  # coarse_npoint + bg
+    parser.add_argument('--chunk-size', type=int, default=64)
+    parser.add_argument('--device', default='cuda' if torch.cuda.is_available() else 'cpu')
+    args = parser.parse_args()
+
+    module = GeometricStructureEmbedding(make_cfg(args.chunk_size)).to(args.device).eval()
+
+    print(f"device={args.device}, N={args.num_point}, chunk_size={args.chunk_size}")
+    print(f"{'B':>4} | {'ref ms':>9} | {'ref MB':>9} | {'chunk ms':>9} | {'chunk MB':>9}")
+    for batch_size in args.batch_sizes:
+        points = sample_points(batch_size, args.num_point, args.device)
+        try:
+            ref_ms, ref_mb = measure(lambda: reference_forward(module, points), args.device)
+        except RuntimeError as e:  # OOM
+            ref_ms, ref_mb = float('nan'), float('nan')
+            print(f"   reference failed at B={batch_size}: {e}")
+        new_ms, new_mb = measure(lambda: module(points), args.device)
+        print(f"{batch_size:>4} | {ref_ms:>9.2f} | {ref_mb:>9.1f} | {new_ms:>9.2f} | {new_mb:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# PEM_Server/bench_point_cloud.py - depth -> point cloud 역투영 마이크로 벤치마크
+import os
+import sys
+import time
+
+PEM_ROOT = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(PEM_ROOT)
+UTILS_DIR = os.path.join(PEM_ROOT, 'utils')
+for path in (UTILS_DIR, REPO_ROOT):
+    if path not in sys.path:
+        sys.path.append(path)
+
+import numpy as np
+
+from data_utils import get_point_cloud_from_depth
+
+
+def legacy_point_cloud_from_depth(depth, K, bbox=None):
+    """기존 리스트 컴프리헨션 기반 구현 (비교 기준)"""
+    cam_fx, cam_fy, cam_cx, cam_cy = K[0, 0], K[1, 1], K[0, 2], K[1, 2]
+
+    im_H, im_W = depth.shape
+    xmap = np.array([[i for i in range(im_W)] for j in range(im_H)])
+    ymap = np.array([[j for i in range(im_W)] for j in range(im_H)])
+
+    if bbox is not None:
+        rmin, rmax, cmin, cmax = bbox
+        depth = depth[rmin:rmax, cmin:cmax].astype(np.float32)
+        xmap = xmap[rmin:rmax, cmin:cmax].astype(np.float32)
+        ymap = ymap[rmin:rmax, cmin:cmax].astype(np.float32)
+
+    pt2 = depth.astype(np.float32)
+    pt0 = (xmap.astype(np.float32) - cam_cx) * pt2 / cam_fx
+    pt1 = (ymap.astype(np.float32) - cam_cy) * pt2 / cam_fy
+    return np.stack([pt0, pt1, pt2]).transpose((1, 2, 0))
+
+
+def timeit(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main(repeat=20):
+    rng = np.random.default_rng(0)
+    for im_W, im_H in [(640, 480), (1280, 720)]:
+        K = np.array([[615.0, 0.0, im_W / 2 - 0.5], [0.0, 615.0, im_H / 2 + 0.5], [0.0, 0.0, 1.0]])
+        depth = rng.uniform(0.3, 1.5, size=(im_H, im_W)).astype(np.float32)
+        bbox = [im_H // 4, im_H // 4 + 160, im_W // 3, im_W // 3 + 160]
+
+        for name, box in [("full", None), ("bbox 160x160", bbox)]:
+            expected = legacy_point_cloud_from_depth(depth, K, box)
+            actual = get_point_cloud_from_depth(depth, K, box)
+            assert np.allclose(actual, expected, rtol=1e-5, atol=1e-6)
+
+            legacy_ms = timeit(lambda: legacy_point_cloud_from_depth(depth, K, box), repeat)
+            cached_ms = timeit(lambda: get_point_cloud_from_depth(depth, K, box), repeat)
+            print(
+                f"{im_W}x{im_H} {name:>12}: legacy {legacy_ms:8.2f} ms | "
+                f"ray grid {cached_ms:7.3f} ms | x{legacy_ms / cached_ms:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
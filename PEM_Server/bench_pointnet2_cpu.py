@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# PEM_Server/bench_pointnet2_cpu.py - pointnet2 PyTorch(CPU) 백엔드 벤치마크 (CPU 노드 사이징용)
+import argparse
+import time
+
+import torch
+
+from test_pointnet2_cpu import pointnet2_torch, pointnet2_utils, sample_points
+
+
+def timeit(fn, repeat):
+    fn()  # warmup
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 4, torch.get_num_threads()])
+    parser.add_argument('--dense-npoint', type=int, default=2048)  # fine_npoint
+    parser.add_argument('--coarse-npoint', type=int, default=196)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    pointnet2_utils.set_backend("torch")
+    group1 = pointnet2_utils.QueryAndGroup(0.1, 32, use_xyz=True)  # PositionalEncoding scale1
+    group2 = pointnet2_utils.QueryAndGroup(0.2, 64, use_xyz=True)  # PositionalEncoding scale2
+
+    print(f"dense_npoint={args.dense_npoint}, coarse_npoint={args.coarse_npoint} (ms per call)")
+    print(f"{'threads':>7} | {'B':>3} | {'fps':>8} | {'gather':>8} | {'ball_q':>8} | {'group1':>8} | {'group2':>8}")
+    for threads in args.threads:
+        torch.set_num_threads(threads)
+        for batch_size in args.batch_sizes:
+            xyz = sample_points(batch_size, args.dense_npoint)
+            feats = torch.randn(batch_size, 256, args.dense_npoint)
+            feats_t = xyz.transpose(1, 2).contiguous()
+            idx = pointnet2_torch.furthest_point_sampling(xyz, args.coarse_npoint)
+
+            with torch.no_grad():
+                fps_ms = timeit(lambda: pointnet2_torch.furthest_point_sampling(xyz, args.coarse_npoint), args.repeat)
+                gather_ms = timeit(lambda: pointnet2_torch.gather_points(feats, idx), args.repeat)
+                ball_ms = timeit(lambda: pointnet2_torch.ball_query(xyz, xyz, 0.2, 64), args.repeat)
+                group1_ms = timeit(lambda: group1(xyz, xyz, feats_t), args.repeat)
+                group2_ms = timeit(lambda: group2(xyz, xyz, feats_t), args.repeat)
+            print(
+                f"{threads:>7} | {batch_size:>3} | {fps_ms:>8.2f} | {gather_ms:>8.2f} | "
+                f"{ball_ms:>8.2f} | {group1_ms:>8.2f} | {group2_ms:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
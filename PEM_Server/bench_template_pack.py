@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# PEM_Server/bench_template_pack.py - 템플릿 로딩 벤치마크 (loose PNG/npy vs templates.pack)
+#
+# 사용법:
+#   python PEM_Server/bench_template_pack.py                      # 합성 템플릿 (42뷰, 640x480)
+#   python PEM_Server/bench_template_pack.py <template_dir>       # 실제 렌더링 결과 (templates.pack 없으면 생성)
+import os
+import sys
+import time
+import shutil
+import tempfile
+from types import SimpleNamespace
+
+PEM_ROOT = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(PEM_ROOT)
+UTILS_DIR = os.path.join(PEM_ROOT, 'utils')
+for path in (UTILS_DIR, REPO_ROOT):
+    if path not in sys.path:
+        sys.path.append(path)
+
+import cv2
+import numpy as np
+
+from template_pack import TemplatePack, load_templates_from_pack
+from sam6d_common.template_pack import PACK_FILENAME
+from Render_Server import template_pack as render_template_pack
+from test_template_pack import reference_get_templates
+
+
+
+def make_synthetic_templates(num_views=42, h=480, w=640, seed=0):
+    """렌더링 결과와 비슷한 크기의 템플릿 (객체가 이미지의 약 1/4 차지)"""
+    rng = np.random.default_rng(seed)
+    template_dir = tempfile.mkdtemp(prefix='pem_tpl_bench_')
+    yy, xx = np.mgrid[:h, :w]
+    for i in range(num_views):
+        cy, cx = h // 2 + rng.integers(-40, 40), w // 2 + rng.integers(-40, 40)
+        mask = (((yy - cy) / (h / 4)) ** 2 + ((xx - cx) / (w / 5)) ** 2 < 1).astype(np.uint8) * 255
+        rgb = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+        rgb[mask == 0] = 0
+        xyz = (rng.standard_normal((h, w, 3)) * 50).astype(np.float16)
+        xyz[mask == 0] = 0
+        cv2.imwrite(os.path.join(template_dir, f'rgb_{i}.png'), rgb)
+        cv2.imwrite(os.path.join(template_dir, f'mask_{i}.png'), mask)
+        np.save(os.path.join(template_dir, f'xyz_{i}.npy'), xyz)
+    return template_dir
+
+
+def drop_page_cache(template_dir):
+    """템플릿 파일들의 페이지 캐시 제거 (cold load 근사, posix_fadvise 미지원 시 무시)"""
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for name in os.listdir(template_dir):
+        fd = os.open(os.path.join(template_dir, name), os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def timeit(fn, repeat, template_dir, cold):
+    fn()
+    total = 0.0
+    for _ in range(repeat):
+        if cold:
+            drop_page_cache(template_dir)
+        start = time.perf_counter()
+        fn()
+        total += time.perf_counter() - start
+    return total * 1000 / repeat
+
+
+def main(template_dir=None, repeat=5):
+    synthetic = template_dir is None
+    if synthetic:
+        template_dir = make_synthetic_templates()
+    try:
+        pack_path = os.path.join(template_dir, PACK_FILENAME)
+        if not os.path.exists(pack_path):
+            render_template_pack.pack_template_dir(template_dir)
+        num_views = TemplatePack(pack_path).num_views
+        loose_bytes = sum(
+            os.path.getsize(os.path.join(template_dir, name))
+            for name in os.listdir(template_dir) if name != PACK_FILENAME
+        )
+        print(f'templates: {template_dir} ({num_views} views)')
+        print(f'  loose files: {loose_bytes / 1e6:.1f} MB, pack: {os.path.getsize(pack_path) / 1e6:.1f} MB')
+
+        cfg = SimpleNamespace(n_template_view=42, img_size=224, n_sample_template_point=5000, rgb_mask_flag=True)
+        loose = lambda: reference_get_templates(template_dir, cfg, num_views)
+        packed = lambda: load_templates_from_pack(TemplatePack(pack_path), cfg, 'cpu')
+        for cold in [False, True]:
+            loose_ms = timeit(loose, repeat, template_dir, cold)
+            pack_ms = timeit(packed, repeat, template_dir, cold)
+            label = 'cold (page cache dropped)' if cold else 'warm'
+            print(f'  {label:26s} loose {loose_ms:8.1f} ms | pack {pack_ms:8.1f} ms | x{loose_ms / pack_ms:.1f}')
+    finally:
+        if synthetic:
+            shutil.rmtree(template_dir)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
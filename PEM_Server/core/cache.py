@@ -7,10 +7,14 @@ class LRUCache:
     def __init__(self, capacity: int):
         self.cache = OrderedDict()
         self.capacity = max(1, capacity)
+        self.hits = 0
+        self.misses = 0
 
     def get(self, key: str):
         if key not in self.cache:
+            self.misses += 1
             return None
+        self.hits += 1
         self.cache.move_to_end(key)
         return self.cache[key]
 
@@ -21,9 +25,26 @@ class LRUCache:
         if len(self.cache) > self.capacity:
             self.cache.popitem(last=False)
 
+    def evict(self, key: str) -> bool:
+        """항목 제거 (있었으면 True)"""
+        return self.cache.pop(key, None) is not None
+
+    def clear(self) -> int:
+        count = len(self.cache)
+        self.cache.clear()
+        return count
+
+    def keys(self):
+        return list(self.cache)
+
     def __contains__(self, key: str) -> bool:
         return key in self.cache
 
     def __len__(self) -> int:
         return len(self.cache)
 
+    @property
+    def hit_ratio(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else None
+
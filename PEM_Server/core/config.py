@@ -24,6 +24,8 @@ class Settings(BaseModel):
     config_path: str = "/workspace/Estimation_Server/SAM-6D/SAM-6D/Pose_Estimation_Model/config/base.yaml"
     checkpoint_path: str = "/workspace/Estimation_Server/SAM-6D/SAM-6D/Pose_Estimation_Model/checkpoints/sam-6d-pem-base.pth"
     device: str = "cuda"  # GPU 사용
+    # pointnet2 연산 백엔드: auto(CUDA 텐서는 _ext, 그 외 PyTorch) / cuda / torch
+    pointnet2_backend: str = os.getenv("PEM_POINTNET2_BACKEND", "auto")
     
     # 파일 경로 설정
     workspace_root: str = "/workspace/Estimation_Server"
@@ -38,6 +40,16 @@ class Settings(BaseModel):
     template_cache_capacity: int = int(os.getenv("PEM_TEMPLATE_CACHE_MAX", 20))
     cad_cache_capacity: int = int(os.getenv("PEM_CAD_CACHE_MAX", 20))
     preload_templates: bool = os.getenv("PEM_PRELOAD_TEMPLATES", "false").lower() == "true"
+    # 프리로드할 클래스 (쉼표 구분, *면 전체)
+    preload_classes: str = os.getenv("PEM_PRELOAD_CLASSES", "ycb")
+    # 템플릿 디렉토리에 templates.pack이 있으면 사용 (없거나 loose 파일보다 오래되면 PNG/npy 로드)
+    use_template_pack: bool = os.getenv("PEM_USE_TEMPLATE_PACK", "true").lower() == "true"
+    # /cache/warm 대기열에 둘 수 있는 최대 객체 수
+    warm_max_pending: int = int(os.getenv("PEM_WARM_MAX_PENDING", 64))
+
+    # 결과 파일 저장: true면 SAM-6D 코어가 요청 중에 직접 저장 (기존 동작),
+    # false면 백그라운드 저장기가 detection_pem.json / vis_pem.png 저장
+    core_save_outputs: bool = os.getenv("PEM_CORE_SAVE_OUTPUTS", "false").lower() == "true"
 
 # 전역 설정 인스턴스
 settings = Settings()
@@ -7,13 +7,15 @@ import sys
 import time
 import torch
 import logging
-from typing import Optional, Dict, Any, Tuple
+from typing import Optional, Dict, Any, List, Tuple
 from threading import Lock
 
 import trimesh
 
 from .config import get_settings
 from .cache import LRUCache
+from utils.metrics import METRICS
+from sam6d_common.cache_warmer import CacheWarmer, WarmItem
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +26,8 @@ class ModelManager:
         self.settings = get_settings()
         self.model = None
         self.cfg = None
+        self._template_pack = None
+        self._load_templates_from_files = None
         self.device = None
         self.loaded = False
         self.loading_time = None
@@ -31,6 +35,11 @@ class ModelManager:
         self.cache_lock = Lock()
         self.template_cache = LRUCache(self.settings.template_cache_capacity)
         self.cad_cache = LRUCache(self.settings.cad_cache_capacity)
+        for name, cache in (("template", self.template_cache), ("cad", self.cad_cache)):
+            METRICS.cache_hit_ratio.set_function(lambda c=cache: c.hit_ratio, cache=name)
+            METRICS.cache_entries.set_function(lambda c=cache: len(c), cache=name)
+        # /cache/warm 백그라운드 로더
+        self.warmer = CacheWarmer(self._warm_item, max_pending=self.settings.warm_max_pending, observe=METRICS.observe_stage)
         
         # 경로 설정
         self._setup_paths()
@@ -42,7 +51,8 @@ class ModelManager:
             os.path.join(self.settings.sam6d_root, 'utils'),
             os.path.join(self.settings.sam6d_root, 'model'),
             os.path.join(self.settings.sam6d_root, 'provider'),
-            os.path.join(self.settings.pem_server_root, 'model', 'pointnet2')
+            os.path.join(self.settings.pem_server_root, 'model', 'pointnet2'),
+            os.path.join(self.settings.pem_server_root, 'utils'),  # template_pack
         ]
         
         for path in paths:
@@ -89,13 +99,19 @@ class ModelManager:
             
             # 실제 모델 로딩 로직 구현
             import gorilla
-            from run_inference_custom_function import init_model_and_config
+            from run_inference_custom_function import init_model_and_config, load_templates_from_files
+            import template_pack
 
             # GPU 설정 확인
             if device == "cuda" and not torch.cuda.is_available():
                 logger.warning("CUDA requested but not available, falling back to CPU")
                 device = "cpu"
 
+            # pointnet2 연산 백엔드 선택 (CPU 노드는 PyTorch 구현 사용)
+            import pointnet2_utils
+            pointnet2_utils.set_backend(self.settings.pointnet2_backend)
+            logger.info(f"pointnet2 backend: {pointnet2_utils.get_backend()}")
+
             # CUDA 디바이스 설정 (gorilla가 CUDA를 인식할 수 있도록)
             if device == "cuda":
                 gorilla.utils.set_cuda_visible_devices("0")
@@ -109,6 +125,11 @@ class ModelManager:
                 iter_num=0
             )
             
+            self._instrument_model()
+            # 템플릿 로더는 로드 때 찾아 둠 (Main 서버 in-process 모드는 요청 중에 PEM 모듈을 import할 수 없음)
+            self._template_pack = template_pack
+            self._load_templates_from_files = load_templates_from_files
+
             # 모델 상태 설정
             self.device = device
             self.loaded = True
@@ -133,6 +154,15 @@ class ModelManager:
             self.loaded = False
             return False
     
+    def _instrument_model(self):
+        """PEM 단계 (특징 추출 / coarse / fine 매칭) 소요 시간을 /metrics에 기록"""
+        if self.model is None:
+            return
+        net = getattr(self.model, "module", self.model)
+        METRICS.instrument_method(net.feature_extraction, "forward", "pem_feature_extraction")
+        METRICS.instrument_method(net.coarse_point_matching, "forward", "pem_coarse")
+        METRICS.instrument_method(net.fine_point_matching, "forward", "pem_fine")
+
     def unload_model(self) -> bool:
         """모델 언로드"""
         try:
@@ -163,6 +193,7 @@ class ModelManager:
             "parameters": self.parameters,
             "loading_time": self.loading_time,
             "model_name": self.settings.model_name,
+            "pointnet2_backend": self.settings.pointnet2_backend,
             "config_path": self.settings.config_path,
             "checkpoint_path": self.settings.checkpoint_path
         }
@@ -216,27 +247,44 @@ class ModelManager:
 
         template_dir = os.path.abspath(template_dir)
 
+        # 같은 템플릿을 캐시 워머가 로드 중이면 끝날 때까지 기다렸다가 캐시에서 사용
+        self.warmer.wait_for(template_dir)
         with self.cache_lock:
             cached = self.template_cache.get(template_dir)
         if cached is not None:
             return cached
 
-        from run_inference_custom_function import load_templates_from_files
+        bundle = self._build_template_bundle(template_dir)
+        with self.cache_lock:
+            self.template_cache.put(template_dir, bundle)
 
-        all_tem, all_tem_pts, all_tem_choose = load_templates_from_files(
-            template_dir, self.cfg.test_dataset, self.device
-        )
+        return bundle
+
+    def _build_template_bundle(self, template_dir: str) -> Tuple[Any, Any, Any, Any]:
+        """템플릿 로드 + 템플릿 특징 추출"""
+        all_tem, all_tem_pts, all_tem_choose = self._load_templates(template_dir)
 
         with torch.no_grad():
             all_tem_pts, all_tem_feat = self.model.feature_extraction.get_obj_feats(
                 all_tem, all_tem_pts, all_tem_choose
             )
 
-        bundle = (all_tem, all_tem_pts, all_tem_choose, all_tem_feat)
-        with self.cache_lock:
-            self.template_cache.put(template_dir, bundle)
+        return all_tem, all_tem_pts, all_tem_choose, all_tem_feat
 
-        return bundle
+    def _load_templates(self, template_dir: str) -> Tuple[Any, Any, Any]:
+        """templates.pack이 있으면 memmap으로 로드, 없으면 loose 파일(PNG/npy)에서 로드"""
+        if self.settings.use_template_pack and getattr(self.cfg.test_dataset, "rgb_mask_flag", True):
+            pack = self._template_pack
+            pack_path = pack.find_template_pack(template_dir)
+            if pack_path is not None:
+                try:
+                    return pack.load_templates_from_pack(
+                        pack.TemplatePack(pack_path), self.cfg.test_dataset, self.device
+                    )
+                except Exception as exc:
+                    logger.warning("Failed to load template pack %s, falling back to loose files: %s", pack_path, exc)
+
+        return self._load_templates_from_files(template_dir, self.cfg.test_dataset, self.device)
 
     def get_cad_points(self, cad_path: str) -> Any:
         """CAD 모델 포인트를 캐시에서 가져오거나 새로 로드"""
@@ -247,14 +295,61 @@ class ModelManager:
         if cached is not None:
             return cached
 
-        mesh = trimesh.load_mesh(cad_path)
-        cad_points = mesh.sample(2048).astype("float32") / 1000.0
+        cad_points = self._load_cad_points(cad_path)
 
         with self.cache_lock:
             self.cad_cache.put(cad_path, cad_points)
 
         return cad_points
 
+    @staticmethod
+    def _load_cad_points(cad_path: str) -> Any:
+        mesh = trimesh.load_mesh(cad_path)
+        return mesh.sample(2048).astype("float32") / 1000.0
+
+    def _warm_item(self, item: WarmItem) -> str:
+        """캐시 워밍 (워커 스레드): 적중률 통계에 넣지 않고, 로드는 cache_lock 밖에서"""
+        if not self.loaded:
+            raise RuntimeError("Model must be loaded before warming templates")
+        with self.cache_lock:
+            has_templates = item.template_dir in self.template_cache
+            has_cad = item.cad_path is None or item.cad_path in self.cad_cache
+        if not has_templates:
+            if not os.path.isdir(item.template_dir):
+                raise FileNotFoundError(f"Template directory not found: {item.template_dir}")
+            bundle = self._build_template_bundle(item.template_dir)
+            with self.cache_lock:
+                self.template_cache.put(item.template_dir, bundle)
+        if not has_cad:
+            cad_points = self._load_cad_points(item.cad_path)
+            with self.cache_lock:
+                self.cad_cache.put(item.cad_path, cad_points)
+        return "cached" if has_templates and has_cad else "loaded"
+
+    def evict_assets(self, items: Optional[List[WarmItem]] = None) -> Dict[str, int]:
+        """캐시에서 제거 (items가 없으면 전체), 대기 중인 워밍도 취소"""
+        cancelled = self.warmer.cancel(None if items is None else [item.key for item in items])
+        with self.cache_lock:
+            if items is None:
+                evicted = {"templates": self.template_cache.clear(), "cad": self.cad_cache.clear()}
+            else:
+                evicted = {
+                    "templates": sum(self.template_cache.evict(item.template_dir) for item in items),
+                    "cad": sum(self.cad_cache.evict(item.cad_path) for item in items if item.cad_path),
+                }
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        return {**evicted, "cancelled": cancelled}
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        with self.cache_lock:
+            caches = {
+                name: {"entries": len(cache), "capacity": cache.capacity, "hits": cache.hits,
+                       "misses": cache.misses, "hit_ratio": cache.hit_ratio, "keys": cache.keys()}
+                for name, cache in (("templates", self.template_cache), ("cad", self.cad_cache))
+            }
+        return {"caches": caches, "warmer": self.warmer.get_stats()}
+
     def preload_assets(self):
         """템플릿과 CAD 자산을 미리 로드"""
         templates_root = os.path.join(self.settings.workspace_root, "static", "templates")
@@ -270,8 +365,9 @@ class ModelManager:
             self.cad_cache.capacity,
         )
 
+        preload_classes = {c.strip().lower() for c in self.settings.preload_classes.split(",") if c.strip()}
         for class_name in sorted(os.listdir(templates_root)):
-            if class_name.lower() != "ycb":
+            if "*" not in preload_classes and class_name.lower() not in preload_classes:
                 continue
             class_template_dir = os.path.join(templates_root, class_name)
             class_mesh_dir = os.path.join(meshes_root, class_name)
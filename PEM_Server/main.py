@@ -11,11 +11,16 @@ import uvicorn
 
 # 프로젝트 루트를 sys.path에 추가
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# 공용 모듈 (sam6d_common) 은 저장소 루트에 있음
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.config import get_settings
 from core.model_manager import get_model_manager
 from core.logging_config import setup_logging
-from api.endpoints import health, pose_estimation, model
+from utils.artifact_writer import ARTIFACT_WRITER
+from utils.tracing import TRACER
+from sam6d_common.tracing import TracingMiddleware
+from api.endpoints import health, pose_estimation, model, metrics, cache
 
 # 설정 로드
 settings = get_settings()
@@ -59,6 +64,8 @@ async def lifespan(app: FastAPI):
     # 종료 시 실행
     logger.info("Shutting down PEM Server...")
     model_manager.unload_model()
+    if not ARTIFACT_WRITER.close(timeout=30.0):
+        logger.warning("Timed out while flushing pending artifacts")
 
 # FastAPI 앱 생성
 app = FastAPI(
@@ -75,12 +82,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Request-ID"],
 )
 
+# 요청 추적 (Main 서버의 X-Request-ID / traceparent를 이어받고, 응답에 Server-Timing 추가)
+app.add_middleware(TracingMiddleware, tracer=TRACER)
+
 # 라우터 등록
 app.include_router(health.router)
 app.include_router(pose_estimation.router)
 app.include_router(model.router)
+app.include_router(metrics.router)
+app.include_router(cache.router)
 
 # 루트 엔드포인트
 @app.get("/")
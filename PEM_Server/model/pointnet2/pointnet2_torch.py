@@ -0,0 +1,174 @@
+''' Pure PyTorch implementations of the pointnet2 _ext ops (CPU / GPU without the compiled extension).
+
+Each function mirrors the signature and output of the corresponding `_ext` binding, so that
+`pointnet2_utils` can dispatch to either backend. Index outputs are int32 like the CUDA kernels.
+'''
+from __future__ import (
+    division,
+    absolute_import,
+    with_statement,
+    print_function,
+    unicode_literals,
+)
+import torch
+
+if False:
+    # Workaround for type hints without depending on the `typing` module
+    from typing import *
+
+
+def furthest_point_sampling(xyz, npoint):
+    # type: (torch.Tensor, int) -> torch.Tensor
+    r"""
+    Iterative furthest point sampling, starting from the first point (same as the CUDA kernel)
+
+    Parameters
+    ----------
+    xyz : torch.Tensor
+        (B, N, 3) tensor
+    npoint : int
+        number of points in the sampled set
+
+    Returns
+    -------
+    torch.Tensor
+        (B, npoint) int32 tensor of sampled indices
+    """
+    B, N, _ = xyz.size()
+    idxs = torch.zeros(B, npoint, dtype=torch.int32, device=xyz.device)
+    if npoint <= 0:
+        return idxs
+
+    xyz = xyz.float()
+    temp = torch.full((B, N), 1e10, dtype=xyz.dtype, device=xyz.device)
+    batch_indices = torch.arange(B, device=xyz.device)
+    farthest = torch.zeros(B, dtype=torch.long, device=xyz.device)
+    for j in range(1, npoint):
+        centroid = xyz[batch_indices, farthest].unsqueeze(1)  # (B, 1, 3)
+        dist = ((xyz - centroid) ** 2).sum(dim=2)  # (B, N)
+        torch.minimum(temp, dist, out=temp)
+        farthest = temp.argmax(dim=1)
+        idxs[:, j] = farthest
+    return idxs
+
+
+def gather_points(features, idx):
+    # type: (torch.Tensor, torch.Tensor) -> torch.Tensor
+    r"""
+    Parameters
+    ----------
+    features : torch.Tensor
+        (B, C, N) tensor
+    idx : torch.Tensor
+        (B, npoint) tensor of the features to gather
+
+    Returns
+    -------
+    torch.Tensor
+        (B, C, npoint) tensor
+    """
+    B, C, _ = features.size()
+    idx = idx.long().unsqueeze(1).expand(B, C, idx.size(1))
+    return torch.gather(features, 2, idx)
+
+
+def ball_query(new_xyz, xyz, radius, nsample):
+    # type: (torch.Tensor, torch.Tensor, float, int) -> torch.Tensor
+    r"""
+    Takes the first `nsample` points (in index order) inside the ball, padding with the first hit;
+    rows without any hit are filled with 0, as in the CUDA kernel.
+
+    Parameters
+    ----------
+    new_xyz : torch.Tensor
+        (B, npoint, 3) centers of the ball query
+    xyz : torch.Tensor
+        (B, N, 3) xyz coordinates of the features
+    radius : float
+        radius of the balls
+    nsample : int
+        maximum number of features in the balls
+
+    Returns
+    -------
+    torch.Tensor
+        (B, npoint, nsample) int32 tensor with the indices of the features that form the query balls
+    """
+    N = xyz.size(1)
+    dist2 = ((new_xyz.unsqueeze(2) - xyz.unsqueeze(1)) ** 2).sum(dim=3)  # (B, npoint, N)
+    arange = torch.arange(N, device=xyz.device).view(1, 1, N)
+    # out-of-ball points get key N so that the smallest keys are the in-ball indices in order
+    keys = torch.where(dist2 < radius * radius, arange, torch.full_like(arange, N))
+    k = min(nsample, N)
+    idx = keys.topk(k, dim=2, largest=False, sorted=True)[0]  # (B, npoint, k)
+    if k < nsample:
+        idx = torch.cat([idx, idx.new_full((*idx.shape[:2], nsample - k), N)], dim=2)
+
+    first = idx[:, :, :1]
+    first = torch.where(first == N, torch.zeros_like(first), first)
+    idx = torch.where(idx == N, first.expand_as(idx), idx)
+    return idx.int()
+
+
+def group_points(features, idx):
+    # type: (torch.Tensor, torch.Tensor) -> torch.Tensor
+    r"""
+    Parameters
+    ----------
+    features : torch.Tensor
+        (B, C, N) tensor of features to group
+    idx : torch.Tensor
+        (B, npoint, nsample) tensor containing the indicies of features to group with
+
+    Returns
+    -------
+    torch.Tensor
+        (B, C, npoint, nsample) tensor
+    """
+    B, C, _ = features.size()
+    _, npoint, nsample = idx.size()
+    flat_idx = idx.long().reshape(B, 1, npoint * nsample).expand(B, C, npoint * nsample)
+    return torch.gather(features, 2, flat_idx).reshape(B, C, npoint, nsample)
+
+
+def three_nn(unknown, known):
+    # type: (torch.Tensor, torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]
+    r"""
+    Parameters
+    ----------
+    unknown : torch.Tensor
+        (B, n, 3) tensor of unknown points
+    known : torch.Tensor
+        (B, m, 3) tensor of known points
+
+    Returns
+    -------
+    dist2 : torch.Tensor
+        (B, n, 3) squared l2 distance to the three nearest neighbors
+    idx : torch.Tensor
+        (B, n, 3) int32 index of 3 nearest neighbors
+    """
+    dist2 = ((unknown.unsqueeze(2) - known.unsqueeze(1)) ** 2).sum(dim=3)  # (B, n, m)
+    dist2, idx = dist2.topk(3, dim=2, largest=False, sorted=True)
+    return dist2, idx.int()
+
+
+def three_interpolate(features, idx, weight):
+    # type: (torch.Tensor, torch.Tensor, torch.Tensor) -> torch.Tensor
+    r"""
+    Parameters
+    ----------
+    features : torch.Tensor
+        (B, c, m) Features descriptors to be interpolated from
+    idx : torch.Tensor
+        (B, n, 3) three nearest neighbors of the target features in features
+    weight : torch.Tensor
+        (B, n, 3) weights
+
+    Returns
+    -------
+    torch.Tensor
+        (B, c, n) tensor of the interpolated features
+    """
+    grouped = group_points(features, idx)  # (B, c, n, 3)
+    return (grouped * weight.unsqueeze(1)).sum(dim=3)
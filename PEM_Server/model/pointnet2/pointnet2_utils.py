@@ -15,6 +15,8 @@ import torch
 from torch.autograd import Function
 import torch.nn as nn
 import pytorch_utils as pt_utils
+import pointnet2_torch as _torch_ops
+import os
 import sys
 
 try:
@@ -22,10 +24,16 @@ try:
 except:
     import __builtin__ as builtins
 
+# "auto": compiled CUDA ops for CUDA tensors, pure PyTorch ops otherwise
+# "cuda": always the compiled ops, "torch": always the pure PyTorch ops
+BACKENDS = ("auto", "cuda", "torch")
+_backend = os.getenv("PEM_POINTNET2_BACKEND", "auto").lower()
+
 try:
     import pointnet2._ext as _ext
 except ImportError:
-    if not getattr(builtins, "__POINTNET2_SETUP__", False):
+    _ext = None
+    if _backend == "cuda" and not getattr(builtins, "__POINTNET2_SETUP__", False):
         raise ImportError(
             "Could not import _ext module.\n"
             "Please see the setup instructions in the README: "
@@ -37,6 +45,32 @@ if False:
     from typing import *
 
 
+def set_backend(backend):
+    # type: (str) -> None
+    r"""Select the implementation of the pointnet2 ops ("auto", "cuda" or "torch")."""
+    global _backend
+    backend = backend.lower()
+    if backend not in BACKENDS:
+        raise ValueError("Unsupported pointnet2 backend: {}".format(backend))
+    if backend == "cuda" and _ext is None:
+        raise ImportError("pointnet2 backend 'cuda' requested but the _ext module is not built")
+    _backend = backend
+
+
+def get_backend():
+    # type: () -> str
+    return _backend
+
+
+def _use_torch_ops(tensor):
+    # type: (torch.Tensor) -> bool
+    if _backend == "torch":
+        return True
+    if _backend == "cuda":
+        return False
+    return _ext is None or not tensor.is_cuda
+
+
 class RandomDropout(nn.Module):
     def __init__(self, p=0.5, inplace=False):
         super(RandomDropout, self).__init__()
@@ -77,7 +111,11 @@ class FurthestPointSampling(Function):
         return None, None
 
 
-furthest_point_sample = FurthestPointSampling.apply
+def furthest_point_sample(xyz, npoint):
+    # type: (torch.Tensor, int) -> torch.Tensor
+    if _use_torch_ops(xyz):
+        return _torch_ops.furthest_point_sampling(xyz, npoint)
+    return FurthestPointSampling.apply(xyz, npoint)
 
 
 class GatherOperation(Function):
@@ -114,7 +152,11 @@ class GatherOperation(Function):
         return grad_features, None
 
 
-gather_operation = GatherOperation.apply
+def gather_operation(features, idx):
+    # type: (torch.Tensor, torch.Tensor) -> torch.Tensor
+    if _use_torch_ops(features):
+        return _torch_ops.gather_points(features, idx)
+    return GatherOperation.apply(features, idx)
 
 
 class ThreeNN(Function):
@@ -146,7 +188,12 @@ class ThreeNN(Function):
         return None, None
 
 
-three_nn = ThreeNN.apply
+def three_nn(unknown, known):
+    # type: (torch.Tensor, torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]
+    if _use_torch_ops(unknown):
+        dist2, idx = _torch_ops.three_nn(unknown, known)
+        return torch.sqrt(dist2), idx
+    return ThreeNN.apply(unknown, known)
 
 
 class ThreeInterpolate(Function):
@@ -203,7 +250,11 @@ class ThreeInterpolate(Function):
         return grad_features, None, None
 
 
-three_interpolate = ThreeInterpolate.apply
+def three_interpolate(features, idx, weight):
+    # type: (torch.Tensor, torch.Tensor, torch.Tensor) -> torch.Tensor
+    if _use_torch_ops(features):
+        return _torch_ops.three_interpolate(features, idx, weight)
+    return ThreeInterpolate.apply(features, idx, weight)
 
 
 class GroupingOperation(Function):
@@ -254,7 +305,11 @@ class GroupingOperation(Function):
         return grad_features, None
 
 
-grouping_operation = GroupingOperation.apply
+def grouping_operation(features, idx):
+    # type: (torch.Tensor, torch.Tensor) -> torch.Tensor
+    if _use_torch_ops(features):
+        return _torch_ops.group_points(features, idx)
+    return GroupingOperation.apply(features, idx)
 
 
 class BallQuery(Function):
@@ -288,7 +343,11 @@ class BallQuery(Function):
         return None, None, None, None
 
 
-ball_query = BallQuery.apply
+def ball_query(radius, nsample, xyz, new_xyz):
+    # type: (float, int, torch.Tensor, torch.Tensor) -> torch.Tensor
+    if _use_torch_ops(xyz):
+        return _torch_ops.ball_query(new_xyz, xyz, radius, nsample)
+    return BallQuery.apply(radius, nsample, xyz, new_xyz)
 
 
 class QueryAndGroup(nn.Module):
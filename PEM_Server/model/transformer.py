@@ -299,54 +299,83 @@ class GeometricStructureEmbedding(nn.Module):
         if self.reduction_a not in ['max', 'mean']:
             raise ValueError(f'Unsupported reduction mode: {self.reduction_a}.')
 
+        # number of anchor rows processed at once (None: all rows in one block)
+        self.chunk_size = getattr(cfg, 'chunk_size', None)
+
     @torch.no_grad()
-    def get_embedding_indices(self, points):
+    def get_embedding_indices(self, points, start=0, end=None):
         r"""Compute the indices of pair-wise distance embedding and triplet-wise angular embedding.
 
+        Only the anchor rows in [start, end) are computed, so the peak memory is bounded by
+        the block size instead of the full (B, N, N, k, 3) expansion.
+
         Args:
             points: torch.Tensor (B, N, 3), input point cloud
+            start: int, first anchor row (default: 0)
+            end: int, last anchor row, exclusive (default: N)
 
         Returns:
-            d_indices: torch.FloatTensor (B, N, N), distance embedding indices
-            a_indices: torch.FloatTensor (B, N, N, k), angular embedding indices
+            d_indices: torch.FloatTensor (B, M, N), distance embedding indices, M = end - start
+            a_indices: torch.FloatTensor (B, M, N, k), angular embedding indices
         """
         batch_size, num_point, _ = points.shape
+        if end is None:
+            end = num_point
+        num_anchor = end - start
+        anchor_points = points[:, start:end]  # (B, M, 3)
 
-        dist_map = torch.sqrt(pairwise_distance(points, points))  # (B, N, N)
+        dist_map = torch.sqrt(pairwise_distance(anchor_points, points))  # (B, M, N)
         d_indices = dist_map / self.sigma_d
 
         k = self.angle_k
-        knn_indices = dist_map.topk(k=k + 1, dim=2, largest=False)[1][:, :, 1:]  # (B, N, k)
-        knn_indices = knn_indices.unsqueeze(3).expand(batch_size, num_point, k, 3)  # (B, N, k, 3)
-        expanded_points = points.unsqueeze(1).expand(batch_size, num_point, num_point, 3)  # (B, N, N, 3)
-        knn_points = torch.gather(expanded_points, dim=2, index=knn_indices)  # (B, N, k, 3)
-        ref_vectors = knn_points - points.unsqueeze(2)  # (B, N, k, 3)
-        anc_vectors = points.unsqueeze(1) - points.unsqueeze(2)  # (B, N, N, 3)
-        ref_vectors = ref_vectors.unsqueeze(2).expand(batch_size, num_point, num_point, k, 3)  # (B, N, N, k, 3)
-        anc_vectors = anc_vectors.unsqueeze(3).expand(batch_size, num_point, num_point, k, 3)  # (B, N, N, k, 3)
-        sin_values = torch.linalg.norm(torch.cross(ref_vectors, anc_vectors, dim=-1), dim=-1)  # (B, N, N, k)
-        cos_values = torch.sum(ref_vectors * anc_vectors, dim=-1)  # (B, N, N, k)
-        angles = torch.atan2(sin_values, cos_values)  # (B, N, N, k)
+        knn_indices = dist_map.topk(k=k + 1, dim=2, largest=False)[1][:, :, 1:]  # (B, M, k)
+        knn_indices = knn_indices.unsqueeze(3).expand(batch_size, num_anchor, k, 3)  # (B, M, k, 3)
+        expanded_points = points.unsqueeze(1).expand(batch_size, num_anchor, num_point, 3)  # (B, M, N, 3)
+        knn_points = torch.gather(expanded_points, dim=2, index=knn_indices)  # (B, M, k, 3)
+        ref_vectors = (knn_points - anchor_points.unsqueeze(2)).unsqueeze(2)  # (B, M, 1, k, 3)
+        anc_vectors = (points.unsqueeze(1) - anchor_points.unsqueeze(2)).unsqueeze(3)  # (B, M, N, 1, 3)
+
+        # cross / dot products by component, broadcasting to (B, M, N, k) without a trailing 3-dim
+        rx, ry, rz = ref_vectors.unbind(dim=-1)
+        ax, ay, az = anc_vectors.unbind(dim=-1)
+        sin_values = (ry * az - rz * ay).square_()
+        sin_values += (rz * ax - rx * az).square_()
+        sin_values += (rx * ay - ry * ax).square_()
+        sin_values = sin_values.sqrt_()  # (B, M, N, k)
+        cos_values = rx * ax
+        cos_values += ry * ay
+        cos_values += rz * az  # (B, M, N, k)
+        # turn -0.0 into +0.0 (as torch.sum does), otherwise atan2(0, -0.0) = pi on the zero anchor vectors
+        cos_values += 0.0
+        angles = torch.atan2(sin_values, cos_values)  # (B, M, N, k)
         a_indices = angles * self.factor_a
 
         return d_indices, a_indices
 
     def forward(self, points):
-        d_indices, a_indices = self.get_embedding_indices(points)
+        num_point = points.size(1)
+        chunk_size = self.chunk_size or num_point
 
-        d_embeddings = self.embedding(d_indices)
-        d_embeddings = self.proj_d(d_embeddings)
+        embeddings = []
+        for start in range(0, num_point, chunk_size):
+            end = min(start + chunk_size, num_point)
+            d_indices, a_indices = self.get_embedding_indices(points, start, end)
 
-        a_embeddings = self.embedding(a_indices)
-        a_embeddings = self.proj_a(a_embeddings)
-        if self.reduction_a == 'max':
-            a_embeddings = a_embeddings.max(dim=3)[0]
-        else:
-            a_embeddings = a_embeddings.mean(dim=3)
+            d_embeddings = self.embedding(d_indices)
+            d_embeddings = self.proj_d(d_embeddings)
 
-        embeddings = d_embeddings + a_embeddings
+            a_embeddings = self.embedding(a_indices)
+            a_embeddings = self.proj_a(a_embeddings)
+            if self.reduction_a == 'max':
+                a_embeddings = a_embeddings.max(dim=3)[0]
+            else:
+                a_embeddings = a_embeddings.mean(dim=3)
 
-        return embeddings
+            embeddings.append(d_embeddings + a_embeddings)
+
+        if len(embeddings) == 1:
+            return embeddings[0]
+        return torch.cat(embeddings, dim=1)
 
 
 class RPEMultiHeadAttention(nn.Module):
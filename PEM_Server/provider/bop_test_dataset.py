@@ -17,6 +17,7 @@ from data_utils import (
     get_bbox,
     get_point_cloud_from_depth,
     get_resize_rgb_choose,
+    rle_to_binary_mask,
 )
 from bop_object_utils import load_objs
 
@@ -112,11 +113,15 @@ class BOPTestset():
 
         # mask
         h,w = seg['size']
-        try:
-            rle = cocomask.frPyObjects(seg, h, w)
-        except:
-            rle = seg
-        mask = cocomask.decode(rle)
+        if isinstance(seg['counts'], list):
+            # uncompressed RLE: vectorized decode, no pycocotools round trip
+            mask = rle_to_binary_mask(seg)
+        else:
+            try:
+                rle = cocomask.frPyObjects(seg, h, w)
+            except:
+                rle = seg
+            mask = cocomask.decode(rle)
         mask = np.logical_and(mask > 0, depth > 0)
         if np.sum(mask) > self.minimum_n_point:
             bbox = get_bbox(mask)
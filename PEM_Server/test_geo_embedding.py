@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# PEM_Server/test_geo_embedding.py - GeometricStructureEmbedding 블록 계산 수치 동등성 테스트
+import os
+import sys
+from types import SimpleNamespace
+
+PEM_ROOT = os.path.dirname(os.path.abspath(__file__))
+for path in [
+    os.path.join(PEM_ROOT, 'model'),
+    os.path.join(PEM_ROOT, 'utils'),
+    os.path.join(PEM_ROOT, 'model', 'pointnet2'),
+]:
+    if path not in sys.path:
+        sys.path.append(path)
+
+import torch
+
+from transformer import GeometricStructureEmbedding
+from model_utils import pairwise_distance
+
+
+def make_cfg(chunk_size=None):
+    return SimpleNamespace(
+        sigma_d=0.2, sigma_a=15, angle_k=3, reduction_a='max', hidden_dim=256, chunk_size=chunk_size
+    )
+
+
+def reference_embedding_indices(module, points):
+    """기존 (B, N, N, k, 3) 확장 방식 구현 (비교 기준)"""
+    batch_size, num_point, _ = points.shape
+
+    dist_map = torch.sqrt(pairwise_distance(points, points))
+    d_indices = dist_map / module.sigma_d
+
+    k = module.angle_k
+    knn_indices = dist_map.topk(k=k + 1, dim=2, largest=False)[1][:, :, 1:]
+    knn_indices = knn_indices.unsqueeze(3).expand(batch_size, num_point, k, 3)
+    expanded_points = points.unsqueeze(1).expand(batch_size, num_point, num_point, 3)
+    knn_points = torch.gather(expanded_points, dim=2, index=knn_indices)
+    ref_vectors = knn_points - points.unsqueeze(2)
+    anc_vectors = points.unsqueeze(1) - points.unsqueeze(2)
+    ref_vectors = ref_vectors.unsqueeze(2).expand(batch_size, num_point, num_point, k, 3)
+    anc_vectors = anc_vectors.unsqueeze(3).expand(batch_size, num_point, num_point, k, 3)
+    sin_values = torch.linalg.norm(torch.cross(ref_vectors, anc_vectors, dim=-1), dim=-1)
+    cos_values = torch.sum(ref_vectors * anc_vectors, dim=-1)
+    angles = torch.atan2(sin_values, cos_values)
+    a_indices = angles * module.factor_a
+    return d_indices, a_indices
+
+
+def sample_points(batch_size=4, num_point=197, device='cpu'):
+    torch.manual_seed(0)
+    points = torch.rand(batch_size, num_point, 3, device=device) - 0.5
+    # 배경 포인트 (pose_estimation_model.Net과 동일)
+    points[:, 0, :] = 100
+    return points
+
+
+def test_embedding_indices_equivalence():
+    """블록 단위 인덱스 계산이 기존 구현과 일치하는지 확인"""
+    module = GeometricStructureEmbedding(make_cfg())
+    points = sample_points()
+
+    ref_d, ref_a = reference_embedding_indices(module, points)
+    d_indices, a_indices = module.get_embedding_indices(points)
+    assert torch.allclose(d_indices, ref_d, atol=1e-5)
+    assert torch.allclose(a_indices, ref_a, atol=1e-3)
+
+    blocks = [module.get_embedding_indices(points, s, min(s + 50, points.size(1))) for s in range(0, points.size(1), 50)]
+    assert torch.allclose(torch.cat([b[0] for b in blocks], dim=1), ref_d, atol=1e-5)
+    assert torch.allclose(torch.cat([b[1] for b in blocks], dim=1), ref_a, atol=1e-3)
+    print("✅ embedding indices equivalence")
+    return True
+
+
+def test_forward_chunk_equivalence():
+    """chunk_size 설정 여부와 무관하게 forward 결과가 같은지 확인"""
+    full = GeometricStructureEmbedding(make_cfg()).eval()
+    chunked = GeometricStructureEmbedding(make_cfg(chunk_size=32)).eval()
+    chunked.load_state_dict(full.state_dict())
+    points = sample_points()
+
+    with torch.no_grad():
+        out_full = full(points)
+        out_chunked = chunked(points)
+    assert out_full.shape == (points.size(0), points.size(1), points.size(1), 256)
+    assert torch.allclose(out_full, out_chunked, atol=1e-4)
+    print("✅ forward chunk equivalence")
+    return True
+
+
+if __name__ == "__main__":
+    print("GeometricStructureEmbedding 동등성 테스트 시작...\n")
+
+    success = True
+    success &= test_embedding_indices_equivalence()
+    success &= test_forward_chunk_equivalence()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# PEM_Server/test_pointnet2_cpu.py - pointnet2 PyTorch(CPU) 백엔드 검증 테스트
+import os
+import sys
+
+PEM_ROOT = os.path.dirname(os.path.abspath(__file__))
+POINTNET2_DIR = os.path.join(PEM_ROOT, 'model', 'pointnet2')
+if POINTNET2_DIR not in sys.path:
+    sys.path.append(POINTNET2_DIR)
+
+import torch
+
+import pointnet2_torch
+import pointnet2_utils
+
+
+def sample_points(batch_size=2, num_point=1024, seed=0):
+    torch.manual_seed(seed)
+    return (torch.rand(batch_size, num_point, 3) - 0.5) * 0.6
+
+
+def naive_ball_query(new_xyz, xyz, radius, nsample):
+    """CUDA 커널과 동일한 순차 루프 구현 (비교 기준)"""
+    B, M, _ = new_xyz.shape
+    idx = torch.zeros(B, M, nsample, dtype=torch.int32)
+    for b in range(B):
+        d2 = ((new_xyz[b].unsqueeze(1) - xyz[b].unsqueeze(0)) ** 2).sum(-1)
+        for j in range(M):
+            hits = torch.nonzero(d2[j] < radius * radius).flatten()[:nsample]
+            if len(hits) > 0:
+                idx[b, j, :] = hits[0]
+                idx[b, j, :len(hits)] = hits
+    return idx
+
+
+def naive_furthest_point_sample(xyz, npoint):
+    B, N, _ = xyz.shape
+    idx = torch.zeros(B, npoint, dtype=torch.int32)
+    for b in range(B):
+        temp = torch.full((N,), 1e10)
+        old = 0
+        for j in range(1, npoint):
+            d = ((xyz[b] - xyz[b, old]) ** 2).sum(-1)
+            temp = torch.minimum(temp, d)
+            old = int(temp.argmax())
+            idx[b, j] = old
+    return idx
+
+
+def test_cpu_ops_match_reference():
+    """PyTorch 구현이 순차 참조 구현과 일치하는지 확인"""
+    xyz = sample_points(num_point=256)
+    new_xyz = xyz[:, :64].contiguous()
+
+    assert torch.equal(
+        pointnet2_torch.furthest_point_sampling(xyz, 32), naive_furthest_point_sample(xyz, 32)
+    )
+    for radius, nsample in [(0.1, 32), (0.2, 64), (0.01, 8)]:
+        assert torch.equal(
+            pointnet2_torch.ball_query(new_xyz, xyz, radius, nsample),
+            naive_ball_query(new_xyz, xyz, radius, nsample),
+        )
+
+    feats = torch.randn(2, 5, 256)
+    idx = torch.randint(0, 256, (2, 64, 16), dtype=torch.int32)
+    grouped = pointnet2_torch.group_points(feats, idx)
+    assert torch.equal(grouped[1, :, 3, 7], feats[1, :, idx[1, 3, 7]])
+    print("✅ CPU ops match reference")
+    return True
+
+
+def test_cpu_matches_cuda():
+    """CPU 결과가 CUDA _ext 결과와 일치하는지 확인 (CUDA 및 _ext가 있을 때만)"""
+    if not torch.cuda.is_available() or pointnet2_utils._ext is None:
+        print("⏭️  CUDA/_ext not available, skipping CUDA comparison")
+        return True
+
+    _ext = pointnet2_utils._ext
+    xyz = sample_points(batch_size=4, num_point=2048)
+    new_xyz = xyz[:, ::4].contiguous()
+    feats = torch.randn(4, 32, 2048)
+    xyz_cuda, new_xyz_cuda, feats_cuda = xyz.cuda(), new_xyz.cuda(), feats.cuda()
+
+    fps_cpu = pointnet2_torch.furthest_point_sampling(xyz, 196)
+    fps_cuda = _ext.furthest_point_sampling(xyz_cuda, 196).cpu()
+    assert torch.equal(fps_cpu, fps_cuda), "furthest_point_sampling mismatch"
+
+    assert torch.allclose(
+        pointnet2_torch.gather_points(feats, fps_cpu),
+        _ext.gather_points(feats_cuda, fps_cuda.cuda()).cpu(),
+    ), "gather_points mismatch"
+
+    for radius, nsample in [(0.1, 32), (0.2, 64)]:
+        idx_cpu = pointnet2_torch.ball_query(new_xyz, xyz, radius, nsample)
+        idx_cuda = _ext.ball_query(new_xyz_cuda, xyz_cuda, radius, nsample).cpu()
+        assert torch.equal(idx_cpu, idx_cuda), f"ball_query mismatch (r={radius})"
+        assert torch.allclose(
+            pointnet2_torch.group_points(feats, idx_cpu),
+            _ext.group_points(feats_cuda, idx_cuda.cuda()).cpu(),
+        ), "group_points mismatch"
+
+    dist_cpu, nn_cpu = pointnet2_torch.three_nn(new_xyz, xyz)
+    dist_cuda, nn_cuda = _ext.three_nn(new_xyz_cuda, xyz_cuda)
+    assert torch.equal(nn_cpu, nn_cuda.cpu()), "three_nn mismatch"
+    assert torch.allclose(dist_cpu, dist_cuda.cpu(), atol=1e-6)
+    print("✅ CPU ops match CUDA _ext")
+    return True
+
+
+def test_query_and_group_backend_switch():
+    """QueryAndGroup이 torch 백엔드에서 CPU 텐서로 동작하는지 확인"""
+    previous = pointnet2_utils.get_backend()
+    pointnet2_utils.set_backend("torch")
+    try:
+        xyz = sample_points(num_point=512)
+        grouper = pointnet2_utils.QueryAndGroup(0.1, 32, use_xyz=True)
+        out = grouper(xyz, xyz, xyz.transpose(1, 2).contiguous())
+        assert out.shape == (2, 6, 512, 32)
+        sampled = pointnet2_utils.furthest_point_sample(xyz, 128)
+        gathered = pointnet2_utils.gather_operation(xyz.transpose(1, 2).contiguous(), sampled)
+        assert gathered.shape == (2, 3, 128)
+    finally:
+        pointnet2_utils.set_backend(previous)
+    print("✅ QueryAndGroup on torch backend")
+    return True
+
+
+if __name__ == "__main__":
+    print("pointnet2 CPU 백엔드 테스트 시작...\n")
+
+    success = True
+    success &= test_cpu_ops_match_reference()
+    success &= test_cpu_matches_cuda()
+    success &= test_query_and_group_backend_switch()
+
+    print(f"\n=== 테스트 결과 ===")
+    print("✅ 모든 테스트 통과!" if success else "❌ 일부 테스트 실패")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# PEM_Server/test_template_pack.py - templates.pack 로더와 loose 파일 로더의 동등성 테스트
+import os
+import sys
+import shutil
+import tempfile
+from types import SimpleNamespace
+
+PEM_ROOT = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(PEM_ROOT)
+UTILS_DIR = os.path.join(PEM_ROOT, 'utils')
+for path in (UTILS_DIR, REPO_ROOT):
+    if path not in sys.path:
+        sys.path.append(path)
+
+import cv2
+import numpy as np
+import torch
+
+from data_utils import load_im, get_bbox, get_resize_rgb_choose
+from template_pack import find_template_pack, TemplatePack, load_templates_from_pack, _rgb_transform
+from bop_object_utils import Obj
+from Render_Server import template_pack as render_template_pack
+
+
+
+def make_template_dir(num_views=6, h=96, w=128, seed=0):
+    """렌더링 결과 형태의 (rgb_i.png, mask_i.png, xyz_i.npy) 디렉토리 생성 - 경계에 닿는 뷰 포함"""
+    rng = np.random.default_rng(seed)
+    template_dir = tempfile.mkdtemp(prefix='pem_tpl_')
+    for i in range(num_views):
+        mask = np.zeros((h, w), dtype=np.uint8)
+        y1, x1 = rng.integers(0, h // 2), rng.integers(0, w // 2)
+        y2, x2 = y1 + rng.integers(10, h // 2), x1 + rng.integers(10, w // 2)
+        if i == 0:
+            y1, x1, y2, x2 = 0, w // 3, h, w  # 이미지 경계에 닿는 객체
+        mask[y1:y2, x1:x2] = 255
+        mask[y1:y2:5, x1:x2:7] = 128  # 반투명 경계 픽셀 (== 255 가 아님)
+        rgb = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+        rgb[mask == 0] = 0  # 렌더링 배경은 검은색
+        xyz = (rng.standard_normal((h, w, 3)) * 50).astype(np.float16)
+        xyz[mask == 0] = 0
+        cv2.imwrite(os.path.join(template_dir, f'rgb_{i}.png'), rgb[:, :, ::-1])
+        cv2.imwrite(os.path.join(template_dir, f'mask_{i}.png'), mask)
+        np.save(os.path.join(template_dir, f'xyz_{i}.npy'), xyz)
+    return template_dir
+
+
+def reference_get_templates(path, cfg, total_nView):
+    """SAM-6D get_templates (loose 파일) 구현 (비교 기준)"""
+    all_tem, all_tem_choose, all_tem_pts = [], [], []
+    for v in range(cfg.n_template_view):
+        i = int(total_nView / cfg.n_template_view * v)
+        rgb = load_im(os.path.join(path, f'rgb_{i}.png')).astype(np.uint8)
+        xyz = np.load(os.path.join(path, f'xyz_{i}.npy')).astype(np.float32) / 1000.0
+        mask = load_im(os.path.join(path, f'mask_{i}.png')).astype(np.uint8) == 255
+
+        bbox = get_bbox(mask)
+        y1, y2, x1, x2 = bbox
+        mask = mask[y1:y2, x1:x2]
+        rgb = rgb[:, :, ::-1][y1:y2, x1:x2, :]
+        rgb = rgb * (mask[:, :, None] > 0).astype(np.uint8)
+        rgb = cv2.resize(rgb, (cfg.img_size, cfg.img_size), interpolation=cv2.INTER_LINEAR)
+        rgb = _rgb_transform(np.array(rgb))
+
+        choose = (mask > 0).astype(np.float32).flatten().nonzero()[0]
+        if len(choose) <= cfg.n_sample_template_point:
+            choose_idx = np.random.choice(np.arange(len(choose)), cfg.n_sample_template_point)
+        else:
+            choose_idx = np.random.choice(np.arange(len(choose)), cfg.n_sample_template_point, replace=False)
+        choose = choose[choose_idx]
+        xyz = xyz[y1:y2, x1:x2, :].reshape((-1, 3))[choose, :]
+        rgb_choose = get_resize_rgb_choose(choose, [y1, y2, x1, x2], cfg.img_size)
+
+        all_tem.append(torch.FloatTensor(rgb).unsqueeze(0))
+        all_tem_choose.append(torch.IntTensor(rgb_choose).long().unsqueeze(0))
+        all_tem_pts.append(torch.FloatTensor(xyz).unsqueeze(0))
+    return all_tem, all_tem_pts, all_tem_choose
+
+
+def test_full_view_roundtrip():
+    """pack의 full view가 loose 파일 (RGB / mask / xyz)과 같은지 확인"""
+    template_dir = make_template_dir()
+    try:
+        pack_path = render_template_pack.pack_template_dir(template_dir)
+        assert find_template_pack(template_dir) == pack_path
+        pack = TemplatePack(pack_path)
+        assert pack.num_views == 6
+        for i in range(pack.num_views):
+            rgb, mask, xyz = pack.get_full_view(i)
+            assert np.array_equal(rgb, load_im(os.path.join(template_dir, f'rgb_{i}.png')))
+            assert np.array_equal(mask, load_im(os.path.join(template_dir, f'mask_{i}.png')))
+            assert np.array_equal(xyz, np.load(os.path.join(template_dir, f'xyz_{i}.npy')))
+        print('✅ full view round trip')
+        return True
+    finally:
+        shutil.rmtree(template_dir)
+
+
+def test_load_templates_from_pack():
+    """pack 로더 출력이 loose 파일 로더와 같은지 확인 (같은 random seed)"""
+    template_dir = make_template_dir()
+    try:
+        pack = TemplatePack(render_template_pack.pack_template_dir(template_dir))
+        for n_sample in [64, 100000]:  # 비복원 / 복원 샘플링
+            cfg = SimpleNamespace(n_template_view=3, img_size=56, n_sample_template_point=n_sample, rgb_mask_flag=True)
+            np.random.seed(0)
+            expected = reference_get_templates(template_dir, cfg, pack.num_views)
+            np.random.seed(0)
+            actual = load_templates_from_pack(pack, cfg, 'cpu')
+            for expected_list, actual_list in zip(expected, actual):
+                assert len(expected_list) == len(actual_list) == cfg.n_template_view
+                for e, a in zip(expected_list, actual_list):
+                    assert e.shape == a.shape and e.dtype == a.dtype
+                    assert torch.equal(e, a)
+        print('✅ load_templates_from_pack')
+        return True
+    finally:
+        shutil.rmtree(template_dir)
+
+
+def test_stale_pack_and_obj():
+    """loose 파일이 pack보다 새로우면 pack을 무시하고, Obj 템플릿은 두 경로에서 같은지 확인"""
+    template_dir = make_template_dir()
+    try:
+        pack_path = render_template_pack.pack_template_dir(template_dir)
+        from_pack = Obj.__new__(Obj)
+        from_pack._get_template(template_dir, 3)
+
+        os.remove(pack_path)
+        from_loose = Obj.__new__(Obj)
+        from_loose._get_template(template_dir, 3)
+        for i in range(3):
+            for a, e in zip(from_pack.get_template(i), from_loose.get_template(i)):
+                assert a.dtype == e.dtype and np.array_equal(a, e)
+
+        pack_path = render_template_pack.pack_template_dir(template_dir)
+        rgb_path = os.path.join(template_dir, 'rgb_0.png')
+        os.utime(rgb_path, (os.path.getmtime(pack_path) + 10,) * 2)
+        assert find_template_pack(template_dir) is None
+        print('✅ stale pack / Obj templates')
+        return True
+    finally:
+        shutil.rmtree(template_dir)
+
+
+if __name__ == '__main__':
+    print('템플릿 팩 테스트 시작...\n')
+
+    success = True
+    success &= test_full_view_roundtrip()
+    success &= test_load_templates_from_pack()
+    success &= test_stale_pack_and_obj()
+
+    print(f'\n=== 테스트 결과 ===')
+    print('✅ 모든 테스트 통과!' if success else '❌ 일부 테스트 실패')
@@ -0,0 +1,7 @@
+#!/usr/bin/env python3
+"""백그라운드 산출물 저장 (PEM 서버 설정, 구현은 sam6d_common/artifact_writer.py)"""
+from sam6d_common.artifact_writer import ArtifactWriter
+
+from .metrics import METRICS
+
+ARTIFACT_WRITER = ArtifactWriter(env_prefix="PEM_ARTIFACT", observe=METRICS.observe_stage)
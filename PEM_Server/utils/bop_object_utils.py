@@ -47,6 +47,21 @@ class Obj:
             self.template_mask = []
             self.template_pts = []
 
+            # cv2 / torchvision are only needed once templates are loaded
+            from template_pack import find_template_pack, TemplatePack
+
+            pack_path = find_template_pack(path)
+            if pack_path is not None:
+                # packed templates: no PNG decoding
+                pack = TemplatePack(pack_path)
+                for v in range(nView):
+                    i = int(pack.num_views / nView * v)
+                    rgb, mask, xyz = pack.get_full_view(i)
+                    self.template.append(rgb)
+                    self.template_mask.append(mask == 255)
+                    self.template_pts.append(xyz.astype(np.float32) / 1000.0)
+                return
+
             for v in range(nView):
                 i = int(total_nView / nView * v)
                 rgb_path = os.path.join(path, 'rgb_'+str(i)+'.png')
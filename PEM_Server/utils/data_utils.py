@@ -3,9 +3,12 @@ import numpy as np
 import json
 import imageio
 import cv2
+from functools import lru_cache
 
 from PIL import Image
 
+from sam6d_common.rle import rle_to_mask
+
 def load_im(path):
     """Loads an image from a file.
 
@@ -75,38 +78,39 @@ def rle_to_binary_mask(rle):
     :param rle: Mask in RLE format
     :return: a 2D binary numpy array where '1's represent the object
     """
-    binary_array = np.zeros(np.prod(rle.get('size')), dtype=bool)
-    counts = rle.get('counts')
+    return rle_to_mask(rle)
 
-    start = 0
-    for i in range(len(counts)-1):
-        start += counts[i] 
-        end = start + counts[i+1] 
-        binary_array[start:end] = (i + 1) % 2
 
-    binary_mask = binary_array.reshape(*rle.get('size'), order='F')
+@lru_cache(maxsize=8)
+def _pixel_ray_grid(K_key, im_H, im_W):
+    K = np.array(K_key, dtype=np.float64).reshape(3, 3)
+    xmap, ymap = np.meshgrid(np.arange(im_W, dtype=np.float64), np.arange(im_H, dtype=np.float64))
+    pixels = np.stack([xmap, ymap, np.ones_like(xmap)], axis=2)
+    rays = (pixels @ np.linalg.inv(K).T).astype(np.float32)
+    rays.setflags(write=False)
+    return rays
 
-    return binary_mask
 
+def get_pixel_ray_grid(K, im_H, im_W):
+    """Returns the per-pixel rays K^-1 [u, v, 1] of a camera, cached per (K, image size).
 
-def get_point_cloud_from_depth(depth, K, bbox=None):
-    cam_fx, cam_fy, cam_cx, cam_cy = K[0,0], K[1,1], K[0,2], K[1,2]
+    :param K: 3x3 camera intrinsic matrix.
+    :return: read-only (im_H, im_W, 3) float32 array whose last channel is 1.
+    """
+    K_key = tuple(np.asarray(K, dtype=np.float64).reshape(-1).tolist())
+    return _pixel_ray_grid(K_key, int(im_H), int(im_W))
 
+
+def get_point_cloud_from_depth(depth, K, bbox=None):
     im_H, im_W = depth.shape
-    xmap = np.array([[i for i in range(im_W)] for j in range(im_H)])
-    ymap = np.array([[j for i in range(im_W)] for j in range(im_H)])
+    rays = get_pixel_ray_grid(K, im_H, im_W)
 
     if bbox is not None:
         rmin, rmax, cmin, cmax = bbox
-        depth = depth[rmin:rmax, cmin:cmax].astype(np.float32)
-        xmap = xmap[rmin:rmax, cmin:cmax].astype(np.float32)
-        ymap = ymap[rmin:rmax, cmin:cmax].astype(np.float32)
-
-    pt2 = depth.astype(np.float32)
-    pt0 = (xmap.astype(np.float32) - cam_cx) * pt2 / cam_fx
-    pt1 = (ymap.astype(np.float32) - cam_cy) * pt2 / cam_fy
+        depth = depth[rmin:rmax, cmin:cmax]
+        rays = rays[rmin:rmax, cmin:cmax]
 
-    cloud = np.stack([pt0,pt1,pt2]).transpose((1,2,0))
+    cloud = rays * depth.astype(np.float32)[:, :, None]
     return cloud
 
 
@@ -0,0 +1,87 @@
+'''
+templates.pack 리더 (PEM 템플릿 xyz / 전체 뷰 복원과 텐서 변환, 파일 형식 / 공용 리더는 sam6d_common/template_pack.py)
+
+팩의 뷰는 마스크 bbox 로 크롭되어 있으므로 전체 이미지로 되돌리면 크롭 밖은 배경 (0)이다.
+'''
+
+import numpy as np
+import cv2
+import torch
+import torchvision.transforms as transforms
+
+from data_utils import (
+    get_bbox,
+    get_resize_rgb_choose,
+)
+from sam6d_common.template_pack import TemplatePack as _BaseTemplatePack, find_template_pack
+
+
+class TemplatePack(_BaseTemplatePack):
+    CROP_ARRAYS = ('rgb', 'mask', 'xyz')
+
+    def get_window(self, array, crop_bbox, bbox):
+        """크롭에서 전체 이미지 기준 [y1, y2, x1, x2] 윈도우를 잘라냄 (크롭 밖은 0)"""
+        y1, y2, x1, x2 = bbox
+        cy1, cy2, cx1, cx2 = crop_bbox
+        window = np.zeros((y2 - y1, x2 - x1) + array.shape[2:], dtype=array.dtype)
+        oy1, oy2 = max(y1, cy1), min(y2, cy2)
+        ox1, ox2 = max(x1, cx1), min(x2, cx2)
+        if oy1 < oy2 and ox1 < ox2:
+            window[oy1 - y1:oy2 - y1, ox1 - x1:ox2 - x1] = array[oy1 - cy1:oy2 - cy1, ox1 - cx1:ox2 - cx1]
+        return window
+
+    def get_full_view(self, view_idx):
+        """뷰의 전체 이미지 크기 (rgb, mask, xyz) (rgb_i.png / mask_i.png / xyz_i.npy 와 같음)"""
+        rgb, mask, xyz, crop_bbox = self.get_crop(view_idx)
+        full_bbox = (0, self.image_size[0], 0, self.image_size[1])
+        return (
+            self.get_window(rgb, crop_bbox, full_bbox),
+            self.get_window(mask, crop_bbox, full_bbox),
+            self.get_window(xyz, crop_bbox, full_bbox),
+        )
+
+
+_rgb_transform = transforms.Compose([
+    transforms.ToTensor(),
+    transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
+])
+
+
+def load_templates_from_pack(pack, cfg, device):
+    """
+    loose 파일 템플릿 로더와 같은 출력 (all_tem, all_tem_pts, all_tem_choose)을 크롭 윈도우만으로 계산
+    배경은 저장되지 않으므로 cfg.rgb_mask_flag 가 필요하다.
+    """
+    n_template_view = cfg.n_template_view
+    all_tem, all_tem_choose, all_tem_pts = [], [], []
+
+    for v in range(n_template_view):
+        i = int(pack.num_views / n_template_view * v)
+        rgb, mask, xyz, crop_bbox = pack.get_crop(i)
+
+        # get_bbox 와 같은 전체 크기 마스크의 정사각 bbox
+        full_mask = pack.get_window(mask == 255, crop_bbox, (0, pack.image_size[0], 0, pack.image_size[1]))
+        bbox = get_bbox(full_mask)
+        y1, y2, x1, x2 = bbox
+        mask = full_mask[y1:y2, x1:x2]
+
+        rgb = pack.get_window(rgb, crop_bbox, bbox)[:, :, ::-1]
+        rgb = rgb * (mask[:, :, None] > 0).astype(np.uint8)
+        rgb = cv2.resize(rgb, (cfg.img_size, cfg.img_size), interpolation=cv2.INTER_LINEAR)
+        rgb = _rgb_transform(np.array(rgb))
+
+        choose = (mask > 0).astype(np.float32).flatten().nonzero()[0]
+        if len(choose) <= cfg.n_sample_template_point:
+            choose_idx = np.random.choice(np.arange(len(choose)), cfg.n_sample_template_point)
+        else:
+            choose_idx = np.random.choice(np.arange(len(choose)), cfg.n_sample_template_point, replace=False)
+        choose = choose[choose_idx]
+        xyz = pack.get_window(xyz, crop_bbox, bbox).reshape((-1, 3))[choose, :].astype(np.float32) / 1000.0
+
+        rgb_choose = get_resize_rgb_choose(choose, [y1, y2, x1, x2], cfg.img_size)
+
+        all_tem.append(torch.FloatTensor(rgb).unsqueeze(0).to(device))
+        all_tem_choose.append(torch.IntTensor(rgb_choose).long().unsqueeze(0).to(device))
+        all_tem_pts.append(torch.FloatTensor(xyz).unsqueeze(0).to(device))
+
+    return all_tem, all_tem_pts, all_tem_choose
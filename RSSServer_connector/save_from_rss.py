@@ -25,6 +25,56 @@ import numpy as np
 from PIL import Image
 
 
+def align_depth_to_color(
+    depth: np.ndarray,
+    K_depth: np.ndarray,
+    K_color: np.ndarray,
+    T_depth_to_color: np.ndarray,
+    color_size: Tuple[int, int],
+    depth_unit: float = 1000.0,
+) -> np.ndarray:
+    """Register a depth image to the color frame (uint16 mm), color_size is (W, H).
+
+    Standalone copy of DepthRegistration.align in Main_Server/utils/depth_registration.py
+    (kept in sync by Main_Server/test_depth_registration.py) so this script runs without Main_Server.
+    """
+    H_d, W_d = depth.shape
+    W_c, H_c = int(color_size[0]), int(color_size[1])
+    fx_d, fy_d, cx_d, cy_d = float(K_depth[0, 0]), float(K_depth[1, 1]), float(K_depth[0, 2]), float(K_depth[1, 2])
+    fx_c, fy_c, cx_c, cy_c = float(K_color[0, 0]), float(K_color[1, 1]), float(K_color[0, 2]), float(K_color[1, 2])
+    T_depth_to_color = np.array(T_depth_to_color, dtype=float)
+    R, t = T_depth_to_color[:3, :3], T_depth_to_color[:3, 3]
+
+    # color-camera ray per depth pixel: R @ ((u - cx) / fx, (v - cy) / fy, 1)
+    uu, vv = np.meshgrid(np.arange(W_d, dtype=np.float32), np.arange(H_d, dtype=np.float32))
+    rays = np.stack([(uu - cx_d) / fx_d, (vv - cy_d) / fy_d, np.ones_like(uu)]).astype(np.float64)
+    ray_c = np.einsum('ij,jhw->ihw', R, rays)
+
+    z_m = depth.astype(np.float32) / depth_unit
+    Xc = ray_c[0] * z_m + t[0]
+    Yc = ray_c[1] * z_m + t[1]
+    Zc = ray_c[2] * z_m + t[2]
+    inv_z = 1.0 / (Zc + 1e-9)
+    uc_i = np.rint(fx_c * Xc * inv_z + cx_c).astype(np.int32)
+    vc_i = np.rint(fy_c * Yc * inv_z + cy_c).astype(np.int32)
+
+    m = (z_m > 0) & (Zc > 0) & (uc_i >= 0) & (uc_i < W_c) & (vc_i >= 0) & (vc_i < H_c)
+    flat_idx = vc_i[m].astype(np.int64) * W_c + uc_i[m]
+    z_vals = Zc[m].astype(np.float32)
+
+    # z-buffer: sort one (pixel index << 32 | float32 bits of Z) key per point;
+    # positive float32 bits sort like their values, so the first key per pixel is the nearest point
+    keys = np.sort((flat_idx << 32) | z_vals.view(np.uint32).astype(np.int64))
+    flat_sorted = keys >> 32
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = flat_sorted[1:] != flat_sorted[:-1]
+    nearest = (keys[first] & 0xFFFFFFFF).astype(np.uint32).view(np.float32)
+
+    aligned = np.zeros((H_c, W_c), dtype=np.float32)
+    aligned.reshape(-1)[flat_sorted[first]] = nearest
+    return np.clip(np.rint(aligned * 1000.0), 0, 65535).astype(np.uint16)
+
+
 def build_base_url(host: str | None, port: int | None, base: str | None) -> str:
     if base:
         return base.rstrip('/')
@@ -431,61 +481,10 @@ def main() -> None:
             # Note: PIL .size returns (W, H)
             W_c, H_c = Image.open(color_png_path).size
 
-            # convert to meters (assume input in mm if scale==1.0)
-            # depth_scale here denotes mm-per-unit if string-based; be conservative
-            z_m = depth_img / 1000.0
-
-            fx_d, fy_d, cx_d, cy_d = float(depth_cam_K[0,0]), float(depth_cam_K[1,1]), float(depth_cam_K[0,2]), float(depth_cam_K[1,2])
-            fx_c, fy_c, cx_c, cy_c = float(color_cam_K[0,0]), float(color_cam_K[1,1]), float(color_cam_K[0,2]), float(color_cam_K[1,2])
-
-            # grid of depth pixels
-            us = np.arange(W_d, dtype=np.float32)
-            vs = np.arange(H_d, dtype=np.float32)
-            uu, vv = np.meshgrid(us, vs)
-
-            Z = z_m
-            valid = Z > 0
-            Xd = (uu - cx_d) / fx_d * Z
-            Yd = (vv - cy_d) / fy_d * Z
-
-            # transform to color
-            R = T_depth_to_color[:3, :3]
-            t = T_depth_to_color[:3, 3]
-            Xc = R[0,0]*Xd + R[0,1]*Yd + R[0,2]*Z + t[0]
-            Yc = R[1,0]*Xd + R[1,1]*Yd + R[1,2]*Z + t[1]
-            Zc = R[2,0]*Xd + R[2,1]*Yd + R[2,2]*Z + t[2]
-
-            # project
-            uc = fx_c * (Xc / (Zc + 1e-9)) + cx_c
-            vc = fy_c * (Yc / (Zc + 1e-9)) + cy_c
-
-            # rasterize (nearest)
-            aligned = np.zeros((int(H_c), int(W_c)), dtype=np.float32)
-            # clamp and mask
-            uc_i = np.rint(uc).astype(np.int32)
-            vc_i = np.rint(vc).astype(np.int32)
-            m = valid & (Zc > 0) & (uc_i >= 0) & (uc_i < int(W_c)) & (vc_i >= 0) & (vc_i < int(H_c))
-            inds = np.where(m)
-            rr = vc_i[inds]
-            cc = uc_i[inds]
-            # keep nearest depth per pixel
-            flat_idx = rr * int(W_c) + cc
-            order = np.argsort(Zc[inds])
-            flat_idx = flat_idx[order]
-            z_vals = Zc[inds][order]
-            # fill with nearest
-            seen = set()
-            for i in range(len(flat_idx)):
-                k = int(flat_idx[i])
-                if k in seen:
-                    continue
-                seen.add(k)
-                r = k // int(W_c)
-                c = k % int(W_c)
-                aligned[r, c] = z_vals[i]
-
-            # save as 16-bit in millimeters
-            aligned_mm = np.clip(np.rint(aligned * 1000.0), 0, 65535).astype(np.uint16)
+            # convert to meters (assume input in mm if scale==1.0), project + nearest-depth z-buffer
+            aligned_mm = align_depth_to_color(
+                depth_img, depth_cam_K, color_cam_K, T_depth_to_color, (int(W_c), int(H_c))
+            )
             aligned_path = out_dir / 'depth_aligned_to_color.png'
             Image.fromarray(aligned_mm, mode='I;16').save(aligned_path)
             print(f"[OK ] Saved: {aligned_path}")
@@ -1,13 +1,20 @@
 from fastapi import FastAPI
 from fastapi import HTTPException
+from fastapi.responses import Response
 from pydantic import BaseModel, Field
 from typing import Optional
 import time
 
 from Render_Server.runner import start_job, get_job
+from Render_Server.metrics import METRICS
+from Render_Server.tracing import TRACER
+from sam6d_common.metrics import CONTENT_TYPE
+from sam6d_common.tracing import TracingMiddleware
 
 
 app = FastAPI(title="Render Server (minimal)")
+# 요청 추적 (Main 서버의 X-Request-ID / traceparent를 이어받고, 응답에 Server-Timing 추가)
+app.add_middleware(TracingMiddleware, tracer=TRACER)
 
 
 class RenderRequest(BaseModel):
@@ -62,3 +69,7 @@ def get_job_status(job_id: str):
     return job
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """단계별 소요 시간 히스토그램, 대기 작업 수, 메모리 (Prometheus 텍스트 형식)"""
+    return Response(content=METRICS.render(), media_type=CONTENT_TYPE)
@@ -1,3 +1,4 @@
+import contextvars
 import os
 import sys
 import time
@@ -6,6 +7,8 @@ import threading
 import subprocess
 from typing import Dict, Any
 
+from Render_Server.metrics import METRICS
+
 
 # 간단한 인메모리 작업 레지스트리
 JOBS: Dict[str, Dict[str, Any]] = {}
@@ -13,6 +16,10 @@ JOBS: Dict[str, Dict[str, Any]] = {}
 # 동시 실행 제한(필요 시 값 조정)
 _SEMAPHORE = threading.Semaphore(value=1)
 
+RENDER_JOBS = METRICS.registry.counter("render_jobs_total", "Finished render jobs by result", ["result"])
+# 세마포어를 기다리는 작업 수
+METRICS.queue_depth.set_function(lambda: sum(1 for job in list(JOBS.values()) if job.get("status") == "queued"), queue="render_jobs")
+
 
 def start_job(cad_path: str, output_dir: str, colorize: bool = False, base_color: float = 0.05, timeout_sec: int = 1800) -> str:
     job_id = str(uuid.uuid4())
@@ -23,9 +30,11 @@ def start_job(cad_path: str, output_dir: str, colorize: bool = False, base_color
         "created_at": time.time()
     }
 
+    # 요청의 추적 context를 작업 스레드로 넘김 (wait 모드면 render 단계가 Server-Timing에 포함됨)
+    context = contextvars.copy_context()
     worker = threading.Thread(
-        target=_run_job,
-        args=(job_id, cad_path, output_dir, colorize, base_color, timeout_sec),
+        target=context.run,
+        args=(_run_job, job_id, cad_path, output_dir, colorize, base_color, timeout_sec),
         daemon=True,
     )
     worker.start()
@@ -44,6 +53,7 @@ def _run_job(job_id: str, cad_path: str, output_dir: str, colorize: bool, base_c
     log_path = os.path.join(logs_dir, f"{job_id}.log")
 
     with _SEMAPHORE:
+        METRICS.observe_stage("queue_wait", time.time() - JOBS[job_id]["created_at"])
         # BlenderProc 스크립트는 python이 아닌 `blenderproc run`으로 실행해야 함
         cmd = [
             "blenderproc",
@@ -65,7 +75,7 @@ def _run_job(job_id: str, cad_path: str, output_dir: str, colorize: bool, base_c
         })
 
         try:
-            with open(log_path, "w", encoding="utf-8") as logf:
+            with open(log_path, "w", encoding="utf-8") as logf, METRICS.time_stage("render"):
                 proc = subprocess.Popen(cmd, stdout=logf, stderr=logf, cwd=os.getcwd())
                 JOBS[job_id]["pid"] = proc.pid
                 try:
@@ -78,7 +88,19 @@ def _run_job(job_id: str, cad_path: str, output_dir: str, colorize: bool, base_c
             with open(log_path, "a", encoding="utf-8") as logf:
                 logf.write(f"\n[runner] Exception: {repr(e)}\n")
 
+        # 렌더링 성공 시 templates.pack 생성 (실패해도 loose 파일은 그대로 사용 가능하므로 작업은 성공 처리)
+        if rc == 0:
+            try:
+                from Render_Server.template_pack import pack_template_dir
+                with METRICS.time_stage("template_pack"):
+                    JOBS[job_id]["pack_path"] = pack_template_dir(output_dir)
+            except Exception as e:
+                JOBS[job_id]["pack_error"] = repr(e)
+                with open(log_path, "a", encoding="utf-8") as logf:
+                    logf.write(f"\n[runner] Template pack failed: {repr(e)}\n")
+
         end_ts = time.time()
+        RENDER_JOBS.inc(result="succeeded" if rc == 0 else "failed")
         JOBS[job_id].update({
             "status": "succeeded" if rc == 0 else "failed",
             "returncode": rc,
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+템플릿 팩 (templates.pack) 생성
+
+템플릿 디렉토리의 rgb_i.png / mask_i.png / xyz_i.npy 를 하나의 비압축 파일로 묶는다.
+파일 형식과 리더는 sam6d_common/template_pack.py 에 있다.
+
+사용법 (기존 템플릿 디렉토리 일괄 변환, 저장소 루트에서):
+    python -m Render_Server.template_pack static/templates/ycb/*
+"""
+import glob
+import json
+import os
+import struct
+import sys
+from typing import Any, Dict
+
+import cv2
+import numpy as np
+
+from sam6d_common.template_pack import PACK_FILENAME, PACK_MAGIC, PACK_VERSION, align_offset
+
+
+def _count_views(template_dir: str) -> int:
+    return len(glob.glob(os.path.join(template_dir, "rgb_*.png")))
+
+
+def pack_template_dir(template_dir: str) -> str:
+    """템플릿 디렉토리의 loose 파일들로 templates.pack 생성 (임시 파일에 쓴 뒤 교체)"""
+    num_views = _count_views(template_dir)
+    if num_views == 0:
+        raise FileNotFoundError(f"No rgb_*.png templates in {template_dir}")
+
+    views, rgbs, masks, xyzs = [], [], [], []
+    image_size = None
+    num_pixels = 0
+    for idx in range(num_views):
+        bgr = cv2.imread(os.path.join(template_dir, f"rgb_{idx}.png"), cv2.IMREAD_COLOR)
+        mask = cv2.imread(os.path.join(template_dir, f"mask_{idx}.png"), cv2.IMREAD_GRAYSCALE)
+        xyz = np.load(os.path.join(template_dir, f"xyz_{idx}.npy"))
+        if bgr is None or mask is None:
+            raise IOError(f"Failed to read template view {idx} in {template_dir}")
+        if image_size is None:
+            image_size = list(mask.shape)
+
+        rows = np.flatnonzero(mask.any(axis=1))
+        cols = np.flatnonzero(mask.any(axis=0))
+        if len(rows) == 0:
+            y1 = y2 = x1 = x2 = 0
+        else:
+            y1, y2, x1, x2 = int(rows[0]), int(rows[-1]) + 1, int(cols[0]), int(cols[-1]) + 1
+
+        views.append({"index": idx, "bbox": [y1, y2, x1, x2], "offset": num_pixels})
+        rgbs.append(bgr[y1:y2, x1:x2, ::-1].reshape(-1, 3))
+        masks.append(mask[y1:y2, x1:x2].reshape(-1))
+        xyzs.append(xyz[y1:y2, x1:x2].reshape(-1, 3))
+        num_pixels += (y2 - y1) * (x2 - x1)
+
+    arrays = {
+        "rgb": np.ascontiguousarray(np.concatenate(rgbs), dtype=np.uint8),
+        "mask": np.ascontiguousarray(np.concatenate(masks), dtype=np.uint8),
+        "xyz": np.ascontiguousarray(np.concatenate(xyzs)),
+    }
+    header: Dict[str, Any] = {
+        "version": PACK_VERSION,
+        "image_size": image_size,
+        "num_views": num_views,
+        "views": views,
+        "arrays": {},
+    }
+    # 배열 오프셋은 데이터 영역 시작 기준 (데이터 영역은 헤더 뒤 64-byte 정렬 위치에서 시작)
+    offset = 0
+    for name, array in arrays.items():
+        header["arrays"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset = align_offset(offset + array.nbytes)
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = align_offset(len(PACK_MAGIC) + 8 + len(header_bytes))
+
+    pack_path = os.path.join(template_dir, PACK_FILENAME)
+    tmp_path = pack_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(PACK_MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(data_start + header["arrays"][name]["offset"])
+            f.write(array.tobytes())
+    os.replace(tmp_path, pack_path)
+    return pack_path
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m Render_Server.template_pack <template_dir> [<template_dir> ...]")
+        sys.exit(1)
+    for template_dir in sys.argv[1:]:
+        if not os.path.isdir(template_dir):
+            continue
+        try:
+            print(f"✅ {pack_template_dir(template_dir)}")
+        except Exception as e:
+            print(f"❌ {template_dir}: {e}")
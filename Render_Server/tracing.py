@@ -0,0 +1,5 @@
+#!/usr/bin/env python3
+"""요청 추적 (Render 서버 설정, 구현은 sam6d_common/tracing.py)"""
+from sam6d_common.tracing import Tracer
+
+TRACER = Tracer("render", env_prefix="RENDER")
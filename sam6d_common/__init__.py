@@ -0,0 +1,6 @@
+"""
+Main_Server / ISM_Server / PEM_Server / Render_Server가 공유하는 모듈
+
+서버별 설정 (메트릭 / 서비스 이름, 환경 변수 접두사)은 각 서버의 utils 모듈이 인스턴스를 만들 때 넘긴다.
+저장소 루트가 sys.path에 있어야 한다 (각 서버 main.py가 추가, 도커 이미지는 PYTHONPATH에 포함).
+"""
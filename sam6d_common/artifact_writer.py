@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+백그라운드 산출물 저장 (write-behind)
+
+요청 경로에서는 저장할 내용을 큐에 넣기만 하고, 파일 쓰기 / 인코딩은 전용 스레드에서 한다.
+
+- 큐는 항목 수 / 바이트 수 상한이 있으며, 가득 차면 정책에 따라 처리
+  - spill: 호출한 쪽에서 바로 저장 (유실 없음, 요청 경로로 부하가 넘어옴)
+  - drop: 저장하지 않고 버림 (dropped 카운트 증가)
+- 원본 인코딩 바이트 (PNG base64 등)는 디코딩 / 재인코딩 없이 그대로 저장 (raw passthrough)
+- 파일은 임시 파일에 쓴 뒤 교체하고, fsync는 배치 단위로 한 번에 수행
+
+서버마다 다른 설정 (환경 변수 접두사 / 단계 시간 기록)은 생성자 인자로 받고,
+각 서버의 utils/artifact_writer.py가 자기 저장기 인스턴스 (싱글톤)를 만들어 사용한다.
+"""
+import base64
+import itertools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+
+logger = logging.getLogger(__name__)
+
+_BATCH_SIZE = 32
+_tmp_counter = itertools.count()
+
+PathLike = Union[str, Path]
+
+
+def is_png_base64(data: str) -> bool:
+    """base64 문자열이 PNG 파일인지 확인 (PNG 시그니처의 base64 접두사)"""
+    return isinstance(data, str) and data.startswith("iVBORw0KGgo")
+
+
+class ArtifactWriter:
+    """백그라운드 파일 저장 스레드 + 상한 있는 큐
+
+    인자를 생략하면 환경 변수 {env_prefix}_QUEUE_SIZE / _QUEUE_MB / _QUEUE_POLICY (spill/drop) /
+    _FSYNC (batch: 배치마다 한 번에 fsync, none: fsync 안 함) / _ASYNC (false면 스레드 없이 바로 저장)
+    에서 읽고, env_prefix가 없으면 기본값을 사용한다.
+    observe: 단계 시간 기록 함수 (작업 1건은 "io", 배치 fsync / 교체는 "io_commit")
+    """
+
+    def __init__(
+        self,
+        env_prefix: Optional[str] = None,
+        max_items: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        policy: Optional[str] = None,
+        fsync: Optional[str] = None,
+        enabled: Optional[bool] = None,
+        name: str = "artifact-writer",
+        observe: Optional[Callable[[str, float], None]] = None,
+    ):
+        def env(key: str, default: str) -> str:
+            return os.getenv(f"{env_prefix}_{key}", default) if env_prefix else default
+
+        if max_items is None:
+            max_items = int(env("QUEUE_SIZE", "256"))
+        if max_bytes is None:
+            max_bytes = int(float(env("QUEUE_MB", "512")) * 1024 * 1024)
+        if policy is None:
+            policy = env("QUEUE_POLICY", "spill").lower()
+        if fsync is None:
+            fsync = env("FSYNC", "batch").lower()
+        if enabled is None:
+            enabled = env("ASYNC", "true").lower() == "true"
+        if policy not in ("spill", "drop"):
+            raise ValueError(f"Unknown artifact queue policy: {policy} (expected spill/drop)")
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.fsync = fsync == "batch"
+        self.enabled = enabled
+        self.name = name
+        self.observe = observe
+        self._queue: "queue.Queue[Optional[Tuple[Callable[[], Any], int, str]]]" = queue.Queue()
+        self._cond = threading.Condition()
+        self._pending_items = 0
+        self._pending_bytes = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stats_lock = threading.Lock()
+        self.stats = {
+            "queued": 0, "written": 0, "spilled": 0, "dropped": 0, "failed": 0,
+            "bytes_written": 0, "batches": 0, "fsync_sec": 0.0, "last_error": None,
+        }
+
+    def _count(self, key: str, amount=1):
+        # spill은 호출한 스레드에서도 저장하므로 카운터는 lock으로 보호
+        with self._stats_lock:
+            self.stats[key] += amount
+
+    # ----- 제출 API -----
+
+    def write_bytes(self, path: PathLike, data: bytes) -> bool:
+        """바이트를 그대로 저장"""
+        return self._submit(lambda: self._write_file(path, data), len(data), str(path))
+
+    def write_base64(self, path: PathLike, data: str) -> bool:
+        """base64 문자열을 디코딩만 해서 저장 (재인코딩 없음, 디코딩도 저장 스레드에서 수행)"""
+        return self._submit(lambda: self._write_file(path, base64.b64decode(data)), len(data) * 3 // 4, str(path))
+
+    def write_json(self, path: PathLike, obj: Any, indent: Optional[int] = 2) -> bool:
+        """JSON 저장 (직렬화도 저장 스레드에서 수행, 제출 후 obj를 수정하면 안 됨)"""
+        def task():
+            text = json.dumps(obj, indent=indent, ensure_ascii=False, default=str)
+            return self._write_file(path, text.encode("utf-8"))
+        return self._submit(task, 0, str(path))
+
+    def write_with(self, path: PathLike, producer: Callable[[], Optional[bytes]], size_hint: int = 0) -> bool:
+        """저장 스레드에서 producer()로 내용을 만들어 저장 (이미지 인코딩 / 시각화 등), None이면 저장 안 함"""
+        def task():
+            data = producer()
+            return self._write_file(path, data) if data is not None else None
+        return self._submit(task, size_hint, str(path))
+
+    def call(self, fn: Callable[..., Any], *args, size_hint: int = 0, **kwargs) -> bool:
+        """임의의 파일 작업 (임시 디렉토리 삭제 등)을 저장 스레드에서 실행"""
+        def task():
+            fn(*args, **kwargs)
+        return self._submit(task, size_hint, getattr(fn, "__name__", "call"))
+
+    # ----- 내부 구현 -----
+
+    def _submit(self, task: Callable[[], Any], size: int, label: str) -> bool:
+        """큐에 작업 추가 (spill이면 큐가 가득 찼을 때 바로 실행), 저장 예정이면 True"""
+        if not self.enabled:
+            return self._run_inline(task, label)
+        with self._cond:
+            full = self._pending_items >= self.max_items or (
+                self._pending_items > 0 and self._pending_bytes + size > self.max_bytes
+            )
+            if not full:
+                self._pending_items += 1
+                self._pending_bytes += size
+                self._count("queued")
+        if full:
+            if self.policy == "drop":
+                self._count("dropped")
+                logger.warning(f"[{self.name}] queue full, dropped: {label}")
+                return False
+            self._count("spilled")
+            return self._run_inline(task, label)
+        self._ensure_thread()
+        self._queue.put((task, size, label))
+        return True
+
+    def _run_inline(self, task: Callable[[], Any], label: str) -> bool:
+        try:
+            written = self._execute(task)
+            self._finalize([written] if written else [])
+            return True
+        except Exception as e:
+            self._record_failure(label, e)
+            return False
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._cond:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            while len(batch) < _BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            written: List[Tuple[int, Path, Path]] = []
+            stop = False
+            for entry in batch:
+                if entry is None:
+                    stop = True
+                    continue
+                task, size, label = entry
+                try:
+                    result = self._execute(task)
+                    if result:
+                        written.append(result)
+                except Exception as e:
+                    self._record_failure(label, e)
+            self._finalize(written)
+
+            with self._cond:
+                for entry in batch:
+                    if entry is not None:
+                        self._pending_items -= 1
+                        self._pending_bytes -= entry[1]
+                self._cond.notify_all()
+            if stop:
+                return
+
+    def _execute(self, task: Callable[[], Any]) -> Any:
+        # 작업 1건 (인코딩 + 쓰기) 소요 시간을 io 단계로 기록
+        start = time.perf_counter()
+        try:
+            return task()
+        finally:
+            if self.observe is not None:
+                self.observe("io", time.perf_counter() - start)
+
+    def _write_file(self, path: PathLike, data: bytes) -> Tuple[int, Path, Path]:
+        """임시 파일에 쓰고 fd를 반환 (fsync / 교체는 _finalize에서 배치로 처리)"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{next(_tmp_counter)}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        except Exception:
+            os.close(fd)
+            os.unlink(tmp_path)
+            raise
+        self._count("bytes_written", len(data))
+        return fd, tmp_path, path
+
+    def _finalize(self, written: List[Tuple[int, Path, Path]]):
+        """배치로 fsync 후 임시 파일을 최종 경로로 교체"""
+        if not written:
+            return
+        start = time.perf_counter()
+        for fd, tmp_path, path in written:
+            try:
+                if self.fsync:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+        dirs = set()
+        for _, tmp_path, path in written:
+            try:
+                os.replace(tmp_path, path)
+                dirs.add(str(path.parent))
+                self._count("written")
+            except OSError as e:
+                self._record_failure(str(path), e)
+        if self.fsync and hasattr(os, "O_DIRECTORY"):
+            for directory in dirs:
+                try:
+                    dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+                    try:
+                        os.fsync(dir_fd)
+                    finally:
+                        os.close(dir_fd)
+                except OSError:
+                    pass
+        elapsed = time.perf_counter() - start
+        self._count("batches")
+        self._count("fsync_sec", elapsed)
+        if self.observe is not None:
+            self.observe("io_commit", elapsed)
+
+    def _record_failure(self, label: str, error: Exception):
+        self._count("failed")
+        with self._stats_lock:
+            self.stats["last_error"] = f"{label}: {error}"
+        logger.warning(f"[{self.name}] failed to write {label}: {error}")
+
+    # ----- 관리 -----
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """큐의 작업이 모두 저장될 때까지 대기 (timeout 초과 시 False)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending_items > 0:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = 30.0) -> bool:
+        """남은 작업을 저장하고 스레드 종료"""
+        flushed = self.flush(timeout)
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+        self._thread = None
+        return flushed
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond, self._stats_lock:
+            return {
+                "enabled": self.enabled,
+                "policy": self.policy,
+                "fsync": "batch" if self.fsync else "none",
+                "pending_items": self._pending_items,
+                "pending_bytes": self._pending_bytes,
+                "max_items": self.max_items,
+                "max_bytes": self.max_bytes,
+                **self.stats,
+                "fsync_sec": round(self.stats["fsync_sec"], 4),
+            }
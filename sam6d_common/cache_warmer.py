@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+템플릿 / CAD 캐시 백그라운드 워밍 (/cache/warm, /cache/evict, /cache/stats)
+
+요청 처리와 별도의 워커 스레드 하나가 대기열의 객체를 순서대로 캐시에 올린다.
+추론 요청은 워밍을 기다리지 않으며, 로드는 캐시 lock 밖에서 하고 저장할 때만 lock을 잡는다.
+
+- 이미 대기 중이거나 로드 중인 객체는 다시 넣지 않음 (duplicate)
+- 대기열 상한을 넘는 객체는 거절 (rejected)
+- 요청이 지금 워밍 중인 객체를 필요로 하면 wait_for로 끝날 때까지 기다려서 두 번 로드하지 않음
+- 클래스 이름만 주면 해당 클래스의 객체 전체 (캐시 용량까지)
+
+대기열 상한 / 워밍 시간 기록 함수는 각 서버가 자기 설정으로 넘긴다 (ISM_Server / PEM_Server).
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+CAD_EXTENSIONS = (".ply", ".obj", ".stl")
+
+
+@dataclass
+class WarmItem:
+    """워밍할 객체 하나 (key: 템플릿 캐시 키)"""
+    key: str
+    class_name: str
+    object_name: str
+    template_dir: str
+    cad_path: Optional[str] = None
+
+
+def find_cad_path(meshes_root: str, class_name: str, object_name: str) -> Optional[str]:
+    for ext in CAD_EXTENSIONS:
+        candidate = os.path.join(meshes_root, class_name, f"{object_name}{ext}")
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def resolve_targets(
+    targets: Iterable[Any],
+    templates_root: str,
+    meshes_root: str,
+    limit: Optional[int] = None,
+) -> List[WarmItem]:
+    """class_name / object_name / template_dir / cad_path 속성을 가진 요청 항목 목록 → WarmItem 목록
+
+    object_name이 없으면 templates_root/class_name 아래 객체 전체 (limit개까지).
+    template_dir / cad_path를 주면 (Main 서버 warm hint) 디스크 배치 대신 그 경로를 사용한다.
+    """
+    items: List[WarmItem] = []
+    for target in targets:
+        class_name = target.class_name
+        object_name = getattr(target, "object_name", None)
+        if object_name:
+            names = [object_name]
+        else:
+            class_dir = os.path.join(templates_root, class_name)
+            names = sorted(
+                name for name in os.listdir(class_dir) if os.path.isdir(os.path.join(class_dir, name))
+            ) if os.path.isdir(class_dir) else []
+        for name in names:
+            template_dir = getattr(target, "template_dir", None) if object_name else None
+            template_dir = os.path.abspath(template_dir or os.path.join(templates_root, class_name, name))
+            cad_path = getattr(target, "cad_path", None) if object_name else None
+            cad_path = os.path.abspath(cad_path) if cad_path else find_cad_path(meshes_root, class_name, name)
+            items.append(WarmItem(template_dir, class_name, name, template_dir, cad_path))
+            if limit is not None and len(items) >= limit:
+                return items
+    return items
+
+
+class CacheWarmer:
+    """백그라운드 캐시 워밍 대기열 + 워커 스레드 하나
+
+    warm_fn(item)은 워커 스레드에서 호출되며 "loaded" (새로 로드) 또는 "cached" (이미 있음)를 반환한다.
+    max_pending: 대기열에 둘 수 있는 최대 객체 수
+    observe: 단계 시간 기록 함수 (새로 로드한 객체의 시간을 "cache_warm"으로 기록)
+    """
+
+    def __init__(
+        self,
+        warm_fn: Callable[[WarmItem], str],
+        max_pending: int,
+        observe: Optional[Callable[[str, float], None]] = None,
+    ):
+        self.warm_fn = warm_fn
+        self.max_pending = max_pending
+        self.observe = observe
+        self._cond = threading.Condition()
+        self._pending: "OrderedDict[str, WarmItem]" = OrderedDict()
+        self._loading: Optional[WarmItem] = None
+        self._thread: Optional[threading.Thread] = None
+        self._recent: deque = deque(maxlen=20)
+        self.stats = {"submitted": 0, "loaded": 0, "cached": 0, "failed": 0, "duplicate": 0,
+                      "rejected": 0, "cancelled": 0, "waited": 0}
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="cache-warmer", daemon=True)
+            self._thread.start()
+
+    def submit(self, items: Iterable[WarmItem]) -> Dict[str, List[str]]:
+        """대기열에 추가 (바로 반환), 객체별 처리 결과 (queued / duplicate / rejected)"""
+        result: Dict[str, List[str]] = {"queued": [], "duplicate": [], "rejected": []}
+        with self._cond:
+            for item in items:
+                name = f"{item.class_name}/{item.object_name}"
+                if item.key in self._pending or (self._loading is not None and self._loading.key == item.key):
+                    result["duplicate"].append(name)
+                elif len(self._pending) >= self.max_pending:
+                    result["rejected"].append(name)
+                else:
+                    self._pending[item.key] = item
+                    result["queued"].append(name)
+            self.stats["submitted"] += len(result["queued"])
+            self.stats["duplicate"] += len(result["duplicate"])
+            self.stats["rejected"] += len(result["rejected"])
+            if result["queued"]:
+                self._ensure_thread()
+                self._cond.notify_all()
+        return result
+
+    def cancel(self, keys: Optional[Iterable[str]] = None) -> int:
+        """대기 중인 객체 취소 (keys가 없으면 전체), 취소한 수 반환"""
+        with self._cond:
+            targets = list(self._pending) if keys is None else [k for k in keys if k in self._pending]
+            for key in targets:
+                del self._pending[key]
+            self.stats["cancelled"] += len(targets)
+            return len(targets)
+
+    def wait_for(self, key: str, timeout: Optional[float] = None) -> bool:
+        """key를 지금 로드 중이면 끝날 때까지 대기 (대기했으면 True)"""
+        with self._cond:
+            if self._loading is None or self._loading.key != key:
+                return False
+            self.stats["waited"] += 1
+            self._cond.wait_for(lambda: self._loading is None or self._loading.key != key, timeout)
+            return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending)
+                _, item = self._pending.popitem(last=False)
+                self._loading = item
+            start = time.perf_counter()
+            outcome, error = "failed", None
+            try:
+                outcome = self.warm_fn(item)
+            except Exception as e:
+                error = repr(e)
+                logger.warning(f"Cache warm failed for {item.class_name}/{item.object_name}: {e}")
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._cond:
+                    self._loading = None
+                    self.stats[outcome if outcome in ("loaded", "cached") else "failed"] += 1
+                    self._recent.append({"object": f"{item.class_name}/{item.object_name}", "result": outcome,
+                                         "sec": round(elapsed, 3), "error": error})
+                    self._cond.notify_all()
+            if outcome == "loaded" and self.observe is not None:
+                self.observe("cache_warm", elapsed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "pending": [f"{item.class_name}/{item.object_name}" for item in self._pending.values()],
+                "loading": f"{self._loading.class_name}/{self._loading.object_name}" if self._loading else None,
+                "max_pending": self.max_pending,
+                "recent": list(self._recent),
+                **self.stats,
+            }
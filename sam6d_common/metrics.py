@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Prometheus 텍스트 형식 메트릭 (외부 라이브러리 없이 구현)
+
+- /metrics 엔드포인트가 render() 결과를 그대로 반환 → 로컬 Prometheus가 스크랩
+- 기록 비용은 관측 1회당 lock + 버킷 이진 탐색 정도라 운영 환경에서 켜 둔 채로 사용
+- 캐시 적중률 / 큐 깊이 / 메모리 같은 값은 콜백 게이지로 등록해서 스크랩 시점에만 계산
+
+각 서버의 utils/metrics.py (Render_Server/metrics.py)가 자기 이름 접두사로 ServiceMetrics
+(공통 메트릭 + time_stage / observe_stage) 인스턴스 METRICS를 하나 만들어 사용한다.
+"""
+import bisect
+import functools
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .tracing import span as trace_span
+
+
+# 단계 소요 시간 버킷 (초): ms 단위 디코딩부터 수십 초 렌더링까지
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[Tuple[str, Sequence[str], Sequence[str], float]]:
+        """(이름, 라벨 이름, 라벨 값, 값) 목록"""
+        raise NotImplementedError
+
+    def render(self, lines: List[str]):
+        samples = self.samples()
+        lines.append(f"# HELP {self.name} {self.documentation}")
+        lines.append(f"# TYPE {self.name} {self.type_name}")
+        for name, labelnames, labelvalues, value in samples:
+            lines.append(f"{name}{_format_labels(labelnames, labelvalues)} {_format_value(value)}")
+
+
+class Counter(_Metric):
+    """증가만 하는 값 (이름은 _total로 끝나야 함)"""
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, self.labelnames, key, value) for key, value in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    """현재 값 (직접 set 하거나, 스크랩 시점에 호출되는 콜백으로 계산)"""
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._functions: Dict[Optional[LabelValues], Callable[[], Any]] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def set_function(self, fn: Callable[[], Any], **labels):
+        """스크랩 시 fn() 값을 사용
+
+        라벨을 지정하면 fn()은 숫자 하나를 반환하고,
+        라벨 없이 등록하면 (라벨이 있는 게이지에서) fn()은 {라벨 값 튜플: 숫자} dict를 반환한다.
+        None을 반환하면 해당 시계열은 생략된다.
+        """
+        key = self._key(labels) if labels or not self.labelnames else None
+        with self._lock:
+            self._functions[key] = fn
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+            functions = list(self._functions.items())
+        for key, fn in functions:
+            try:
+                result = fn()
+            except Exception:
+                # 콜백 실패가 스크랩 전체를 망가뜨리지 않도록 해당 값만 생략
+                continue
+            if key is None and isinstance(result, dict):
+                for sub_key, value in result.items():
+                    if value is not None:
+                        values[tuple(str(v) for v in sub_key)] = float(value)
+            elif result is not None:
+                values[key if key is not None else ()] = float(result)
+        return [(self.name, self.labelnames, key, value) for key, value in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    """버킷별 관측 횟수 + 합계 (Prometheus histogram)"""
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 값 -> [버킷별 횟수 (+Inf 포함, 누적 아님), 합계]
+        self._series: Dict[LabelValues, List[Any]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return sum(series[0]) if series else 0
+
+    def samples(self):
+        with self._lock:
+            snapshot = [(key, list(series[0]), series[1]) for key, series in sorted(self._series.items())]
+        names = self.labelnames + ("le",)
+        samples = []
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                samples.append((f"{self.name}_bucket", names, key + (le,), cumulative))
+            samples.append((f"{self.name}_sum", self.labelnames, key, total))
+            samples.append((f"{self.name}_count", self.labelnames, key, cumulative))
+        return samples
+
+
+class Registry:
+    """메트릭 모음 (이름에 namespace 접두사를 붙이고, 같은 이름은 같은 객체를 반환)"""
+
+    def __init__(self, namespace: str = ""):
+        self.namespace = namespace
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Iterable[str], **kwargs):
+        full_name = f"{self.namespace}_{name}" if self.namespace else name
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if metric is None:
+                metric = self._metrics[full_name] = cls(full_name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {full_name} already registered as {metric.type_name}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식 (0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            metric.render(lines)
+        return "\n".join(lines) + "\n"
+
+
+def _cuda():
+    """torch가 이미 import되어 있고 CUDA를 쓸 수 있으면 torch.cuda (메트릭 때문에 torch를 import하지 않음)"""
+    torch = sys.modules.get("torch")
+    if torch is None:
+        return None
+    try:
+        return torch.cuda if torch.cuda.is_available() and torch.cuda.is_initialized() else None
+    except Exception:
+        return None
+
+
+def _host_memory_bytes() -> Optional[float]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        try:
+            import resource
+            # /proc이 없는 환경: 최대 RSS (Linux는 KB, macOS는 byte)
+            usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return usage if sys.platform == "darwin" else usage * 1024
+        except Exception:
+            return None
+
+
+def _gpu_memory(kind: str) -> Dict[LabelValues, float]:
+    cuda = _cuda()
+    if cuda is None:
+        return {}
+    read = cuda.memory_allocated if kind == "allocated" else cuda.memory_reserved
+    return {(str(i),): read(i) for i in range(cuda.device_count())}
+
+
+class ServiceMetrics:
+    """서버 하나의 공통 메트릭 (단계 소요 시간 / 캐시 / 큐 / 메모리)과 기록 함수
+
+    namespace: 메트릭 이름 접두사 (ism → ism_stage_duration_seconds)
+    cuda_sync: instrument_method로 감싼 GPU 단계에서 torch.cuda.synchronize() 호출 여부
+        (정확하지만 파이프라인이 약간 느려짐, 생략하면 {env_prefix}_METRICS_CUDA_SYNC)
+    """
+
+    def __init__(self, namespace: str, env_prefix: Optional[str] = None, cuda_sync: Optional[bool] = None):
+        if cuda_sync is None:
+            cuda_sync = env_prefix is not None and os.getenv(f"{env_prefix}_METRICS_CUDA_SYNC", "false").lower() == "true"
+        self.registry = registry = Registry(namespace)
+        self.cuda_sync = cuda_sync
+        self.stage_seconds = registry.histogram("stage_duration_seconds", "Latency of each processing stage in seconds", ["stage"])
+        self.cache_hit_ratio = registry.gauge("cache_hit_ratio", "Cache hit ratio since start (hits / lookups)", ["cache"])
+        self.cache_entries = registry.gauge("cache_entries", "Number of entries currently cached", ["cache"])
+        self.queue_depth = registry.gauge("queue_depth", "Number of items waiting in a queue", ["queue"])
+        self.host_memory = registry.gauge("process_resident_memory_bytes", "Resident memory of this process in bytes")
+        self.gpu_memory_allocated = registry.gauge("gpu_memory_allocated_bytes", "GPU memory allocated by tensors in bytes", ["device"])
+        self.gpu_memory_reserved = registry.gauge("gpu_memory_reserved_bytes", "GPU memory reserved by the caching allocator in bytes", ["device"])
+        self.host_memory.set_function(_host_memory_bytes)
+        self.gpu_memory_allocated.set_function(lambda: _gpu_memory("allocated"))
+        self.gpu_memory_reserved.set_function(lambda: _gpu_memory("reserved"))
+
+    @contextmanager
+    def time_stage(self, stage: str, cuda_sync: bool = False):
+        """with 블록 소요 시간을 stage_duration_seconds{stage=...}에 기록 (추적 중이면 같은 이름의 span도 기록)"""
+        start = time.perf_counter()
+        with trace_span(stage):
+            try:
+                yield
+            finally:
+                if cuda_sync:
+                    cuda = _cuda()
+                    if cuda is not None:
+                        cuda.synchronize()
+                self.stage_seconds.observe(time.perf_counter() - start, stage=stage)
+
+    def observe_stage(self, stage: str, seconds: float):
+        """이미 측정한 단계 소요 시간 기록"""
+        self.stage_seconds.observe(seconds, stage=stage)
+
+    def instrument_method(self, obj: Any, method_name: str, stage: str, cuda_sync: Optional[bool] = None):
+        """객체의 메서드 호출 시간을 stage로 기록하도록 감싸기 (외부 코어가 호출하는 모델 메서드 계측용)"""
+        original = getattr(obj, method_name)
+        if getattr(original, "_metrics_stage", None) is not None:
+            return
+        cuda_sync = self.cuda_sync if cuda_sync is None else cuda_sync
+
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            with self.time_stage(stage, cuda_sync=cuda_sync):
+                return original(*args, **kwargs)
+
+        wrapper._metrics_stage = stage
+        setattr(obj, method_name, wrapper)
+
+    def render(self) -> str:
+        return self.registry.render()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+COCO RLE 유틸리티 (비압축 RLE, NumPy 벡터화)
+
+ISM 서버 (마스크 인코딩), Main 서버 (박스 마스크 / detection_ism.json), PEM 서버 (마스크 디코딩)가 함께 쓴다.
+"""
+from typing import Any, Dict, List
+
+import numpy as np
+
+
+def _counts_from_changes(change_indices, first_value, num_pixels) -> List[int]:
+    """Fortran 순서 마스크에서 값이 바뀌는 (정렬된) 위치 → run 길이 (COCO RLE는 항상 0-run으로 시작)"""
+    counts = np.diff(np.concatenate(([0], change_indices, [num_pixels])))
+    if first_value:
+        counts = np.concatenate(([0], counts))
+    return counts.tolist()
+
+
+def mask_to_rle(binary_mask: np.ndarray) -> Dict[str, Any]:
+    """H x W 바이너리 마스크를 비압축 COCO RLE {"size": [H, W], "counts": [...]}로 변환"""
+    binary_mask = np.asarray(binary_mask)
+    h, w = binary_mask.shape
+    flat = binary_mask.ravel(order="F") != 0
+    change_indices = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    counts = _counts_from_changes(change_indices, flat.size > 0 and flat[0], flat.size)
+    return {"size": [int(h), int(w)], "counts": counts}
+
+
+def masks_to_rle_torch(masks) -> List[Dict[str, Any]]:
+    """
+    N x H x W 마스크 텐서 (장치 무관)를 비압축 COCO RLE 리스트로 변환
+    값이 바뀌는 위치는 장치에서 찾고 호스트로는 한 번만 복사한다.
+    """
+    n, h, w = masks.shape
+    if n == 0:
+        return []
+    flat = masks.permute(0, 2, 1).reshape(n, h * w) != 0
+    changes = (flat[:, 1:] != flat[:, :-1]).nonzero()
+    first_values = flat[:, 0].cpu().numpy()
+    changes = changes.cpu().numpy()
+
+    rows, change_indices = changes[:, 0], changes[:, 1] + 1
+    splits = np.searchsorted(rows, np.arange(1, n))
+    return [
+        {"size": [h, w], "counts": _counts_from_changes(idx, first_values[i], h * w)}
+        for i, idx in enumerate(np.split(change_indices, splits))
+    ]
+
+
+def rle_to_mask(rle: Dict[str, Any]) -> np.ndarray:
+    """비압축 COCO RLE → H x W bool 마스크 (counts가 덮지 않는 픽셀은 배경)"""
+    h, w = rle["size"]
+    counts = np.asarray(rle["counts"], dtype=np.int64)
+    values = (np.arange(len(counts)) % 2).astype(bool)
+    flat = np.repeat(values, counts)[: h * w]
+    if flat.size < h * w:
+        flat = np.concatenate((flat, np.zeros(h * w - flat.size, dtype=bool)))
+    return flat.reshape(h, w, order="F")
+
+
+def bbox_to_rle(x1: int, y1: int, x2: int, y2: int, h: int, w: int) -> Dict[str, Any]:
+    """[x1, x2) x [y1, y2) 사각형 마스크의 RLE를 마스크 생성 없이 직접 계산"""
+    box_h, box_w = y2 - y1, x2 - x1
+    if box_h == h:
+        # 열 사이 0-run이 없으므로 1-run 하나로 합쳐짐
+        counts: List[int] = [x1 * h, box_w * h, (w - x2) * h]
+    else:
+        counts = [x1 * h + y1] + [box_h, h - box_h] * box_w
+        counts[-1] = (h - y2) + (w - x2) * h
+    if counts[-1] == 0:
+        counts.pop()
+    return {"size": [int(h), int(w)], "counts": [int(c) for c in counts]}
+
+
+def detections_to_bop(detections: Dict[str, Any], inference_time: float) -> List[Dict[str, Any]]:
+    """응답 형식 감지 결과 (RLE 마스크) → detection_ism.json 형식 (BOP 감지 리스트)"""
+    results = []
+    for i, score in enumerate(detections.get("scores") or []):
+        x1, y1, x2, y2 = [float(v) for v in detections["boxes"][i]]
+        object_ids = detections.get("object_ids") or []
+        masks = detections.get("masks") or []
+        results.append({
+            "scene_id": 0,
+            "image_id": 0,
+            "category_id": int(object_ids[i]) + 1 if i < len(object_ids) else 1,
+            "bbox": [x1, y1, x2 - x1, y2 - y1],
+            "score": float(score),
+            "time": inference_time,
+            "segmentation": masks[i] if i < len(masks) else None,
+        })
+    return results
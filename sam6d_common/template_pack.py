@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+템플릿 팩 (templates.pack) 파일 형식과 공용 리더
+
+Render 서버가 쓰고 (Render_Server/template_pack.py) ISM / PEM 서버가 읽는다.
+각 뷰는 마스크(>0)의 tight bbox로 크롭되어 연속 배열에 이어 붙여지고, 헤더(JSON 인덱스)에
+뷰별 bbox [y1, y2, x1, x2]와 픽셀 오프셋이 기록된다. 리더는 np.memmap 으로 PNG 디코딩 없이 (zero-copy) 읽는다.
+
+파일 구조:
+    MAGIC (8 bytes) | header length (uint64 LE) | header (JSON, utf-8) | 64-byte 정렬된 배열 데이터
+    (배열 offset은 데이터 영역 시작 기준)
+
+텐서 변환 (ISM 템플릿 / PEM 템플릿 포인트)은 각 서버의 utils/template_pack.py 에 있다.
+"""
+import json
+import os
+import struct
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+PACK_FILENAME = "templates.pack"
+PACK_MAGIC = b"S6DTPK01"
+PACK_VERSION = 1
+PACK_ALIGN = 64
+
+
+def align_offset(offset: int) -> int:
+    """PACK_ALIGN 배수로 올림"""
+    return -(-offset // PACK_ALIGN) * PACK_ALIGN
+
+
+def read_pack_header(pack_path: str) -> Dict[str, Any]:
+    """헤더 (JSON 인덱스)를 읽고 데이터 영역 시작 위치 (data_start)를 추가해 반환"""
+    with open(pack_path, "rb") as f:
+        if f.read(len(PACK_MAGIC)) != PACK_MAGIC:
+            raise ValueError(f"Not a template pack: {pack_path}")
+        (header_len,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(header_len).decode("utf-8"))
+    header["data_start"] = align_offset(len(PACK_MAGIC) + 8 + header_len)
+    return header
+
+
+def find_template_pack(template_dir: str) -> Optional[str]:
+    """팩이 있고 loose 템플릿보다 오래되지 않았으면 팩 경로, 아니면 None"""
+    pack_path = os.path.join(template_dir, PACK_FILENAME)
+    if not os.path.isfile(pack_path):
+        return None
+    loose_path = os.path.join(template_dir, "rgb_0.png")
+    if os.path.exists(loose_path) and os.path.getmtime(loose_path) > os.path.getmtime(pack_path):
+        return None
+    return pack_path
+
+
+class TemplatePack:
+    """templates.pack 리더 (배열은 np.memmap, get_crop은 CROP_ARRAYS 배열들의 뷰별 크롭을 반환)"""
+
+    CROP_ARRAYS = ("rgb", "mask")
+
+    def __init__(self, pack_path: str):
+        header = read_pack_header(pack_path)
+        self.path = pack_path
+        self.image_size = tuple(header["image_size"])
+        self.num_views = header["num_views"]
+        self.views = header["views"]
+        self.arrays = {
+            name: np.memmap(
+                pack_path,
+                dtype=np.dtype(meta["dtype"]),
+                mode="r",
+                offset=header["data_start"] + meta["offset"],
+                shape=tuple(meta["shape"]),
+            )
+            if np.prod(meta["shape"]) > 0
+            else np.zeros(meta["shape"], dtype=np.dtype(meta["dtype"]))
+            for name, meta in header["arrays"].items()
+        }
+
+    def get_crop(self, view_idx: int):
+        """뷰의 CROP_ARRAYS 크롭 (zero-copy)들과 이미지 안의 bbox (y1, y2, x1, x2)"""
+        view = self.views[view_idx]
+        y1, y2, x1, x2 = view["bbox"]
+        start, end = view["offset"], view["offset"] + (y2 - y1) * (x2 - x1)
+        crops = tuple(
+            self.arrays[name][start:end].reshape((y2 - y1, x2 - x1) + self.arrays[name].shape[1:])
+            for name in self.CROP_ARRAYS
+        )
+        return crops + ((y1, y2, x1, x2),)
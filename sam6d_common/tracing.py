@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+요청 추적 (correlation ID + 중첩 span)
+
+- 추적 ID는 W3C traceparent / X-Request-ID 헤더로 서버 간에 전달
+- span은 contextvars로 중첩 관계를 유지 (await / asyncio.to_thread에서도 유지됨)
+- 각 서버는 응답의 Server-Timing 헤더로 span 시간을 돌려주고,
+  호출한 쪽은 이를 자신의 추적에 원격 span으로 붙여 단계별 waterfall을 만든다
+- 완료된 추적은 선택적으로 JSONL 파일 / OTLP HTTP(JSON) 수집기로 내보냄 (백그라운드 스레드)
+
+서버마다 다른 설정 (서비스 이름 / 환경 변수 접두사 / 내보내기)은 Tracer 인스턴스가 갖고,
+각 서버의 utils/tracing.py (Render_Server/tracing.py)가 자기 Tracer (TRACER)를 하나 만들어 사용한다.
+span context (contextvars)는 모듈 전역이라 in-process 모드에서도 하나의 추적으로 이어진다.
+"""
+import contextvars
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+import urllib.request
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+TRACEPARENT_HEADER = "traceparent"
+# 추적하지 않는 경로 (헬스 체크 / 스크랩)
+UNTRACED_PATHS = {"/health", "/api/v1/health", "/metrics"}
+
+# 추적 1건당 최대 span 수 (Server-Timing 헤더 / 메모리 상한)
+MAX_SPANS = 256
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+_TOKEN_RE = re.compile(r"[^A-Za-z0-9_.\-]")
+
+
+class Span:
+    """추적의 한 구간 (start / end는 time.perf_counter 기준)"""
+
+    __slots__ = ("name", "span_id", "parent_id", "start", "end", "server", "attributes")
+
+    def __init__(self, name: str, parent_id: Optional[str], start: float, server: str):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start = start
+        self.end: Optional[float] = None
+        self.server = server
+        self.attributes: Dict[str, Any] = {}
+
+
+class Trace:
+    """요청 하나의 span 모음 (service: 이 프로세스의 서비스 이름, 다른 server의 span은 원격 span)"""
+
+    def __init__(
+        self,
+        service: str,
+        trace_id: Optional[str] = None,
+        parent_span_id: Optional[str] = None,
+        request_id: Optional[str] = None,
+    ):
+        self.service = service
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.request_id = request_id or self.trace_id
+        self.parent_span_id = parent_span_id
+        self.t0 = time.perf_counter()
+        self.wall_t0 = time.time()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def start_span(self, name: str, parent_id: Optional[str], start: Optional[float] = None, server: Optional[str] = None) -> Span:
+        span = Span(name, parent_id, time.perf_counter() if start is None else start, server or self.service)
+        with self._lock:
+            if len(self.spans) < MAX_SPANS:
+                self.spans.append(span)
+        return span
+
+    def _children(self) -> Dict[Optional[str], List[Span]]:
+        with self._lock:
+            spans = list(self.spans)
+        children: Dict[Optional[str], List[Span]] = {}
+        for span in spans:
+            children.setdefault(span.parent_id, []).append(span)
+        return children
+
+    def _walk(self, root: Span) -> Iterator[tuple]:
+        """root와 하위 span을 (span, depth) 순서로 (시작 시간 순)"""
+        children = self._children()
+        stack = [(root, 0)]
+        while stack:
+            span, depth = stack.pop()
+            yield span, depth
+            for child in sorted(children.get(span.span_id, []), key=lambda s: s.start, reverse=True):
+                stack.append((child, depth + 1))
+
+    def root(self) -> Optional[Span]:
+        with self._lock:
+            return self.spans[0] if self.spans else None
+
+    def server_timing(self, root: Optional[Span] = None) -> str:
+        """Server-Timing 헤더 값 (로컬 span만, start는 root 기준 ms, depth는 중첩 깊이)"""
+        root = root or self.root()
+        if root is None:
+            return ""
+        now = time.perf_counter()
+        entries = []
+        for span, depth in self._walk(root):
+            if span.server != self.service:
+                continue
+            duration = ((span.end or now) - span.start) * 1000
+            start = (span.start - root.start) * 1000
+            entries.append(f"{_TOKEN_RE.sub('_', span.name)};dur={duration:.1f};start={start:.1f};depth={depth}")
+        return ", ".join(entries)
+
+    def add_remote_timing(self, header: Optional[str], parent: Span, server: str):
+        """하위 서버의 Server-Timing 헤더를 parent (HTTP 호출 span) 아래 원격 span으로 추가
+
+        서버 간 시계 차이를 알 수 없으므로, 호출 시간과 원격 처리 시간의 차이 (네트워크 / 직렬화)를
+        요청 / 응답에 반씩 나눠 원격 root의 시작 시점을 추정한다.
+        """
+        entries = parse_server_timing(header)
+        if not entries or parent.end is None:
+            return
+        remote_total = max(e["dur"] for e in entries if e["depth"] == 0) / 1000 if any(e["depth"] == 0 for e in entries) else 0.0
+        offset = parent.start + max(0.0, (parent.end - parent.start) - remote_total) / 2
+        parents = {-1: parent.span_id}
+        for entry in entries:
+            depth = entry["depth"]
+            span = self.start_span(entry["name"], parents.get(depth - 1, parent.span_id), offset + entry["start"] / 1000, server)
+            span.end = span.start + entry["dur"] / 1000
+            parents[depth] = span.span_id
+
+    def waterfall(self, root: Optional[Span] = None) -> List[Dict[str, Any]]:
+        """단계별 지연 waterfall (root 기준 시작 시간 / 소요 시간, ms)"""
+        root = root or self.root()
+        if root is None:
+            return []
+        now = time.perf_counter()
+        return [
+            {
+                "name": span.name,
+                "server": span.server,
+                "depth": depth,
+                "start_ms": round((span.start - root.start) * 1000, 1),
+                "duration_ms": round(((span.end or now) - span.start) * 1000, 1),
+            }
+            for span, depth in self._walk(root)
+        ]
+
+    def to_record(self) -> Dict[str, Any]:
+        """JSONL 기록 (로컬 span만)"""
+        with self._lock:
+            spans = [span for span in self.spans if span.server == self.service]
+        return {
+            "trace_id": self.trace_id,
+            "request_id": self.request_id,
+            "service": self.service,
+            "spans": [
+                {
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id or self.parent_span_id,
+                    "name": span.name,
+                    "start_unix_nano": self._unix_nano(span.start),
+                    "end_unix_nano": self._unix_nano(span.end if span.end is not None else span.start),
+                    "attributes": span.attributes,
+                }
+                for span in spans
+            ],
+        }
+
+    def _unix_nano(self, perf: float) -> int:
+        return int((self.wall_t0 + (perf - self.t0)) * 1e9)
+
+
+_current_trace: "contextvars.ContextVar[Optional[Trace]]" = contextvars.ContextVar("current_trace", default=None)
+_current_span: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("current_span", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """현재 추적에 중첩 span 추가 (추적 중이 아니면 아무것도 하지 않음)"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    parent = _current_span.get()
+    current = trace.start_span(name, parent.span_id if parent else None)
+    current.attributes.update(attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+
+
+def propagation_headers() -> Dict[str, str]:
+    """하위 서버 호출에 붙일 헤더 (X-Request-ID + traceparent)"""
+    trace = _current_trace.get()
+    if trace is None:
+        return {}
+    parent = _current_span.get()
+    parent_id = parent.span_id if parent else (trace.parent_span_id or uuid.uuid4().hex[:16])
+    return {
+        REQUEST_ID_HEADER: trace.request_id,
+        TRACEPARENT_HEADER: f"00-{trace.trace_id}-{parent_id}-01",
+    }
+
+
+def parse_server_timing(header: Optional[str]) -> List[Dict[str, Any]]:
+    """Server-Timing 헤더 → [{name, dur, start, depth}] (start / depth가 없으면 0)"""
+    entries = []
+    for part in (header or "").split(","):
+        fields = [f.strip() for f in part.split(";") if f.strip()]
+        if not fields:
+            continue
+        entry = {"name": fields[0], "dur": 0.0, "start": 0.0, "depth": 0}
+        for field in fields[1:]:
+            key, _, value = field.partition("=")
+            try:
+                if key in ("dur", "start"):
+                    entry[key] = float(value.strip('"'))
+                elif key == "depth":
+                    entry[key] = int(value.strip('"'))
+            except ValueError:
+                pass
+        entries.append(entry)
+    return entries
+
+
+def record_remote_timing(parent: Optional[Span], header: Optional[str], server: str):
+    """하위 서버 응답의 Server-Timing을 현재 추적에 추가 (parent는 끝난 HTTP 호출 span)"""
+    trace = _current_trace.get()
+    if trace is not None and parent is not None:
+        trace.add_remote_timing(header, parent, server)
+
+
+class Tracer:
+    """서비스 하나의 추적 설정 (서비스 이름 + 완료된 추적 내보내기)
+
+    sink: 완료된 추적을 한 줄씩 기록할 JSONL 파일 ({env_prefix}_TRACE_SINK, 비어 있으면 기록 안 함)
+    otlp_endpoint: OTLP/HTTP 수집기 주소 ({env_prefix}_TRACE_OTLP_ENDPOINT,
+        예: http://localhost:4318/v1/traces, 비어 있으면 전송 안 함)
+    """
+
+    def __init__(
+        self,
+        service: str,
+        env_prefix: Optional[str] = None,
+        sink: Optional[str] = None,
+        otlp_endpoint: Optional[str] = None,
+    ):
+        self.service = service
+        if sink is None:
+            sink = os.getenv(f"{env_prefix}_TRACE_SINK", "") if env_prefix else ""
+        if otlp_endpoint is None:
+            otlp_endpoint = os.getenv(f"{env_prefix}_TRACE_OTLP_ENDPOINT", "") if env_prefix else ""
+        self.sink = sink
+        self.otlp_endpoint = otlp_endpoint
+        self._export_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=1000)
+        self._export_thread: Optional[threading.Thread] = None
+        self._export_lock = threading.Lock()
+
+    @contextmanager
+    def start_trace(self, name: str, request_id: Optional[str] = None, traceparent: Optional[str] = None):
+        """새 추적 시작 (traceparent가 있으면 상위 서버의 추적을 이어감), 끝나면 내보내기"""
+        trace_id, parent_span_id = None, None
+        match = _TRACEPARENT_RE.match((traceparent or "").strip().lower())
+        if match:
+            trace_id, parent_span_id = match.group(1), match.group(2)
+        trace = Trace(self.service, trace_id, parent_span_id, request_id)
+        trace_token = _current_trace.set(trace)
+        span_token = _current_span.set(None)
+        try:
+            with span(name) as root:
+                yield trace, root
+        finally:
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+            self.export(trace)
+
+    @contextmanager
+    def trace_or_span(self, name: str):
+        """추적 중이면 하위 span, 아니면 새 추적 (작업 큐 / 연속 모드처럼 HTTP 요청 밖에서 실행되는 경우)
+
+        context를 물려받은 태스크가 이미 끝난 요청의 추적을 갖고 있으면 (root span 종료) 새 추적을 시작한다.
+        """
+        trace = _current_trace.get()
+        root = trace.root() if trace is not None else None
+        if trace is not None and (root is None or root.end is None):
+            with span(name) as current:
+                yield trace, current
+        else:
+            with self.start_trace(name) as (trace, root):
+                yield trace, root
+
+    # ----- 내보내기 (백그라운드 스레드) -----
+
+    def export(self, trace: Trace):
+        """완료된 추적을 JSONL / OTLP로 내보내기 (설정이 없으면 무시, 큐가 가득 차면 버림)"""
+        if not (self.sink or self.otlp_endpoint):
+            return
+        with self._export_lock:
+            if self._export_thread is None or not self._export_thread.is_alive():
+                self._export_thread = threading.Thread(
+                    target=self._export_loop, name=f"trace-exporter-{self.service}", daemon=True
+                )
+                self._export_thread.start()
+        try:
+            self._export_queue.put_nowait(trace.to_record())
+        except queue.Full:
+            logger.debug("trace export queue full, dropping trace %s", trace.trace_id)
+
+    def _export_loop(self):
+        while True:
+            record = self._export_queue.get()
+            if self.sink:
+                try:
+                    with open(self.sink, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                except OSError as e:
+                    logger.warning(f"Failed to write trace sink {self.sink}: {e}")
+            if self.otlp_endpoint:
+                try:
+                    request = urllib.request.Request(
+                        self.otlp_endpoint,
+                        data=json.dumps(to_otlp(record)).encode("utf-8"),
+                        headers={"Content-Type": "application/json"},
+                        method="POST",
+                    )
+                    urllib.request.urlopen(request, timeout=2.0).close()
+                except Exception as e:
+                    logger.debug(f"Failed to export trace to {self.otlp_endpoint}: {e}")
+
+
+class TracingMiddleware:
+    """ASGI 미들웨어: 요청마다 추적 시작, 응답에 Server-Timing / X-Request-ID 헤더 추가
+
+    app.add_middleware(TracingMiddleware, tracer=TRACER) (각 서버의 Tracer)
+    """
+
+    def __init__(self, app, tracer: Tracer):
+        self.app = app
+        self.tracer = tracer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in UNTRACED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        name = f"{scope.get('method', 'GET')} {scope.get('path', '')}"
+        with self.tracer.start_trace(name, headers.get(REQUEST_ID_HEADER.lower()), headers.get(TRACEPARENT_HEADER)) as (trace, root):
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start":
+                    extra = [
+                        (b"server-timing", trace.server_timing(root).encode("latin-1")),
+                        (REQUEST_ID_HEADER.lower().encode("latin-1"), trace.request_id.encode("latin-1")),
+                    ]
+                    message = dict(message, headers=list(message.get("headers", [])) + extra)
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
+
+
+def to_otlp(record: Dict[str, Any]) -> Dict[str, Any]:
+    """JSONL 기록 → OTLP/HTTP JSON (ExportTraceServiceRequest)"""
+    def attributes(values: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [{"key": k, "value": {"stringValue": str(v)}} for k, v in values.items()]
+
+    spans = []
+    for s in record["spans"]:
+        item = {
+            "traceId": record["trace_id"],
+            "spanId": s["span_id"],
+            "name": s["name"],
+            "kind": 1,
+            "startTimeUnixNano": str(s["start_unix_nano"]),
+            "endTimeUnixNano": str(s["end_unix_nano"]),
+            "attributes": attributes(dict(s["attributes"], **{"request.id": record["request_id"]})),
+        }
+        if s["parent_id"]:
+            item["parentSpanId"] = s["parent_id"]
+        spans.append(item)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": attributes({"service.name": record["service"]})},
+            "scopeSpans": [{"scope": {"name": "sam6d.tracing"}, "spans": spans}],
+        }]
+    }